@@ -0,0 +1,123 @@
+"""
+Steps per second of SimpleGillespieSimulator before and after the
+vectorized propensity kernel, and of each SSA method, on random
+association/dissociation networks.
+
+Usage: python benchmarks/bench_gillespie_propensity.py [--reactions 1000 10000]
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from ionerdss.gillespie_simulation.propensity import PropensityKernel
+from ionerdss.gillespie_simulation.simple_gillespie import SimpleGillespieSimulator
+from ionerdss.gillespie_simulation.ssa_methods import SSA_METHODS
+
+
+def random_network(num_reactions, num_species, seed=0):
+    """Half bimolecular associations A + B -> C, half dissociations C -> A + B."""
+    rng = np.random.default_rng(seed)
+    reactant_matrix = np.zeros((num_reactions, num_species), dtype=np.int64)
+    product_matrix = np.zeros_like(reactant_matrix)
+    for r in range(num_reactions):
+        a, b, c = rng.choice(num_species, size=3, replace=False)
+        if r % 2 == 0:
+            reactant_matrix[r, a] += 1
+            reactant_matrix[r, b] += 1
+            product_matrix[r, c] += 1
+        else:
+            reactant_matrix[r, c] += 1
+            product_matrix[r, a] += 1
+            product_matrix[r, b] += 1
+    rate_constants = rng.uniform(0.001, 0.01, num_reactions)
+    y_init = rng.integers(50, 200, num_species)
+    return reactant_matrix, product_matrix, rate_constants, y_init
+
+
+def legacy_propensity(y, reactant_matrix, microscopic_rate_constants,
+                      previous_propensities=None, is_propensity_update_needed=None):
+    """The per-reaction math.comb loop the kernel replaced."""
+    propensities = np.zeros(len(reactant_matrix)) if previous_propensities is None else previous_propensities
+    for reaction_index, reaction in enumerate(reactant_matrix):
+        if is_propensity_update_needed is not None and is_propensity_update_needed[reaction_index] == 0:
+            continue
+        propensity = microscopic_rate_constants[reaction_index]
+        for species_index, species_count in enumerate(reaction):
+            propensity *= math.comb(y[species_index], species_count)
+        propensities[reaction_index] = propensity
+    return propensities
+
+
+def run_legacy(network, num_steps):
+    reactant_matrix, product_matrix, k, y_init = network
+    y = y_init.copy()
+    delta_y = product_matrix - reactant_matrix
+    propensities = legacy_propensity(y, reactant_matrix, k)
+    index = np.arange(len(reactant_matrix))
+    for _ in range(num_steps):
+        chosen = np.random.choice(index, p=propensities / propensities.sum())
+        y += delta_y[chosen]
+        update_needed = np.dot(reactant_matrix, np.abs(delta_y[chosen]))
+        legacy_propensity(y, reactant_matrix, k, propensities, update_needed)
+
+
+def run_kernel(network, num_steps):
+    reactant_matrix, product_matrix, k, y_init = network
+    y = y_init.copy()
+    delta_y = product_matrix - reactant_matrix
+    kernel = PropensityKernel(reactant_matrix, k)
+    dependents = kernel.dependency_graph(delta_y)
+    propensities = kernel.evaluate(y)
+    index = np.arange(len(reactant_matrix))
+    for _ in range(num_steps):
+        chosen = np.random.choice(index, p=propensities / propensities.sum())
+        y += delta_y[chosen]
+        kernel.update(y, dependents[chosen], propensities)
+
+
+def steps_per_second(run, network, num_steps):
+    np.random.seed(0)
+    start = time.perf_counter()
+    run(network, num_steps)
+    return num_steps / (time.perf_counter() - start)
+
+
+def method_steps_per_second(network, method, num_steps):
+    """Includes network setup; use enough steps for it to amortize."""
+    reactant_matrix, product_matrix, k, y_init = network
+    # Stop after roughly num_steps events
+    max_time = num_steps / legacy_propensity(y_init, reactant_matrix, k).sum()
+    np.random.seed(0)
+    start = time.perf_counter()
+    _, t_record = SimpleGillespieSimulator().gillespie_simulation(
+        max_time, y_init, reactant_matrix, product_matrix, k, method=method
+    )
+    return (len(t_record) - 1) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reactions", type=int, nargs="+", default=[1000, 3000, 10000])
+    parser.add_argument("--legacy-steps", type=int, default=3)
+    parser.add_argument("--steps", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'reactions':>10} {'species':>8} {'legacy steps/s':>15} {'kernel steps/s':>15} {'speedup':>8}")
+    for num_reactions in args.reactions:
+        network = random_network(num_reactions, max(10, num_reactions // 10))
+        legacy = steps_per_second(run_legacy, network, args.legacy_steps)
+        kernel = steps_per_second(run_kernel, network, args.steps)
+        print(f"{num_reactions:>10} {network[3].size:>8} {legacy:>15.1f} {kernel:>15.1f} {kernel / legacy:>7.0f}x")
+
+    print()
+    print(f"{'reactions':>10} " + " ".join(f"{method:>22}" for method in SSA_METHODS))
+    for num_reactions in args.reactions:
+        network = random_network(num_reactions, max(10, num_reactions // 10))
+        rates = [method_steps_per_second(network, method, 10 * args.steps) for method in SSA_METHODS]
+        print(f"{num_reactions:>10} " + " ".join(f"{rate:>22.1f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Wall time of PDBModel.regularize_homologous_chains on the bundled 8ERQ and
+8Y7S assemblies and on synthetic assemblies made of translated copies of
+8Y7S (180 copies of its 4 chains give a 720-mer).
+
+Homology detection by sequence alignment is timed separately; during
+regularization the synthetic chains are assigned to the molecule type of
+the chain they were copied from.
+
+Usage: python benchmarks/bench_regularize_index.py [--copies 15 60 180]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+from Bio.PDB.Model import Model as BioModel
+from Bio.PDB.Structure import Structure
+
+from ionerdss.nerdss_model.pdb_model import PDBModel
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+
+
+def synthetic_model(num_copies, spacing=300.0):
+    """PDBModel of ``num_copies`` copies of 8Y7S on a cubic grid, ``spacing`` Angstrom apart."""
+    model = PDBModel(pdb_file=os.path.join(DATA_DIR, "8y7s-assembly1.cif"), save_dir=tempfile.mkdtemp())
+    with contextlib.redirect_stdout(io.StringIO()):
+        model.identify_homologous_chains()
+    source_chains = [chain for chain in model.all_atoms_structure[0] if chain.id in model.chains_map]
+    side = int(np.ceil(num_copies ** (1 / 3)))
+
+    structure = Structure("synthetic")
+    bio_model = BioModel(0)
+    structure.add(bio_model)
+    chains_map = {}
+    for n in range(num_copies):
+        offset = spacing * np.array(np.unravel_index(n, (side, side, side)), dtype=np.float32)
+        for chain in source_chains:
+            new_chain = chain.copy()
+            new_chain.id = f"{chain.id}-{n}"
+            for atom in new_chain.get_atoms():
+                atom.set_coord(atom.coord + offset)
+            bio_model.add(new_chain)
+            chains_map[new_chain.id] = model.chains_map[chain.id]
+
+    groups = {}
+    for chain_id, mol_id in chains_map.items():
+        groups.setdefault(mol_id, []).append(chain_id)
+
+    def identify_homologous_chains():
+        model.chains_map = dict(chains_map)
+        model.chains_group = [list(group) for group in groups.values()]
+
+    model.all_atoms_structure = structure
+    model.identify_homologous_chains = identify_homologous_chains
+    return model
+
+
+def time_homology(model):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        model._find_homologous_chains_by_alignment()
+    return time.perf_counter() - start
+
+
+def time_regularization(model):
+    with contextlib.redirect_stdout(io.StringIO()):
+        model.coarse_grain()
+        start = time.perf_counter()
+        model.regularize_homologous_chains()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--copies", type=int, nargs="+", default=[15, 60, 180])
+    args = parser.parse_args()
+
+    for name in ("8erq", "8y7s"):
+        model = PDBModel(pdb_file=os.path.join(DATA_DIR, f"{name}-assembly1.cif"), save_dir=tempfile.mkdtemp())
+        print(f"{name.upper():>10}: {len(model.all_atoms_structure[0]):4d} chains, "
+              f"homology {time_homology(model):8.3f} s, regularization {time_regularization(model):8.3f} s")
+    for num_copies in args.copies:
+        model = synthetic_model(num_copies)
+        print(f"{num_copies:4d} x 8Y7S: {len(model.all_atoms_structure[0]):4d} chains, "
+              f"homology {time_homology(model):8.3f} s, regularization {time_regularization(model):8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
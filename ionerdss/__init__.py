@@ -56,6 +56,8 @@ ReactionStringParser = LazyLoader('.ode_solver.reaction_string_parser', 'Reactio
 solve_reaction_ode = LazyLoader('.ode_solver.reaction_ode_solver', 'solve_reaction_ode')
 reaction_dydt = LazyLoader('.ode_solver.reaction_ode_solver', 'dydt')
 calculate_macroscopic_reaction_rates = LazyLoader('.ode_solver.reaction_ode_solver', 'calculate_macroscopic_reaction_rates')
+ReactionNetwork = LazyLoader('.ode_solver.reaction_network', 'ReactionNetwork')
+solve_reaction_ode_sweep = LazyLoader('.ode_solver.parameter_sweep', 'solve_reaction_ode_sweep')
 SimpleGillespieSimulator = LazyLoader('.gillespie_simulation.simple_gillespie', 'SimpleGillespieSimulator')
 gui = LazyLoader('.nerdss_guis.gui', 'gui')
 pdb_gui = LazyLoader('.nerdss_guis.nerdss', 'nerdss')
@@ -0,0 +1,263 @@
+"""
+Approximate stochastic simulation: adaptive tau-leaping and hybrid SSA/ODE.
+
+Both are event generators with the same contract as the exact SSA loop of
+``SimpleGillespieSimulator``: they update the state ``y`` in place and
+yield the simulation time after every step, so they plug into
+``gillespie_simulation`` and the ensemble runner unchanged.
+
+Tau-leaping follows Cao, Gillespie & Petzold (J. Chem. Phys. 124, 044109,
+2006): the leap is chosen so that the expected relative change of every
+reactant stays below ``epsilon``; reactions within ``critical_threshold``
+firings of exhausting a reactant fire at most once per leap; and when the
+leap would be shorter than a few SSA steps, exact SSA steps are taken
+instead.
+
+The hybrid mode follows Haseltine & Rawlings (J. Chem. Phys. 117, 6959,
+2002): reactions whose species all have at least ``copy_threshold`` copies
+are integrated deterministically with the mass-action right-hand side of
+``ode_solver.reaction_ode_solver``, while the remaining reactions fire
+stochastically, their integrated propensity being carried along in the ODE
+to locate the next firing.
+"""
+
+import math
+import numpy as np
+import scipy.sparse as sp
+from scipy.integrate import solve_ivp
+
+APPROXIMATE_METHODS = ("tau_leaping", "hybrid")
+
+
+def _choose(propensities, total, source):
+    """Index drawn with probability proportional to ``propensities``."""
+    cumulative = np.cumsum(propensities)
+    return min(int(np.searchsorted(cumulative, source.random() * total, side="right")), len(propensities) - 1)
+
+
+def highest_order_terms(kernel):
+    """
+    Highest order of reaction (HOR) consuming each species.
+
+    Args:
+        kernel (PropensityKernel): Propensity kernel of the network.
+
+    Returns:
+        tuple: (hor, stoichiometry) arrays of length num_species; ``stoichiometry``
+            is the number of copies of the species needed by that reaction. Both
+            are 0 for species that are no reactant.
+    """
+    reactions, species, orders = kernel.terms
+    total_orders = np.bincount(reactions, weights=orders, minlength=kernel.num_reactions).astype(np.int64)
+    base = int(orders.max()) + 1 if len(orders) else 1
+    # Lexicographic maximum of (reaction order, stoichiometry) per species
+    best = np.zeros(kernel.num_species, dtype=np.int64)
+    np.maximum.at(best, species, total_orders[reactions] * base + orders)
+    return best // base, best % base
+
+
+def g_factor(x, hor, stoichiometry):
+    """
+    g_i of Cao et al., bounding the relative change of a propensity by that of species i.
+
+    Args:
+        x (numpy.ndarray): Copy numbers of the species.
+        hor (numpy.ndarray): Highest order of reaction of each species.
+        stoichiometry (numpy.ndarray): Copies of the species needed by that reaction.
+
+    Returns:
+        numpy.ndarray: g of each species.
+    """
+    x1 = 1.0 / np.maximum(x - 1.0, 1.0)
+    x2 = 2.0 / np.maximum(x - 2.0, 1.0)
+    g = hor.astype(np.float64)
+    g = np.where((hor == 2) & (stoichiometry == 2), 2.0 + x1, g)
+    g = np.where((hor == 3) & (stoichiometry == 2), 1.5 * (2.0 + x1), g)
+    g = np.where((hor == 3) & (stoichiometry == 3), 3.0 + x1 + x2, g)
+    return g
+
+
+def tau_leaping_events(y, kernel, dependents, delta_y, source, until=None,
+                       epsilon=0.03, critical_threshold=10, ssa_factor=10.0, num_ssa_steps=100):
+    """
+    Adaptive tau-leaping with Cao-Gillespie step selection.
+
+    Args:
+        y (numpy.ndarray): Current state of the system, updated in place.
+        kernel (PropensityKernel): Propensity kernel of the network.
+        dependents (ReactionDependencyGraph): Reactions to update after an exact SSA step.
+        delta_y (numpy.ndarray): Net change of each species in each reaction.
+        source: numpy.random.Generator or the numpy.random module.
+        until (float, optional): Leaps are shortened so as not to pass this time.
+        epsilon (float): Error control parameter; bound on the relative change of the propensities.
+        critical_threshold (int): Reactions fewer firings than this away from exhausting a reactant are critical.
+        ssa_factor (float): Exact SSA steps are taken when the leap is shorter than ssa_factor / a0.
+        num_ssa_steps (int): Number of exact SSA steps taken in that case.
+
+    Yields:
+        float: Simulation time after each leap or exact step.
+    """
+    num_reactions = kernel.num_reactions
+    delta = sp.csr_matrix(delta_y)
+    delta_t = delta.T.tocsr()
+    delta_sq_t = delta_t.multiply(delta_t).tocsr()
+    consumed = sp.coo_matrix(delta.multiply(delta < 0))
+    consumed_reaction, consumed_species, consumed_amount = consumed.row, consumed.col, -consumed.data.astype(np.float64)
+
+    reactant_species = np.unique(kernel.terms[1])
+    hor, stoichiometry = highest_order_terms(kernel)
+    hor, stoichiometry = hor[reactant_species], stoichiometry[reactant_species]
+
+    time = 0.0
+    propensities = kernel.evaluate(y)
+
+    while True:
+        a0 = propensities.sum()
+        if a0 <= 0:
+            # No reaction can fire any more
+            return
+
+        # Reactions close to exhausting one of their reactants
+        limits = np.full(num_reactions, np.inf)
+        np.minimum.at(limits, consumed_reaction, np.floor(y[consumed_species] / consumed_amount))
+        critical = (propensities > 0) & (limits < critical_threshold)
+        noncritical_propensities = np.where(critical, 0.0, propensities)
+
+        # Largest leap keeping the expected relative change of every reactant below epsilon
+        x = y[reactant_species].astype(np.float64)
+        mean_change = np.abs((delta_t @ noncritical_propensities)[reactant_species])
+        variance_change = (delta_sq_t @ noncritical_propensities)[reactant_species]
+        bound = np.maximum(epsilon * x / g_factor(x, hor, stoichiometry), 1.0)
+        with np.errstate(divide="ignore"):
+            tau_noncritical = min(np.min(bound / mean_change, initial=np.inf),
+                                  np.min(bound ** 2 / variance_change, initial=np.inf))
+
+        critical_total = propensities[critical].sum()
+        if tau_noncritical < ssa_factor / a0 or (math.isinf(tau_noncritical) and critical_total == 0):
+            # Leaping would not pay off (or the leap is unbounded): take exact SSA steps
+            for _ in range(num_ssa_steps):
+                a0 = propensities.sum()
+                if a0 <= 0:
+                    return
+                tau = -math.log(1.0 - source.random()) / a0
+                reaction_index_chose = _choose(propensities, a0, source)
+                y += delta_y[reaction_index_chose].astype(y.dtype, copy=False)
+                kernel.update(y, dependents[reaction_index_chose], propensities)
+                time += tau
+                yield time
+            continue
+
+        while True:
+            tau_critical = source.exponential() / critical_total if critical_total > 0 else math.inf
+            tau = min(tau_noncritical, tau_critical)
+            fire_critical = tau_critical <= tau_noncritical
+            capped = until is not None and until - time <= tau
+            if capped:
+                tau, fire_critical = until - time, False
+
+            firings = source.poisson(noncritical_propensities * tau)
+            if fire_critical:
+                firings[np.flatnonzero(critical)[_choose(propensities[critical], critical_total, source)]] += 1
+            change = delta_t @ firings
+            if np.all(y + change >= 0):
+                break
+            # Some species would go negative: retry with half the leap
+            tau_noncritical /= 2
+
+        y += change.astype(y.dtype, copy=False)
+        time = until if capped else time + tau
+        propensities[:] = kernel.evaluate(y)
+        yield time
+
+
+def hybrid_events(y, kernel, delta_y, reactant_matrix, source, until=None,
+                  copy_threshold=100, ode_window=None, ode_method="LSODA"):
+    """
+    Hybrid SSA/ODE simulation with dynamic partitioning.
+
+    Before each step, reactions whose reactants and products all have at
+    least ``copy_threshold`` copies are marked fast. Fast reactions are
+    integrated as an ``ode_solver.reaction_network.ReactionNetwork`` over a window
+    (``c / prod(n!)`` serving as the mass-action rate constant in copy
+    numbers), together with the integrated propensity of the slow
+    reactions; a slow reaction fires when that integral reaches an
+    exponentially distributed threshold. Without fast reactions an exact SSA
+    step is taken.
+
+    Args:
+        y (numpy.ndarray): Current state of the system (float), updated in place.
+        kernel (PropensityKernel): Propensity kernel of the network.
+        delta_y (numpy.ndarray): Net change of each species in each reaction.
+        reactant_matrix (numpy.ndarray): Matrix representing reactants in each reaction.
+        source: numpy.random.Generator or the numpy.random module.
+        until (float, optional): ODE windows are shortened so as not to pass this time.
+        copy_threshold (float): Copy number from which a species is treated as continuous.
+        ode_window (float, optional): Length of the ODE windows between repartitionings;
+            defaults to the time of about 100 fast firings.
+        ode_method (str): Integrator passed to scipy.integrate.solve_ivp.
+
+    Raises:
+        RuntimeError: If the ODE integration fails.
+
+    Yields:
+        float: Simulation time after each window or exact step.
+    """
+    from ..ode_solver.reaction_network import ReactionNetwork
+
+    reactant_matrix = np.asarray(reactant_matrix)
+    product_matrix = reactant_matrix + delta_y
+    involved = sp.csr_matrix((delta_y != 0) | (reactant_matrix > 0), dtype=np.int64)
+    time = 0.0
+
+    while True:
+        propensities = kernel.evaluate(y)
+        a0 = propensities.sum()
+        if a0 <= 0:
+            # No reaction can fire any more
+            return
+
+        low_copy = (y < copy_threshold).astype(np.int64)
+        fast = (involved @ low_copy == 0) & (propensities > 0)
+
+        if not fast.any():
+            tau = -math.log(1.0 - source.random()) / a0
+            y += delta_y[_choose(propensities, a0, source)]
+            time += tau
+            yield time
+            continue
+
+        slow = np.flatnonzero(~fast)
+        window = ode_window if ode_window is not None else 100.0 / propensities[fast].sum()
+        capped = until is not None and until - time <= window
+        if capped:
+            window = until - time
+        fast_network = ReactionNetwork(reactant_matrix[fast], product_matrix[fast], kernel.scale[fast])
+        threshold = -math.log(1.0 - source.random())
+
+        def rhs(t, state):
+            species = np.maximum(state[:-1], 0.0)
+            slow_total = kernel.evaluate(species)[slow].sum() if len(slow) else 0.0
+            return np.append(fast_network.dydt(t, species), slow_total)
+
+        def slow_reaction(t, state):
+            return state[-1] - threshold
+        slow_reaction.terminal = True
+        slow_reaction.direction = 1
+
+        solution = solve_ivp(rhs, (time, time + window), np.append(y, 0.0), method=ode_method,
+                             events=slow_reaction if len(slow) else None)
+        if solution.status == -1:
+            raise RuntimeError(f"ODE integration of the fast reactions failed: {solution.message}")
+        y[:] = np.maximum(solution.y[:-1, -1], 0.0)
+
+        if solution.status == 1:
+            # A slow reaction fires at the event time
+            time = float(solution.t[-1])
+            slow_propensities = kernel.evaluate(y)[slow]
+            total = slow_propensities.sum()
+            if total > 0:
+                y += delta_y[slow[_choose(slow_propensities, total, source)]]
+                np.maximum(y, 0.0, out=y)
+        else:
+            time = until if capped else time + window
+        yield time
@@ -0,0 +1,242 @@
+"""
+Ensembles of independent Gillespie trajectories.
+
+Replicates are split into batches that run in a process pool. Every
+replicate draws from its own random stream, spawned from one
+``numpy.random.SeedSequence``, so results do not depend on how replicates
+are distributed over workers. States are sampled on a fixed output time
+grid into preallocated arrays, optionally memory-mapped to disk, and the
+ensemble mean and variance are accumulated batch by batch, so the
+trajectories themselves need not be kept.
+"""
+
+import os
+import math
+import pickle
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from .simple_gillespie import SimpleGillespieSimulator
+
+# Configure logging,
+import logging
+# inherit from the global level (should be setup in main)
+logger = logging.getLogger(__name__)
+
+
+class RunningMoments:
+    """
+    Mean and variance accumulated over batches of samples.
+
+    Batches are merged with the pairwise update of Chan, Golub & LeVeque,
+    which is numerically stable and needs only the running mean and sum of
+    squared deviations.
+
+    Attributes:
+        count (int): Number of samples seen.
+        mean (numpy.ndarray): Running mean.
+        m2 (numpy.ndarray): Running sum of squared deviations from the mean.
+    """
+
+    def __init__(self, shape):
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+
+    def add_batch(self, samples):
+        """
+        Merge a batch of samples, stacked along the first axis.
+
+        Args:
+            samples (numpy.ndarray): Array of shape (batch, *shape).
+        """
+        batch_count = len(samples)
+        if batch_count == 0:
+            return
+        batch_mean = samples.mean(axis=0)
+        batch_m2 = ((samples - batch_mean) ** 2).sum(axis=0)
+        total = self.count + batch_count
+        delta = batch_mean - self.mean
+        self.mean += delta * (batch_count / total)
+        self.m2 += batch_m2 + delta ** 2 * (self.count * batch_count / total)
+        self.count = total
+
+    @property
+    def variance(self):
+        """Population variance (ddof=0), as np.var."""
+        return self.m2 / self.count if self.count else np.full_like(self.m2, np.nan)
+
+
+class EnsembleResult:
+    """
+    Output of run_gillespie_ensemble.
+
+    Attributes:
+        times (numpy.ndarray): Output time grid, shape (T,).
+        mean (numpy.ndarray): Ensemble mean copy numbers, shape (T, S).
+        variance (numpy.ndarray): Ensemble variance of copy numbers, shape (T, S).
+        num_replicates (int): Number of trajectories.
+        trajectories (numpy.ndarray or None): Copy numbers of each replicate, shape (N, T, S);
+            a numpy.memmap when written to disk, None when not stored.
+    """
+
+    def __init__(self, times, mean, variance, num_replicates, trajectories=None):
+        self.times = times
+        self.mean = mean
+        self.variance = variance
+        self.num_replicates = num_replicates
+        self.trajectories = trajectories
+
+    @property
+    def std(self):
+        """Ensemble standard deviation of copy numbers, shape (T, S)."""
+        return np.sqrt(self.variance)
+
+
+def sample_on_time_grid(events, y, time_grid, out):
+    """
+    Record the state of a trajectory at fixed output times.
+
+    The state at a grid time is the state after the last event at or before
+    it. Consumes ``events`` only until the last grid time is passed.
+
+    Args:
+        events (Iterator[float]): Event times; ``y`` holds the state after each event when it is yielded.
+        y (numpy.ndarray): Current state, updated in place by ``events``.
+        time_grid (numpy.ndarray): Non-decreasing output times.
+        out (numpy.ndarray): Array of shape (len(time_grid), len(y)) to fill.
+
+    Returns:
+        numpy.ndarray: ``out``, filled.
+    """
+    num_points = len(time_grid)
+    next_point = 0
+    previous = np.copy(y)
+    for time in events:
+        # Grid points before this event still see the previous state
+        if time > time_grid[next_point]:
+            stop = int(np.searchsorted(time_grid, time, side="left"))
+            out[next_point:stop] = previous
+            next_point = stop
+            if next_point == num_points:
+                return out
+        np.copyto(previous, y)
+    # No reaction can fire any more: the state stays frozen
+    out[next_point:] = previous
+    return out
+
+
+def _simulate_batch(replicates, seed_sequences, time_grid, y_init, reactant_matrix, product_matrix,
+                    microscopic_rate_constants, method, full_update_scheme, dtype, method_options):
+    """Run a batch of replicates; module-level so it can be sent to worker processes."""
+    simulator = SimpleGillespieSimulator()
+    network = simulator._prepare_network(reactant_matrix, product_matrix, microscopic_rate_constants, method)
+    batch = np.empty((len(replicates), len(time_grid), len(y_init)), dtype=dtype)
+    for out, seed_sequence in zip(batch, seed_sequences):
+        y = np.array(y_init, dtype=dtype)
+        events = simulator._iterate_events(y, network, full_update_scheme, method, np.random.default_rng(seed_sequence),
+                                           until=time_grid[-1], **method_options)
+        sample_on_time_grid(events, y, time_grid, out)
+    return replicates, batch
+
+
+def run_gillespie_ensemble(num_replicates, time_grid, y_init,
+                           reactant_matrix, product_matrix, microscopic_rate_constants,
+                           seed=None, method="direct", full_update_scheme=False,
+                           max_workers=None, batch_size=None, backend="process",
+                           store_trajectories=True, memmap_file=None, method_options=None):
+    """
+    Run independent Gillespie trajectories on a fixed output time grid.
+
+    Args:
+        num_replicates (int): Number of trajectories.
+        time_grid (numpy.ndarray): Non-decreasing output times, starting at or after 0.
+        y_init (numpy.ndarray): Initial state of the system (species counts).
+        reactant_matrix (numpy.ndarray): Matrix representing reactants in each reaction.
+        product_matrix (numpy.ndarray): Matrix representing products in each reaction.
+        microscopic_rate_constants (numpy.ndarray): Rate constants for each reaction.
+        seed (int or numpy.random.SeedSequence, optional): Root seed; replicate i always uses
+            the i-th stream spawned from it.
+        method (str): Simulation method, see SimpleGillespieSimulator.gillespie_simulation.
+        full_update_scheme (bool): controls if update every propensity entry in each iteration.
+        max_workers (int, optional): Number of worker processes; defaults to the number of CPUs.
+        batch_size (int, optional): Replicates per task; defaults to about four tasks per worker.
+        backend (str): "process" or "serial".
+        store_trajectories (bool): Keep every trajectory; if False only the moments are returned.
+        memmap_file (str, optional): Write trajectories to this .npy file instead of memory.
+        method_options (dict, optional): Tuning parameters of the "tau_leaping" and "hybrid" methods.
+
+    Raises:
+        ValueError: If the arguments are inconsistent.
+
+    Returns:
+        EnsembleResult: Time grid, ensemble mean and variance, and the trajectories if stored.
+
+    Example:
+        >>> result = run_gillespie_ensemble(1000, np.linspace(0, 10, 101), y_init,
+        ...                                 reactant_matrix, product_matrix, k, seed=42)
+        >>> result.mean.shape
+        (101, 3)
+    """
+    if backend not in ("process", "serial"):
+        raise ValueError(f"Unknown backend '{backend}'; expected 'process' or 'serial'.")
+    if num_replicates < 1:
+        raise ValueError("num_replicates must be at least 1.")
+    time_grid = np.asarray(time_grid, dtype=np.float64)
+    if time_grid.ndim != 1 or len(time_grid) == 0 or np.any(np.diff(time_grid) < 0) or time_grid[0] < 0:
+        raise ValueError("time_grid must be a non-empty, non-decreasing 1-d array of times >= 0.")
+
+    y_init = np.asarray(y_init)
+    reactant_matrix = np.asarray(reactant_matrix)
+    product_matrix = np.asarray(product_matrix)
+    # Validates the network before any work is sent out
+    _, _, delta_y, _ = SimpleGillespieSimulator()._prepare_network(
+        reactant_matrix, product_matrix, microscopic_rate_constants, method)
+    # Hybrid states are continuous
+    dtype = np.float64 if method == "hybrid" else np.result_type(y_init.dtype, delta_y.dtype)
+    shape = (num_replicates, len(time_grid), len(y_init))
+
+    trajectories = None
+    if memmap_file is not None:
+        trajectories = np.lib.format.open_memmap(memmap_file, mode="w+", dtype=dtype, shape=shape)
+    elif store_trajectories:
+        trajectories = np.empty(shape, dtype=dtype)
+    moments = RunningMoments(shape[1:])
+
+    num_workers = 1 if backend == "serial" else max(1, min(num_replicates, max_workers or os.cpu_count() or 1))
+    if batch_size is None:
+        batch_size = max(1, math.ceil(num_replicates / (4 * num_workers)))
+    seed_sequences = (seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)).spawn(num_replicates)
+    batches = [
+        (np.arange(start, min(start + batch_size, num_replicates)), seed_sequences[start:start + batch_size])
+        for start in range(0, num_replicates, batch_size)
+    ]
+    common = (time_grid, y_init, reactant_matrix, product_matrix, microscopic_rate_constants,
+              method, full_update_scheme, dtype, method_options or {})
+
+    def collect(replicates, batch):
+        if trajectories is not None:
+            trajectories[replicates] = batch
+        moments.add_batch(batch)
+
+    if num_workers == 1:
+        for replicates, seeds in batches:
+            collect(*_simulate_batch(replicates, seeds, *common))
+    else:
+        try:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=num_workers) as pool:
+                futures = [pool.submit(_simulate_batch, replicates, seeds, *common) for replicates, seeds in batches]
+                # Merge batches as they finish so only a few are held at once
+                for future in concurrent.futures.as_completed(futures):
+                    collect(*future.result())
+        except (BrokenProcessPool, pickle.PicklingError, OSError) as e:
+            logger.warning(f"Process pool unavailable ({e}); running replicates serially instead.")
+            moments = RunningMoments(shape[1:])
+            for replicates, seeds in batches:
+                collect(*_simulate_batch(replicates, seeds, *common))
+
+    if isinstance(trajectories, np.memmap):
+        trajectories.flush()
+    return EnsembleResult(time_grid, moments.mean, moments.variance, num_replicates, trajectories)
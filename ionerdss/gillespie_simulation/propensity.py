@@ -0,0 +1,165 @@
+"""
+Vectorized propensity evaluation for Gillespie simulations.
+
+The mass-action propensity of reaction ``r`` is
+
+    a_r = c_r * prod_s comb(y_s, n_rs)
+        = c_r / prod_s n_rs! * prod_s y_s (y_s - 1) ... (y_s - n_rs + 1)
+
+so every nonzero entry ``n_rs`` of the reactant matrix contributes
+``n_rs`` factors ``y_s - j`` (j = 0 .. n_rs - 1) to a falling-factorial
+product. ``PropensityKernel`` lays these factors out once, grouped by
+reaction, and evaluates all products of a set of reactions with a single
+``np.multiply.reduceat``. ``ReactionDependencyGraph`` records which
+propensities change when a reaction fires, so a simulation step only
+recomputes those.
+"""
+
+import math
+import numpy as np
+import scipy.sparse as sp
+
+
+class PropensityKernel:
+    """
+    Precomputed falling-factorial terms of a reactant matrix.
+
+    Attributes:
+        num_reactions (int): Number of reactions.
+        num_species (int): Number of species.
+        terms (tuple): (reaction, species, order) arrays, one entry per nonzero of the reactant matrix.
+        scale (numpy.ndarray): c_r / prod_s n_rs! for each reaction.
+        factor_ptr (numpy.ndarray): Factors of reaction r are factor_ptr[r]:factor_ptr[r + 1].
+        factor_species (numpy.ndarray): Species of each factor.
+        factor_shift (numpy.ndarray): j of each factor ``y_s - j``.
+
+    Example:
+        >>> kernel = PropensityKernel(np.array([[1, 1, 0], [0, 0, 2]]), np.array([9.0, 0.25]))
+        >>> kernel.evaluate(np.array([10, 5, 3]))
+        array([450.  ,   0.75])
+    """
+
+    def __init__(self, reactant_matrix, microscopic_rate_constants):
+        """
+        Args:
+            reactant_matrix (numpy.ndarray): Matrix representing reactants in each reaction.
+            microscopic_rate_constants (numpy.ndarray): Rate constants for each reaction.
+
+        Raises:
+            ValueError: If the reactant matrix has negative or non-integer entries.
+        """
+        reactant_matrix = np.asarray(reactant_matrix)
+        if not np.all(np.mod(reactant_matrix, 1) == 0) or np.any(reactant_matrix < 0):
+            raise ValueError("For Gillespie, all entries in the reactant matrix must be non-negative integers.")
+        self.num_reactions, self.num_species = reactant_matrix.shape
+
+        # np.nonzero walks the matrix row by row, so terms come out grouped by reaction
+        reactions, species = np.nonzero(reactant_matrix)
+        orders = reactant_matrix[reactions, species].astype(np.int64)
+        self.terms = (reactions, species, orders)
+
+        factorials = np.array([math.factorial(n) for n in orders], dtype=np.float64)
+        denominators = np.ones(self.num_reactions)
+        np.multiply.at(denominators, reactions, factorials)
+        self.scale = np.asarray(microscopic_rate_constants, dtype=np.float64) / denominators
+
+        # One factor y_s - j per unit of stoichiometry
+        num_factors = np.bincount(reactions, weights=orders, minlength=self.num_reactions).astype(np.int64)
+        self.factor_ptr = np.concatenate(([0], np.cumsum(num_factors)))
+        self.factor_species = np.repeat(species, orders)
+        term_starts = np.cumsum(orders) - orders
+        self.factor_shift = (np.arange(orders.sum()) - np.repeat(term_starts, orders)).astype(np.float64)
+
+        self._has_factors = num_factors > 0
+        self._segment_starts = self.factor_ptr[:-1][self._has_factors]
+
+    def evaluate(self, y):
+        """
+        Propensities of all reactions.
+
+        Args:
+            y (numpy.ndarray): Current state of the system (species counts).
+
+        Returns:
+            numpy.ndarray: Array of propensities for each reaction.
+        """
+        propensities = self.scale.copy()
+        if len(self.factor_species):
+            factors = np.asarray(y)[self.factor_species] - self.factor_shift
+            propensities[self._has_factors] *= np.multiply.reduceat(factors, self._segment_starts)
+        return propensities
+
+    def update(self, y, reactions, propensities):
+        """
+        Recompute the propensities of ``reactions`` in place.
+
+        Args:
+            y (numpy.ndarray): Current state of the system (species counts).
+            reactions (numpy.ndarray): Indices of the reactions to recompute.
+            propensities (numpy.ndarray): Propensities to update.
+
+        Returns:
+            numpy.ndarray: ``propensities``, updated.
+        """
+        starts = self.factor_ptr[reactions]
+        lengths = self.factor_ptr[reactions + 1] - starts
+        values = self.scale[reactions]
+        nonempty = lengths > 0
+        if nonempty.any():
+            # Gather the factors of the selected reactions into contiguous segments
+            segment_starts = np.cumsum(lengths) - lengths
+            factor_index = np.arange(segment_starts[-1] + lengths[-1]) + np.repeat(starts - segment_starts, lengths)
+            factors = np.asarray(y)[self.factor_species[factor_index]] - self.factor_shift[factor_index]
+            values[nonempty] *= np.multiply.reduceat(factors, segment_starts[nonempty])
+        propensities[reactions] = values
+        return propensities
+
+    def dependency_graph(self, delta_y):
+        """
+        Reactions whose propensity depends on each reaction's firing.
+
+        Args:
+            delta_y (numpy.ndarray): Net change of each species in each reaction (products - reactants).
+
+        Returns:
+            ReactionDependencyGraph: The dependency graph.
+        """
+        return ReactionDependencyGraph(delta_y, self.terms, self.num_reactions)
+
+
+class ReactionDependencyGraph:
+    """
+    For each reaction, the reactions that must be recomputed after it fires.
+
+    Reaction ``i`` depends on reaction ``j`` if ``j`` changes the copy number
+    of one of the reactants of ``i``.
+
+    Attributes:
+        indptr (numpy.ndarray): Dependents of reaction j are indices[indptr[j]:indptr[j + 1]].
+        indices (numpy.ndarray): Dependent reactions, sorted within each row.
+    """
+
+    def __init__(self, delta_y, terms, num_reactions):
+        """
+        Args:
+            delta_y (numpy.ndarray): Net change of each species in each reaction.
+            terms (tuple): (reaction, species, order) arrays of ``PropensityKernel``.
+            num_reactions (int): Number of reactions.
+        """
+        changes = sp.csr_matrix(np.asarray(delta_y) != 0, dtype=np.int32)
+        reactions, species, _ = terms
+        consumers = sp.csr_matrix(
+            (np.ones(len(reactions), dtype=np.int32), (species, reactions)),
+            shape=(changes.shape[1], num_reactions)
+        )
+        graph = (changes @ consumers).tocsr()
+        graph.sort_indices()
+        self.indptr = graph.indptr.astype(np.int64)
+        self.indices = graph.indices.astype(np.int64)
+
+    def __getitem__(self, reaction_index):
+        return self.indices[self.indptr[reaction_index]:self.indptr[reaction_index + 1]]
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
@@ -13,6 +13,12 @@ Docstrings and comments are helped written by GPT3.5 and GPT API
 import numpy as np
 import math
 
+from .propensity import PropensityKernel
+from .ssa_methods import SSA_METHODS, IndexedPriorityQueue, make_selector
+from .approximate import APPROXIMATE_METHODS, tau_leaping_events, hybrid_events
+
+SIMULATION_METHODS = SSA_METHODS + APPROXIMATE_METHODS
+
 class SimpleGillespieSimulator:
     def convert_to_microscopic_rate_constants(self,macroscopic_rate_constants, reactant_matrix, volume,
                                             avogadro=6.02214e23):
@@ -85,45 +91,28 @@ class SimpleGillespieSimulator:
         Note:
             The function calculates the propensity of each reaction in a Gillespie algorithm.
             Propensity is the product of the microscopic rate constant and combinatorial terms
-            based on the reactant matrix and current state (y) of the system.
+            based on the reactant matrix and current state (y) of the system. With
+            previous_propensities, only reactions flagged in is_propensity_update_needed
+            are recomputed, in place.
         """
         
-        if previous_propensities is None: # simple case
-            
-            propensities = np.zeros(len(reactant_matrix))
-
-            # Loop over each reaction
-            for reaction_index, reaction in enumerate(reactant_matrix):
-                propensity = microscopic_rate_constants[reaction_index]
-
-                # Multiply by the combinatorial term for each reactant
-                for species_index, species_count in enumerate(reaction):
-                    propensity *= math.comb(y[species_index], species_count)
+        kernel = PropensityKernel(reactant_matrix, microscopic_rate_constants)
 
-                propensities[reaction_index] = propensity
-            
-            return propensities
+        if previous_propensities is None: # simple case
+            return kernel.evaluate(y)
 
         else: # optimization case
-            # Loop over each reaction
-            for reaction_index, reaction in enumerate(reactant_matrix):
-                if is_propensity_update_needed[reaction_index] != 0:
-                    # Update propensity if entry is not zero
-                    propensity = microscopic_rate_constants[reaction_index]
-
-                    # Multiply by the combinatorial term for each reactant
-                    for species_index, species_count in enumerate(reaction):
-                        propensity *= math.comb(y[species_index], species_count)
-                    
-                    previous_propensities[reaction_index] = propensity
-                
-            return previous_propensities
+            # Only recompute the flagged reactions
+            return kernel.update(y, np.flatnonzero(is_propensity_update_needed), previous_propensities)
 
 
     def gillespie_simulation(self, max_time, y_init,
                             reactant_matrix, product_matrix, microscopic_rate_constants,
                             record_interval = 1,
-                            full_update_scheme = False):
+                            full_update_scheme = False,
+                            method = "direct",
+                            rng = None,
+                            **method_options):
         """
         Perform Gillespie simulation for a chemical reaction system.
 
@@ -134,6 +123,19 @@ class SimpleGillespieSimulator:
             product_matrix (numpy.ndarray): Matrix representing products in each reaction.
             microscopic_rate_constants (numpy.ndarray): Rate constants for each reaction.
             full_update_scheme (bool): controls if update every propensity entry in each iteration.
+            method (str): SSA variant used to pick the next reaction:
+                "direct": normalize all propensities each step, O(R) (default).
+                "sum_tree": sum tree of propensities, O(log R).
+                "composition_rejection": exponent groups with rejection sampling, amortized O(1).
+                "next_reaction": Gibson-Bruck Next Reaction Method with an indexed priority queue, O(log R).
+                "tau_leaping" and "hybrid": approximate methods, see tau_leaping_simulation
+                and hybrid_simulation.
+            rng (numpy.random.Generator, optional): Random number source; the global numpy
+                random state (np.random.seed) is used if None.
+            **method_options: Tuning parameters of the approximate methods.
+
+        Raises:
+            ValueError: If a matrix has non-integer entries or the method is unknown.
 
         Returns:
             tuple: A tuple containing arrays for recorded time points (t_record) and
@@ -162,60 +164,272 @@ class SimpleGillespieSimulator:
         Note:
             This function performs a Gillespie simulation for a chemical reaction system.
             It records the system state and corresponding time points during the simulation.
+            Unless full_update_scheme is set, only the propensities of reactions whose
+            reactants were changed by the last firing are recomputed. The methods other
+            than "direct" pay off on networks with many reactions, such as those produced
+            by build_ode_model_from_complexes.
+        """
+        time = 0.0 # Simulation time elapsed
+        # Initial copy numbers; y_init is left untouched. Hybrid states are continuous.
+        y = np.array(y_init, dtype=np.float64) if method == "hybrid" else np.array(y_init)
+        network = self._prepare_network(reactant_matrix, product_matrix, microscopic_rate_constants, method)
+
+        y_record = [np.copy(y)]  # Record array for copy numbers
+        t_record = [time]  # Record array for time
+        n_steps = 0 # Record every record_interval step(s)
+
+        if max_time <= 0:
+            return y_record, t_record
+
+        for time in self._iterate_events(y, network, full_update_scheme, method, rng,
+                                         until=max_time, **method_options):
+
+            # Record
+            if n_steps % record_interval == 0:
+                y_record.append(np.copy(y))
+                t_record.append(time)
+            n_steps += 1
+
+            if time >= max_time:  # Control simulation time scale
+                break
+
+        return y_record, t_record
+
+    def tau_leaping_simulation(self, max_time, y_init,
+                               reactant_matrix, product_matrix, microscopic_rate_constants,
+                               record_interval = 1,
+                               epsilon = 0.03, critical_threshold = 10,
+                               ssa_factor = 10.0, num_ssa_steps = 100, rng = None):
+        """
+        Adaptive tau-leaping; a drop-in replacement for gillespie_simulation.
+
+        Each leap fires a Poisson number of every non-critical reaction, with
+        the leap chosen so that no propensity is expected to change by more
+        than a fraction epsilon (Cao-Gillespie step selection). Reactions that
+        could exhaust a reactant within critical_threshold firings fire at most
+        once per leap. When leaps would be shorter than ssa_factor / a0,
+        num_ssa_steps exact SSA steps are taken instead.
+
+        Args:
+            max_time, y_init, reactant_matrix, product_matrix, microscopic_rate_constants,
+            record_interval, rng: As in gillespie_simulation; record_interval counts leaps.
+            epsilon (float): Error control parameter (default 0.03).
+            critical_threshold (int): Firings left before a reaction is critical (default 10).
+            ssa_factor (float): Threshold for falling back to exact SSA, in mean SSA steps.
+            num_ssa_steps (int): Number of exact SSA steps taken per fallback.
+
+        Returns:
+            tuple: y_record and t_record, as in gillespie_simulation.
+        """
+        return self.gillespie_simulation(max_time, y_init, reactant_matrix, product_matrix,
+                                         microscopic_rate_constants, record_interval,
+                                         method="tau_leaping", rng=rng,
+                                         epsilon=epsilon, critical_threshold=critical_threshold,
+                                         ssa_factor=ssa_factor, num_ssa_steps=num_ssa_steps)
+
+    def hybrid_simulation(self, max_time, y_init,
+                          reactant_matrix, product_matrix, microscopic_rate_constants,
+                          record_interval = 1,
+                          copy_threshold = 100, ode_window = None, ode_method = "LSODA", rng = None):
+        """
+        Hybrid SSA/ODE simulation; a drop-in replacement for gillespie_simulation.
+
+        Reactions whose reactants and products all have at least
+        copy_threshold copies are integrated as an ode_solver.reaction_network.ReactionNetwork;
+        all other reactions fire stochastically. The partition is redone after
+        every slow firing and every ODE window. Recorded states are floats,
+        since high-copy species are treated as continuous.
+
+        Args:
+            max_time, y_init, reactant_matrix, product_matrix, microscopic_rate_constants,
+            record_interval, rng: As in gillespie_simulation; record_interval counts steps.
+            copy_threshold (float): Copy number from which a species is continuous (default 100).
+            ode_window (float, optional): Time between repartitionings; defaults to about
+                100 fast firings.
+            ode_method (str): Integrator of scipy.integrate.solve_ivp (default "LSODA").
+
+        Returns:
+            tuple: y_record and t_record, as in gillespie_simulation.
+        """
+        return self.gillespie_simulation(max_time, y_init, reactant_matrix, product_matrix,
+                                         microscopic_rate_constants, record_interval,
+                                         method="hybrid", rng=rng,
+                                         copy_threshold=copy_threshold, ode_window=ode_window,
+                                         ode_method=ode_method)
+
+    def gillespie_ensemble(self, num_replicates, time_grid, y_init,
+                           reactant_matrix, product_matrix, microscopic_rate_constants,
+                           seed = None, method = "direct", full_update_scheme = False, **kwargs):
+        """
+        Run independent replicates of gillespie_simulation across worker processes.
+
+        Each replicate uses its own random stream spawned from seed, and its
+        state is sampled on time_grid instead of every record_interval events.
+        See ensemble.run_gillespie_ensemble for the remaining keyword arguments
+        (max_workers, batch_size, backend, store_trajectories, memmap_file, method_options).
+
+        Returns:
+            EnsembleResult: Time grid, incrementally accumulated ensemble mean and
+                variance, and the trajectories of shape (N, T, S) if stored.
+        """
+        from .ensemble import run_gillespie_ensemble
+        return run_gillespie_ensemble(num_replicates, time_grid, y_init,
+                                      reactant_matrix, product_matrix, microscopic_rate_constants,
+                                      seed=seed, method=method, full_update_scheme=full_update_scheme, **kwargs)
+
+    def _prepare_network(self, reactant_matrix, product_matrix, microscopic_rate_constants, method="direct"):
+        """
+        Validate a network and lay out its propensity kernel and dependency graph.
+
+        Returns:
+            tuple: (kernel, dependents, delta_y, reactant_matrix)
         """
         if not np.all(np.mod(reactant_matrix, 1) == 0):
             raise ValueError("For gillespie, all entries in the reactant matrix must be mathematically integers.")
         
         if not np.all(np.mod(product_matrix, 1) == 0):
             raise ValueError("For gillespie, all entries in the product matrix must be mathematically integers.")
-        
-        time = 0.0 # Simulation time elapsed
-        y = y_init  # Initial copy numbers
-        propensities = self.calculate_propensity(y, reactant_matrix, microscopic_rate_constants)  # Propensities array
 
-        is_propensity_update_needed = np.zeros(len(reactant_matrix)) # 1 for updated needed
-        delta_y = product_matrix - reactant_matrix  # Yield matrix
-        index = np.array(range(0, len(reactant_matrix)))  # np.random.choice must be 1-d array; use indexing instead
-        y_record = [np.copy(y)]  # Record array for copy numbers
-        t_record = [time]  # Record array for time
-        n_steps = 0 # Record every record_interval step(s)
+        if method not in SIMULATION_METHODS:
+            raise ValueError(f"Unknown simulation method '{method}'; expected one of {SIMULATION_METHODS}.")
+
+        reactant_matrix = np.asarray(reactant_matrix)
+        delta_y = np.asarray(product_matrix) - reactant_matrix  # Yield matrix
+
+        # Falling-factorial terms and reaction dependencies are laid out once
+        kernel = PropensityKernel(reactant_matrix, microscopic_rate_constants)
+        dependents = kernel.dependency_graph(delta_y)
+        return kernel, dependents, delta_y, reactant_matrix
+
+    def _iterate_events(self, y, network, full_update_scheme=False, method="direct", rng=None,
+                        until=None, **method_options):
+        """
+        Fire reactions, updating y in place.
+
+        Args:
+            y (numpy.ndarray): Current state of the system, updated in place.
+            network (tuple): Output of _prepare_network.
+            full_update_scheme (bool): Update every propensity entry in each iteration.
+            method (str): SSA variant, see gillespie_simulation.
+            rng (numpy.random.Generator, optional): Random number source; the global
+                numpy random state if None.
+            until (float, optional): Time the caller stops at; tau leaps and ODE windows
+                are shortened so as not to pass it.
+            **method_options: Tuning parameters of "tau_leaping" and "hybrid".
+
+        Yields:
+            float: Simulation time after each firing (or leap / ODE window). The
+                generator ends once no reaction can fire any more.
+        """
+        # np.random.random draws from the same global stream as np.random.rand
+        source = np.random if rng is None else rng
+        rand, choice, exponential = source.random, source.choice, source.exponential
+
+        kernel, dependents, delta_y, reactant_matrix = network
+
+        if method == "tau_leaping":
+            yield from tau_leaping_events(y, kernel, dependents, delta_y, source, until, **method_options)
+            return
+        if method == "hybrid":
+            yield from hybrid_events(y, kernel, delta_y, reactant_matrix, source, until, **method_options)
+            return
+
+        propensities = kernel.evaluate(y)  # Propensities array
+
+        if method == "next_reaction":
+            yield from self._next_reaction_events(y, delta_y, kernel, dependents, propensities,
+                                                  full_update_scheme, exponential)
+            return
+
+        # Running totals for the logarithmic / constant-time variants; None for the direct method
+        selector = None if method == "direct" else make_selector(method, propensities)
+
+        time = 0.0
+        index = np.array(range(0, kernel.num_reactions))  # np.random.choice must be 1-d array; use indexing instead
+
+        while True:
 
-        while time < max_time:  # Control simulation time scale
-            
-            if full_update_scheme:
-            
-                # Calculate propensity
-                propensities = self.calculate_propensity(y, reactant_matrix, microscopic_rate_constants)
-            
-            else:
-                
-                # Calculate propensity
-                propensities = self.calculate_propensity(y, reactant_matrix, microscopic_rate_constants,
-                                                propensities, is_propensity_update_needed)
-            
             # Calculate r_tot and sojourn time
-            r_tot = np.sum(propensities)
-            tau = - (1.0 / r_tot) * np.log(np.random.rand())
+            r_tot = np.sum(propensities) if selector is None else selector.total
+            if r_tot <= 0:
+                # No reaction can fire any more
+                return
+            tau = - (1.0 / r_tot) * np.log(rand())
 
             # Choose reaction and add to species
-            reaction_index_chose = np.random.choice(index, p=propensities / r_tot)
+            if selector is None:
+                reaction_index_chose = choice(index, p=propensities / r_tot)
+            else:
+                reaction_index_chose = selector.select(rand)
             y += delta_y[reaction_index_chose]
-            
-            
-            # Update which propensities need to be updated in next iteration
-            if not full_update_scheme:
-                ##@deprecated: entries_changed = np.abs(np.transpose(delta_y[[reaction_index_chose]]))
-                ##@deprecated: is_propensity_update_needed = np.squeeze(np.matmul(reactant_matrix, entries_changed))
-                entries_changed = np.abs(delta_y[reaction_index_chose].T)
-                is_propensity_update_needed = np.dot(reactant_matrix, entries_changed.squeeze())
+
+            # Update propensities for the next iteration
+            if full_update_scheme:
+                changed = index
+                propensities[:] = kernel.evaluate(y)
+            else:
+                # Only the reactions whose reactants changed
+                changed = dependents[reaction_index_chose]
+                kernel.update(y, changed, propensities)
+            if selector is not None:
+                selector.update(changed, propensities)
 
             # Progress time
             time += tau
+            yield time
 
-            # Record
-            if n_steps % record_interval == 0:
-                y_record.append(np.copy(y))
-                t_record.append(time)
-            n_steps += 1
+    def _next_reaction_events(self, y, delta_y, kernel, dependents, propensities,
+                              full_update_scheme, exponential):
+        """
+        Gibson-Bruck Next Reaction Method.
 
-        return y_record, t_record
+        Every reaction keeps an absolute putative firing time in an indexed
+        priority queue; the earliest one fires. After a firing, the times of
+        the dependent reactions are rescaled by old/new propensity instead of
+        being redrawn, so each step uses a single new random number.
+
+        Args:
+            y (numpy.ndarray): Current state of the system, updated in place.
+            delta_y (numpy.ndarray): Net change of each species in each reaction.
+            kernel (PropensityKernel): Propensity kernel of the network.
+            dependents (ReactionDependencyGraph): Reactions to update after each firing.
+            propensities (numpy.ndarray): Initial propensities, updated in place.
+            full_update_scheme (bool): Update every propensity entry in each iteration.
+            exponential (callable): Draws from the unit exponential distribution.
+
+        Yields:
+            float: Simulation time after each firing.
+        """
+        with np.errstate(divide="ignore"):
+            firing_times = exponential(size=len(propensities)) / propensities
+        queue = IndexedPriorityQueue(firing_times)
+        all_reactions = np.arange(len(propensities))
+
+        while True:
+            reaction_index_chose, time = queue.top()
+            if math.isinf(time):
+                # No reaction can fire any more
+                return
+            y += delta_y[reaction_index_chose]
+
+            changed = all_reactions if full_update_scheme else dependents[reaction_index_chose]
+            old_propensities = propensities[changed]
+            kernel.update(y, changed, propensities)
+            for reaction_index, old, new in zip(changed.tolist(), old_propensities.tolist(),
+                                                propensities[changed].tolist()):
+                if reaction_index == reaction_index_chose:
+                    continue
+                if new <= 0:
+                    firing_time = math.inf
+                elif old > 0:
+                    firing_time = time + (old / new) * (queue.keys[reaction_index] - time)
+                else:
+                    firing_time = time + exponential() / new
+                queue.update(reaction_index, firing_time)
+
+            # The fired reaction always draws a new firing time
+            propensity = propensities[reaction_index_chose]
+            queue.update(reaction_index_chose,
+                         time + exponential() / propensity if propensity > 0 else math.inf)
+
+            yield time
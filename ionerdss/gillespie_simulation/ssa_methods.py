@@ -0,0 +1,284 @@
+"""
+Reaction selection structures for the Gillespie stochastic simulation algorithm.
+
+The direct method normalizes the full propensity vector at every step,
+which costs O(R) for R reactions. The structures here keep the propensity
+total up to date as individual propensities change and pick the next
+reaction without touching every reaction:
+
+- ``SumTreeSelector``: binary tree of partial sums, O(log R) per selection and update.
+- ``CompositionRejectionSelector``: reactions grouped by the binary exponent of their
+  propensity; a group is chosen by a scan over the (few) groups and a reaction
+  inside it by rejection sampling, amortized O(1) (Slepoy, Thompson & Plimpton 2008).
+- ``IndexedPriorityQueue``: binary heap of putative firing times with O(log R) updates,
+  used by the Next Reaction Method (Gibson & Bruck 2000).
+"""
+
+import math
+import numpy as np
+
+SSA_METHODS = ("direct", "sum_tree", "composition_rejection", "next_reaction")
+
+
+class SumTreeSelector:
+    """
+    Sum tree over the propensities; the root holds their total.
+
+    Leaf ``i`` of the tree is reaction ``i``; each internal node holds the sum
+    of its two children, so totals are recomputed rather than accumulated and
+    do not drift.
+    """
+
+    def __init__(self, propensities):
+        """
+        Args:
+            propensities (numpy.ndarray): Initial propensity of each reaction.
+        """
+        num_reactions = len(propensities)
+        self._size = 1 << max(0, (num_reactions - 1).bit_length())
+        self._levels = np.arange(1, self._size.bit_length())
+        self._tree = np.zeros(2 * self._size)
+        self._tree[self._size:self._size + num_reactions] = propensities
+        level = self._size
+        while level > 1:
+            parents = np.arange(level // 2, level)
+            self._tree[parents] = self._tree[2 * parents] + self._tree[2 * parents + 1]
+            level //= 2
+
+    @property
+    def total(self):
+        """Sum of all propensities."""
+        return self._tree[1]
+
+    def update(self, indices, propensities):
+        """
+        Propagate new propensities of ``indices`` to the root.
+
+        Args:
+            indices (numpy.ndarray): Reactions whose propensity changed.
+            propensities (numpy.ndarray): Current propensity of each reaction.
+        """
+        if len(indices) == 0:
+            return
+        tree = self._tree
+        leaves = np.asarray(indices) + self._size
+        tree[leaves] = propensities[indices]
+        # Ancestors of every leaf, one tree level per column; repeated nodes just get the same sum twice
+        ancestors = leaves[:, None] >> self._levels
+        for nodes in ancestors.T:
+            tree[nodes] = tree[2 * nodes] + tree[2 * nodes + 1]
+
+    def select(self, rand):
+        """
+        Draw a reaction with probability proportional to its propensity.
+
+        Args:
+            rand (callable): Uniform random number generator on [0, 1).
+
+        Returns:
+            int: Index of the chosen reaction.
+        """
+        tree = self._tree
+        target = rand() * tree[1]
+        node = 1
+        while node < self._size:
+            left = 2 * node
+            # Rounding can leave target just above a subtree total; never descend into an empty subtree
+            if target < tree[left] or tree[left + 1] <= 0:
+                node = left
+            else:
+                target -= tree[left]
+                node = left + 1
+        return node - self._size
+
+
+class CompositionRejectionSelector:
+    """
+    Propensities grouped by binary exponent, for composition-rejection sampling.
+
+    Group ``e`` holds the reactions with propensity in [2**(e - 1), 2**e), so
+    rejection sampling inside a group accepts with probability at least 1/2.
+    Zero propensities belong to no group.
+    """
+
+    def __init__(self, propensities):
+        """
+        Args:
+            propensities (numpy.ndarray): Initial propensity of each reaction.
+        """
+        self._values = np.zeros(len(propensities))
+        self._group_of = [None] * len(propensities)
+        self._position = [0] * len(propensities)
+        self._members = {}
+        self._sums = {}
+        # Group sums are updated incrementally; resum them periodically to bound rounding drift
+        self._updates_until_resum = max(len(propensities), 1000)
+        self.update(np.flatnonzero(propensities), propensities)
+
+    @property
+    def total(self):
+        """Sum of all propensities."""
+        return sum(self._sums.values())
+
+    def _remove(self, reaction_index):
+        group = self._group_of[reaction_index]
+        members = self._members[group]
+        # Swap the last member into the freed slot
+        last = members.pop()
+        if last != reaction_index:
+            slot = self._position[reaction_index]
+            members[slot] = last
+            self._position[last] = slot
+        if members:
+            self._sums[group] -= self._values[reaction_index]
+        else:
+            del self._members[group]
+            del self._sums[group]
+        self._group_of[reaction_index] = None
+
+    def _insert(self, reaction_index, group, value):
+        members = self._members.setdefault(group, [])
+        self._position[reaction_index] = len(members)
+        members.append(reaction_index)
+        self._sums[group] = self._sums.get(group, 0.0) + value
+        self._group_of[reaction_index] = group
+
+    def update(self, indices, propensities):
+        """
+        Move reactions whose propensity changed to their new group.
+
+        Args:
+            indices (numpy.ndarray): Reactions whose propensity changed.
+            propensities (numpy.ndarray): Current propensity of each reaction.
+        """
+        for reaction_index in np.asarray(indices).tolist():
+            value = float(propensities[reaction_index])
+            group = math.frexp(value)[1] if value > 0 else None
+            if group == self._group_of[reaction_index]:
+                if group is not None:
+                    self._sums[group] += value - self._values[reaction_index]
+            else:
+                if self._group_of[reaction_index] is not None:
+                    self._remove(reaction_index)
+                if group is not None:
+                    self._insert(reaction_index, group, value)
+            self._values[reaction_index] = value
+
+        self._updates_until_resum -= len(indices)
+        if self._updates_until_resum <= 0:
+            for group, members in self._members.items():
+                self._sums[group] = float(self._values[members].sum())
+            self._updates_until_resum = max(len(self._values), 1000)
+
+    def select(self, rand):
+        """
+        Draw a reaction with probability proportional to its propensity.
+
+        Args:
+            rand (callable): Uniform random number generator on [0, 1).
+
+        Returns:
+            int: Index of the chosen reaction.
+        """
+        target = rand() * self.total
+        chosen = None
+        for group, group_sum in self._sums.items():
+            chosen = group
+            target -= group_sum
+            if target < 0:
+                break
+
+        members = self._members[chosen]
+        upper_bound = math.ldexp(1.0, chosen)
+        while True:
+            reaction_index = members[int(rand() * len(members))]
+            if rand() * upper_bound < self._values[reaction_index]:
+                return reaction_index
+
+
+class IndexedPriorityQueue:
+    """
+    Binary min-heap of keys that can be changed by item index.
+
+    Attributes:
+        keys (list): Current key of each item.
+    """
+
+    def __init__(self, keys):
+        """
+        Args:
+            keys (Iterable[float]): Initial key of each item.
+        """
+        self.keys = [float(key) for key in keys]
+        order = sorted(range(len(self.keys)), key=self.keys.__getitem__)
+        # A sorted array is a valid heap
+        self._heap = order
+        self._position = [0] * len(order)
+        for slot, item in enumerate(order):
+            self._position[item] = slot
+
+    def __len__(self):
+        return len(self._heap)
+
+    def top(self):
+        """(item, key) with the smallest key."""
+        item = self._heap[0]
+        return item, self.keys[item]
+
+    def update(self, item, key):
+        """Change the key of ``item`` and restore the heap order."""
+        old_key = self.keys[item]
+        self.keys[item] = key
+        if key < old_key:
+            self._sift_up(self._position[item])
+        elif key > old_key:
+            self._sift_down(self._position[item])
+
+    def _swap(self, i, j):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._position[heap[i]] = i
+        self._position[heap[j]] = j
+
+    def _sift_up(self, slot):
+        keys, heap = self.keys, self._heap
+        while slot > 0:
+            parent = (slot - 1) // 2
+            if keys[heap[slot]] >= keys[heap[parent]]:
+                break
+            self._swap(slot, parent)
+            slot = parent
+
+    def _sift_down(self, slot):
+        keys, heap = self.keys, self._heap
+        size = len(heap)
+        while True:
+            smallest = slot
+            for child in (2 * slot + 1, 2 * slot + 2):
+                if child < size and keys[heap[child]] < keys[heap[smallest]]:
+                    smallest = child
+            if smallest == slot:
+                return
+            self._swap(slot, smallest)
+            slot = smallest
+
+
+def make_selector(method, propensities):
+    """
+    Selection structure of an SSA variant.
+
+    Args:
+        method (str): "sum_tree" or "composition_rejection".
+        propensities (numpy.ndarray): Initial propensity of each reaction.
+
+    Raises:
+        ValueError: If the method is not supported.
+
+    Returns:
+        SumTreeSelector or CompositionRejectionSelector: The selector.
+    """
+    if method == "sum_tree":
+        return SumTreeSelector(propensities)
+    if method == "composition_rejection":
+        return CompositionRejectionSelector(propensities)
+    raise ValueError(f"Unknown SSA selection method '{method}'; expected one of {SSA_METHODS}.")
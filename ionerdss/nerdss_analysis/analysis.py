@@ -9,6 +9,8 @@ from typing import List, Optional, Tuple, Dict, Any
 from .data import Data
 from .plotting import PlotConfigure
 from .legacy import LegacyPlotInterface
+from .cache import CACHE_DIR_NAME
+from .discovery import discover_simulation_dirs
 
 
 class Analysis:
@@ -18,40 +20,61 @@ class Analysis:
     Provides both new modular API and legacy compatibility.
     """
     
-    def __init__(self, save_dir: str = None, verbose:bool=False):
+    def __init__(self, save_dir: str = None, verbose:bool=False, use_manifest: bool = True):
+        """
+        Open the simulations under ``save_dir``.
+
+        Nothing is read here: simulation directories are discovered on
+        first access of ``simulation_dirs`` (using the manifest kept under
+        ``<save_dir>/.ionerdss_cache`` while the directory tree is
+        unchanged, unless ``use_manifest`` is False), and ``data`` is
+        configured on first use.
+        """
         if save_dir is None:
             save_dir = os.getcwd()
         elif save_dir.startswith("~"):
             save_dir = os.path.expanduser(save_dir)
         
         self.save_dir = os.path.abspath(save_dir)
-        self._discover_simulations(verbose)
+        self._verbose = verbose
+        self._use_manifest = use_manifest
+        self._simulation_dirs = None
         self._setup_directories()
         
-        # Initialize subsystems
-        self.data = Data()
+        # Initialize subsystems; the default Data object covering all simulations is created on first use
+        self._data = None
         self.plot = PlotConfigure(self.save_dir)
         self._legacy = LegacyPlotInterface(self)
-        
-        # Configure data reading by default with all possibile directories
-        self.get_data()
+    
+    @property
+    def simulation_dirs(self) -> List[str]:
+        """Simulation directories (containing DATA folders), discovered on first access."""
+        if self._simulation_dirs is None:
+            self._discover_simulations(self._verbose)
+        return self._simulation_dirs
+    
+    @property
+    def data(self) -> Data:
+        """The current Data object; defaults to ``get_data()`` over all simulations."""
+        if self._data is None:
+            self.get_data()
+        return self._data
+    
+    @data.setter
+    def data(self, data: Data):
+        self._data = data
     
     def _discover_simulations(self, verbose:bool=True):
         """Discover simulation directories containing DATA folders."""
-        if os.path.exists(os.path.join(self.save_dir, "DATA")):
-            self.simulation_dirs = [self.save_dir]
+        simulation_dirs = discover_simulation_dirs(self.save_dir, use_manifest=self._use_manifest)
+        if simulation_dirs == [self.save_dir]:
             if verbose: print("Detected a single simulation directory.")
-        else:
-            self.simulation_dirs = []
-            for root, dirs, _ in os.walk(self.save_dir):
-                if "DATA" in dirs:
-                    self.simulation_dirs.append(root)
-                    # Don't recurse into directories that contain DATA
-                    dirs[:] = [d for d in dirs if d != "DATA"]
-            if verbose: print(f"Detected {len(self.simulation_dirs)} simulation directories.")
+        elif verbose:
+            print(f"Detected {len(simulation_dirs)} simulation directories.")
         
-        if not self.simulation_dirs:
+        if not simulation_dirs:
             raise ValueError(f"No simulation directories found in {self.save_dir}")
+        self._simulation_dirs = simulation_dirs
     
     def _setup_directories(self):
         """Create necessary output directories."""
@@ -61,12 +84,20 @@ class Analysis:
     def get_data(self, 
                  simulations: Optional[List[int]] = None,
                  species: Optional[List[str]] = None,
-                 time_frame: Optional[Tuple[float, float]] = None) -> Data:
+                 time_frame: Optional[Tuple[float, float]] = None,
+                 live: bool = False,
+                 disk_cache: bool = False,
+                 cache_memory_mb: float = 512) -> Data:
         """
         Get a configured Data object for processing specific simulations.
         
         Returns a Data object pre-configured with simulation subset and filters.
         The returned object can process different data types independently.
+        Use ``live=True`` for simulations that are still running and call
+        ``refresh()`` before re-plotting to pick up newly written data.
+        Results are cached within ``cache_memory_mb``; with ``disk_cache``
+        they are also persisted under ``<save_dir>/.ionerdss_cache/results``
+        and reused by later sessions while the source files are unchanged.
         """
         if simulations is None:
             simulations = list(range(len(self.simulation_dirs)))
@@ -84,7 +115,9 @@ class Analysis:
             simulations=simulations,
             species=species,
             time_frame=time_frame,
-            cache_dir=self.plot_data_dir
+            cache_dir=os.path.join(self.save_dir, CACHE_DIR_NAME, "results") if disk_cache else None,
+            live=live,
+            cache_memory_mb=cache_memory_mb
         )
         self.data = data
         return data
@@ -147,9 +180,21 @@ class Analysis:
             'plot_data_dir': self.plot_data_dir
         }
     
+    def refresh(self):
+        """
+        Pick up data written since the last read (incrementally in live mode).
+
+        Simulation directories are discovered again on next access; the
+        current ``data`` keeps the directories it was configured with.
+        """
+        self._simulation_dirs = None
+        if self._data is not None:
+            self._data.refresh()
+    
     def clear_cache(self):
         """Clear all cached data."""
-        self.data.clear_cache()
+        if self._data is not None:
+            self._data.clear_cache()
         print("All cached data cleared.")
     
     # Context manager support for batch operations
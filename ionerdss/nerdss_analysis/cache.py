@@ -0,0 +1,293 @@
+"""
+Bounded, content-addressed cache for analysis results.
+
+Cache keys are derived from the source files a result was computed from
+(path, size and modification time), the version of the parser that read
+them and the query parameters, so a key can never point at stale data:
+when a file grows or a parameter changes, the key changes. Entries are kept
+in memory under an LRU byte budget and can optionally be persisted to a
+directory, where they survive between sessions.
+"""
+
+import os
+import sys
+import json
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# Configure logging,
+import logging
+# inherit from the global level (should be setup in main)
+logger = logging.getLogger(__name__)
+
+
+# Name of the directory holding sidecars and persisted results
+CACHE_DIR_NAME = ".ionerdss_cache"
+# Bump whenever cached result formats change, to orphan old disk entries
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_MISSING = object()
+
+
+def file_fingerprint(path: str) -> tuple:
+    """(path, size, mtime_ns) of a file; size and mtime are None if it does not exist."""
+    try:
+        stat = os.stat(path)
+        return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        return (os.path.abspath(path), None, None)
+
+
+def make_cache_key(namespace: str, files: Iterable[str] = (), version: int = 0, **params) -> str:
+    """
+    Build a content-addressed cache key.
+
+    The key is a SHA-1 digest of the namespace, the fingerprints of
+    ``files``, the parser ``version`` and the query parameters; unlike
+    ``hash()`` it is stable across processes and sessions.
+
+    Parameters:
+        namespace (str): Kind of result, e.g. "histogram.count_tensor"
+        files (Iterable[str]): Source files the result is computed from
+        version (int): Version of the parser / result format
+        **params: Query parameters; must be representable as JSON (``repr`` is used otherwise)
+
+    Returns:
+        str: Key of the form ``<namespace>-<digest>``
+    """
+    payload = {
+        "cache_version": CACHE_VERSION,
+        "version": version,
+        "files": [file_fingerprint(f) for f in files],
+        "params": params,
+    }
+    digest = hashlib.sha1(json.dumps(payload, sort_keys=True, default=repr).encode()).hexdigest()
+    return f"{namespace}-{digest}"
+
+
+def estimate_nbytes(obj: Any, _depth: int = 0) -> int:
+    """
+    Approximate memory held by a cached value.
+
+    Memory-mapped arrays count as zero since their pages belong to the OS
+    page cache. Long lists are estimated from a sample of their items.
+    """
+    if isinstance(obj, np.memmap):
+        return 0
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True))
+    if sp.issparse(obj):
+        return int(sum(getattr(obj, name).nbytes for name in ("data", "indices", "indptr") if hasattr(obj, name)))
+    if hasattr(obj, "nbytes") and not isinstance(obj, (bytes, bytearray)):
+        try:
+            return int(obj.nbytes)
+        except (TypeError, ValueError):
+            pass
+    if _depth > 8:
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            estimate_nbytes(k, _depth + 1) + estimate_nbytes(v, _depth + 1) for k, v in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        items = list(obj) if not isinstance(obj, (list, tuple)) else obj
+        if len(items) > 1000:
+            sample = items[::len(items) // 100]
+            per_item = sum(estimate_nbytes(x, _depth + 1) for x in sample) / len(sample)
+            return sys.getsizeof(obj) + int(per_item * len(items))
+        return sys.getsizeof(obj) + sum(estimate_nbytes(x, _depth + 1) for x in items)
+    return sys.getsizeof(obj)
+
+
+class ResultCache:
+    """
+    LRU cache with a memory budget and an optional on-disk tier.
+
+    Attributes:
+        max_bytes (int): Memory budget; least recently used entries are evicted beyond it
+        disk_dir (Optional[str]): Directory of the on-disk tier, or None to keep entries in memory only
+        max_disk_bytes (Optional[int]): Budget of the on-disk tier, or None for no limit
+
+    Example:
+        >>> cache = ResultCache(max_bytes=256 * 1024**2, disk_dir="analysis/.ionerdss_cache/results")
+        >>> key = make_cache_key("copy_numbers", [data_file], time_frame=(0, 1))
+        >>> value = cache.get_or_compute(key, lambda: read_copy_numbers_file(sim_dir))
+    """
+
+    def __init__(self,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 disk_dir: Optional[str] = None,
+                 max_disk_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()   # key -> (value, nbytes)
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._counters = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    def __contains__(self, key: str) -> bool:
+        if key in self._entries:
+            return True
+        path = self._disk_path(key)
+        return path is not None and os.path.exists(path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _disk_path(self, key: str) -> Optional[str]:
+        if self.disk_dir is None:
+            return None
+        return os.path.join(self.disk_dir, f"{key}.pkl")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value, looking in memory first and then on disk."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return self._entries[key][0]
+
+            value = self._load_from_disk(key)
+            if value is not _MISSING:
+                self._counters["disk_hits"] += 1
+                self._store_in_memory(key, value)
+                return value
+
+            self._counters["misses"] += 1
+            return default
+
+    def put(self, key: str, value: Any, persist: bool = True):
+        """
+        Cache ``value``; with ``persist`` it is also written to the on-disk tier.
+
+        Values larger than the memory budget are not kept in memory.
+        """
+        with self._lock:
+            self._store_in_memory(key, value)
+        if persist:
+            self._save_to_disk(key, value)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], persist: bool = True) -> Any:
+        """Return the cached value for ``key``, computing and caching it on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value, persist=persist)
+        return value
+
+    def _store_in_memory(self, key: str, value: Any):
+        nbytes = estimate_nbytes(value)
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        if nbytes > self.max_bytes:
+            logger.debug(f"Not caching {key} in memory: {nbytes} bytes exceed the budget")
+            return
+        self._entries[key] = (value, nbytes)
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes:
+            evicted, (_, evicted_bytes) = self._entries.popitem(last=False)
+            self._bytes -= evicted_bytes
+            self._counters["evictions"] += 1
+            logger.debug(f"Evicted {evicted} ({evicted_bytes} bytes) from the result cache")
+
+    def _load_from_disk(self, key: str) -> Any:
+        path = self._disk_path(key)
+        if path is None or not os.path.exists(path):
+            return _MISSING
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            os.utime(path)  # mark as recently used for disk eviction
+            return value
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache entry {path}: {e}")
+            return _MISSING
+
+    def _save_to_disk(self, key: str, value: Any):
+        path = self._disk_path(key)
+        if path is None:
+            return
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.debug(f"Could not persist cache entry {key}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        if self.max_disk_bytes is not None:
+            self._prune_disk()
+
+    def _disk_entries(self) -> list:
+        if self.disk_dir is None or not os.path.isdir(self.disk_dir):
+            return []
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith(".pkl"):
+                try:
+                    stat = os.stat(os.path.join(self.disk_dir, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, name))
+        return entries
+
+    def _prune_disk(self):
+        entries = sorted(self._disk_entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.disk_dir, name))
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self, disk: bool = False):
+        """Drop all in-memory entries, and the on-disk tier as well with ``disk``."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if disk:
+                for _, _, name in self._disk_entries():
+                    try:
+                        os.remove(os.path.join(self.disk_dir, name))
+                    except OSError:
+                        pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry counts, bytes held and hit rates of both tiers."""
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["disk_hits"] + self._counters["misses"]
+            disk_entries = self._disk_entries()
+            return {
+                "num_entries": len(self._entries),
+                "memory_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                **self._counters,
+                "hit_rate": (self._counters["hits"] + self._counters["disk_hits"]) / lookups if lookups else 0.0,
+                "disk_dir": self.disk_dir,
+                "disk_entries": len(disk_entries),
+                "disk_bytes": sum(size for _, size, _ in disk_entries),
+            }
+
+    def keys(self):
+        """Keys of the in-memory entries, least recently used first."""
+        with self._lock:
+            return list(self._entries.keys())
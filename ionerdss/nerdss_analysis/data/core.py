@@ -4,13 +4,13 @@ Enhanced with specialized processors for different data types.
 """
 
 import os
-import pickle
-import hashlib
 from typing import List, Optional, Dict, Any, Tuple
 from .processors import HistogramProcessor, CopyNumberProcessor, TransitionProcessor
 
 from .processors.utils import align_time_series
 from ..data_readers import DataIO
+from ..parallel import ParallelExecutor
+from ..cache import ResultCache, make_cache_key
 
 
 class Data:
@@ -23,33 +23,64 @@ class Data:
     
     def __init__(self):
         self._config = {}
-        self._cache = {}
+        self._cache = ResultCache()
 
         self._data_io = DataIO
         
-        # Initialize specialized processors
-        self.histogram = HistogramProcessor()
-        self.copy_numbers = CopyNumberProcessor()
-        self.transitions = TransitionProcessor()
+        # Initialize specialized processors; they share one result cache
+        self.histogram = HistogramProcessor(cache=self._cache)
+        self.copy_numbers = CopyNumberProcessor(cache=self._cache)
+        self.transitions = TransitionProcessor(cache=self._cache)
     
     def configure(self,
                  simulation_dirs: List[str],
                  simulations: Optional[List[int]] = None,
                  species: Optional[List[str]] = None,
                  time_frame: Optional[Tuple[float, float]] = None,
-                 cache_dir: Optional[str] = None):
-        """Configure data processing parameters."""
+                 cache_dir: Optional[str] = None,
+                 live: bool = False,
+                 executor: str = "process",
+                 max_workers: Optional[int] = None,
+                 chunksize: int = 1,
+                 cache_memory_mb: float = 512,
+                 cache_disk_mb: Optional[float] = None):
+        """
+        Configure data processing parameters.
+
+        With ``live`` the output files are followed incrementally, so that
+        ``refresh()`` followed by a new query only parses data appended by a
+        still running simulation.
+
+        Simulation directories are read in parallel by ``executor``
+        ("process", "thread" or "serial") with ``max_workers`` workers
+        (default: number of CPUs), handing ``chunksize`` directories to a
+        worker at a time. Directories that fail to load are skipped and
+        reported by ``get_load_errors()``.
+
+        Results are cached under keys derived from the size and modification
+        time of the source files and the query, within a memory budget of
+        ``cache_memory_mb``. If ``cache_dir`` is given, results are also
+        persisted there (up to ``cache_disk_mb``, unlimited if None) and
+        reused by later sessions.
+        """
         self._config = {
             'simulation_dirs': simulation_dirs,
             'simulations': simulations or list(range(len(simulation_dirs))),
             'species': species,
             'time_frame': time_frame,
-            'cache_dir': cache_dir
+            'cache_dir': cache_dir,
+            'live': live
         }
+        self._executor = ParallelExecutor(backend=executor, max_workers=max_workers, chunksize=chunksize)
+        self._cache = ResultCache(
+            max_bytes=int(cache_memory_mb * 1024 * 1024),
+            disk_dir=cache_dir,
+            max_disk_bytes=int(cache_disk_mb * 1024 * 1024) if cache_disk_mb is not None else None
+        )
         self._selected_dirs = [simulation_dirs[i] for i in self._config['simulations']]
-        self.histogram.configure(self._selected_dirs)
-        self.copy_numbers.configure(self._selected_dirs)
-        self.transitions.configure(self._selected_dirs)
+        self.histogram.configure(self._selected_dirs, live=live, executor=self._executor, cache=self._cache)
+        self.copy_numbers.configure(self._selected_dirs, live=live, executor=self._executor, cache=self._cache)
+        self.transitions.configure(self._selected_dirs, live=live, executor=self._executor, cache=self._cache)
     
     def get_histogram_data(self, sim_dirs) -> Dict[str, Any]:
         """
@@ -71,10 +102,13 @@ class Data:
                 }
         }
         """
-        cache_key = self._generate_cache_key(f"histograms_{hash(tuple(sorted(sim_dirs)))}")
+        cache_key = self._generate_cache_key(
+            "histograms", self._data_files(sim_dirs, "histogram_complexes_time.dat"), input_form=self._input_form(sim_dirs)
+        )
         
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         # Load raw data
         all_data, num_dirs = self.histogram.read(sim_dirs, self._config)
@@ -94,15 +128,19 @@ class Data:
         elif num_dirs == 'Single':
             result = all_data
         
-        self._cache[cache_key] = result
+        # The raw data is rebuilt quickly from the memory-mapped sidecars
+        self._cache.put(cache_key, result, persist=False)
         return result
     
     def get_copy_numbers_data(self, sim_dirs) -> Dict[str, Any]:
         """Get processed copy numbers data with enhanced processing."""
-        cache_key = self._generate_cache_key(f"copy_numbers_{hash(tuple(sorted(sim_dirs)))}")
+        cache_key = self._generate_cache_key(
+            "copy_numbers", self._data_files(sim_dirs, "copy_numbers_time.dat"), input_form=self._input_form(sim_dirs)
+        )
         
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         # Load raw data
         all_data, num_dirs = self.copy_numbers.read(sim_dirs, self._config)
@@ -122,22 +160,24 @@ class Data:
         elif num_dirs == 'Single':
             result = all_data
         
-        self._cache[cache_key] = result
+        self._cache.put(cache_key, result)
 
         return result
     
     def get_transition_data(self, **kwargs) -> Dict[str, Any]:
         """Get processed transition matrix and lifetime data."""
-        cache_key = self._generate_cache_key('transition', **kwargs)
+        cache_key = self._generate_cache_key(
+            'transition', self._data_files(self._selected_dirs, "transition_matrix_time.dat"), **kwargs
+        )
         
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         # Load raw data
         matrices = []
         lifetimes = []
-        for sim_dir in self._selected_dirs:
-            matrix, lifetime = self._data_io.get_transition_matrix(sim_dir, self._config['time_frame'])
+        for matrix, lifetime in self.transitions.read_multiple(self._selected_dirs, self._config['time_frame']):
             if matrix is not None:
                 matrices.append(matrix)
                 lifetimes.append(lifetime)
@@ -153,24 +193,38 @@ class Data:
             }
         }
         
-        self._cache[cache_key] = result
+        self._cache.put(cache_key, result)
         return result
     
     # Enhanced methods using processors
-    def get_time_series_statistics(self, legends: List[List[str]], **kwargs):
+    def get_count_tensor(self, sim_dirs: Optional[List[str]] = None):
+        """
+        Get the (simulation, time, composition) count tensor of the histogram data.
+
+        Parameters:
+            sim_dirs (Optional[List[str]]): Simulation directories; defaults to the selected ones
+
+        Returns:
+            CountTensor: Complex counts of every composition in every simulation over time
+        """
+        return self.histogram.get_count_tensor(sim_dirs or self._selected_dirs, self._config)
+
+    def get_time_series_statistics(self, 
+                                   legends: List[List[str]], 
+                                   legend_names: Optional[List[str]] = None,
+                                   sim_dirs: Optional[List[str]] = None):
         """Get time series statistics for multiple legends."""
-        histogram_data = self.get_histogram_data(**kwargs)
-        return self.histogram.calculate_time_series_statistics(histogram_data, legends)
+        return self.histogram.calculate_time_series_statistics(
+            legends, legend_names, sim_dirs or self._selected_dirs, self._config
+        )
 
-    def get_complex_sizes(self, legend: List[str], **kwargs) -> List[List[int]]:
+    def get_complex_sizes(self, legend: List[str], sim_dirs: Optional[List[str]] = None) -> List[List[int]]:
         """Extract complex sizes using histogram processor."""
-        histogram_data = self.get_histogram_data(**kwargs)
-        return self.histogram.calculate_complex_sizes(histogram_data, legend)
+        return self.histogram.calculate_complex_sizes(legend, sim_dirs or self._selected_dirs, self._config)
     
-    def get_size_distribution_stats(self, legend: List[str], **kwargs) -> Dict[str, float]:
+    def get_size_distribution_stats(self, legend: List[str], sim_dirs: Optional[List[str]] = None) -> Dict[str, float]:
         """Get statistical measures of complex size distribution."""
-        histogram_data = self.get_histogram_data(**kwargs)
-        return self.histogram.get_size_distribution_stats(histogram_data, legend)
+        return self.histogram.get_size_distribution_stats(legend, sim_dirs or self._selected_dirs, self._config)
     
     def get_free_energy_landscape(self, **kwargs) -> Dict[str, Any]:
         """Get free energy landscape from transition data."""
@@ -201,30 +255,73 @@ class Data:
     # ============================================
     # Utility methods
     # ============================================
-    def _generate_cache_key(self, data_type: str, **kwargs) -> str:
-        """Generate unique cache key based on configuration and parameters."""
-        key_data = {
-            'data_type': data_type,
-            'simulations': tuple(self._config['simulations']),
-            'species': tuple(self._config['species']) if self._config['species'] else None,
-            'time_frame': self._config['time_frame'],
+    def _generate_cache_key(self, data_type: str, files: List[str] = (), **kwargs) -> str:
+        """
+        Generate a content-addressed cache key.
+
+        The key covers the size and modification time of ``files``, the
+        configuration and the query parameters, so results of modified
+        files or a different selection are never served from the cache.
+        """
+        return make_cache_key(
+            f"data.{data_type}",
+            files,
+            simulations=list(self._config['simulations']),
+            species=list(self._config['species']) if self._config['species'] else None,
+            time_frame=self._config['time_frame'],
             **kwargs
-        }
-        key_str = str(sorted(key_data.items()))
-        return hashlib.md5(key_str.encode()).hexdigest()[:12]
+        )
+
+    @staticmethod
+    def _input_form(sim_dirs) -> str:
+        """Result shape of a query: 'Single' for one directory given as a str, else 'Multiple'."""
+        return 'Single' if isinstance(sim_dirs, str) else 'Multiple'
+
+    @staticmethod
+    def _data_files(sim_dirs, file_name: str) -> List[str]:
+        """Paths of ``DATA/<file_name>`` for one or several simulation directories."""
+        if isinstance(sim_dirs, str):
+            sim_dirs = [sim_dirs]
+        return [os.path.join(sim_dir, "DATA", file_name) for sim_dir in sim_dirs or []]
     
-    def clear_cache(self):
-        """Clear all cached data and processor caches."""
+    def refresh(self):
+        """
+        Drop in-memory results.
+
+        Cache keys already change when a source file is modified, so this is
+        only needed to free memory. In live mode the processors keep their
+        file offsets, so only the data appended since the previous read is
+        parsed.
+        """
         self._cache.clear()
-        self.histogram.clear_cache()
-        self.copy_numbers.clear_cache()
-        self.transitions.clear_cache()
+
+    def clear_cache(self):
+        """Clear all cached data, including the on-disk tier, and processor state."""
+        self._cache.clear(disk=True)
+        self.histogram.reset()
+        self.copy_numbers.reset()
+        self.transitions.reset()
+    
+    def get_load_errors(self) -> Dict[str, Dict[str, str]]:
+        """Errors of the last read of each data type, keyed by simulation directory."""
+        return {
+            'histogram': dict(self.histogram.errors),
+            'copy_numbers': dict(self.copy_numbers.errors),
+            'transitions': dict(self.transitions.errors)
+        }
     
     def get_cache_info(self) -> Dict[str, Any]:
-        """Get comprehensive cache statistics."""
+        """
+        Get comprehensive cache statistics.
+
+        Reports the entries and bytes held in memory and on disk, together
+        with the hit rate (memory and disk hits over all lookups).
+        """
+        stats = self._cache.stats()
         return {
-            'num_entries': len(self._cache),
-            'cache_keys': list(self._cache.keys()),
-            'memory_usage_mb': sum(len(pickle.dumps(v)) for v in self._cache.values()) / (1024*1024),
+            **stats,
+            'cache_keys': self._cache.keys(),
+            'memory_usage_mb': stats['memory_bytes'] / (1024*1024),
+            'disk_usage_mb': stats['disk_bytes'] / (1024*1024),
             'processors_available': ['histogram', 'copy_numbers', 'transitions']
         }
\ No newline at end of file
@@ -5,5 +5,8 @@ Specialized data processors for different data types.
 from .histogram import HistogramProcessor
 from .copy_numbers import CopyNumberProcessor
 from .transitions import TransitionProcessor
+from .histogram_store import HistogramStore, load_histogram_store
+from .count_tensor import CountTensor
 
-__all__ = ["HistogramProcessor", "CopyNumberProcessor", "TransitionProcessor"]
\ No newline at end of file
+__all__ = ["HistogramProcessor", "CopyNumberProcessor", "TransitionProcessor",
+           "HistogramStore", "load_histogram_store", "CountTensor"]
\ No newline at end of file
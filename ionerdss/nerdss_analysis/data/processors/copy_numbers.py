@@ -6,6 +6,9 @@ import numpy as np
 import pandas as pd
 from typing import List, Dict, Any, Tuple, Optional
 from .utils import align_time_series
+from .tail_readers import CopyNumberTailReader
+from ...parallel import ParallelExecutor
+from ...cache import ResultCache, make_cache_key
 import os
 
 # Configure logging, 
@@ -14,6 +17,29 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+def read_copy_numbers_file(sim_dir: str) -> Optional[pd.DataFrame]:
+    """
+    Read DATA/copy_numbers_time.dat of a simulation directory.
+    
+    Parameters:
+        sim_dir (str): Path to the simulation directory
+        
+    Returns:
+        Optional[pd.DataFrame]: DataFrame containing the data, or None if file not found
+    """
+    data_file = os.path.join(sim_dir, "DATA", "copy_numbers_time.dat")
+    
+    if not os.path.exists(data_file):
+        logger.warning(f"Copy numbers file not found: {data_file}")
+        return None
+    
+    df = pd.read_csv(data_file)
+    df.rename(columns=lambda x: x.strip(), inplace=True)
+    df = df.rename(columns={'time_points': 'Time (s)'}) # unify the name of time points
+    logger.debug(f"Successfully read copy numbers from {data_file}")
+    return df
+
+
 class CopyNumberProcessor:
     """
     Specialized processor for species copy number time series data.
@@ -22,12 +48,33 @@ class CopyNumberProcessor:
     and species group calculations.
     """
     
-    def __init__(self):
-        self._cache = {}
+    def __init__(self, cache: Optional[ResultCache] = None):
+        self._cache = cache if cache is not None else ResultCache()
         self._selected_dirs = []
+        self._tails = {}
+        self.live = False
+        self.executor = ParallelExecutor()
+        self.errors = {}
 
-    def configure(self, selected_dirs: List[str]):
+    def configure(self, 
+                  selected_dirs: List[str], 
+                  live: bool = False, 
+                  executor: Optional[ParallelExecutor] = None,
+                  cache: Optional[ResultCache] = None):
+        """
+        Select directories to read.
+
+        With ``live`` the files are followed incrementally: every read only
+        parses the rows appended since the previous read. Otherwise
+        ``executor`` reads the directories in parallel. ``cache`` replaces
+        the result cache.
+        """
         self._selected_dirs = selected_dirs
+        self.live = live
+        if executor is not None:
+            self.executor = executor
+        if cache is not None:
+            self._cache = cache
 
     def read(self, selected_dirs, config = {"time_frame":None}) -> List[Dict[str, Any]]:
         """Decide to read multiple or read single"""
@@ -60,11 +107,11 @@ class CopyNumberProcessor:
             return None
         
         try:
-            df = pd.read_csv(data_file)
-            df.rename(columns=lambda x: x.strip(), inplace=True)
-            df = df.rename(columns={'time_points': 'Time (s)'}) # unify the name of time points
-            logger.debug(f"Successfully read copy numbers from {data_file}")
-            return df
+            if self.live:
+                if data_file not in self._tails:
+                    self._tails[data_file] = CopyNumberTailReader(data_file)
+                return self._tails[data_file].read()
+            return read_copy_numbers_file(sim_dir)
         except Exception as e:
             logger.error(f"Error reading copy numbers from {data_file}: {e}")
             return None
@@ -75,21 +122,29 @@ class CopyNumberProcessor:
             config:Dict[str,Any] = {"time_frame":None}, # left here for unified format
         ) -> List[Dict[str, Any]]:
         
-        # check cache
-        cache_key = "all_data"
-        if cache_key in self._cache:
-            return self._cache[cache_key]
-        
         # parse selected directories
         if not selected_dirs:
             if not self._selected_dirs:
                 raise FileNotFoundError("No directory selected for reading.")
             selected_dirs = self._selected_dirs
 
-        # Load raw data
+        # check cache
+        files = [os.path.join(sim_dir, "DATA", "copy_numbers_time.dat") for sim_dir in selected_dirs]
+        cache_key = make_cache_key("copy_numbers.all_data", files)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Load raw data; followed files keep their state in this process
+        if self.live:
+            frames = [self.read_single(sim_dir) for sim_dir in selected_dirs]
+        else:
+            results = self.executor.map(read_copy_numbers_file, selected_dirs)
+            self.errors = {r.item: r.error for r in results if r.error is not None}
+            frames = [r.value for r in results]
+
         dataframes = []
-        for sim_dir in selected_dirs:
-            df = self.read_single(sim_dir)
+        for df in frames:
             if df is not None:
                 # TODO: filter by time frame. 
                 # Now function filter_by_time_frame does not support copy number data
@@ -97,7 +152,7 @@ class CopyNumberProcessor:
                 #     df = filter_by_time_frame(df, config['time_frame'])
                 dataframes.append(df)
 
-        self._cache[cache_key] = dataframes
+        self._cache.put(cache_key, dataframes)
 
         return dataframes
     
@@ -271,4 +326,9 @@ class CopyNumberProcessor:
     
     def clear_cache(self):
         """Clear processor cache."""
-        self._cache.clear()
\ No newline at end of file
+        self._cache.clear()
+
+    def reset(self):
+        """Clear processor cache and forget the state of incrementally followed files."""
+        self._cache.clear()
+        self._tails.clear()
\ No newline at end of file
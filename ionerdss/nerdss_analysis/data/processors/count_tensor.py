@@ -0,0 +1,216 @@
+"""
+Simulation x time x composition count tensor built from histogram stores.
+
+Every distinct species composition of all selected simulations gets one
+global ID, and the complex counts are stored as a sparse matrix whose rows
+are (simulation, time index) pairs and whose columns are composition IDs.
+Legend queries, complex sizes and histograms then become NumPy gathers and
+weighted reductions instead of loops over Python lists.
+"""
+
+import numpy as np
+import scipy.sparse as sp
+from typing import List, Dict, Any, Tuple, Optional, Sequence
+
+from .histogram_store import HistogramStore
+
+# Configure logging,
+import logging
+# inherit from the global level (should be setup in main)
+logger = logging.getLogger(__name__)
+
+
+def composition_key(species_dict: Dict[str, int]) -> Tuple[Tuple[str, int], ...]:
+    """Canonical, hashable key of a species composition."""
+    return tuple(sorted(species_dict.items()))
+
+
+class CountTensor:
+    """
+    Complex counts of several simulations indexed by (simulation, time, composition).
+
+    Row ``s * num_times + t`` of ``matrix`` holds the number of complexes of
+    every composition in simulation ``s`` at its ``t``-th time point.
+    Simulations shorter than the longest one are padded with empty rows and
+    NaN times.
+
+    Attributes:
+        times (np.ndarray): Time points (s) of each simulation, shape (num_sims, num_times)
+        lengths (np.ndarray): Number of time points of each simulation
+        compositions (List[Dict[str, int]]): Species -> count mapping for each global composition ID
+        species (List[str]): Species appearing in any composition, sorted
+        composition_matrix (np.ndarray): Species counts of each composition, shape (num_compositions, num_species)
+        matrix (scipy.sparse.csr_matrix): Counts, shape (num_sims * num_times, num_compositions)
+    """
+
+    def __init__(self,
+                 times: np.ndarray,
+                 lengths: np.ndarray,
+                 compositions: List[Dict[str, int]],
+                 matrix: sp.csr_matrix):
+        self.times = times
+        self.lengths = lengths
+        self.compositions = compositions
+        self.matrix = matrix
+        self._key_to_id = {composition_key(c): i for i, c in enumerate(compositions)}
+        self.species = sorted({s for c in compositions for s in c})
+        species_index = {s: i for i, s in enumerate(self.species)}
+        self.composition_matrix = np.zeros((len(compositions), len(self.species)), dtype=np.int64)
+        for cid, composition in enumerate(compositions):
+            for s, n in composition.items():
+                self.composition_matrix[cid, species_index[s]] = n
+        self._csc = None
+
+    @classmethod
+    def from_stores(cls, stores: Sequence[HistogramStore]) -> "CountTensor":
+        """
+        Merge the histogram stores of several simulations into one tensor.
+
+        Parameters:
+            stores (Sequence[HistogramStore]): Columnar histogram data, one per simulation
+
+        Returns:
+            CountTensor: Counts of all simulations over the union of their compositions
+        """
+        num_sims = len(stores)
+        lengths = np.array([store.num_times for store in stores], dtype=np.int64)
+        num_times = int(lengths.max()) if num_sims else 0
+
+        times = np.full((num_sims, num_times), np.nan)
+        key_to_id = {}
+        compositions = []
+        rows, cols, values = [], [], []
+
+        for s, store in enumerate(stores):
+            times[s, :store.num_times] = store.times
+
+            # Translate the per-file composition IDs into global IDs
+            local_to_global = np.empty(store.num_compositions, dtype=np.int64)
+            for local_id, composition in enumerate(store.compositions):
+                key = composition_key(composition)
+                global_id = key_to_id.get(key)
+                if global_id is None:
+                    global_id = len(compositions)
+                    key_to_id[key] = global_id
+                    compositions.append(composition)
+                local_to_global[local_id] = global_id
+
+            rows.append(s * num_times + np.asarray(store.time_index, dtype=np.int64))
+            cols.append(local_to_global[np.asarray(store.composition_id, dtype=np.int64)])
+            values.append(np.asarray(store.count, dtype=np.int64))
+
+        shape = (num_sims * num_times, len(compositions))
+        if rows:
+            # Duplicate (row, column) pairs are summed by the conversion
+            matrix = sp.coo_matrix(
+                (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))), shape=shape
+            ).tocsr()
+            matrix.eliminate_zeros()
+        else:
+            matrix = sp.csr_matrix(shape, dtype=np.int64)
+
+        return cls(times, lengths, compositions, matrix)
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        """(num_sims, num_times, num_compositions)"""
+        return self.times.shape + (len(self.compositions),)
+
+    @property
+    def num_sims(self) -> int:
+        return self.times.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        matrix = self.matrix
+        return int(self.times.nbytes + self.composition_matrix.nbytes
+                   + matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes)
+
+    @property
+    def common_times(self) -> np.ndarray:
+        """Time points shared by all simulations (the first simulation's, cut to the shortest length)."""
+        if self.num_sims == 0:
+            return np.zeros(0)
+        return self.times[0, :int(self.lengths.min())]
+
+    def composition_id(self, species_dict: Dict[str, int]) -> int:
+        """Global ID of a composition, or -1 if it never occurs."""
+        return self._key_to_id.get(composition_key(species_dict), -1)
+
+    def counts(self, composition_ids: Sequence[int]) -> np.ndarray:
+        """
+        Dense counts of selected compositions.
+
+        Parameters:
+            composition_ids (Sequence[int]): Global composition IDs; -1 yields zeros
+
+        Returns:
+            np.ndarray: Counts, shape (num_sims, num_times, len(composition_ids))
+        """
+        ids = np.asarray(composition_ids, dtype=np.int64)
+        num_sims, num_times, _ = self.shape
+        result = np.zeros((num_sims * num_times, len(ids)), dtype=np.int64)
+        known = np.flatnonzero(ids >= 0)
+        if len(known) and self.matrix.shape[0]:
+            if self._csc is None:
+                self._csc = self.matrix.tocsc()
+            result[:, known] = self._csc[:, ids[known]].toarray()
+        return result.reshape(num_sims, num_times, len(ids))
+
+    def sizes(self, legend: Sequence[str]) -> np.ndarray:
+        """
+        Size of every composition counting only the species in ``legend``.
+
+        Returns:
+            np.ndarray: Sizes, shape (num_compositions,)
+        """
+        legend = set(legend)
+        columns = [i for i, s in enumerate(self.species) if s in legend]
+        return self.composition_matrix[:, columns].sum(axis=1)
+
+    def species_counts(self, species: str) -> np.ndarray:
+        """Number of ``species`` in every composition, shape (num_compositions,)."""
+        if species not in self.species:
+            return np.zeros(len(self.compositions), dtype=np.int64)
+        return self.composition_matrix[:, self.species.index(species)]
+
+    def entries(self, time_frame: Optional[Tuple[float, float]] = None
+                ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Non-zero entries as flat arrays, ordered by simulation and time.
+
+        Parameters:
+            time_frame (Optional[Tuple[float, float]]): Only keep entries with start <= t <= end
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+                Simulation index, time (s), composition ID and count of each entry
+        """
+        num_times = self.times.shape[1]
+        rows = np.repeat(np.arange(self.matrix.shape[0]), np.diff(self.matrix.indptr))
+        sim_index = rows // num_times if num_times else rows
+        times = self.times.ravel()[rows]
+        composition_ids = self.matrix.indices.astype(np.int64)
+        counts = self.matrix.data.astype(np.int64)
+        if time_frame is not None:
+            keep = (times >= time_frame[0]) & (times <= time_frame[1])
+            sim_index, times, composition_ids, counts = (
+                sim_index[keep], times[keep], composition_ids[keep], counts[keep]
+            )
+        return sim_index, times, composition_ids, counts
+
+    def totals(self, time_frame: Optional[Tuple[float, float]] = None) -> np.ndarray:
+        """
+        Counts of each composition summed over time.
+
+        Returns:
+            np.ndarray: Counts, shape (num_sims, num_compositions)
+        """
+        sim_index, _, composition_ids, counts = self.entries(time_frame)
+        num_compositions = len(self.compositions)
+        flat = np.bincount(
+            sim_index * num_compositions + composition_ids,
+            weights=counts,
+            minlength=self.num_sims * num_compositions
+        )
+        return flat.astype(np.int64).reshape(self.num_sims, num_compositions)
@@ -3,12 +3,16 @@ Histogram data processor for complex analysis.
 """
 import os
 import numpy as np
-import re
 import pandas as pd
 from typing import List, Dict, Any, Tuple, Optional
 
 # Helper functions
-from .utils import parse_histogram_complex, parse_histogram_line, filter_by_time_frame, align_time_series
+from .utils import parse_histogram_complex
+from .histogram_store import HistogramStore, load_histogram_store, HISTOGRAM_FILE_NAME, HISTOGRAM_STORE_VERSION
+from .count_tensor import CountTensor
+from .tail_readers import HistogramTailReader
+from ...parallel import ParallelExecutor
+from ...cache import ResultCache, make_cache_key
 
 
 # Configure logging, 
@@ -26,12 +30,46 @@ class HistogramProcessor:
     and statistical analysis of complex distributions.
     """
     
-    def __init__(self):
-        self._cache = {}
+    def __init__(self, use_disk_cache: bool = True, cache: Optional[ResultCache] = None):
+        self._cache = cache if cache is not None else ResultCache()
         self._selected_dirs = []
+        self._tails = {}
+        self.use_disk_cache = use_disk_cache
+        self.live = False
+        self.executor = ParallelExecutor()
+        self.errors = {}
 
-    def configure(self, selected_dirs: List[str]):
+    def configure(self, 
+                  selected_dirs: List[str], 
+                  live: bool = False, 
+                  executor: Optional[ParallelExecutor] = None,
+                  cache: Optional[ResultCache] = None):
+        """
+        Select directories to read.
+
+        With ``live`` the files are followed incrementally: every read only
+        parses the time blocks appended since the previous read, which suits
+        simulations that are still running. Otherwise ``executor`` reads the
+        directories in parallel. ``cache`` replaces the result cache, e.g.
+        to share one memory budget between processors.
+        """
         self._selected_dirs = selected_dirs
+        self.live = live
+        if executor is not None:
+            self.executor = executor
+        if cache is not None:
+            self._cache = cache
+
+    def _cache_key(self, 
+                   name: str, 
+                   selected_dirs: Optional[List[str]], 
+                   config: Optional[Dict[str, Any]], 
+                   **params) -> str:
+        """Content-addressed key of a result computed from the histograms of ``selected_dirs``."""
+        selected_dirs = selected_dirs or self._selected_dirs
+        files = [os.path.join(sim_dir, "DATA", HISTOGRAM_FILE_NAME) for sim_dir in selected_dirs]
+        return make_cache_key(f"histogram.{name}", files, HISTOGRAM_STORE_VERSION,
+                              time_frame=(config or {}).get('time_frame'), **params)
 
     def read(self, selected_dirs, config = {"time_frame":None}) -> List[Dict[str, Any]]:
         """Decide to read multiple or read single"""
@@ -47,6 +85,35 @@ class HistogramProcessor:
         elif isinstance(selected_dirs, str):
             return self.read_single(selected_dirs), 'Single'
     
+    def read_store(self, sim_dir: str) -> Optional[HistogramStore]:
+        """
+        Read histogram complex data from a simulation directory in columnar form.
+
+        The text file is parsed once and cached as a memory-mapped sidecar
+        next to ``DATA/``; subsequent reads reuse the sidecar while the
+        source file is unchanged. In live mode the file is instead followed
+        incrementally and no sidecar is written.
+
+        Parameters:
+            sim_dir (str): Path to the simulation directory
+
+        Returns:
+            Optional[HistogramStore]: Columnar histogram data, or None if unavailable
+        """
+        try:
+            if self.live:
+                data_file = os.path.join(sim_dir, "DATA", HISTOGRAM_FILE_NAME)
+                if not os.path.exists(data_file):
+                    logger.warning(f"Histogram complexes file not found: {data_file}")
+                    return None
+                if data_file not in self._tails:
+                    self._tails[data_file] = HistogramTailReader(data_file)
+                return self._tails[data_file].read()
+            return load_histogram_store(sim_dir, use_cache=self.use_disk_cache)
+        except Exception as e:
+            logger.error(f"Error reading histogram complexes from {sim_dir}: {e}")
+            return None
+
     def read_single(self, sim_dir: str) -> Dict[str, Any]:
         """
         Read histogram complex data from a simulation directory.
@@ -57,57 +124,59 @@ class HistogramProcessor:
         Returns:
             Dict[str, Any]: Dictionary containing time series and complex data
         """
-        data_file = os.path.join(sim_dir, "DATA", "histogram_complexes_time.dat")
-        
-        if not os.path.exists(data_file):
-            logger.warning(f"Histogram complexes file not found: {data_file}")
-            return {"time_series": [], "complexes": []}
-        
-        time_series = []
-        all_complexes = []
+        store = self.read_store(sim_dir)
+        if store is None:
+            return {"Time (s)": [], "complexes": []}
         
-        try:
-            with open(data_file, "r") as f:
-                lines = f.readlines()
-            
-            current_time = None
-            current_complexes = []
-            
-            for line_num, line in enumerate(lines, 1):
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                time_match = re.match(r"Time \(s\):\s+([\d.]+(?:[eE][+-]?\d+)?)", line)
-                if time_match:
-                    if current_time is not None:
-                        time_series.append(current_time)
-                        all_complexes.append(current_complexes)
-                        current_complexes = []
-                    
-                    current_time = float(time_match.group(1))
-                else:
-                    count, species_dict = parse_histogram_line(line)
-                    if species_dict:
-                        current_complexes.append((count, species_dict))
-                    elif line.strip() and not line.startswith('#'):
-                        logger.debug(f"Could not parse line {line_num}: {line}")
-            
-            # Add the last time point
-            if current_time is not None and current_complexes:
-                time_series.append(current_time)
-                all_complexes.append(current_complexes)
-            
-            logger.debug(f"Successfully read histogram complexes from {data_file}")
-            
-        except Exception as e:
-            logger.error(f"Error reading histogram complexes from {data_file}: {e}")
-            return {"time_series": [], "complexes": []}
-        
-        return {
-            "Time (s)": time_series,
-            "complexes": all_complexes
-        }
+        return store.to_dict()
+
+    def read_stores(
+            self,
+            selected_dirs: Optional[List[str]] = None,
+            config: Optional[Dict[str, Any]] = None
+        ) -> List[HistogramStore]:
+        """
+        Read the histograms of multiple simulations in columnar form.
+
+        Directories without data are skipped, and the configured time frame
+        is applied to every store.
+
+        Parameters:
+            selected_dirs (Optional[List[str]]): Simulation directories; defaults to the configured ones
+            config (Optional[Dict[str, Any]]): Configuration holding the "time_frame"
+
+        Returns:
+            List[HistogramStore]: One non-empty store per readable simulation
+        """
+        if not selected_dirs:
+            if not self._selected_dirs:
+                raise FileNotFoundError("No directory selected for reading.")
+            selected_dirs = self._selected_dirs
+        time_frame = (config or {}).get('time_frame')
+
+        cache_key = self._cache_key("stores", selected_dirs, config)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Load raw data; followed files keep their state in this process
+        if self.live:
+            stores = [self.read_store(sim_dir) for sim_dir in selected_dirs]
+        else:
+            results = self.executor.map(load_histogram_store, selected_dirs, use_cache=self.use_disk_cache)
+            self.errors = {r.item: r.error for r in results if r.error is not None}
+            stores = [r.value for r in results]
+
+        selected = []
+        for store in stores:
+            if store is not None and store.num_times:
+                if time_frame:
+                    store = store.select_time_frame(time_frame)
+                selected.append(store)
+
+        # Stores are memory-mapped from their own sidecars; keep them out of the disk tier
+        self._cache.put(cache_key, selected, persist=False)
+        return selected
 
     def read_multiple(
             self, 
@@ -117,120 +186,133 @@ class HistogramProcessor:
         """read multiple files"""
 
         # check cache
-        cache_key = "all_data"
-        if cache_key in self._cache:
-            return self._cache[cache_key]
-        
-        if not selected_dirs:
-            if not self._selected_dirs:
-                raise FileNotFoundError("No directory selected for reading.")
-            selected_dirs = self._selected_dirs
+        cache_key = self._cache_key("all_data", selected_dirs, config)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-        # Load raw data
-        all_data = []
-        for sim_dir in selected_dirs:
-            data = self.read_single(sim_dir)
-            if data["Time (s)"]:
-                if config['time_frame']:
-                    data = filter_by_time_frame(data, config['time_frame'])
-                all_data.append(data)
+        all_data = [store.to_dict() for store in self.read_stores(selected_dirs, config)]
 
-        self._cache[cache_key] = all_data
+        self._cache.put(cache_key, all_data, persist=False)
 
         return all_data
 
+    def get_count_tensor(
+            self,
+            selected_dirs: Optional[List[str]] = None,
+            config: Optional[Dict[str, Any]] = None
+        ) -> CountTensor:
+        """
+        Complex counts of all selected simulations as a (simulation, time, composition) tensor.
+
+        The tensor is built once per selection and time frame; legend
+        queries, complex sizes and histograms are all answered from it.
+
+        Parameters:
+            selected_dirs (Optional[List[str]]): Simulation directories; defaults to the configured ones
+            config (Optional[Dict[str, Any]]): Configuration holding the "time_frame"
+
+        Returns:
+            CountTensor: Counts of every composition in every simulation over time
+        """
+        cache_key = self._cache_key("count_tensor", selected_dirs, config)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        tensor = CountTensor.from_stores(self.read_stores(selected_dirs, config))
+        logger.debug(f"Built count tensor of shape {tensor.shape}")
+
+        self._cache.put(cache_key, tensor)
+        return tensor
+
     def calculate_complex_sizes(self, 
-                              histogram_data: Dict[str, Any], 
-                              legend: List[str]) -> List[List[int]]:
-        """Calculate complex sizes for specified species across all simulations."""
-        cache_key = f"sizes_{hash(tuple(legend))}"
-        if cache_key in self._cache:
-            return self._cache[cache_key]
-        
-        all_sizes = []
-        for data in histogram_data['raw_data']:
-            sim_sizes = []
-        for complexes in data["complexes"]:
-            for count, species_dict in complexes:
-                complex_size = sum(species_dict[species] for species in legend if species in species_dict)
-                sim_sizes.extend([complex_size] * count)
-            all_sizes.append(sim_sizes)
-        
-        self._cache[cache_key] = all_sizes
-        return all_sizes
+                              legend: List[str],
+                              selected_dirs: Optional[List[str]] = None,
+                              config: Optional[Dict[str, Any]] = None) -> List[np.ndarray]:
+        """
+        Calculate complex sizes for specified species across all simulations.
+
+        Every complex present at any time point contributes one entry, so a
+        composition counted ``n`` times appears ``n`` times.
+
+        Returns:
+            List[np.ndarray]: Sizes of all complexes, one array per simulation
+        """
+        tensor = self.get_count_tensor(selected_dirs, config)
+        sim_index, _, composition_ids, counts = tensor.entries()
+        sizes = np.repeat(tensor.sizes(legend)[composition_ids], counts)
+        # Entries are ordered by simulation, so each simulation is one contiguous run
+        boundaries = np.cumsum(np.bincount(sim_index, weights=counts, minlength=tensor.num_sims)).astype(np.int64)
+        return np.split(sizes, boundaries[:-1])
     
     
     def get_size_distribution_stats(self, 
-                                  histogram_data: Dict[str, Any], 
-                                  legend: List[str]) -> Dict[str, float]:
+                                  legend: List[str],
+                                  selected_dirs: Optional[List[str]] = None,
+                                  config: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
         """Calculate statistical measures of size distribution."""
-        all_sizes = self.calculate_complex_sizes(histogram_data, legend)
-        combined_sizes = [size for sim_sizes in all_sizes for size in sim_sizes]
+        all_sizes = self.calculate_complex_sizes(legend, selected_dirs, config)
         
-        if not combined_sizes:
+        if not all_sizes or not sum(len(sizes) for sizes in all_sizes):
             return {'mean': 0, 'std': 0, 'median': 0, 'max': 0, 'min': 0}
         
-        sizes_array = np.array(combined_sizes)
+        sizes_array = np.concatenate(all_sizes)
         return {
             'mean': float(np.mean(sizes_array)),
             'std': float(np.std(sizes_array)),
             'median': float(np.median(sizes_array)),
             'max': int(np.max(sizes_array)),
             'min': int(np.min(sizes_array)),
-            'total_complexes': len(combined_sizes)
+            'total_complexes': len(sizes_array)
         }
     
     def get_time_series(self, 
                         legends: List[List[str]],
-                        legend_names: Optional[List[str]] = None
-        ) -> pd.DataFrame:
+                        legend_names: Optional[List[str]] = None,
+                        selected_dirs: Optional[List[str]] = None,
+                        config: Optional[Dict[str, Any]] = None
+        ) -> Dict[str, Any]:
 
         """
-        Calculate time series statistics (mean, std, median) for different legends.
+        Collect the count of each legend over time for every simulation.
         
-        This method processes histogram data across multiple simulations and time points
-        to generate statistical measures for each legend over time.
+        Each legend is looked up once in the count tensor, so the result is a
+        gather of one composition column per legend.
         
         Parameters:
-            histogram_data (Dict[str, Any]): Processed histogram data from get_histogram_data()
             legends (List[List[str]]): List of legend definitions, where each legend is a list of species.
                 Example: ["A: 1.", "B: 2.", "A: 3. B: 4."] for separate A, B, and combined A+B analysis
             legend_names (Optional[List[str]]): Custom names for each legend. If None, use legends.
                 Example: ["A1", "B2", "A3B4"]
+            selected_dirs (Optional[List[str]]): Simulation directories; defaults to the configured ones
+            config (Optional[Dict[str, Any]]): Configuration holding the "time_frame"
         
         Returns:
-            pd.DataFrame: DataFrame with columns:
-                - Time (s): Time points
-                - For each legend: Each trajectory's data for aligned time points
+            Dict[str, Any]: Dictionary with keys:
+                - Time (s): Time points aligned across simulations
+                - For each legend name: Array of shape (num_simulations, num_time_points)
                 
         Example:
             # Get time series statistics for individual and combined species
             legends = ["A: 1.", "B: 2.", "A: 3. B: 4."]
             legend_names = ["A1", "B2", "A3B4"]
-            stats_df = processor.get_time_series(data, legends, legend_names)
+            time_series = processor.get_time_series(legends, legend_names)
         """
-        
-        cache_key = f"all_data"
-        if cache_key in self._cache:
-            all_data = self._cache[cache_key]
-        else:
-            logger.info("No data been read. Start reading...")
-            try:
-                all_data = self.read_multiple()
-            except Exception as e:
-                logger.error(f"No data provided: {e}")
-
-
-        cache_key = f"time_series_{hash(tuple(sorted(legends)))}"
-        if cache_key in self._cache:
-            return self._cache[cache_key]
-        
         # Generate legend names if not provided
         if legend_names is None:
             legend_names = legends
         
         if len(legend_names) != len(legends):
             raise ValueError("Number of legend_names must match number of legends")
+
+        cache_key = self._cache_key("time_series", selected_dirs, config, 
+                                    legends=list(legends), legend_names=list(legend_names))
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        tensor = self.get_count_tensor(selected_dirs, config)
         
         legend_dicts = {}
         for lname, l in zip(legend_names, legends):
@@ -238,43 +320,17 @@ class HistogramProcessor:
 
         logger.debug('Dictionary of legends: ' + str(legend_dicts))
         
-        common_time_points = align_time_series(all_data)
+        common_time_points = tensor.common_times
         min_length = len(common_time_points)
         
-        # Initialize result dictionary
-        result_data = {'Time (s)': common_time_points}
-        for lname in legend_dicts:
-            result_data[lname] = [] # all data points
-        
-        # Process over all data
-            
-        for data in all_data:
-            if not data['Time (s)'] or len(data['Time (s)']) < min_length:
-                logger.critical(f"Illegal time_series. This should not happen. Min length calculated is {min_length}. \n" +
-                                f"This time series has length {len(data['time_series'])}")
-                continue
-                
-            # initialize
-            time_series = {}
-            for lname in legend_dicts:
-                time_series[lname] = [0 for i in range(min_length)]
-            
-            logger.debug('Time series initialized with all 0: ' + str(time_series))
-
-            for time_idx in range(min_length):
-                complexes = data['complexes'][time_idx]
-                for count, species_dict in complexes:
-                    # find the corresponding legend name
-                    for lname in legend_dicts:
-                        if legend_dicts[lname] == species_dict:
-                            time_series[lname][time_idx] = count
+        composition_ids = [tensor.composition_id(legend_dict) for legend_dict in legend_dicts.values()]
+        counts = tensor.counts(composition_ids)[:, :min_length, :]
 
-            logger.debug('Time series after reading: ' + str(time_series))
-            
-            for lname in legend_dicts:
-                result_data[lname].append(time_series[lname])
+        result_data = {'Time (s)': common_time_points.tolist()}
+        for k, lname in enumerate(legend_dicts):
+            result_data[lname] = counts[:, :, k]
 
-        self._cache[cache_key] = result_data
+        self._cache.put(cache_key, result_data)
 
         return result_data
         
@@ -282,7 +338,9 @@ class HistogramProcessor:
     def calculate_time_series_statistics(
             self, 
             legends: List[List[str]],
-            legend_names: Optional[List[str]] = None
+            legend_names: Optional[List[str]] = None,
+            selected_dirs: Optional[List[str]] = None,
+            config: Optional[Dict[str, Any]] = None
         ) -> Dict[Dict,Any]:
         """
         Calculate time series statistics (mean, std, median) for different legends.
@@ -291,11 +349,12 @@ class HistogramProcessor:
         to generate statistical measures for each legend over time.
         
         Parameters:
-            histogram_data (Dict[str, Any]): Processed histogram data from get_histogram_data()
             legends (List[List[str]]): List of legend definitions, where each legend is a list of species.
                 Example: ["A: 1.", "B: 2.", "A: 3. B: 4."] for separate A, B, and combined A+B analysis
             legend_names (Optional[List[str]]): Custom names for each legend. If None, use legends.
                 Example: ["A1", "B2", "A3B4"]
+            selected_dirs (Optional[List[str]]): Simulation directories; defaults to the configured ones
+            config (Optional[Dict[str, Any]]): Configuration holding the "time_frame"
         
         Returns:
             pd.DataFrame: DataFrame with columns:
@@ -306,18 +365,20 @@ class HistogramProcessor:
             # Get time series statistics for individual and combined species
             legends = ["A: 1.", "B: 2.", "A: 3. B: 4."]
             legend_names = ["A1", "B2", "A3B4"]
-            stats_df = processor.calculate_time_series_statistics(data, legends, legend_names)
+            stats_df = processor.calculate_time_series_statistics(legends, legend_names)
             
             # Results in DataFrame with columns:
             # Time (s), Species_A_Mean, Species_A_Std, Species_A_Median, 
             # Species_B_Mean, Species_B_Std, Species_B_Median,
             # Combined_AB_Mean, Combined_AB_Std, Combined_AB_Median
         """
-        cache_key = f"time_series_stats_{hash(tuple(sorted(legends)))}"
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        cache_key = self._cache_key("time_series_stats", selected_dirs, config, 
+                                    legends=list(legends), legend_names=list(legend_names or legends))
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
         
-        result_data = self.get_time_series(legends=legends, legend_names=legend_names)
+        result_data = self.get_time_series(legends, legend_names, selected_dirs, config)
             
         
         # Calculate statistics across simulations for each time point
@@ -334,7 +395,7 @@ class HistogramProcessor:
             logger.error(f"Failed calculating stats: {e}")
         
         # Cache the result
-        self._cache[cache_key] = result_stat
+        self._cache.put(cache_key, result_stat)
         
         return result_stat
 
@@ -342,3 +403,8 @@ class HistogramProcessor:
         """Clear processor cache."""
         self._cache.clear()
 
+    def reset(self):
+        """Clear processor cache and forget the state of incrementally followed files."""
+        self._cache.clear()
+        self._tails.clear()
+
@@ -0,0 +1,353 @@
+"""
+Columnar storage for histogram_complexes_time.dat.
+
+The text file is streamed once, block by block, and every distinct species
+composition is interned into an integer ID. The result is kept as three flat
+columns (time index, composition ID, count) plus the time axis and the
+composition table, and can be persisted as a sidecar next to ``DATA/`` so
+later reads memory-map the arrays instead of re-parsing the text.
+"""
+
+import os
+import re
+import json
+import array
+import numpy as np
+from typing import List, Dict, Any, Tuple, Optional, Iterable
+
+from .utils import parse_histogram_complex
+from ...cache import CACHE_DIR_NAME
+
+# Configure logging,
+import logging
+# inherit from the global level (should be setup in main)
+logger = logging.getLogger(__name__)
+
+
+HISTOGRAM_FILE_NAME = "histogram_complexes_time.dat"
+# Bump whenever the parsing rules or the on-disk layout change
+HISTOGRAM_STORE_VERSION = 1
+
+_TIME_PATTERN = re.compile(r"Time \(s\):\s+([\d.]+(?:[eE][+-]?\d+)?)")
+_COLUMNS = ("times", "time_index", "composition_id", "count")
+
+
+class HistogramStore:
+    """
+    Columnar representation of the complexes histogram of one simulation.
+
+    Row ``r`` says that ``count[r]`` complexes with composition
+    ``compositions[composition_id[r]]`` exist at time ``times[time_index[r]]``.
+    Rows are ordered by time index.
+
+    Attributes:
+        times (np.ndarray): Time points (s), shape (num_times,)
+        time_index (np.ndarray): Time index of each row, int32
+        composition_id (np.ndarray): Composition ID of each row, int32
+        count (np.ndarray): Number of complexes of each row, int32
+        compositions (List[Dict[str, int]]): Species -> count mapping for each composition ID
+    """
+
+    def __init__(self,
+                 times: np.ndarray,
+                 time_index: np.ndarray,
+                 composition_id: np.ndarray,
+                 count: np.ndarray,
+                 compositions: List[Dict[str, int]]):
+        self.times = times
+        self.time_index = time_index
+        self.composition_id = composition_id
+        self.count = count
+        self.compositions = compositions
+        self._offsets = None
+
+    @property
+    def num_times(self) -> int:
+        return len(self.times)
+
+    @property
+    def num_compositions(self) -> int:
+        return len(self.compositions)
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """Row offsets of each time block; rows of block i are offsets[i]:offsets[i+1]."""
+        if self._offsets is None:
+            self._offsets = np.searchsorted(self.time_index, np.arange(self.num_times + 1), side="left")
+        return self._offsets
+
+    @property
+    def nbytes(self) -> int:
+        return int(sum(getattr(self, name).nbytes for name in _COLUMNS))
+
+    def complexes_at(self, i: int) -> List[Tuple[int, Dict[str, int]]]:
+        """Return the (count, species_dict) list of time block ``i``."""
+        start, end = self.offsets[i], self.offsets[i + 1]
+        compositions = self.compositions
+        return [
+            (c, compositions[cid])
+            for c, cid in zip(self.count[start:end].tolist(), self.composition_id[start:end].tolist())
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Expand into the dictionary format returned by ``HistogramProcessor.read_single``.
+
+        Composition dictionaries are shared between rows, so the expanded view
+        costs one tuple per row.
+        """
+        return {
+            "Time (s)": self.times.tolist(),
+            "complexes": [self.complexes_at(i) for i in range(self.num_times)]
+        }
+
+    def select_time_frame(self, time_frame: Optional[Tuple[float, float]]) -> "HistogramStore":
+        """Return a new in-memory store restricted to start <= t <= end."""
+        if time_frame is None:
+            return self
+        start, end = time_frame
+        keep = np.flatnonzero((self.times >= start) & (self.times <= end))
+        if len(keep) == 0:
+            return HistogramStore(
+                np.zeros(0), np.zeros(0, np.int32), np.zeros(0, np.int32), np.zeros(0, np.int32), self.compositions
+            )
+        # Time indices are sorted, so the kept blocks form one contiguous row range
+        row_start, row_end = self.offsets[keep[0]], self.offsets[keep[-1] + 1]
+        return HistogramStore(
+            np.asarray(self.times[keep[0]:keep[-1] + 1], dtype=np.float64),
+            np.asarray(self.time_index[row_start:row_end], dtype=np.int32) - np.int32(keep[0]),
+            np.asarray(self.composition_id[row_start:row_end], dtype=np.int32),
+            np.asarray(self.count[row_start:row_end], dtype=np.int32),
+            self.compositions
+        )
+
+    def save(self, store_dir: str, source_stat: Optional[os.stat_result] = None):
+        """
+        Write the store as .npy columns plus JSON metadata into ``store_dir``.
+
+        The metadata file is written last, so a partially written store is
+        never considered valid.
+        """
+        os.makedirs(store_dir, exist_ok=True)
+        meta_path = os.path.join(store_dir, "meta.json")
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+        for name in _COLUMNS:
+            tmp_path = os.path.join(store_dir, f"{name}.tmp.npy")
+            np.save(tmp_path, np.asarray(getattr(self, name)))
+            os.replace(tmp_path, os.path.join(store_dir, f"{name}.npy"))
+
+        with open(os.path.join(store_dir, "compositions.json"), "w") as f:
+            json.dump([list(c.items()) for c in self.compositions], f)
+
+        meta = {"version": HISTOGRAM_STORE_VERSION}
+        if source_stat is not None:
+            meta["source_size"] = source_stat.st_size
+            meta["source_mtime_ns"] = source_stat.st_mtime_ns
+        with open(meta_path, "w") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, store_dir: str, mmap: bool = True) -> "HistogramStore":
+        """Load a store written by ``save``; the columns are memory-mapped by default."""
+        mmap_mode = "r" if mmap else None
+        columns = {
+            name: np.load(os.path.join(store_dir, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in _COLUMNS
+        }
+        with open(os.path.join(store_dir, "compositions.json"), "r") as f:
+            compositions = [dict((species, int(n)) for species, n in items) for items in json.load(f)]
+        return cls(compositions=compositions, **columns)
+
+
+class HistogramParser:
+    """
+    Stateful streaming parser for histogram_complexes_time.dat.
+
+    Lines can be fed in arbitrary chunks; the columns and the composition
+    intern table persist between calls, so a growing file can be parsed
+    incrementally. ``rollback`` discards trailing time blocks, which lets a
+    caller re-parse a block that was still being written.
+    """
+
+    def __init__(self):
+        self.times = array.array("d")
+        self.time_index = array.array("i")
+        self.composition_id = array.array("i")
+        self.count = array.array("i")
+        self.compositions = []
+        self._block_starts = array.array("q")   # first row of each time block
+        self._key_to_id = {}    # canonical composition -> ID
+        self._text_to_id = {}   # raw composition text -> ID (-1 if unparsable)
+
+    @property
+    def num_times(self) -> int:
+        return len(self.times)
+
+    def feed(self, lines: Iterable[str]):
+        """Parse an iterable of lines, appending to the current columns."""
+        times = self.times
+        time_index = self.time_index
+        composition_id = self.composition_id
+        count = self.count
+        compositions = self.compositions
+        block_starts = self._block_starts
+        key_to_id = self._key_to_id
+        text_to_id = self._text_to_id
+
+        current = len(times) - 1
+
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+
+            if line[0] == "T":
+                time_match = _TIME_PATTERN.match(line)
+                if time_match:
+                    times.append(float(time_match.group(1)))
+                    block_starts.append(len(count))
+                    current += 1
+                    continue
+
+            parts = line.split(None, 1)
+            if len(parts) != 2 or not parts[0].isdigit() or current < 0:
+                if not line.startswith('#'):
+                    logger.debug(f"Could not parse line: {line}")
+                continue
+
+            text = parts[1].strip()
+            cid = text_to_id.get(text)
+            if cid is None:
+                species_dict = parse_histogram_complex(text)
+                if species_dict:
+                    key = tuple(sorted(species_dict.items()))
+                    cid = key_to_id.get(key)
+                    if cid is None:
+                        cid = len(compositions)
+                        key_to_id[key] = cid
+                        compositions.append(species_dict)
+                else:
+                    cid = -1
+                text_to_id[text] = cid
+            if cid < 0:
+                logger.debug(f"Could not parse line: {line}")
+                continue
+
+            time_index.append(current)
+            composition_id.append(cid)
+            count.append(int(parts[0]))
+
+    def rollback(self, num_times: int):
+        """Discard every time block from index ``num_times`` on."""
+        if num_times >= len(self.times):
+            return
+        first_row = self._block_starts[num_times]
+        del self.times[num_times:]
+        del self._block_starts[num_times:]
+        del self.time_index[first_row:]
+        del self.composition_id[first_row:]
+        del self.count[first_row:]
+
+    def to_store(self) -> HistogramStore:
+        """
+        Snapshot the parsed data as a ``HistogramStore``.
+
+        A trailing time header without complexes is an incomplete block and
+        is left out of the snapshot.
+        """
+        num_times = len(self.times)
+        if num_times and self._block_starts[-1] == len(self.count):
+            num_times -= 1
+        return HistogramStore(
+            np.frombuffer(self.times, dtype=np.float64)[:num_times].copy(),
+            np.frombuffer(self.time_index, dtype=np.int32).copy(),
+            np.frombuffer(self.composition_id, dtype=np.int32).copy(),
+            np.frombuffer(self.count, dtype=np.int32).copy(),
+            list(self.compositions)
+        )
+
+
+def parse_histogram_file(data_file: str) -> HistogramStore:
+    """
+    Stream histogram_complexes_time.dat into a ``HistogramStore``.
+
+    The file is consumed line by line; only the compact columns and one entry
+    per distinct composition string are held in memory.
+
+    Parameters:
+        data_file (str): Path to histogram_complexes_time.dat
+
+    Returns:
+        HistogramStore: Columnar histogram data
+    """
+    parser = HistogramParser()
+    with open(data_file, "r") as f:
+        parser.feed(f)
+    return parser.to_store()
+
+
+def get_store_dir(sim_dir: str) -> str:
+    """Location of the histogram sidecar of a simulation directory."""
+    return os.path.join(sim_dir, CACHE_DIR_NAME, "histogram_complexes_time")
+
+
+def _is_store_valid(store_dir: str, source_stat: os.stat_result) -> bool:
+    meta_path = os.path.join(store_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return False
+    try:
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return (
+        meta.get("version") == HISTOGRAM_STORE_VERSION
+        and meta.get("source_size") == source_stat.st_size
+        and meta.get("source_mtime_ns") == source_stat.st_mtime_ns
+    )
+
+
+def load_histogram_store(sim_dir: str, use_cache: bool = True) -> Optional[HistogramStore]:
+    """
+    Load the histogram of a simulation directory as a ``HistogramStore``.
+
+    With ``use_cache`` the sidecar under ``<sim_dir>/.ionerdss_cache`` is
+    memory-mapped when it matches the size and mtime of the source file;
+    otherwise the text file is parsed and the sidecar (re)written. Failing to
+    write the sidecar (e.g. read-only data) is not an error.
+
+    Parameters:
+        sim_dir (str): Path to the simulation directory
+        use_cache (bool): Whether to read and write the on-disk sidecar
+
+    Returns:
+        Optional[HistogramStore]: The histogram data, or None if the file does not exist
+    """
+    data_file = os.path.join(sim_dir, "DATA", HISTOGRAM_FILE_NAME)
+    if not os.path.exists(data_file):
+        logger.warning(f"Histogram complexes file not found: {data_file}")
+        return None
+
+    source_stat = os.stat(data_file)
+    store_dir = get_store_dir(sim_dir)
+
+    if use_cache and _is_store_valid(store_dir, source_stat):
+        try:
+            store = HistogramStore.load(store_dir)
+            logger.debug(f"Memory-mapped histogram sidecar {store_dir}")
+            return store
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable histogram sidecar {store_dir}: {e}")
+
+    store = parse_histogram_file(data_file)
+    logger.debug(f"Successfully read histogram complexes from {data_file}")
+
+    if use_cache:
+        try:
+            store.save(store_dir, source_stat)
+        except OSError as e:
+            logger.debug(f"Could not write histogram sidecar {store_dir}: {e}")
+
+    return store
@@ -0,0 +1,186 @@
+"""
+Incremental readers for NERDSS output files of running simulations.
+
+Each reader follows one file, remembers the byte offset of the data it has
+already parsed together with the parser state, and on every ``read`` call
+only parses the time blocks appended since the previous call. The last time
+block of a growing file may still be incomplete, so it is held back as
+pending text and re-parsed once more data arrives.
+"""
+
+import io
+import re
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Tuple, Optional
+
+from ....util import FileTail
+from ...data_readers import parse_transition_block, combine_transition_blocks
+from .histogram_store import HistogramParser, HistogramStore
+
+# Configure logging,
+import logging
+# inherit from the global level (should be setup in main)
+logger = logging.getLogger(__name__)
+
+
+def _split_pending(data: bytes, header: bytes) -> Tuple[bytes, bytes]:
+    """Split ``data`` before the last line starting with ``header``."""
+    pos = data.rfind(b"\n" + header) + 1
+    return data[:pos], data[pos:]
+
+
+class HistogramTailReader:
+    """
+    Incremental reader for histogram_complexes_time.dat.
+
+    Attributes:
+        data_file (str): Path to the followed file
+    """
+
+    _HEADER = b"Time (s):"
+
+    def __init__(self, data_file: str):
+        self.data_file = data_file
+        self._tail = FileTail(data_file)
+        self.reset()
+
+    def reset(self):
+        """Drop all parsed data; the next read starts from the beginning of the file."""
+        self._tail.reset()
+        self._clear()
+
+    def _clear(self):
+        self._parser = HistogramParser()
+        self._committed_times = 0
+        self._pending = b""
+        self._store = None
+
+    def read(self) -> HistogramStore:
+        """Parse newly appended time blocks and return the full histogram so far."""
+        _, chunk, truncated = self._tail.read()
+        if truncated:
+            logger.info(f"{self.data_file} was truncated; reading it again from the start")
+            self._clear()
+
+        if chunk or self._store is None:
+            committed, self._pending = _split_pending(self._pending + chunk, self._HEADER)
+            # The pending block was parsed last time; parse it again with its new lines
+            self._parser.rollback(self._committed_times)
+            if committed:
+                self._parser.feed(committed.decode("utf-8", errors="replace").splitlines())
+                self._committed_times = self._parser.num_times
+            self._parser.feed(self._pending.decode("utf-8", errors="replace").splitlines())
+            self._store = self._parser.to_store()
+
+        return self._store
+
+
+class CopyNumberTailReader:
+    """
+    Incremental reader for copy_numbers_time.dat.
+
+    Attributes:
+        data_file (str): Path to the followed file
+    """
+
+    def __init__(self, data_file: str):
+        self.data_file = data_file
+        self._tail = FileTail(data_file)
+        self.reset()
+
+    def reset(self):
+        """Drop all parsed data; the next read starts from the beginning of the file."""
+        self._tail.reset()
+        self._clear()
+
+    def _clear(self):
+        self._columns = None
+        self._frame = None
+
+    def read(self) -> Optional[pd.DataFrame]:
+        """Parse newly appended rows and return all rows read so far."""
+        _, chunk, truncated = self._tail.read()
+        if truncated:
+            logger.info(f"{self.data_file} was truncated; reading it again from the start")
+            self._clear()
+
+        if self._columns is None:
+            if not chunk:
+                return None
+            header, _, chunk = chunk.partition(b"\n")
+            self._columns = [c.strip() for c in header.decode("utf-8").split(",")]
+            # unify the name of time points
+            self._columns = ['Time (s)' if c == 'time_points' else c for c in self._columns]
+            self._frame = pd.DataFrame(columns=self._columns)
+
+        if chunk.strip():
+            new_rows = pd.read_csv(io.BytesIO(chunk), header=None, names=self._columns)
+            if len(self._frame):
+                self._frame = pd.concat([self._frame, new_rows], ignore_index=True)
+            else:
+                self._frame = new_rows
+
+        return self._frame
+
+
+class TransitionTailReader:
+    """
+    Incremental reader for transition_matrix_time.dat.
+
+    Attributes:
+        data_file (str): Path to the followed file
+    """
+
+    _HEADER = b"time:"
+
+    def __init__(self, data_file: str):
+        self.data_file = data_file
+        self._tail = FileTail(data_file)
+        self.reset()
+
+    def reset(self):
+        """Drop all parsed data; the next read starts from the beginning of the file."""
+        self._tail.reset()
+        self._clear()
+
+    def _clear(self):
+        self._blocks = []
+        self._pending = b""
+        self._pending_block = None
+
+    def _parse(self, block: bytes):
+        try:
+            return parse_transition_block(block.decode("utf-8", errors="replace")[len(self._HEADER):])
+        except Exception as e:
+            logger.warning(f"Error parsing time block in {self.data_file}: {e}")
+            return None
+
+    def read(self, time_frame: Optional[Tuple[float, float]] = None) -> Tuple[np.ndarray, Dict[int, List[float]]]:
+        """
+        Parse newly appended time blocks.
+
+        Parameters:
+            time_frame (Optional[Tuple[float, float]]): Time range (start, end) to consider
+
+        Returns:
+            Tuple[np.ndarray, Dict[int, List[float]]]:
+                The transition matrix and lifetimes per cluster size, as returned by
+                ``parse_transition_lifetime_data``
+        """
+        _, chunk, truncated = self._tail.read()
+        if truncated:
+            logger.info(f"{self.data_file} was truncated; reading it again from the start")
+            self._clear()
+
+        if chunk:
+            committed, self._pending = _split_pending(self._pending + chunk, self._HEADER)
+            starts = [m.start() for m in re.finditer(rb"(?m)^time:", committed)]
+            for start, end in zip(starts, starts[1:] + [len(committed)]):
+                parsed = self._parse(committed[start:end])
+                if parsed is not None:
+                    self._blocks.append(parsed)
+            self._pending_block = self._parse(self._pending) if self._pending.startswith(self._HEADER) else None
+
+        time_data = self._blocks if self._pending_block is None else self._blocks + [self._pending_block]
+        return combine_transition_blocks(time_data, time_frame)
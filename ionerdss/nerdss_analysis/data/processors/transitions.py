@@ -2,10 +2,21 @@
 Transition matrix and lifetime data processor.
 """
 
+import os
 import numpy as np
 from typing import List, Dict, Any, Tuple, Optional
 from collections import defaultdict
 
+from ...data_readers import read_transition_matrix
+from .tail_readers import TransitionTailReader
+from ...parallel import ParallelExecutor
+from ...cache import ResultCache
+
+# Configure logging, 
+import logging
+# inherit from the global level (should be setup in main)
+logger = logging.getLogger(__name__)
+
 
 class TransitionProcessor:
     """
@@ -15,13 +26,89 @@ class TransitionProcessor:
     and lifetime statistics for cluster dynamics analysis.
     """
     
-    def __init__(self):
-        self._cache = {}
+    def __init__(self, cache: Optional[ResultCache] = None):
+        self._cache = cache if cache is not None else ResultCache()
         self._selected_dirs = []
+        self._tails = {}
+        self.live = False
+        self.executor = ParallelExecutor()
+        self.errors = {}
 
-    def configure(self, selected_dirs: List[str]):
+    def configure(self, 
+                  selected_dirs: List[str], 
+                  live: bool = False, 
+                  executor: Optional[ParallelExecutor] = None,
+                  cache: Optional[ResultCache] = None):
+        """
+        Select directories to read.
+
+        With ``live`` the files are followed incrementally: every read only
+        parses the time blocks appended since the previous read. Otherwise
+        ``executor`` reads the directories in parallel. ``cache`` replaces
+        the result cache.
+        """
         self._selected_dirs = selected_dirs
+        self.live = live
+        if executor is not None:
+            self.executor = executor
+        if cache is not None:
+            self._cache = cache
+
+    def read_single(self, 
+                    sim_dir: str, 
+                    time_frame: Optional[Tuple[float, float]] = None
+        ) -> Tuple[Optional[np.ndarray], Optional[Dict[int, List[float]]]]:
+        """
+        Read transition matrix and lifetime data from a simulation directory.
+        
+        Parameters:
+            sim_dir (str): Path to the simulation directory
+            time_frame (Optional[Tuple[float, float]]): Time range (start, end) to consider
+            
+        Returns:
+            Tuple[Optional[np.ndarray], Optional[Dict[int, List[float]]]]: 
+                The transition matrix and lifetime data, or (None, None) if file not found
+        """
+        if not self.live:
+            return read_transition_matrix(sim_dir, time_frame)
+
+        data_file = os.path.join(sim_dir, "DATA", "transition_matrix_time.dat")
+        if not os.path.exists(data_file):
+            logger.warning(f"Transition matrix file not found: {data_file}")
+            return None, None
+
+        try:
+            if data_file not in self._tails:
+                self._tails[data_file] = TransitionTailReader(data_file)
+            return self._tails[data_file].read(time_frame)
+        except Exception as e:
+            logger.error(f"Error processing transition matrix from {data_file}: {e}")
+            return None, None
     
+    def read_multiple(self, 
+                      selected_dirs: Optional[List[str]] = None, 
+                      time_frame: Optional[Tuple[float, float]] = None
+        ) -> List[Tuple[Optional[np.ndarray], Optional[Dict[int, List[float]]]]]:
+        """
+        Read transition matrix and lifetime data from several simulation directories.
+        
+        Returns:
+            List[Tuple[Optional[np.ndarray], Optional[Dict[int, List[float]]]]]: 
+                One (matrix, lifetime) tuple per directory, in order; (None, None) where reading failed
+        """
+        if not selected_dirs:
+            if not self._selected_dirs:
+                raise FileNotFoundError("No directory selected for reading.")
+            selected_dirs = self._selected_dirs
+
+        # Followed files keep their state in this process
+        if self.live:
+            return [self.read_single(sim_dir, time_frame) for sim_dir in selected_dirs]
+
+        results = self.executor.map(read_transition_matrix, selected_dirs, time_frame)
+        self.errors = {r.item: r.error for r in results if r.error is not None}
+        return [r.value if r.error is None else (None, None) for r in results]
+
     def aggregate_matrices(self, transition_data: Dict[str, Any]) -> np.ndarray:
         """Aggregate transition matrices across simulations."""
         matrices = transition_data['matrices']
@@ -282,4 +369,9 @@ class TransitionProcessor:
     
     def clear_cache(self):
         """Clear processor cache."""
-        self._cache.clear()
\ No newline at end of file
+        self._cache.clear()
+
+    def reset(self):
+        """Clear processor cache and forget the state of incrementally followed files."""
+        self._cache.clear()
+        self._tails.clear()
\ No newline at end of file
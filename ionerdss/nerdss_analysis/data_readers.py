@@ -12,6 +12,10 @@ import logging
 from collections import defaultdict
 from typing import List, Dict, Tuple, Optional, Union, Any
 
+from .parallel import ParallelExecutor
+from .cache import ResultCache, make_cache_key, DEFAULT_MAX_BYTES
+from .transition_index import TransitionIndex, parse_transition_snapshot, load_transition_index
+
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -47,104 +51,47 @@ def filter_by_time_frame(data: Dict[str, Any], time_frame: Optional[Tuple[float,
     }
 
 
-def parse_transition_lifetime_data(file_path: str, time_frame: Optional[Tuple[float, float]] = None) -> Tuple[np.ndarray, Dict[int, List[float]]]:
+def parse_transition_block(block: str) -> Optional[Tuple[float, np.ndarray, Dict[int, List[float]]]]:
     """
-    Parse transition matrix and lifetime data from a file.
+    Parse one time block of transition_matrix_time.dat.
     
     Parameters:
-        file_path (str): Path to the transition matrix file
+        block (str): Text of the block following the "time:" marker
+        
+    Returns:
+        Optional[Tuple[float, np.ndarray, Dict[int, List[float]]]]: 
+            (time, transition matrix, lifetimes per cluster size), or None if the block has no matrix
+    """
+    snapshot = parse_transition_snapshot(block)
+    if snapshot is None:
+        return None
+    return snapshot.time, snapshot.matrix, snapshot.lifetime_dict()
+
+
+def combine_transition_blocks(
+        time_data: List[Tuple[float, np.ndarray, Dict[int, List[float]]]], 
+        time_frame: Optional[Tuple[float, float]] = None
+    ) -> Tuple[np.ndarray, Dict[int, List[float]]]:
+    """
+    Reduce parsed time blocks to the transition matrix and lifetimes of a time frame.
+    
+    The matrix and lifetimes in the file are cumulative, so the result for a
+    time frame is the difference between the last and the first block inside it.
+    Without a time frame the last block is returned.
+    
+    Parameters:
+        time_data (List[Tuple[float, np.ndarray, Dict[int, List[float]]]]): Parsed blocks
         time_frame (Optional[Tuple[float, float]]): Time range (start, end) to consider
         
     Returns:
         Tuple[np.ndarray, Dict[int, List[float]]]: 
             A tuple containing the transition matrix and a dictionary of lifetimes per cluster size
     """
-    try:
-        with open(file_path, "r") as f:
-            content = f.read()
-    except Exception as e:
-        logger.error(f"Error reading transition matrix file {file_path}: {e}")
-        return np.array([]), {}
-
-    time_blocks = re.split(r"time:\s*", content)[1:]
-    if not time_blocks:
-        logger.warning(f"No time blocks found in {file_path}")
-        return np.array([]), {}
-
-    time_data = []
-
-    for block in time_blocks:
-        try:
-            lines = block.strip().splitlines()
-            if not lines:
-                continue
-                
-            time_val = float(lines[0])
-            
-            # Parse transition matrix
-            tm_lines = []
-            tm_start = None
-            
-            for i, line in enumerate(lines):
-                if "transion matrix for each mol type:" in line:
-                    tm_start = i + 2
-                    break
-            
-            if tm_start is None:
-                continue
-                
-            for i in range(tm_start, len(lines)):
-                if lines[i].startswith("lifetime for each mol type:"):
-                    break
-                if lines[i].strip() and not lines[i].startswith(('A', 'B', 'C')):
-                    try:
-                        row = [int(x) for x in lines[i].split()]
-                        if row:
-                            tm_lines.append(row)
-                    except ValueError:
-                        continue
-            
-            if not tm_lines:
-                continue
-                
-            transition_matrix = np.array(tm_lines)
-
-            # Parse lifetimes
-            lifetime = defaultdict(list)
-            lt_start = None
-            
-            for i, line in enumerate(lines):
-                if "lifetime for each mol type:" in line:
-                    lt_start = i + 2
-                    break
-            
-            if lt_start is not None:
-                cluster_size = None
-                for line in lines[lt_start:]:
-                    if line.startswith("size of the cluster:"):
-                        try:
-                            cluster_size = int(line.split(":")[1])
-                        except (ValueError, IndexError):
-                            continue
-                    elif cluster_size is not None and line.strip():
-                        try:
-                            lifetimes = [float(x) for x in line.strip().split()]
-                            lifetime[cluster_size].extend(lifetimes)
-                        except ValueError:
-                            continue
-
-            time_data.append((time_val, transition_matrix, lifetime))
-            
-        except Exception as e:
-            logger.warning(f"Error parsing time block in {file_path}: {e}")
-            continue
-
     if not time_data:
-        logger.warning(f"No valid time data found in {file_path}")
         return np.array([]), {}
 
     # Sort by time
-    time_data.sort(key=lambda x: x[0])
+    time_data = sorted(time_data, key=lambda x: x[0])
 
     if time_frame:
         start, end = time_frame
@@ -172,13 +119,44 @@ def parse_transition_lifetime_data(file_path: str, time_frame: Optional[Tuple[fl
     return matrix_delta, dict(lifetime_delta)
 
 
-def read_transition_matrix(sim_dir: str, time_frame: Optional[Tuple[float, float]] = None) -> Tuple[Optional[np.ndarray], Optional[Dict[int, List[float]]]]:
+def parse_transition_lifetime_data(file_path: str, time_frame: Optional[Tuple[float, float]] = None) -> Tuple[np.ndarray, Dict[int, List[float]]]:
+    """
+    Parse transition matrix and lifetime data from a file.
+    
+    The file is indexed in one pass and only the blocks needed for the
+    time frame are parsed (see ``TransitionIndex``).
+    
+    Parameters:
+        file_path (str): Path to the transition matrix file
+        time_frame (Optional[Tuple[float, float]]): Time range (start, end) to consider
+        
+    Returns:
+        Tuple[np.ndarray, Dict[int, List[float]]]: 
+            A tuple containing the transition matrix and a dictionary of lifetimes per cluster size
+    """
+    try:
+        index = TransitionIndex.build(file_path)
+    except Exception as e:
+        logger.error(f"Error reading transition matrix file {file_path}: {e}")
+        return np.array([]), {}
+
+    if not index.num_blocks:
+        logger.warning(f"No time blocks found in {file_path}")
+        return np.array([]), {}
+
+    return index.query(time_frame)
+
+
+def read_transition_matrix(sim_dir: str, 
+                           time_frame: Optional[Tuple[float, float]] = None,
+                           use_cache: bool = True) -> Tuple[Optional[np.ndarray], Optional[Dict[int, List[float]]]]:
     """
     Read transition matrix and lifetime data from a simulation directory.
     
     Parameters:
         sim_dir (str): Path to the simulation directory
         time_frame (Optional[Tuple[float, float]]): Time range (start, end) to consider
+        use_cache (bool): Whether to reuse (and write) the block index sidecar under ``.ionerdss_cache``
         
     Returns:
         Tuple[Optional[np.ndarray], Optional[Dict[int, List[float]]]]: 
@@ -191,7 +169,11 @@ def read_transition_matrix(sim_dir: str, time_frame: Optional[Tuple[float, float
         return None, None
     
     try:
-        matrix, lifetime = parse_transition_lifetime_data(file_path, time_frame)
+        index = load_transition_index(sim_dir, use_cache=use_cache)
+        if not index.num_blocks:
+            logger.warning(f"No time blocks found in {file_path}")
+            return np.array([]), {}
+        matrix, lifetime = index.query(time_frame)
         logger.debug(f"Successfully read transition matrix from {file_path}")
         return matrix, lifetime
     except Exception as e:
@@ -278,29 +260,27 @@ def eval_condition(species_dict: Dict[str, float], condition: str) -> Tuple[bool
         return False, species
 
 
-def read_multiple_simulations(sim_dirs: List[str], reader_func: callable, *args, **kwargs) -> List[Any]:
+def read_multiple_simulations(sim_dirs: List[str], reader_func: callable, *args, 
+                              executor: Optional[ParallelExecutor] = None, **kwargs) -> List[Any]:
     """
     Read data from multiple simulations using the provided reader function.
     
     Parameters:
         sim_dirs (List[str]): List of simulation directories
         reader_func (callable): Function to read data from a single simulation
+        executor (Optional[ParallelExecutor]): Executor used to read the directories; 
+            defaults to a process pool. ``reader_func`` must be a module-level function 
+            to run in worker processes, otherwise reading falls back to serial.
         *args, **kwargs: Additional arguments to pass to the reader function
         
     Returns:
         List[Any]: List of data from each simulation, with None for simulations that failed
     """
-    results = []
+    if executor is None:
+        executor = ParallelExecutor()
     
-    for idx, sim_dir in enumerate(sim_dirs):
-        try:
-            result = reader_func(sim_dir, *args, **kwargs)
-            results.append(result)
-        except Exception as e:
-            logger.error(f"Error reading data from simulation {idx} at {sim_dir}: {e}")
-            results.append(None)
-    
-    return results
+    # Failures are logged by the executor and come back as None
+    return [result.value for result in executor.map(reader_func, sim_dirs, *args, **kwargs)]
 
 
 class DataIO:
@@ -309,15 +289,21 @@ class DataIO:
     Features improved caching, error handling, and progress tracking.
     """
     
-    def __init__(self, cache_enabled: bool = True, log_level: str = "INFO"):
+    def __init__(self, 
+                 cache_enabled: bool = True, 
+                 log_level: str = "INFO", 
+                 cache_memory_mb: float = DEFAULT_MAX_BYTES / (1024 * 1024),
+                 cache_dir: Optional[str] = None):
         """
         Initialize DataIO with configuration options.
         
         Parameters:
             cache_enabled (bool): Whether to enable caching
             log_level (str): Logging level
+            cache_memory_mb (float): Memory budget of the cache
+            cache_dir (Optional[str]): Directory to persist cached results in, or None
         """
-        self._cache = {} if cache_enabled else None
+        self._cache = ResultCache(int(cache_memory_mb * 1024 * 1024), cache_dir) if cache_enabled else None
         self._cache_enabled = cache_enabled
         
         # Configure logging level
@@ -326,7 +312,7 @@ class DataIO:
     def clear_cache(self):
         """Clear the cached data."""
         if self._cache_enabled:
-            self._cache = {}
+            self._cache.clear(disk=True)
             logger.info("DataIO cache cleared")
     
     def get_transition_matrix(self, sim_dir: str, time_frame: Optional[Tuple[float, float]] = None) -> Tuple[Optional[np.ndarray], Optional[Dict[int, List[float]]]]:
@@ -341,18 +327,18 @@ class DataIO:
             Tuple[Optional[np.ndarray], Optional[Dict[int, List[float]]]]: 
                 A tuple containing the transition matrix and lifetime data, or (None, None) if file not found
         """
-        time_str = None
-        if time_frame is not None:
-            time_str = f"{time_frame[0]}-{time_frame[1]}"
-        cache_key = (sim_dir, "transition_matrix", time_str)
+        data_file = os.path.join(sim_dir, "DATA", "transition_matrix_time.dat")
+        cache_key = make_cache_key("transition_matrix", [data_file], time_frame=time_frame)
         
-        if self._cache_enabled and cache_key in self._cache:
-            logger.debug(f"Cache hit for transition matrix: {sim_dir}")
-            return self._cache[cache_key]
+        if self._cache_enabled:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"Cache hit for transition matrix: {sim_dir}")
+                return cached
         
         result = read_transition_matrix(sim_dir, time_frame)
         if result[0] is not None and self._cache_enabled:
-            self._cache[cache_key] = result
+            self._cache.put(cache_key, result)
             logger.debug(f"Cached transition matrix for: {sim_dir}")
         
         return result
@@ -380,6 +366,6 @@ class DataIO:
         
         return {
             "cache_enabled": True,
-            "num_entries": len(self._cache),
-            "cache_keys": list(self._cache.keys())
+            **self._cache.stats(),
+            "cache_keys": self._cache.keys()
         }
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""
+Discovery of simulation directories under an analysis root.
+
+A simulation directory is one containing a ``DATA`` folder. Walking a large
+parameter sweep to find them costs one ``listdir`` per directory, so the
+result is persisted as a manifest under ``<save_dir>/.ionerdss_cache``
+together with the modification time of every directory that was walked.
+Adding, removing or renaming an entry changes the modification time of its
+parent, so a later session only has to ``stat`` those directories to know
+whether the manifest still holds, and walks the tree again only if one
+of them changed.
+"""
+
+import os
+import json
+from typing import Dict, List, Optional, Tuple
+
+from .cache import CACHE_DIR_NAME
+
+# Configure logging,
+import logging
+# inherit from the global level (should be setup in main)
+logger = logging.getLogger(__name__)
+
+
+MANIFEST_FILE_NAME = "simulations.json"
+# Bump whenever the manifest format changes
+MANIFEST_VERSION = 1
+# Folders that never contain simulations but change whenever results are written
+SKIPPED_DIR_NAMES = ("DATA", CACHE_DIR_NAME, "figure_plot_data")
+
+
+def get_manifest_path(save_dir: str) -> str:
+    """Location of the simulation manifest of an analysis root."""
+    return os.path.join(save_dir, CACHE_DIR_NAME, MANIFEST_FILE_NAME)
+
+
+def walk_simulation_dirs(save_dir: str) -> Tuple[List[str], Dict[str, int]]:
+    """
+    Walk ``save_dir`` for directories containing ``DATA``.
+
+    Parameters:
+        save_dir (str): Root directory to search
+
+    Returns:
+        Tuple[List[str], Dict[str, int]]: Simulation directories in walk order, and the
+            modification time (ns) of every directory walked, keyed by path relative to ``save_dir``
+    """
+    simulation_dirs = []
+    mtimes = {}
+    for root, dirs, _ in os.walk(save_dir):
+        try:
+            mtimes[os.path.relpath(root, save_dir)] = os.stat(root).st_mtime_ns
+        except OSError:
+            continue
+        if "DATA" in dirs:
+            simulation_dirs.append(root)
+        # Don't recurse into DATA or into cache and output folders
+        dirs[:] = [d for d in dirs if d not in SKIPPED_DIR_NAMES]
+    return simulation_dirs, mtimes
+
+
+def _load_manifest(save_dir: str) -> Optional[List[str]]:
+    """Simulation directories of the manifest, or None if it is missing or out of date."""
+    path = get_manifest_path(save_dir)
+    try:
+        with open(path, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("save_dir") != save_dir:
+        return None
+    for relative_dir, mtime in manifest.get("mtimes", {}).items():
+        try:
+            if os.stat(os.path.join(save_dir, relative_dir)).st_mtime_ns != mtime:
+                return None
+        except OSError:
+            return None
+    return [os.path.normpath(os.path.join(save_dir, d)) for d in manifest.get("simulation_dirs", [])]
+
+
+def _save_manifest(save_dir: str, simulation_dirs: List[str], mtimes: Dict[str, int]):
+    path = get_manifest_path(save_dir)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "save_dir": save_dir,
+        "simulation_dirs": [os.path.relpath(d, save_dir) for d in simulation_dirs],
+        "mtimes": mtimes,
+    }
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.debug(f"Could not write simulation manifest {path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def discover_simulation_dirs(save_dir: str, use_manifest: bool = True) -> List[str]:
+    """
+    Find the simulation directories under ``save_dir``.
+
+    If ``save_dir`` itself contains ``DATA`` it is the only simulation.
+    Otherwise the persisted manifest is used while none of the walked
+    directories has changed, and the tree is walked (and the manifest
+    rewritten) when one has.
+
+    Parameters:
+        save_dir (str): Absolute path of the analysis root
+        use_manifest (bool): Read and write the manifest; False always walks the tree
+
+    Returns:
+        List[str]: Simulation directories, possibly empty
+    """
+    if os.path.isdir(os.path.join(save_dir, "DATA")):
+        return [save_dir]
+
+    if use_manifest:
+        simulation_dirs = _load_manifest(save_dir)
+        if simulation_dirs is not None:
+            logger.debug(f"Using simulation manifest of {save_dir}")
+            return simulation_dirs
+        try:
+            # Created before walking so that it does not change the recorded mtime of save_dir
+            os.makedirs(os.path.dirname(get_manifest_path(save_dir)), exist_ok=True)
+        except OSError:
+            use_manifest = False
+
+    simulation_dirs, mtimes = walk_simulation_dirs(save_dir)
+    if use_manifest:
+        _save_manifest(save_dir, simulation_dirs, mtimes)
+    return simulation_dirs
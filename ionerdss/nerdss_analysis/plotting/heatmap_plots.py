@@ -57,34 +57,22 @@ def plot_heatmap_complex_species_size(
     plot_data_dir = os.path.join(save_dir, "figure_plot_data")
     os.makedirs(plot_data_dir, exist_ok=True)
     
-    all_data = []
-
     # Get the simulation directories to process
     selected_dirs = [simulations_dir[idx] for idx in simulations_index]
     
-    # Read data from each simulation
-    for sim_dir in selected_dirs:
-        single_data = data.get_histogram_data(sim_dir)
-        if not data["Time (s)"]:
-            continue
-        
-        sim_data = []
-        for i, time in enumerate(single_data["Time (s)"]):
-            for count, species_dict in single_data["complexes"][i]:
-                size = sum(species_dict.get(s, 0) for s in legend if s in species_dict)
-                sim_data.extend([(time, size)] * count)
-                
-        all_data.extend(sim_data)
-
-    if not all_data:
+    # Each (time, composition) entry of the count tensor is weighted by its count
+    tensor = data.get_count_tensor(selected_dirs)
+    _, times, composition_ids, counts = tensor.entries()
+    sizes = tensor.sizes(legend)[composition_ids]
+
+    if not len(times):
         print("No valid data found.")
         return
 
-    times, sizes = zip(*all_data)
-    time_edges = np.linspace(min(times), max(times), time_bins + 1)
+    time_edges = np.linspace(times.min(), times.max(), time_bins + 1)
     size_edges = np.histogram_bin_edges(sizes, bins=bins)
 
-    hist2d, _, _ = np.histogram2d(times, sizes, bins=[time_edges, size_edges])
+    hist2d, _, _ = np.histogram2d(times, sizes, bins=[time_edges, size_edges], weights=counts)
     hist2d /= len(simulations_index)
 
     if frequency:
@@ -155,32 +143,20 @@ def plot_heatmap_monomer_counts_vs_complex_size(
     plot_data_dir = os.path.join(save_dir, "figure_plot_data")
     os.makedirs(plot_data_dir, exist_ok=True)
     
-    all_data = []
-
     # Get the simulation directories to process
     selected_dirs = [simulations_dir[idx] for idx in simulations_index]
     
-    # Read data from each simulation
-    for sim_dir in selected_dirs:
-        single_data = data.get_histogram_data(sim_dir)
-        if not data["Time (s)"]:
-            continue
-        
-        sim_data = []
-        for i, time in enumerate(single_data["Time (s)"]):
-            for count, species_dict in single_data["complexes"][i]:
-                size = sum(species_dict.get(s, 0) for s in legend if s in species_dict)
-                # Weight by size (number of monomers)
-                sim_data.append((time, size, count * size))
-                
-        all_data.extend(sim_data)
-
-    if not all_data:
+    tensor = data.get_count_tensor(selected_dirs)
+    _, times, composition_ids, counts = tensor.entries()
+    sizes = tensor.sizes(legend)[composition_ids]
+    # Weight by size (number of monomers)
+    weights = counts * sizes
+
+    if not len(times):
         print("No valid data found.")
         return
 
-    times, sizes, weights = zip(*all_data)
-    time_edges = np.linspace(min(times), max(times), time_bins + 1)
+    time_edges = np.linspace(times.min(), times.max(), time_bins + 1)
     size_edges = np.histogram_bin_edges(sizes, bins=bins)
 
     # Weighted 2D histogram
@@ -258,32 +234,20 @@ def plot_heatmap_species_a_vs_species_b(
         raise ValueError("At least two species must be specified in the legend.")
     
     species_x, species_y = legend[0], legend[1]
-    all_data = []
 
     # Get the simulation directories to process
     selected_dirs = [simulations_dir[idx] for idx in simulations_index]
     
-    # Read data from each simulation
-    for sim_dir in selected_dirs:
-        single_data = data.get_histogram_data(sim_dir)
-        if not data["Time (s)"]:
-            continue
-        
-        sim_data = []
-        for complexes in single_data["complexes"]:
-            for count, species_dict in complexes:
-                x = species_dict.get(species_x, 0)
-                y = species_dict.get(species_y, 0)
-                sim_data.extend([(x, y)] * count)
-                
-        all_data.extend(sim_data)
-
-    if not all_data:
+    tensor = data.get_count_tensor(selected_dirs)
+    _, _, composition_ids, counts = tensor.entries()
+
+    if not len(counts):
         print("No valid data found.")
         return
 
-    x_vals, y_vals = zip(*all_data)
-    heatmap, xedges, yedges = np.histogram2d(x_vals, y_vals, bins=bins)
+    x_vals = tensor.species_counts(species_x)[composition_ids]
+    y_vals = tensor.species_counts(species_y)[composition_ids]
+    heatmap, xedges, yedges = np.histogram2d(x_vals, y_vals, bins=bins, weights=counts)
     heatmap /= len(simulations_index)
 
     print(f"X edges: {xedges}")
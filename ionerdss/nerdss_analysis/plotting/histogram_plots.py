@@ -56,29 +56,24 @@ def plot_hist_complex_species_size(
     # Get the simulation directories to process
     selected_dirs = [simulations_dir[idx] for idx in simulations_index]
     
-    # Read data for each simulation
-    all_sizes_per_sim = data.get_complex_sizes(selected_dirs)
-    all_sizes_combined = []
-    for sim_sizes in all_sizes_per_sim:
-        all_sizes_combined.extend(sim_sizes)
+    # Read data for each simulation: complexes of each composition summed over time
+    tensor = data.get_count_tensor(selected_dirs)
+    totals = tensor.totals(time_frame)
+    sizes = tensor.sizes(legend)
 
-    if not all_sizes_per_sim:
+    if not totals.any():
         print("No valid simulation data found.")
         return
     
     # Determine global bin edges
-    global_hist, bin_edges = np.histogram(all_sizes_combined, bins=bins)
+    bin_edges = np.histogram_bin_edges(sizes[totals.sum(axis=0) > 0], bins=bins)
     bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2
     bin_width = bin_edges[1] - bin_edges[0]
     
     # Compute histograms for each simulation using the same bin edges
-    hist_values_all = []
-
-    for sizes in all_sizes_per_sim:
-        hist_values, _ = np.histogram(sizes, bins=bin_edges)
-        hist_values_all.append(hist_values)
-
-    hist_values_all = np.array(hist_values_all)
+    hist_values_all = np.array([
+        np.histogram(sizes, bins=bin_edges, weights=sim_totals)[0] for sim_totals in totals
+    ])
 
     # Compute mean and standard deviation
     mean_values = np.mean(hist_values_all, axis=0)
@@ -158,29 +153,25 @@ def plot_hist_monomer_counts_vs_complex_size(
     # Get the simulation directories to process
     selected_dirs = [simulations_dir[idx] for idx in simulations_index]
 
-    # Step 1: Read data for each simulation
-    all_sizes_per_sim = data.get_complex_sizes(selected_dirs)
-    all_sizes_combined = []
-    for sim_sizes in all_sizes_per_sim:
-        all_sizes_combined.extend(sim_sizes)
+    # Step 1: Read data for each simulation: complexes of each composition summed over time
+    tensor = data.get_count_tensor(selected_dirs)
+    totals = tensor.totals(time_frame)
+    sizes = tensor.sizes(legend)
 
-    if not all_sizes_per_sim:
+    if not totals.any():
         print("No valid simulation data found.")
         return
     
     # Step 2: Determine global bin edges
-    _, bin_edges = np.histogram(all_sizes_combined, bins=bins)  # Compute fixed bin edges
+    bin_edges = np.histogram_bin_edges(sizes[totals.sum(axis=0) > 0], bins=bins)  # Compute fixed bin edges
     bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2
     bin_width = bin_edges[1] - bin_edges[0]
 
     # Step 3: Compute histograms for monomer counts using the same bin edges
-    monomer_values_all = []
-
-    for sizes in all_sizes_per_sim:
-        monomer_values, _ = np.histogram(sizes, bins=bin_edges, weights=sizes)  # Weight = complex size
-        monomer_values_all.append(monomer_values)
-
-    monomer_values_all = np.array(monomer_values_all)
+    monomer_values_all = np.array([
+        np.histogram(sizes, bins=bin_edges, weights=sim_totals * sizes)[0]  # Weight = complex size
+        for sim_totals in totals
+    ])
 
     # Step 4: Compute mean and standard deviation
     mean_values = np.mean(monomer_values_all, axis=0)
@@ -385,32 +376,20 @@ def plot_hist_complex_species_size_3d(
     plot_data_dir = os.path.join(save_dir, "figure_plot_data")
     os.makedirs(plot_data_dir, exist_ok=True)
 
-    all_data = []
-
     # Get the simulation directories to process
     selected_dirs = [simulations_dir[idx] for idx in simulations_index]
     
-    # First pass to collect all sizes and times
-    for sim_dir in selected_dirs:
-        single_data = data.get_histogram_data(sim_dir)
-        if not single_data["Time (s)"]:
-            continue
-        
-        sim_data = []
-        for i, time in enumerate(single_data["Time (s)"]):
-            for count, species_dict in single_data["complexes"][i]:
-                size = sum(species_dict.get(s, 0) for s in legend if s in species_dict)
-                sim_data.extend([(time, size)] * count)
-                
-        all_data.extend(sim_data)
+    # Each (time, composition) entry of the count tensor is weighted by its count
+    tensor = data.get_count_tensor(selected_dirs)
+    _, times, composition_ids, counts = tensor.entries()
+    sizes = tensor.sizes(legend)[composition_ids]
 
-    if not all_data:
+    if not len(times):
         print("No valid data found.")
         return
 
     # Organize into time bins
-    times, sizes = zip(*all_data)
-    time_edges = np.linspace(min(times), max(times), time_bins + 1)
+    time_edges = np.linspace(times.min(), times.max(), time_bins + 1)
     size_edges = np.histogram_bin_edges(sizes, bins=bins)
     size_centers = (size_edges[:-1] + size_edges[1:]) / 2
     time_centers = (time_edges[:-1] + time_edges[1:]) / 2
@@ -421,12 +400,7 @@ def plot_hist_complex_species_size_3d(
     print(f"Size centers: {size_centers}")
 
     # Prepare 2D histogram: rows=time bins, cols=size bins
-    hist2d = np.zeros((time_bins, bins))
-    for t, s in all_data:
-        t_idx = min(np.searchsorted(time_edges, t, side='right') - 1, time_bins - 1)
-        s_idx = min(np.searchsorted(size_edges, s, side='right') - 1, bins - 1)
-        if 0 <= t_idx < time_bins and 0 <= s_idx < bins:
-            hist2d[t_idx, s_idx] += 1
+    hist2d, _, _ = np.histogram2d(times, sizes, bins=[time_edges, size_edges], weights=counts)
 
     hist2d /= len(simulations_index)
 
@@ -500,32 +474,22 @@ def plot_hist_monomer_counts_vs_complex_size_3d(
     plot_data_dir = os.path.join(save_dir, "figure_plot_data")
     os.makedirs(plot_data_dir, exist_ok=True)
     
-    all_data = []
-
     # Get the simulation directories to process
     selected_dirs = [simulations_dir[idx] for idx in simulations_index]
     
-    # Read data from each simulation
-    for sim_dir in selected_dirs:
-        single_data = data.get_histogram_data(sim_dir)
-        if not data["Time (s)"]:
-            continue
-        
-        sim_data = []
-        for i, time in enumerate(single_data["Time (s)"]):
-            for count, species_dict in single_data["complexes"][i]:
-                size = sum(species_dict.get(s, 0) for s in legend if s in species_dict)
-                # Weight by size (number of monomers)
-                sim_data.append((time, size, count * size))
-                
-        all_data.extend(sim_data)
-
-    if not all_data:
+    # Each (time, composition) entry of the count tensor is weighted by its count
+    tensor = data.get_count_tensor(selected_dirs)
+    _, times, composition_ids, counts = tensor.entries()
+    sizes = tensor.sizes(legend)[composition_ids]
+    # Weight by size (number of monomers)
+    weights = counts * sizes
+
+    if not len(times):
         print("No valid data found.")
         return
 
-    times, sizes, weights = zip(*all_data)
-    time_edges = np.linspace(min(times), max(times), time_bins + 1)
+    # Organize into time bins
+    time_edges = np.linspace(times.min(), times.max(), time_bins + 1)
     size_edges = np.histogram_bin_edges(sizes, bins=bins)
     size_centers = (size_edges[:-1] + size_edges[1:]) / 2
     time_centers = (time_edges[:-1] + time_edges[1:]) / 2
@@ -535,12 +499,7 @@ def plot_hist_monomer_counts_vs_complex_size_3d(
     print(f"Size edges: {size_edges}")
     print(f"Size centers: {size_centers}")
 
-    hist2d = np.zeros((time_bins, bins))
-    for t, s, w in all_data:
-        t_idx = min(np.searchsorted(time_edges, t, side='right') - 1, time_bins - 1)
-        s_idx = min(np.searchsorted(size_edges, s, side='right') - 1, bins - 1)
-        if 0 <= t_idx < time_bins and 0 <= s_idx < bins:
-            hist2d[t_idx, s_idx] += w
+    hist2d, _, _ = np.histogram2d(times, sizes, bins=[time_edges, size_edges], weights=weights)
 
     hist2d /= len(simulations_index)
 
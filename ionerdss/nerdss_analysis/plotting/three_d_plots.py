@@ -49,32 +49,20 @@ def plot_hist_complex_species_size_3d(
     plot_data_dir = os.path.join(save_dir, "figure_plot_data")
     os.makedirs(plot_data_dir, exist_ok=True)
 
-    all_data = []
-
     # Get the simulation directories to process
     selected_dirs = [simulations_dir[idx] for idx in simulations_index]
     
-    # First pass to collect all sizes and times
-    for sim_dir in selected_dirs:
-        single_data = data.get_histogram_data(sim_dir)
-        if not data["Time (s)"]:
-            continue
-        
-        sim_data = []
-        for i, time in enumerate(single_data["Time (s)"]):
-            for count, species_dict in single_data["complexes"][i]:
-                size = sum(species_dict.get(s, 0) for s in legend if s in species_dict)
-                sim_data.extend([(time, size)] * count)
-                
-        all_data.extend(sim_data)
-
-    if not all_data:
+    # Each (time, composition) entry of the count tensor is weighted by its count
+    tensor = data.get_count_tensor(selected_dirs)
+    _, times, composition_ids, counts = tensor.entries()
+    sizes = tensor.sizes(legend)[composition_ids]
+
+    if not len(times):
         print("No valid data found.")
         return
 
     # Organize into time bins
-    times, sizes = zip(*all_data)
-    time_edges = np.linspace(min(times), max(times), time_bins + 1)
+    time_edges = np.linspace(times.min(), times.max(), time_bins + 1)
     size_edges = np.histogram_bin_edges(sizes, bins=bins)
     size_centers = (size_edges[:-1] + size_edges[1:]) / 2
     time_centers = (time_edges[:-1] + time_edges[1:]) / 2
@@ -85,12 +73,7 @@ def plot_hist_complex_species_size_3d(
     print(f"Size centers: {size_centers}")
 
     # Prepare 2D histogram: rows=time bins, cols=size bins
-    hist2d = np.zeros((time_bins, bins))
-    for t, s in all_data:
-        t_idx = min(np.searchsorted(time_edges, t, side='right') - 1, time_bins - 1)
-        s_idx = min(np.searchsorted(size_edges, s, side='right') - 1, bins - 1)
-        if 0 <= t_idx < time_bins and 0 <= s_idx < bins:
-            hist2d[t_idx, s_idx] += 1
+    hist2d, _, _ = np.histogram2d(times, sizes, bins=[time_edges, size_edges], weights=counts)
 
     hist2d /= len(simulations_index)
 
@@ -164,32 +147,22 @@ def plot_hist_monomer_counts_vs_complex_size_3d(
     plot_data_dir = os.path.join(save_dir, "figure_plot_data")
     os.makedirs(plot_data_dir, exist_ok=True)
     
-    all_data = []
-
     # Get the simulation directories to process
     selected_dirs = [simulations_dir[idx] for idx in simulations_index]
     
-    # Read data from each simulation
-    for sim_dir in selected_dirs:
-        single_data = data.get_histogram_data(sim_dir)
-        if not single_data["Time (s)"]:
-            continue
-        
-        sim_data = []
-        for i, time in enumerate(single_data["Time (s)"]):
-            for count, species_dict in single_data["complexes"][i]:
-                size = sum(species_dict.get(s, 0) for s in legend if s in species_dict)
-                # Weight by size (number of monomers)
-                sim_data.append((time, size, count * size))
-                
-        all_data.extend(sim_data)
-
-    if not all_data:
+    # Each (time, composition) entry of the count tensor is weighted by its count
+    tensor = data.get_count_tensor(selected_dirs)
+    _, times, composition_ids, counts = tensor.entries()
+    sizes = tensor.sizes(legend)[composition_ids]
+    # Weight by size (number of monomers)
+    weights = counts * sizes
+
+    if not len(times):
         print("No valid data found.")
         return
 
-    times, sizes, weights = zip(*all_data)
-    time_edges = np.linspace(min(times), max(times), time_bins + 1)
+    # Organize into time bins
+    time_edges = np.linspace(times.min(), times.max(), time_bins + 1)
     size_edges = np.histogram_bin_edges(sizes, bins=bins)
     size_centers = (size_edges[:-1] + size_edges[1:]) / 2
     time_centers = (time_edges[:-1] + time_edges[1:]) / 2
@@ -199,12 +172,7 @@ def plot_hist_monomer_counts_vs_complex_size_3d(
     print(f"Size edges: {size_edges}")
     print(f"Size centers: {size_centers}")
 
-    hist2d = np.zeros((time_bins, bins))
-    for t, s, w in all_data:
-        t_idx = min(np.searchsorted(time_edges, t, side='right') - 1, time_bins - 1)
-        s_idx = min(np.searchsorted(size_edges, s, side='right') - 1, bins - 1)
-        if 0 <= t_idx < time_bins and 0 <= s_idx < bins:
-            hist2d[t_idx, s_idx] += w
+    hist2d, _, _ = np.histogram2d(times, sizes, bins=[time_edges, size_edges], weights=weights)
 
     hist2d /= len(simulations_index)
 
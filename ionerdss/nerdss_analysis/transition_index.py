@@ -0,0 +1,324 @@
+"""
+Indexed access to transition_matrix_time.dat.
+
+The file is a sequence of time blocks, each holding the cumulative
+transition matrix and the cumulative cluster lifetimes at that time. A
+single regex pass over the memory-mapped file records the byte offset and
+time of every block; queries then parse only the blocks they need, which
+for a time window are its two boundary blocks. The index can be persisted
+as a sidecar next to ``DATA/`` so repeated reads skip the scan as well.
+"""
+
+import os
+import re
+import mmap
+import numpy as np
+from typing import List, Dict, Tuple, Optional
+
+from .cache import CACHE_DIR_NAME
+
+# Configure logging,
+import logging
+# inherit from the global level (should be setup in main)
+logger = logging.getLogger(__name__)
+
+
+TRANSITION_FILE_NAME = "transition_matrix_time.dat"
+# Bump whenever the index layout or the block parsing rules change
+TRANSITION_INDEX_VERSION = 1
+
+_BLOCK_PATTERN = re.compile(rb"^time:[ \t]*(\S*)", re.MULTILINE)
+_MATRIX_HEADER = "transion matrix for each mol type:"
+_LIFETIME_HEADER = "lifetime for each mol type:"
+_CLUSTER_HEADER = "size of the cluster:"
+
+
+class TransitionSnapshot:
+    """
+    Cumulative transition matrix and lifetimes of one time block.
+
+    Lifetimes are stored flat: the lifetimes of clusters of size ``k`` are
+    ``lifetime_values[lifetime_offsets[k]:lifetime_offsets[k + 1]]``.
+
+    Attributes:
+        time (float): Time of the block (s)
+        matrix (np.ndarray): Cumulative transition matrix
+        lifetime_values (np.ndarray): All lifetimes, grouped by cluster size
+        lifetime_offsets (np.ndarray): Start of each cluster size in ``lifetime_values``, length max_size + 2
+    """
+
+    def __init__(self, time: float, matrix: np.ndarray, lifetime_values: np.ndarray, lifetime_offsets: np.ndarray):
+        self.time = time
+        self.matrix = matrix
+        self.lifetime_values = lifetime_values
+        self.lifetime_offsets = lifetime_offsets
+
+    @property
+    def lifetime_counts(self) -> np.ndarray:
+        """Number of lifetimes of each cluster size, indexed by size."""
+        return np.diff(self.lifetime_offsets)
+
+    @property
+    def sizes(self) -> np.ndarray:
+        """Cluster sizes with at least one lifetime."""
+        return np.flatnonzero(self.lifetime_counts)
+
+    def lifetimes(self, size: int) -> np.ndarray:
+        """Lifetimes of clusters of ``size``."""
+        if size + 1 >= len(self.lifetime_offsets):
+            return self.lifetime_values[:0]
+        return self.lifetime_values[self.lifetime_offsets[size]:self.lifetime_offsets[size + 1]]
+
+    def lifetime_dict(self, since: Optional["TransitionSnapshot"] = None) -> Dict[int, List[float]]:
+        """
+        Lifetimes per cluster size as lists.
+
+        Parameters:
+            since (Optional[TransitionSnapshot]): Earlier block; only lifetimes recorded after it are returned
+
+        Returns:
+            Dict[int, List[float]]: Cluster size -> lifetimes
+        """
+        result = {}
+        for size in self.sizes.tolist():
+            values = self.lifetimes(size)
+            if since is not None:
+                values = values[len(since.lifetimes(size)):]
+            result[size] = values.tolist()
+        return result
+
+
+def parse_transition_snapshot(text: str) -> Optional[TransitionSnapshot]:
+    """
+    Parse one time block in a single pass over its lines.
+
+    Parameters:
+        text (str): Text of the block following the "time:" marker
+
+    Returns:
+        Optional[TransitionSnapshot]: The parsed block, or None if it has no matrix
+    """
+    lines = text.strip().splitlines()
+    if not lines:
+        return None
+    time_val = float(lines[0])
+
+    rows = []
+    lifetimes = {}
+    section = None
+    skip_mol_line = False
+    cluster_size = None
+
+    for line in lines[1:]:
+        if skip_mol_line:
+            # The line after a section header names the molecule type
+            skip_mol_line = False
+            continue
+        if section is None and _MATRIX_HEADER in line:
+            section, skip_mol_line = "matrix", True
+            continue
+        if section == "matrix":
+            if line.startswith(_LIFETIME_HEADER):
+                section, skip_mol_line = "lifetime", True
+                continue
+            if line.strip() and not line.startswith(('A', 'B', 'C')):
+                try:
+                    row = [int(x) for x in line.split()]
+                except ValueError:
+                    continue
+                if row:
+                    rows.append(row)
+        elif section == "lifetime":
+            if line.startswith(_CLUSTER_HEADER):
+                try:
+                    cluster_size = int(line.split(":")[1])
+                except (ValueError, IndexError):
+                    continue
+            elif cluster_size is not None and line.strip():
+                try:
+                    values = np.array(line.split(), dtype=np.float64)
+                except ValueError:
+                    continue
+                lifetimes.setdefault(cluster_size, []).append(values)
+
+    if not rows:
+        return None
+
+    max_size = max(lifetimes) if lifetimes else -1
+    counts = np.zeros(max_size + 1, dtype=np.int64)
+    for size, chunks in lifetimes.items():
+        counts[size] = sum(len(chunk) for chunk in chunks)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    values = np.concatenate(
+        [np.concatenate(lifetimes[size]) for size in sorted(lifetimes)]
+    ) if lifetimes else np.zeros(0)
+
+    return TransitionSnapshot(time_val, np.array(rows), values, offsets)
+
+
+class TransitionIndex:
+    """
+    Byte-offset index of the time blocks of one transition_matrix_time.dat.
+
+    Attributes:
+        data_file (str): Path to the indexed file
+        times (np.ndarray): Time of each block (NaN if unreadable), in file order
+        offsets (np.ndarray): Byte offset of each block, plus the file size as last entry
+        source_size (int): Size of the file when indexed
+        source_mtime_ns (int): Modification time of the file when indexed
+    """
+
+    def __init__(self, data_file: str, times: np.ndarray, offsets: np.ndarray,
+                 source_size: int = 0, source_mtime_ns: int = 0):
+        self.data_file = data_file
+        self.times = times
+        self.offsets = offsets
+        self.source_size = source_size
+        self.source_mtime_ns = source_mtime_ns
+        valid = np.flatnonzero(~np.isnan(times))
+        # Block indices in time order; ties keep file order
+        self._order = valid[np.argsort(times[valid], kind="stable")]
+
+    @property
+    def num_blocks(self) -> int:
+        return len(self.times)
+
+    @classmethod
+    def build(cls, data_file: str) -> "TransitionIndex":
+        """Scan ``data_file`` once and record the offset and time of every block."""
+        stat = os.stat(data_file)
+        starts, times = [], []
+        if stat.st_size:
+            with open(data_file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                for match in _BLOCK_PATTERN.finditer(content):
+                    starts.append(match.start())
+                    try:
+                        times.append(float(match.group(1)))
+                    except ValueError:
+                        times.append(np.nan)
+        return cls(
+            data_file,
+            np.array(times, dtype=np.float64),
+            np.array(starts + [stat.st_size], dtype=np.int64),
+            stat.st_size,
+            stat.st_mtime_ns
+        )
+
+    def read_block(self, i: int) -> Optional[TransitionSnapshot]:
+        """Parse block ``i`` (in file order); None if it cannot be parsed."""
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        with open(self.data_file, "rb") as f:
+            f.seek(start)
+            raw = f.read(end - start)
+        try:
+            return parse_transition_snapshot(raw.decode("utf-8", errors="replace")[len("time:"):])
+        except Exception as e:
+            logger.warning(f"Error parsing time block in {self.data_file}: {e}")
+            return None
+
+    def _first_valid(self, candidates: np.ndarray) -> Tuple[int, Optional[TransitionSnapshot]]:
+        for position, i in enumerate(candidates):
+            snapshot = self.read_block(int(i))
+            if snapshot is not None:
+                return position, snapshot
+        return -1, None
+
+    def query(self, time_frame: Optional[Tuple[float, float]] = None) -> Tuple[np.ndarray, Dict[int, List[float]]]:
+        """
+        Transition matrix and lifetimes of a time frame.
+
+        The file is cumulative, so only the first and last block inside the
+        time frame are parsed and their difference is returned. Without a
+        time frame the last block is returned.
+
+        Parameters:
+            time_frame (Optional[Tuple[float, float]]): Time range (start, end) to consider
+
+        Returns:
+            Tuple[np.ndarray, Dict[int, List[float]]]:
+                A tuple containing the transition matrix and a dictionary of lifetimes per cluster size
+        """
+        if time_frame is None:
+            _, last = self._first_valid(self._order[::-1])
+            if last is None:
+                logger.warning(f"No valid time data found in {self.data_file}")
+                return np.array([]), {}
+            return last.matrix, last.lifetime_dict()
+
+        start, end = time_frame
+        times = self.times[self._order]
+        window = self._order[np.searchsorted(times, start, side="left"):np.searchsorted(times, end, side="right")]
+
+        first_position, first = self._first_valid(window)
+        if first is None:
+            return np.array([]), {}
+        last_position, last = self._first_valid(window[first_position + 1:][::-1])
+        if last is None:
+            return np.array([]), {}
+
+        return last.matrix - first.matrix, last.lifetime_dict(since=first)
+
+    def save(self, index_file: str):
+        """Write the index to ``index_file`` (.npz)."""
+        os.makedirs(os.path.dirname(index_file), exist_ok=True)
+        tmp_file = f"{index_file}.{os.getpid()}.tmp.npz"
+        np.savez(
+            tmp_file,
+            times=self.times,
+            offsets=self.offsets,
+            meta=np.array([TRANSITION_INDEX_VERSION, self.source_size, self.source_mtime_ns], dtype=np.int64)
+        )
+        os.replace(tmp_file, index_file)
+
+    @classmethod
+    def load(cls, data_file: str, index_file: str) -> Optional["TransitionIndex"]:
+        """Load an index written by ``save``; None if it is outdated or unreadable."""
+        try:
+            stat = os.stat(data_file)
+            with np.load(index_file) as saved:
+                version, size, mtime_ns = saved["meta"].tolist()
+                if (version, size, mtime_ns) != (TRANSITION_INDEX_VERSION, stat.st_size, stat.st_mtime_ns):
+                    return None
+                return cls(data_file, saved["times"], saved["offsets"], size, mtime_ns)
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+def get_index_file(sim_dir: str) -> str:
+    """Location of the transition index sidecar of a simulation directory."""
+    return os.path.join(sim_dir, CACHE_DIR_NAME, "transition_matrix_time.index.npz")
+
+
+def load_transition_index(sim_dir: str, use_cache: bool = True) -> Optional[TransitionIndex]:
+    """
+    Index DATA/transition_matrix_time.dat of a simulation directory.
+
+    With ``use_cache`` a sidecar matching the size and mtime of the file is
+    reused, and a fresh index is written for the next call. Failing to write
+    the sidecar (e.g. read-only data) is not an error.
+
+    Parameters:
+        sim_dir (str): Path to the simulation directory
+        use_cache (bool): Whether to read and write the on-disk sidecar
+
+    Returns:
+        Optional[TransitionIndex]: The index, or None if the file does not exist
+    """
+    data_file = os.path.join(sim_dir, "DATA", TRANSITION_FILE_NAME)
+    if not os.path.exists(data_file):
+        logger.warning(f"Transition matrix file not found: {data_file}")
+        return None
+
+    index_file = get_index_file(sim_dir)
+    if use_cache and os.path.exists(index_file):
+        index = TransitionIndex.load(data_file, index_file)
+        if index is not None:
+            return index
+
+    index = TransitionIndex.build(data_file)
+    if use_cache:
+        try:
+            index.save(index_file)
+        except OSError as e:
+            logger.debug(f"Could not write transition index {index_file}: {e}")
+    return index
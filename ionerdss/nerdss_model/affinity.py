@@ -0,0 +1,172 @@
+"""Affinity-driven rates for the reaction templates of a PDBModel.
+
+The default rates of a ``PDBModel`` come from summing a residue-pair contact
+energy table over each interface. ProAffinity
+(``proaffinity-gnn/ProAffinity_GNN_inference.py``) instead predicts the
+binding free energy of a chain pair from its structure with a GNN over ESM
+embeddings. ``predict_interface_affinities`` feeds chain pairs to a
+``ProAffinityScorer``: contact graphs are built on a thread pool, all
+interfaces go through the scorer in one batched call, and predictions are
+memoized by an interface signature (a hash of the residues and atom
+coordinates of both partners and of the scorer's models), in memory and in
+a JSON file, so rebuilding a model from the same structure predicts nothing
+again.
+"""
+
+import os
+import json
+import hashlib
+import importlib.util
+import concurrent.futures
+
+import numpy as np
+from Bio.SeqUtils import seq1
+
+R = 8.314e-3  # kJ/(mol K)
+PROAFFINITY_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                  "proaffinity-gnn", "ProAffinity_GNN_inference.py")
+
+# Predicted log10 affinity constants by interface signature, shared by all models of a session
+_predictions = {}
+
+
+def load_proaffinity_scorer(script_path: str = None, **scorer_kwargs):
+    """Loads the ProAffinity inference script and creates its scorer.
+
+    Args:
+        script_path (str, optional): Path to ProAffinity_GNN_inference.py. Defaults to the copy
+            next to the package.
+        **scorer_kwargs: Passed to ``ProAffinityScorer``, e.g. ``model_dir`` and ``cache_dir``.
+
+    Returns:
+        ProAffinityScorer: The scorer, with its models loaded.
+    """
+    script_path = script_path or PROAFFINITY_SCRIPT
+    spec = importlib.util.spec_from_file_location("ProAffinity_GNN_inference", script_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ProAffinityScorer(**scorer_kwargs)
+
+
+def _pdbqt_type(atom_name: str) -> str:
+    """Atom type of the ProAffinity edge features, as ``infer_atom_type`` of the script."""
+    atom_name = atom_name.strip().upper()
+    for prefix, atom_type in (("C", "C"), ("O", "OA"), ("N", "N"), ("S", "SA"), ("H", "HD")):
+        if atom_name.startswith(prefix):
+            return atom_type
+    return "A"
+
+
+def chain_residue_list(chain) -> list:
+    """Converts a Biopython chain to the residue list format of the ProAffinity script.
+
+    Only standard residues (ATOM records) with a CA atom are kept, as when the
+    script parses a PDB file.
+
+    Args:
+        chain (Bio.PDB.Chain.Chain): The chain.
+
+    Returns:
+        list: One dict per residue with its one-letter 'type', 'number', 'chain' and 'atoms'.
+    """
+    residues = []
+    for residue in chain.get_residues():
+        if residue.id[0] != " " or "CA" not in residue:
+            continue
+        atoms = []
+        for atom in residue.get_atoms():
+            x, y, z = (float(c) for c in atom.get_coord())
+            atoms.append({"pdbqt_type": _pdbqt_type(atom.get_name()), "type": atom.get_name(), "x": x, "y": y, "z": z})
+        residues.append({"type": seq1(residue.get_resname()), "number": len(residues), "atoms": atoms,
+                         "chain": chain.id})
+    return residues
+
+
+def _chain_digest(residue_list: list) -> str:
+    digest = hashlib.sha1()
+    for residue in residue_list:
+        digest.update(residue["type"].encode())
+        digest.update(",".join(atom["type"] for atom in residue["atoms"]).encode())
+        # PDB files keep three decimals
+        coords = np.round([[float(atom[c]) for c in "xyz"] for atom in residue["atoms"]], 3)
+        digest.update(coords.tobytes())
+    return digest.hexdigest()
+
+
+def interface_signature(residuelistA: list, residuelistB: list, model_id: str = "") -> str:
+    """Key of an interface prediction.
+
+    Args:
+        residuelistA (list): Residue lists of the chains of the first partner.
+        residuelistB (list): Residue lists of the chains of the second partner.
+        model_id (str, optional): Identifies the predicting models. Defaults to "".
+
+    Returns:
+        str: SHA-1 of the models and of the residues and atom coordinates of both partners, in order.
+    """
+    parts = [model_id, "|".join(_chain_digest(r) for r in residuelistA), "|".join(_chain_digest(r) for r in residuelistB)]
+    return hashlib.sha1("/".join(parts).encode()).hexdigest()
+
+
+def _load_predictions(cache_file: str) -> dict:
+    if cache_file is None or not os.path.exists(cache_file):
+        return {}
+    try:
+        with open(cache_file, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable affinity cache {cache_file}: {e}")
+        return {}
+
+
+def _save_predictions(cache_file: str, predictions: dict):
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, "w") as f:
+            json.dump(predictions, f, indent=1, sort_keys=True)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"Could not write affinity cache {cache_file}: {e}")
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def predict_interface_affinities(scorer, interfaces: list, temperature: float = 298.15, workers: int = -1,
+                                 cache_file: str = None) -> np.ndarray:
+    """Predicts the binding free energy of interfaces, computing each distinct one only once.
+
+    Args:
+        scorer (ProAffinityScorer): Scorer providing ``build_graphs`` and a batched ``predict``.
+        interfaces (list): (residuelistA, residuelistB) pairs, each a list of per-chain residue lists.
+        temperature (float, optional): Temperature in Kelvin. Defaults to 298.15.
+        workers (int, optional): Threads building the contact graphs; -1 uses all CPUs. Defaults to -1.
+        cache_file (str, optional): JSON file persisting predictions between sessions. Defaults to None.
+
+    Returns:
+        np.ndarray: Predicted dG (kJ/mol) of each interface.
+    """
+    model_id = f"{getattr(scorer, 'esm_model', '')}:{getattr(scorer, 'weights_path', '')}"
+    signatures = [interface_signature(a, b, model_id) for a, b in interfaces]
+    stored = _load_predictions(cache_file)
+    for signature in signatures:
+        if signature not in _predictions and signature in stored:
+            _predictions[signature] = stored[signature]
+
+    # First interface of each signature without a prediction
+    todo = {}
+    for signature, interface in zip(signatures, interfaces):
+        if signature not in _predictions:
+            todo.setdefault(signature, interface)
+
+    if todo:
+        max_workers = os.cpu_count() if workers is None or workers < 1 else workers
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+            graphs = list(pool.map(lambda interface: scorer.build_graphs(*interface), todo.values()))
+        for signature, log10_K in zip(todo, np.asarray(scorer.predict(graphs), dtype=float).reshape(-1)):
+            _predictions[signature] = float(log10_K)
+        if cache_file is not None:
+            stored.update({signature: _predictions[signature] for signature in todo})
+            _save_predictions(cache_file, stored)
+
+    log10_K = np.array([_predictions[signature] for signature in signatures], dtype=float)
+    return -R * temperature * np.log(10.0) * log10_K
@@ -0,0 +1,248 @@
+"""Structure-of-arrays atom table for coarse graining PDB structures.
+
+Walking Biopython ``Chain``/``Residue``/``Atom`` objects is slow, and
+``coarse_grain`` used to do it once per chain for the centers of mass, once
+more for the bounding boxes and again for every chain pair. ``AtomTable``
+walks the structure once and keeps the amino-acid atoms as flat NumPy
+arrays, so per-chain quantities become grouped reductions and interface
+detection becomes a single neighbor search over all atoms.
+"""
+
+import numpy as np
+from Bio.PDB.Polypeptide import is_aa
+from scipy.spatial import cKDTree
+
+
+class AtomTable:
+    """Flat arrays describing the amino-acid atoms of a list of chains.
+
+    Atoms are stored chain by chain, residue by residue, in structure order.
+
+    Attributes:
+        chain_ids (list): ID of each chain.
+        coords (np.ndarray): (N, 3) atom coordinates in Angstrom.
+        atom_chain (np.ndarray): (N,) chain index of each atom.
+        atom_residue (np.ndarray): (N,) residue index of each atom.
+        residue_chain (np.ndarray): (M,) chain index of each residue.
+        residue_number (np.ndarray): (M,) sequence number of each residue (``residue.id[1]``).
+        residue_name (np.ndarray): (M,) upper-case three-letter name of each residue.
+        residue_ca (np.ndarray): (M, 3) CA coordinates of each residue, NaN if it has no CA.
+        residue_has_ca (np.ndarray): (M,) whether each residue has a CA atom.
+        residue_type_names (np.ndarray): Sorted distinct residue names.
+        residue_type (np.ndarray): (M,) index of each residue's name in ``residue_type_names``.
+        residue_canonical (np.ndarray): (M,) first residue of the same chain with the same
+            sequence number; residues differing only by insertion code map to one entry.
+    """
+
+    def __init__(self, chain_ids, coords, atom_chain, atom_residue, residue_chain,
+                 residue_number, residue_name, residue_ca):
+        self.chain_ids = list(chain_ids)
+        self.coords = coords
+        self.atom_chain = atom_chain
+        self.atom_residue = atom_residue
+        self.residue_chain = residue_chain
+        self.residue_number = residue_number
+        self.residue_name = residue_name
+        self.residue_ca = residue_ca
+        self.residue_has_ca = ~np.isnan(residue_ca[:, 0])
+        self.residue_type_names, residue_type = np.unique(residue_name, return_inverse=True)
+        self.residue_type = residue_type.ravel().astype(np.int64)
+
+        keys = residue_chain.astype(np.int64) * (int(residue_number.max(initial=0)) - int(residue_number.min(initial=0)) + 1) \
+            + (residue_number - residue_number.min(initial=0))
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        self.residue_canonical = first[inverse.ravel()]
+
+    @classmethod
+    def from_chains(cls, chains):
+        """Builds the table from Biopython chains, keeping residues accepted by ``is_aa``.
+
+        Args:
+            chains (list): Biopython ``Chain`` objects.
+
+        Returns:
+            AtomTable: The atom table.
+        """
+        coords, atom_chain, atom_residue = [], [], []
+        residue_chain, residue_number, residue_name, residue_ca = [], [], [], []
+        nan_coord = np.full(3, np.nan)
+
+        for chain_index, chain in enumerate(chains):
+            for residue in chain:
+                if not is_aa(residue):
+                    continue
+                residue_index = len(residue_number)
+                residue_chain.append(chain_index)
+                residue_number.append(residue.id[1])
+                residue_name.append(residue.get_resname().upper())
+                residue_ca.append(residue['CA'].coord if 'CA' in residue else nan_coord)
+                num_atoms = 0
+                for atom in residue:
+                    coords.append(atom.coord)
+                    num_atoms += 1
+                atom_chain.extend([chain_index] * num_atoms)
+                atom_residue.extend([residue_index] * num_atoms)
+
+        return cls(
+            [chain.id for chain in chains],
+            np.array(coords, dtype=np.float64).reshape(-1, 3),
+            np.array(atom_chain, dtype=np.int64),
+            np.array(atom_residue, dtype=np.int64),
+            np.array(residue_chain, dtype=np.int64),
+            np.array(residue_number, dtype=np.int64),
+            np.array(residue_name, dtype=str),
+            np.array(residue_ca, dtype=np.float64).reshape(-1, 3),
+        )
+
+    @property
+    def num_chains(self) -> int:
+        return len(self.chain_ids)
+
+    @property
+    def num_atoms(self) -> int:
+        return len(self.coords)
+
+    def chain_atom_counts(self) -> np.ndarray:
+        """Number of atoms of each chain."""
+        return np.bincount(self.atom_chain, minlength=self.num_chains)
+
+    def chain_centers_of_mass(self) -> np.ndarray:
+        """(C, 3) mean atom position of each chain; NaN for chains without atoms."""
+        counts = self.chain_atom_counts()
+        sums = np.stack([np.bincount(self.atom_chain, weights=self.coords[:, d], minlength=self.num_chains)
+                         for d in range(3)], axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return sums / counts[:, None]
+
+    def chain_radii_of_gyration(self, centers=None) -> np.ndarray:
+        """(C,) root-mean-square distance of the atoms of each chain from its center of mass."""
+        if centers is None:
+            centers = self.chain_centers_of_mass()
+        squared = np.sum((self.coords - centers[self.atom_chain]) ** 2, axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(np.bincount(self.atom_chain, weights=squared, minlength=self.num_chains)
+                           / self.chain_atom_counts())
+
+    def chain_bounding_boxes(self):
+        """(C, 3) minimum and maximum atom coordinates of each chain; NaN for chains without atoms."""
+        counts = self.chain_atom_counts()
+        mins = np.full((self.num_chains, 3), np.nan)
+        maxs = np.full((self.num_chains, 3), np.nan)
+        nonempty = counts > 0
+        if nonempty.any():
+            # Atoms are contiguous per chain
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[nonempty]
+            mins[nonempty] = np.minimum.reduceat(self.coords, starts, axis=0)
+            maxs[nonempty] = np.maximum.reduceat(self.coords, starts, axis=0)
+        return mins, maxs
+
+    def interchain_contacts(self, cutoff: float, chunk_size: int = 200000, workers: int = 1):
+        """Finds all pairs of atoms of different chains within ``cutoff`` of each other.
+
+        Only atoms of residues with a CA atom take part. A single KD-tree over
+        all of them is queried with fixed-size neighbor lists, so no Python
+        lists are built per atom, and the queries run in ``workers`` native
+        threads that do not hold the GIL.
+
+        Args:
+            cutoff (float): Contact distance in Angstrom (inclusive).
+            chunk_size (int, optional): Atoms queried at once, bounding memory use. Defaults to 200000.
+            workers (int, optional): Threads used by the KD-tree queries; -1 uses all CPUs. Defaults to 1.
+
+        Returns:
+            tuple: (atoms1, atoms2) arrays of atom indices with ``atom_chain[atoms1] < atom_chain[atoms2]``.
+        """
+        eligible = np.flatnonzero(self.residue_has_ca[self.atom_residue])
+        if len(eligible) < 2:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        points = self.coords[eligible]
+        chains = self.atom_chain[eligible]
+        tree = cKDTree(points)
+        # query() treats distance_upper_bound as exclusive
+        bound = np.nextafter(cutoff, np.inf)
+
+        rows, cols = [], []
+        for start in range(0, len(points), chunk_size):
+            query = np.arange(start, min(start + chunk_size, len(points)))
+            k = 16
+            while len(query):
+                k = min(k, len(points))
+                distances, neighbors = tree.query(points[query], k=k, distance_upper_bound=bound,
+                                                 workers=workers)
+                found = np.isfinite(distances)
+                row, col = np.nonzero(found)
+                row, col = query[row], neighbors[row, col]
+                keep = chains[row] < chains[col]
+                rows.append(row[keep])
+                cols.append(col[keep])
+                # Atoms with k neighbors in range may have more: query them again with larger k
+                if k == len(points):
+                    break
+                query = query[found[:, -1]]
+                if len(query):
+                    # Drop what was already collected for these atoms
+                    redo = np.isin(rows[-1], query)
+                    rows[-1], cols[-1] = rows[-1][~redo], cols[-1][~redo]
+                k *= 2
+
+        atoms1 = eligible[np.concatenate(rows)]
+        atoms2 = eligible[np.concatenate(cols)]
+        return atoms1, atoms2
+
+    def energy_matrix(self, energy_table: dict) -> np.ndarray:
+        """Lookup table of ``energy_table`` over the residue types of this table.
+
+        Args:
+            energy_table (dict): Energy of each (residue name, residue name) pair; missing pairs count 0.
+
+        Returns:
+            np.ndarray: (T, T) energies indexed by ``residue_type``.
+        """
+        names = self.residue_type_names.tolist()
+        return np.array([[energy_table.get((name1, name2), 0.0) for name2 in names] for name1 in names],
+                        dtype=np.float64).reshape(len(names), len(names))
+
+    def chain_pair_interfaces(self, cutoff: float, energy_table: dict = None, workers: int = 1):
+        """Contact residues and contact energy of every pair of chains in contact.
+
+        Residues differing only by insertion code count once (``residue_canonical``).
+        The energy of a chain pair is the sum of ``energy_table`` over its
+        distinct contacting residue pairs. Everything is computed with sorting
+        and grouped reductions over the contact arrays.
+
+        Args:
+            cutoff (float): Contact distance in Angstrom (inclusive).
+            energy_table (dict, optional): Energy of each (residue name, residue name) pair. Defaults to no energies.
+            workers (int, optional): Threads used by the neighbor search; -1 uses all CPUs. Defaults to 1.
+
+        Returns:
+            list: (chain1, chain2, residues1, residues2, energy) for each pair with chain1 < chain2,
+                in order of (chain1, chain2); ``residues1`` and ``residues2`` are sorted
+                canonical residue indices.
+        """
+        atoms1, atoms2 = self.interchain_contacts(cutoff, workers=workers)
+        num_residues = np.int64(len(self.residue_number))
+
+        # Distinct contacting residue pairs; the residue pair determines the chain pair
+        residue_pairs = np.unique(self.residue_canonical[self.atom_residue[atoms1]] * num_residues
+                                  + self.residue_canonical[self.atom_residue[atoms2]])
+        residues1, residues2 = np.divmod(residue_pairs, num_residues)
+        chain_pairs, pair_index = np.unique(
+            self.residue_chain[residues1] * self.num_chains + self.residue_chain[residues2], return_inverse=True)
+        pair_index = pair_index.ravel()
+
+        if energy_table is None:
+            energies = np.zeros(len(chain_pairs))
+        else:
+            pair_energies = self.energy_matrix(energy_table)[self.residue_type[residues1], self.residue_type[residues2]]
+            energies = np.bincount(pair_index, weights=pair_energies, minlength=len(chain_pairs))
+
+        def split_by_pair(residues):
+            # Distinct residues of each chain pair, grouped by pair and sorted within it
+            keys = np.unique(pair_index * num_residues + residues)
+            groups, members = np.divmod(keys, num_residues)
+            return np.split(members, np.searchsorted(groups, np.arange(1, len(chain_pairs))))
+
+        chains1, chains2 = np.divmod(chain_pairs, self.num_chains)
+        return list(zip(chains1.tolist(), chains2.tolist(), split_by_pair(residues1), split_by_pair(residues2),
+                        energies.tolist()))
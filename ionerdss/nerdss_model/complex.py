@@ -5,8 +5,7 @@ This module defines classes and functions to convert a coarse-grained PDB struct
 into an ODE model that captures the assembly process of molecular complexes.
 """
 
-from collections import defaultdict, deque
-import itertools
+from collections import defaultdict
 import numpy as np
 
 class Complex:
@@ -221,45 +220,37 @@ class Complex:
         
         return f"{self.name}, {joined_names}, {topology}, {joined_reactions}"
 
+    def canonical_key(self):
+        """
+        Returns a hashable key identifying the complex up to the equivalence of `__eq__`.
+
+        Molecules are labeled by their template name and each bond by the sorted
+        (template, partner template, reaction template expression) triple. The key
+        is the sorted tuple of molecule labels and, for multi-molecule complexes,
+        the sorted tuple of bond labels, so two complexes are equal exactly when
+        their keys are equal and complexes can be deduplicated with a dict.
+
+        Returns:
+            Tuple[Tuple[str, ...], Tuple[Tuple[str, str, str], ...]]: The key.
+        """
+        molecule_labels = tuple(sorted(molecule.my_template.name for molecule in self.structure_information_map))
+        if len(molecule_labels) == 1:
+            return molecule_labels, ()
+        bond_labels = tuple(sorted(
+            tuple(sorted((molecule.my_template.name, partner.my_template.name, reaction.my_template.expression)))
+            for molecule, interactions in self.structure_information_map.items()
+            for partner, reaction in interactions
+        ))
+        return molecule_labels, bond_labels
+
     def __eq__(self, other):
         if not isinstance(other, Complex):
             return False
-
-        if self.size() != other.size():
-            return False
-        
-        # the key.my_template.name should have a one-on-one mapping between the two complexes
-        # get the keys of self
-        self_keys = self.get_keys()
-        # convert the keys to a list of their template names
-        self_template_names = [key.my_template.name for key in self_keys]
-        # get the keys of other
-        other_keys = other.get_keys()
-        # convert the keys to a list of their template names
-        other_template_names = [key.my_template.name for key in other_keys]
-        # sort the two lists and compare
-        if sorted(self_template_names) != sorted(other_template_names):
-            return False
-        
-        if self.size() == 1:
-            return True
-        
-        # the edges should have a one-on-one mapping between the two complexes
-        self_edges = []
-        for key in self_keys:
-            self_edges += [sorted((key.my_template.name, partner.my_template.name, reaction.my_template.expression)) for partner, reaction in self.get_interactions(key)]
-        self_edges = sorted(self_edges)
-        other_edges = []
-        for key in other_keys:
-            other_edges += [sorted((key.my_template.name, partner.my_template.name, reaction.my_template.expression)) for partner, reaction in other.get_interactions(key)]
-        other_edges = sorted(other_edges)
-        if self_edges != other_edges:
-            return False
-        
-        return True
+        # the templates of the molecules and the labeled bonds should have a one-on-one mapping between the two complexes
+        return self.canonical_key() == other.canonical_key()
     
     def __hash__(self):
-        return hash(self.generate_signature())
+        return hash(self.canonical_key())
     
     
 class ComplexReaction:
@@ -274,8 +265,10 @@ class ComplexReaction:
         products (List[Complex]): List of product complexes.
         reaction_type (str): Type of reaction (e.g., "association", "dissociation", "transformations").
         reaction_string (str): String representation of the reaction.
+        degeneracy (float): Number of symmetric copies of the elementary reaction
+            folded into ``rate``.
     """
-    def __init__(self, reactants=None, products=None, reaction_type=None, rate=1.0, rate_name=None):
+    def __init__(self, reactants=None, products=None, reaction_type=None, rate=1.0, rate_name=None, degeneracy=1):
         """
         Initialize a complex reaction.
         
@@ -283,11 +276,13 @@ class ComplexReaction:
             reactants (List[Complex], optional): List of reactant complexes.
             products (List[Complex], optional): List of product complexes.
             reaction_type (str, optional): Type of reaction.
+            degeneracy (float, optional): Statistical degeneracy already included in ``rate``.
         """
         self.reactants = reactants or []
         self.products = products or []
         self.reaction_type = reaction_type
         self.rate = rate
+        self.degeneracy = degeneracy
         self.expression = ""
         self.rate_name = rate_name
         self._generate_reaction_string()
@@ -396,7 +391,8 @@ class ComplexReactionSystem:
         Returns:
             ComplexReaction: The added reaction.
         """
-        if reaction not in self.reactions:
+        # Every added reaction has a rate, so the rate dict doubles as a set of the reactions
+        if reaction not in self.rates:
             self.reactions.append(reaction)
         self.rates[reaction] = rate
         return reaction
@@ -442,163 +438,31 @@ class ComplexReactionSystem:
     def __repr__(self):
         return f"ComplexReactionSystem with {len(self.complexes)} complexes and {len(self.reactions)} reactions"
     
-def parse_complexes_from_pdb_model(pdb_model, max_complex_size=None):
+def parse_complexes_from_pdb_model(pdb_model, max_complex_size=None, progress_callback=None):
     """
     Parse all connected complexes from a PDB model structure.
     
     This function identifies all possible molecular complexes that can form based on
-    the binding interfaces in the PDB structure.
+    the binding interfaces in the PDB structure. Connected molecule sets are grown
+    along binding edges and isomorphic ones share their edge enumeration; see
+    ``ComplexEnumerator``.
     
     Args:
         pdb_model: The PDBModel object containing molecules and reactions.
         max_complex_size (int, optional): Maximum number of molecules in a complex.
             If None, no limit is applied. Defaults to None.
+        progress_callback (callable, optional): Called periodically with the
+            ``ComplexEnumerator`` to report its progress counts. Defaults to None.
             
     Returns:
-        List[Complex]: List of all possible complexes.
+        List[Complex]: List of all possible complexes, ordered by size and then by
+            the combination of molecules that first forms them and number of bonds.
     """
-    # Helper functions for checking connectivity
-    def build_connectivity_graph(molecules, reaction_list):
-        """Build a graph representing molecule connectivity."""
-        graph = defaultdict(set)
-        for reaction in reaction_list:
-            if not reaction.reactants or len(reaction.reactants) != 2:
-                continue
-                
-            m1, m2 = reaction.reactants[0][0], reaction.reactants[1][0]
-            graph[m1.name].add((m2.name, reaction))
-            graph[m2.name].add((m1.name, reaction))
-        return graph
-    
-    def are_molecules_connected(molecule_subset, connectivity_graph):
-        """Check if the molecules in subset form a connected component."""
-        if not molecule_subset:
-            return False
-            
-        # Convert to name-based set for easier lookup
-        molecule_names = {m.name for m in molecule_subset}
-        if len(molecule_names) == 1:
-            return True  # Single molecule is trivially connected
-            
-        # Do a BFS to check connectivity
-        visited = set()
-        queue = deque([molecule_subset[0].name])
-        
-        while queue:
-            current = queue.popleft()
-            visited.add(current)
-            
-            for neighbor, _ in connectivity_graph[current]:
-                if neighbor not in visited and neighbor in molecule_names:
-                    queue.append(neighbor)
-        
-        return len(visited) == len(molecule_names)
-    
-    def find_valid_binding_edges(molecule_subset, connectivity_graph):
-        """Find all valid binding edges between molecules in the subset."""
-        valid_edges = []
-        checked_pairs = set()
-        
-        for molecule in molecule_subset:
-            for partner, reaction in connectivity_graph[molecule.name]:
-                # Check if this partner is in our subset
-                partner_molecule = next((m for m in molecule_subset if m.name == partner), None)
-                if not partner_molecule:
-                    continue
-                    
-                # Avoid duplicate edges (A-B vs B-A)
-                pair = tuple(sorted([molecule.name, partner]))
-                if pair in checked_pairs:
-                    continue
-                    
-                checked_pairs.add(pair)
-                valid_edges.append((molecule, partner_molecule, reaction))
-                
-        return valid_edges
-    
-    def is_edge_subset_connected(molecule_subset, edge_subset):
-        """Check if the selected edges form a connected subgraph."""
-        if not edge_subset:
-            return False
-            
-        # Build a graph from just these edges
-        graph = defaultdict(set)
-        for m1, m2, _ in edge_subset:
-            graph[m1.name].add(m2.name)
-            graph[m2.name].add(m1.name)
-        
-        # Check connectivity with BFS
-        visited = set()
-        queue = deque([molecule_subset[0].name])
-        molecule_names = {m.name for m in molecule_subset}
-        
-        while queue:
-            current = queue.popleft()
-            visited.add(current)
-            
-            for neighbor in graph[current]:
-                if neighbor not in visited and neighbor in molecule_names:
-                    queue.append(neighbor)
-        
-        return len(visited) == len(molecule_names)
-    
-    # Main algorithm implementation
-    all_molecules = pdb_model.molecule_list
-    connectivity_graph = build_connectivity_graph(all_molecules, pdb_model.reaction_list)
-    
-    complex_list = []
-    
-    # Limit complex size if specified
-    max_size = max_complex_size or len(all_molecules)
-    max_size = min(max_size, len(all_molecules))
-    
-    # Handle single-molecule complexes first
-    for molecule in all_molecules:
-        complex_obj = Complex()
-        complex_obj.add_interaction(molecule, None, None)
-        
-        if complex_obj not in complex_list:
-            complex_list.append(complex_obj)
-    
-    # Handle multi-molecule complexes (sizes 2 to max_size)
-    for size in range(2, max_size + 1):
-        # Generate all size-molecule subsets
-        for molecule_subset in itertools.combinations(all_molecules, size):
-            molecule_subset = list(molecule_subset)
-            
-            # Skip disconnected subsets
-            if not are_molecules_connected(molecule_subset, connectivity_graph):
-                continue
-            
-            # Find all valid binding edges
-            valid_edges = find_valid_binding_edges(molecule_subset, connectivity_graph)
-            
-            # Generate all possible connected edge subsets
-            # Start with the minimum spanning tree size (n-1 edges)
-            min_edges = len(molecule_subset) - 1
-            
-            # Try increasing numbers of edges up to all valid edges
-            for edge_count in range(min_edges, len(valid_edges) + 1):
-                for edge_subset in itertools.combinations(valid_edges, edge_count):
-                    edge_subset = list(edge_subset)
-                    
-                    # Skip edge subsets that don't connect all molecules
-                    if not is_edge_subset_connected(molecule_subset, edge_subset):
-                        continue
-                    
-                    # Create a complex with this configuration
-                    complex_obj = Complex()
-                    
-                    # Add bidirectional interactions for each edge
-                    for m1, m2, reaction in edge_subset:
-                        complex_obj.add_interaction(m1, m2, reaction)
-                        complex_obj.add_interaction(m2, m1, reaction)
-                    
-                    # Add the complex to the list if not already present
-                    if complex_obj not in complex_list:
-                        complex_list.append(complex_obj)
-    
-    return complex_list
+    from .complex_enumeration import ComplexEnumerator
+
+    enumerator = ComplexEnumerator(pdb_model.molecule_list, pdb_model.reaction_list,
+                                   max_complex_size=max_complex_size, progress_callback=progress_callback)
+    return enumerator.enumerate()
 
 
 def build_ode_model_from_complexes(complex_list, pdb_model=None, default_association_rate=1.0, default_dissociation_rate=1.0):
@@ -606,7 +470,14 @@ def build_ode_model_from_complexes(complex_list, pdb_model=None, default_associa
     Build an ODE model from a list of complexes.
     
     This function generates association and dissociation reactions between complexes
-    to model the assembly process.
+    to model the assembly process. Every bond of every complex is broken once; the
+    fragments are found with bitsets over the molecules of the complex and resolved
+    to listed complexes by canonical key. Bonds of a complex that give the same
+    fragments are symmetric copies of one reaction and are emitted as a single
+    reaction whose rate carries the statistical degeneracy: the number of such
+    bonds for the breaking direction, and that number times |Aut(fragments)| /
+    |Aut(complex)| for the forming direction, which is the number of distinct ways
+    the fragments can bond into the complex.
     
     Args:
         complex_list (List[Complex]): List of all possible complexes.
@@ -617,158 +488,184 @@ def build_ode_model_from_complexes(complex_list, pdb_model=None, default_associa
     Returns:
         ComplexReactionSystem: The populated reaction system.
     """
+    from .complex_enumeration import automorphism_count
+
     # Initialize reaction system and add all complexes
     reaction_system = ComplexReactionSystem()
     for complex_obj in complex_list:
         reaction_system.add_complex(complex_obj)
-    
+
+    # Fragments are looked up by canonical key; keep the first and the last complex of each key
+    first_complex_by_key = {}
+    last_complex_by_key = {}
+    for complex_obj in complex_list:
+        key = complex_obj.canonical_key()
+        first_complex_by_key.setdefault(key, complex_obj)
+        last_complex_by_key[key] = complex_obj
+
+    # Symmetric copies of a reaction, keyed by reaction type and the keys of reactants and products:
+    # [reactants, products, reaction type, summed rate, number of bonds, forming direction]
+    collapsed = {}
+
+    def collect(reactants, products, reaction_type, rate, forming):
+        key = (reaction_type, tuple(sorted(c.canonical_key() for c in reactants)),
+               tuple(sorted(c.canonical_key() for c in products)))
+        entry = collapsed.get(key)
+        if entry is None:
+            collapsed[key] = [reactants, products, reaction_type, rate, 1, forming]
+        else:
+            entry[3] += rate
+            entry[4] += 1
+
     # Generate all possible reactions
     for complex_obj in complex_list:
         if complex_obj.size() <= 1:
             continue
 
-        bonds = []
-        for molecule  in complex_obj.get_keys():
-            for partner, reaction in complex_obj.get_interactions(molecule):
-                if partner is not None:
-                    bond = tuple(sorted([molecule.name, partner.name]))
-                    if bond not in bonds:
-                        bonds.append(bond)
-
-        # print(f"Complex: {complex_obj}, Bonds: {bonds}")
-
-        for bond in bonds:
-            molecule1, molecule2 = bond
-            molecule1 = next((m for m in complex_obj.get_keys() if m.name == molecule1), None)
-            molecule2 = next((m for m in complex_obj.get_keys() if m.name == molecule2), None)
-            reaction_obj = None
-            for partner, reaction in complex_obj.get_interactions(molecule1):
-                if partner.name == molecule2.name:
-                    reaction_obj = reaction
-                    break
-
-            if not reaction_obj:
-                continue
-
-            # print(f"Processing bond: {bond}, Reaction: {reaction_obj.my_template.expression}")
-            # print(f"Mol1: {molecule1.name}, Mol2: {molecule2.name}")
-            
-            graph = {}
-            for mol in complex_obj.get_keys():
-                graph[mol] = complex_obj.all_partners(mol)
-
-            graph[molecule1].remove(molecule2)
-            graph[molecule2].remove(molecule1)
-
-            # Check if breaking this bond splits the complex
-            # Use BFS to find connected components
-            visited = set()
-            components = []
-
-            for start_molecule in graph:
-                if start_molecule in visited:
-                    continue
-
-                component = set()
-                queue = [start_molecule]
-
-                while queue:
-                    current = queue.pop(0)
-                    if current in component:
-                        continue
-
-                    component.add(current)
-                    visited.add(current)
-
-                    for neighbor in graph.get(current, []):
-                        if neighbor not in component:
-                            queue.append(neighbor)
-
-                if component:
-                    components.append(component)
-
-            # print(f"Components after breaking bond {bond}: {components}")
-
+        for molecule1, molecule2, reaction_obj, components in _bond_splits(complex_obj):
             ka = reaction_obj.my_template.ka # unit: nm^3/us
             kb = reaction_obj.my_template.kb # unit: /s
+            bond = (molecule1, molecule2)
 
-            # Now we know if breaking this bond splits the complex into multiple components
-            if len(components) == 1:
+            if components is None:
                 # The complex remains connected, but with one bond less
-                # Search for a matching complex in the list
                 new_complex = Complex()
                 for mol in complex_obj.get_keys():
                     for partner, reaction in complex_obj.get_interactions(mol):
-                        if partner is not None:
-                            if tuple(sorted([mol.name, partner.name])) != bond:
-                                # print(tuple(sorted([mol.name, partner.name])), bond)
-                                new_complex.add_interaction(mol, partner, reaction)
-                            else:
-                                # print(f"Skipping bond: {bond}")
-                                pass
-                
-                for existing_complex in complex_list:
-                    if new_complex == existing_complex:
-                        # Found a matching complex
-                        new_complex.name = existing_complex.name
-                        break
-
-                # Create a transformation reaction complex_obj -> new_complex
-                reaction = ComplexReaction(reactants=[complex_obj], products=[new_complex], reaction_type="transformation", rate=kb)
-                reaction_system.add_reaction(reaction, rate=kb)
-                # print(f"Created transformation reaction: {reaction}")
-
-                # Create a transformation reaction new_complex -> complex_obj
+                        if partner is not None and (mol, partner) != bond and (partner, mol) != bond:
+                            new_complex.add_interaction(mol, partner, reaction)
+
+                existing_complex = first_complex_by_key.get(new_complex.canonical_key())
+                if existing_complex is not None:
+                    new_complex.name = existing_complex.name
+
+                # Transformations complex_obj -> new_complex and new_complex -> complex_obj
+                collect([complex_obj], [new_complex], "transformation", kb, forming=False)
                 ka = ka * 0.6022 * 1e6 # Convert to 1/M/s
-                reaction = ComplexReaction(reactants=[new_complex], products=[complex_obj], reaction_type="transformation", rate=ka)
-                reaction_system.add_reaction(reaction, rate=ka)
-                # print(f"Created transformation reaction: {reaction}")
-                
+                collect([new_complex], [complex_obj], "transformation", ka, forming=True)
+
             else:
                 # The complex is split into two components
-                component1 = components[0]
-                component2 = components[1]
-                new_complex1 = Complex()
-                new_complex2 = Complex()
+                fragments = []
+                for component in components:
+                    fragment = Complex()
+                    for mol in component:
+                        fragment.structure_information_map[mol] = []
+                        for partner, reaction in complex_obj.get_interactions(mol):
+                            if partner in component:
+                                fragment.add_interaction(mol, partner, reaction)
+                    existing_complex = last_complex_by_key.get(fragment.canonical_key())
+                    if existing_complex is not None:
+                        fragment.name = existing_complex.name
+                        fragment.diffusion_constant = existing_complex.diffusion_constant
+                    fragments.append(fragment)
+                new_complex1, new_complex2 = fragments
 
-                for mol in component1:
-                    new_complex1.structure_information_map[mol] = []
-                    for partner, reaction in complex_obj.get_interactions(mol):
-                        if partner in component1:
-                            new_complex1.add_interaction(mol, partner, reaction)
+                kon, koff = _micro2macro(ka, kb, reaction_obj.my_template.binding_radius / 10.0, new_complex1.diffusion_constant + new_complex2.diffusion_constant)
 
-                for mol in component2:
-                    new_complex2.structure_information_map[mol] = []
-                    for partner, reaction in complex_obj.get_interactions(mol):
-                        if partner in component2:
-                            new_complex2.add_interaction(mol, partner, reaction)
+                # Dissociation complex_obj -> new_complex1 + new_complex2 and the reverse association
+                collect([complex_obj], [new_complex1, new_complex2], "dissociation", koff, forming=False)
+                collect([new_complex1, new_complex2], [complex_obj], "association", kon, forming=True)
+
+    automorphisms = {}
+
+    def count_automorphisms(complexes):
+        key = tuple(sorted(c.canonical_key() for c in complexes))
+        if key not in automorphisms:
+            automorphisms[key] = automorphism_count(*_complex_graph(complexes))
+        return automorphisms[key]
+
+    for reactants, products, reaction_type, rate, num_bonds, forming in collapsed.values():
+        degeneracy = num_bonds
+        if forming:
+            # Each bond is counted once per automorphism of the product; the reactants
+            # reach the same product through each of their own automorphisms
+            symmetry = count_automorphisms(reactants) / count_automorphisms(products)
+            degeneracy = num_bonds * symmetry
+            rate = rate * symmetry
+        reaction = ComplexReaction(reactants=reactants, products=products, reaction_type=reaction_type,
+                                   rate=rate, degeneracy=degeneracy)
+        reaction_system.add_reaction(reaction, rate=rate)
 
-                for existing_complex in complex_list:
-                    if new_complex1 == existing_complex:
-                        new_complex1.name = existing_complex.name
-                        new_complex1.diffusion_constant = existing_complex.diffusion_constant
-                    if new_complex2 == existing_complex:
-                        new_complex2.name = existing_complex.name
-                        new_complex2.diffusion_constant = existing_complex.diffusion_constant
+    return reaction_system
 
-                # print(f"New Complex 1: {new_complex1}, New Complex 2: {new_complex2}")
 
-                kon, koff = _micro2macro(ka, kb, reaction_obj.my_template.binding_radius / 10.0, new_complex1.diffusion_constant + new_complex2.diffusion_constant)
+def _bond_splits(complex_obj):
+    """
+    Fragments left by breaking each bond of a complex.
+
+    The molecules are indexed and each one's partners stored as a bitset, so a
+    component is a flood fill over integer masks.
+
+    Args:
+        complex_obj (Complex): A multi-molecule complex.
+
+    Returns:
+        List[tuple]: (molecule1, molecule2, reaction, components) for each bonded pair of
+            molecules, where ``components`` is None if the complex stays connected and
+            otherwise the two sets of molecules it falls into.
+    """
+    molecules = complex_obj.get_keys()
+    index = {molecule: i for i, molecule in enumerate(molecules)}
+    adjacency = [0] * len(molecules)
+    bond_counts = {}
+    bonds = {}
+    for molecule in molecules:
+        for partner, reaction in complex_obj.get_interactions(molecule):
+            if partner is None:
+                continue
+            i, j = index[molecule], index[partner]
+            adjacency[i] |= 1 << j
+            pair = (min(i, j), max(i, j))
+            if i < j:
+                bond_counts[pair] = bond_counts.get(pair, 0) + 1
+            bonds.setdefault(pair, (molecule, partner, reaction))
+
+    full = (1 << len(molecules)) - 1
+    splits = []
+    for (i, j), (molecule1, molecule2, reaction) in bonds.items():
+        components = None
+        if bond_counts.get((i, j), 1) == 1:
+            reached, frontier = 1 << i, 1 << i
+            while frontier:
+                grown = 0
+                while frontier:
+                    low = frontier & -frontier
+                    v = low.bit_length() - 1
+                    partners = adjacency[v]
+                    if v == i:
+                        partners &= ~(1 << j)
+                    elif v == j:
+                        partners &= ~(1 << i)
+                    grown |= partners
+                    frontier ^= low
+                frontier = grown & ~reached
+                reached |= frontier
+            if reached != full:
+                components = (
+                    {molecules[v] for v in range(len(molecules)) if reached >> v & 1},
+                    {molecules[v] for v in range(len(molecules)) if not reached >> v & 1},
+                )
+        splits.append((molecule1, molecule2, reaction, components))
+    return splits
+
+
+def _complex_graph(complexes):
+    """Template labels and bond labels of the disjoint union of complexes."""
+    labels, edges, offset = [], {}, 0
+    for complex_obj in complexes:
+        molecules = complex_obj.get_keys()
+        index = {molecule: offset + i for i, molecule in enumerate(molecules)}
+        labels.extend(molecule.my_template.name for molecule in molecules)
+        bond_labels = defaultdict(list)
+        for molecule in molecules:
+            for partner, reaction in complex_obj.get_interactions(molecule):
+                if partner is not None and index[molecule] < index[partner]:
+                    bond_labels[(index[molecule], index[partner])].append(reaction.my_template.expression)
+        edges.update((pair, "|".join(sorted(names))) for pair, names in bond_labels.items())
+        offset += len(molecules)
+    return labels, edges
 
-                # Create a dissociation reaction complex_obj -> new_complex1 + new_complex2
-                reaction = ComplexReaction(reactants=[complex_obj], products=[new_complex1, new_complex2], reaction_type="dissociation", rate=koff)
-                reaction_system.add_reaction(reaction, rate=koff)
-                # print(f"Created dissociation reaction: {reaction}")
-                # Create a association reaction new_complex1 + new_complex2 -> complex_obj
-                reaction = ComplexReaction(reactants=[new_complex1, new_complex2], products=[complex_obj], reaction_type="association", rate=kon)
-                reaction_system.add_reaction(reaction, rate=kon)
-                # print(f"Created association reaction: {reaction}")
-
-    # print the reaction system
-    # print(reaction_system)
-    # print(reaction_system.generate_ode_equations())
-    
-    return reaction_system
 
 def generate_ode_model_from_pdb(pdb_model, max_complex_size=None):
     """
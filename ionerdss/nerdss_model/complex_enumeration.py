@@ -0,0 +1,307 @@
+"""
+Enumeration of the distinct complexes that can form from a PDB model.
+
+A complex is a connected set of molecules together with a connected,
+spanning subset of the binding edges between them. Instead of testing every
+combination of molecules and every subset of their edges for connectivity,
+``ComplexEnumerator`` grows connected molecule sets one neighbor at a time
+with the ESU algorithm (Wernicke, IEEE/ACM TCBB 3, 347, 2006), so every
+connected set is visited exactly once and disconnected ones never are.
+
+Molecules are labeled by their template (the homologous chain groups of
+``PDBModel.chains_group``) and edges by the template expression of their
+reaction. Molecule sets whose labeled binding graphs are isomorphic yield
+the same complexes, so the spanning edge subsets are enumerated once per
+isomorphism class, identified by a canonical form obtained by color
+refinement with individualization, and mapped onto every other member.
+"""
+
+import itertools
+from collections import Counter
+
+from .complex import Complex
+
+
+def canonical_form(labels, edges):
+    """
+    Canonical form of a small vertex- and edge-labeled graph.
+
+    Colors are refined Weisfeiler-Lehman style until stable; ties are broken
+    by individualizing each vertex of the first non-singleton color class in
+    turn, and the smallest resulting encoding is kept.
+
+    Args:
+        labels (List[str]): Label of each vertex.
+        edges (Dict[Tuple[int, int], str]): Label of each edge (i, j), i < j.
+
+    Returns:
+        tuple: (form, order) where ``form`` is equal for isomorphic graphs and
+            ``order[p]`` is the vertex at canonical position p.
+    """
+    form, order, _ = _individualization_refinement(labels, edges)
+    return form, order
+
+
+def automorphism_count(labels, edges):
+    """
+    Number of label-preserving automorphisms of a small labeled graph.
+
+    Args:
+        labels (List[str]): Label of each vertex.
+        edges (Dict[Tuple[int, int], str]): Label of each edge (i, j), i < j.
+
+    Returns:
+        int: The size of the automorphism group.
+    """
+    return _individualization_refinement(labels, edges)[2]
+
+
+def _individualization_refinement(labels, edges):
+    # The automorphisms act freely on the leaves of the search tree and the
+    # leaves with the canonical form are one orbit, so counting them gives |Aut|.
+    n = len(labels)
+    adjacency = [[] for _ in range(n)]
+    for (i, j), label in edges.items():
+        adjacency[i].append((j, label))
+        adjacency[j].append((i, label))
+
+    def refine(colors):
+        num_colors = len(set(colors))
+        while True:
+            signatures = [(colors[v], tuple(sorted((label, colors[u]) for u, label in adjacency[v])))
+                          for v in range(n)]
+            ranks = {signature: rank for rank, signature in enumerate(sorted(set(signatures)))}
+            colors = [ranks[signature] for signature in signatures]
+            if len(ranks) == num_colors:
+                return colors
+            num_colors = len(ranks)
+
+    best = [None, None, 0]
+
+    def search(colors):
+        colors = refine(colors)
+        counts = Counter(colors)
+        if len(counts) == n:
+            order = sorted(range(n), key=colors.__getitem__)
+            position = {v: p for p, v in enumerate(order)}
+            form = (tuple(labels[v] for v in order),
+                    tuple(sorted((*sorted((position[i], position[j])), label) for (i, j), label in edges.items())))
+            if best[0] is None or form < best[0]:
+                best[:] = [form, order, 1]
+            elif form == best[0]:
+                best[2] += 1
+            return
+        cell = min(color for color, count in counts.items() if count > 1)
+        for v in range(n):
+            if colors[v] == cell:
+                # A color of its own, ordered just before the rest of its cell
+                individualized = [2 * color for color in colors]
+                individualized[v] = 2 * cell - 1
+                search(individualized)
+
+    initial = {label: rank for rank, label in enumerate(sorted(set(labels)))}
+    search([initial[label] for label in labels])
+    return tuple(best)
+
+
+class ComplexEnumerator:
+    """
+    Enumerates the distinct complexes (up to ``Complex.__eq__``) of a set of molecules.
+
+    Attributes:
+        molecules (list): Molecules, in the order used to rank complexes.
+        max_complex_size (int): Largest number of molecules in a complex.
+        num_molecule_sets (int): Connected molecule sets visited so far.
+        num_isomorphism_classes (int): Distinct labeled binding graphs among them.
+        num_complexes (int): Distinct complexes found so far.
+    """
+
+    def __init__(self, molecules, reaction_list, max_complex_size=None, progress_callback=None,
+                 progress_interval=10000):
+        """
+        Args:
+            molecules (list): CoarseGrainedMolecule objects, e.g. ``PDBModel.molecule_list``.
+            reaction_list (list): Reactions whose two reactants are the binding edges.
+            max_complex_size (int, optional): Maximum number of molecules in a complex.
+                If None, no limit is applied. Defaults to None.
+            progress_callback (callable, optional): Called with the enumerator every
+                ``progress_interval`` molecule sets and once at the end.
+            progress_interval (int, optional): Molecule sets between progress reports. Defaults to 10000.
+        """
+        self.molecules = list(molecules)
+        self.max_complex_size = min(max_complex_size or len(self.molecules), len(self.molecules))
+        self.progress_callback = progress_callback
+        self.progress_interval = progress_interval
+        self.num_molecule_sets = 0
+        self.num_isomorphism_classes = 0
+        self.num_complexes = 0
+
+        position_of_name = {molecule.name: i for i, molecule in enumerate(self.molecules)}
+        self._neighbors = [set() for _ in self.molecules]
+        # One edge per molecule pair, carried by its first reaction
+        self._edge_reactions = {}
+        for reaction in reaction_list:
+            if not reaction.reactants or len(reaction.reactants) != 2:
+                continue
+            i = position_of_name.get(reaction.reactants[0][0].name)
+            j = position_of_name.get(reaction.reactants[1][0].name)
+            if i is None or j is None or i == j:
+                continue
+            self._neighbors[i].add(j)
+            self._neighbors[j].add(i)
+            self._edge_reactions.setdefault((min(i, j), max(i, j)), reaction)
+
+        # Complexes of each isomorphism class: (key, edges in canonical positions)
+        self._class_complexes = {}
+
+    def _report_progress(self, force=False):
+        if self.progress_callback is not None and (force or self.num_molecule_sets % self.progress_interval == 0):
+            self.progress_callback(self)
+
+    def connected_molecule_sets(self):
+        """
+        Yields every connected set of at most ``max_complex_size`` molecules exactly once (ESU).
+
+        Yields:
+            Tuple[int, ...]: Sorted positions of the molecules of the set.
+        """
+        neighbors = self._neighbors
+        max_size = self.max_complex_size
+
+        def extend(subset, extension, root, excluded):
+            yield tuple(sorted(subset))
+            if len(subset) == max_size:
+                return
+            extension = list(extension)
+            while extension:
+                w = extension.pop()
+                # Exclusive neighbors of w: neither in nor next to the current set
+                new = [u for u in neighbors[w] if u > root and u not in excluded]
+                yield from extend(subset + [w], extension + new, root, excluded | neighbors[w] | {w})
+
+        for root in range(len(self.molecules)):
+            if max_size < 1:
+                return
+            start = [u for u in neighbors[root] if u > root]
+            yield from extend([root], start, root, neighbors[root] | {root})
+
+    def _complexes_of_set(self, positions):
+        """(key, Complex builder) for every distinct complex spanning the molecule set."""
+        if len(positions) == 1:
+            molecule = self.molecules[positions[0]]
+
+            def build_single():
+                complex_obj = Complex()
+                complex_obj.add_interaction(molecule, None, None)
+                return complex_obj
+            return [((molecule.my_template.name,), ()), ], [build_single]
+
+        local = {p: i for i, p in enumerate(positions)}
+        labels = [self.molecules[p].my_template.name for p in positions]
+        edges = {}
+        for p in positions:
+            for q in self._neighbors[p]:
+                if q in local and p < q:
+                    edges[(local[p], local[q])] = self._edge_reactions[(p, q)].my_template.expression
+        form, order = canonical_form(labels, edges)
+
+        entries = self._class_complexes.get(form)
+        if entries is None:
+            self.num_isomorphism_classes += 1
+            entries = self._spanning_complexes(positions, order, len(form[1]))
+            self._class_complexes[form] = entries
+
+        keys, builders = [], []
+        for key, canonical_edges in entries:
+            def build(canonical_edges=canonical_edges):
+                complex_obj = Complex()
+                for a, b in canonical_edges:
+                    p, q = sorted((positions[order[a]], positions[order[b]]))
+                    m1, m2, reaction = self.molecules[p], self.molecules[q], self._edge_reactions[(p, q)]
+                    complex_obj.add_interaction(m1, m2, reaction)
+                    complex_obj.add_interaction(m2, m1, reaction)
+                return complex_obj
+            keys.append(key)
+            builders.append(build)
+        return keys, builders
+
+    def _spanning_complexes(self, positions, order, num_edges):
+        """Distinct complexes of the connected, spanning edge subsets of one molecule set."""
+        canonical_position = {positions[v]: p for p, v in enumerate(order)}
+        edge_list = sorted(
+            (canonical_position[p], canonical_position[q])
+            for p in positions for q in self._neighbors[p] if q in canonical_position and p < q
+        )
+        edge_list = [tuple(sorted(edge)) for edge in edge_list]
+        n = len(positions)
+        entries = {}
+        for edge_count in range(n - 1, num_edges + 1):
+            for edge_subset in itertools.combinations(edge_list, edge_count):
+                if not _spans_connected(n, edge_subset):
+                    continue
+                complex_obj = Complex()
+                for a, b in edge_subset:
+                    p, q = sorted((positions[order[a]], positions[order[b]]))
+                    m1, m2, reaction = self.molecules[p], self.molecules[q], self._edge_reactions[(p, q)]
+                    complex_obj.add_interaction(m1, m2, reaction)
+                    complex_obj.add_interaction(m2, m1, reaction)
+                entries.setdefault(complex_obj.canonical_key(), edge_subset)
+        return list(entries.items())
+
+    def iter_unique(self):
+        """
+        Lazily yields each distinct complex once, in the order it is first reached.
+
+        Yields:
+            Complex: A complex not equal to any yielded before.
+        """
+        seen = set()
+        for positions in self.connected_molecule_sets():
+            self.num_molecule_sets += 1
+            for key, build in zip(*self._complexes_of_set(positions)):
+                if key not in seen:
+                    seen.add(key)
+                    self.num_complexes += 1
+                    yield build()
+            self._report_progress()
+        self._report_progress(force=True)
+
+    def enumerate(self):
+        """
+        All distinct complexes, ordered by size, then by the combination of molecules
+        (in molecule order) that first forms them, then by number of bonds.
+
+        Returns:
+            List[Complex]: The complexes.
+        """
+        best = {}
+        for positions in self.connected_molecule_sets():
+            self.num_molecule_sets += 1
+            for key, build in zip(*self._complexes_of_set(positions)):
+                # Fewer bonds first within a molecule set, then a fixed order on the keys
+                rank = (len(positions), positions, len(key[1]), key)
+                if key not in best or rank < best[key][0]:
+                    best[key] = (rank, build)
+            self._report_progress()
+        self.num_complexes = len(best)
+        self._report_progress(force=True)
+        return [build() for rank, build in sorted(best.values(), key=lambda item: item[0])]
+
+
+def _spans_connected(n, edge_subset):
+    """Whether the edges connect all n vertices 0..n-1."""
+    parent = list(range(n))
+
+    def find(v):
+        while parent[v] != v:
+            parent[v] = parent[parent[v]]
+            v = parent[v]
+        return v
+
+    components = n
+    for a, b in edge_subset:
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[ra] = rb
+            components -= 1
+    return components == 1
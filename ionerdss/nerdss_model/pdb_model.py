@@ -10,8 +10,7 @@ import requests
 import numpy as np
 import math
 import re
-from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from Bio.PDB import PDBList, MMCIFParser, PDBParser
 from Bio.PDB.Polypeptide import is_aa
 from Bio.Align import PairwiseAligner
@@ -20,6 +19,8 @@ from scipy.spatial import KDTree
 from sklearn.cluster import KMeans
 from .model import MoleculeType, MoleculeInterface, ReactionType, Model
 from .coords import Coords
+from .atom_table import AtomTable
+from .signature_index import SignatureIndex
 
 
 class PDBModel(Model):
@@ -81,6 +82,14 @@ class PDBModel(Model):
         self.reaction_list = []
         self.reaction_template_list = []
 
+        # name -> position lookups into the lists above, see _index_model
+        self.chain_index = {}
+        self.molecule_index = {}
+        self.molecule_template_index = {}
+        self.interface_index = {}
+        # residue groupings of rigid_transform_chains, by sequence pair
+        self._superposition_cache = {}
+
     def download_pdb(self) -> str:
         """Downloads the PDB structure file.
 
@@ -144,7 +153,7 @@ class PDBModel(Model):
         structure = parser.get_structure(structure_id, self.pdb_file)
         return structure
 
-    def coarse_grain(self, distance_cutoff=0.35, residue_cutoff=3, show_coarse_grained_structure=False, save_pymol_script=False, standard_output=False):
+    def coarse_grain(self, distance_cutoff=0.35, residue_cutoff=3, show_coarse_grained_structure=False, save_pymol_script=False, standard_output=False, workers=-1):
         """Coarse grains the PDB structure by detecting binding interfaces between chains based on atomic distances.
 
         Args:
@@ -153,10 +162,12 @@ class PDBModel(Model):
             show_coarse_grained_structure (bool, optional): Whether to visualize the coarse-grained structure. Defaults to False.
             save_pymol_script (bool, optional): Whether to save a PyMOL script for visualization. Defaults to False.
             standard_output (bool, optional): Whether to print detected interfaces. Defaults to False.
+            workers (int, optional): Threads used by the atom neighbor search; -1 uses all CPUs. Defaults to -1.
         """
         self.all_chains = sorted([chain for chain in self.all_atoms_structure.get_chains() 
             if any(is_aa(residue) for residue in chain.get_residues())], 
             key=lambda chain: chain.id)
+        self.chain_index = {chain.id: i for i, chain in reversed(list(enumerate(self.all_chains)))}
         self.all_COM_chains_coords = []
         self.all_interfaces = []
         self.all_interfaces_coords = []
@@ -175,138 +186,38 @@ class PDBModel(Model):
             self.all_interfaces_residues.append([])
             self.all_interface_energies.append([])
 
-        # Calculate the center of mass (COM) for each chain
-        for chain in self.all_chains:
-            atom_coords = [atom.coord for residue in chain for atom in residue if is_aa(residue)]
-            if not atom_coords:
+        # Flatten the amino-acid atoms of all chains into arrays once
+        self.atom_table = AtomTable.from_chains(self.all_chains)
+        atom_counts = self.atom_table.chain_atom_counts()
+        chain_centers = self.atom_table.chain_centers_of_mass()
+        chain_radii = self.atom_table.chain_radii_of_gyration(chain_centers)
+
+        # Center of mass (COM) and radius of gyration of each chain
+        for i in range(num_chains):
+            if atom_counts[i] == 0:
                 self.all_COM_chains_coords.append(None)
                 continue
-
-            # Calculate the COM
-            avg_coords = np.mean(atom_coords, axis=0)
-            self.all_COM_chains_coords.append(Coords(*avg_coords))
-
-            # Calculate the radius of gyration of each chain based on its COM
-            if len(atom_coords) > 1:
-                distances = np.linalg.norm(atom_coords - avg_coords, axis=1)
-                radius = np.sqrt(np.mean(distances ** 2))
-            else:
-                radius = 0.0
-            self.all_chains_radius.append(radius)
-
-        # Helper function to compute bounding box for a chain
-        def compute_bounding_box(chain):
-            atom_coords = np.array([atom.coord for residue in chain for atom in residue if is_aa(residue)])
-            if atom_coords.size == 0:
-                return None, None
-            min_coords = np.min(atom_coords, axis=0)
-            max_coords = np.max(atom_coords, axis=0)
-            return min_coords, max_coords
-        
-        # Precompute bounding boxes for all chains
-        bounding_boxes = [compute_bounding_box(chain) for chain in self.all_chains]
-
-        # Helper function to process a pair of chains
-        def process_chain_pair(i, j):
-            if self.all_COM_chains_coords[i] is None or self.all_COM_chains_coords[j] is None:
-                return
-
-            min_box1, max_box1 = bounding_boxes[i]
-            min_box2, max_box2 = bounding_boxes[j]
-
-            # Skip if bounding boxes are farther apart than the cutoff distance
-            if np.any(min_box2 > max_box1 + distance_cutoff * 10) or np.any(max_box2 < min_box1 - distance_cutoff * 10):
-                return
-            
-            chain1 = self.all_chains[i]
-            chain2 = self.all_chains[j]
-
-            atom_coords_chain1 = []
-            ca_coords_chain1 = []
-            residue_ids_chain1 = []
-            residue_types_chain1 = []
-            atom_coords_chain2 = []
-            ca_coords_chain2 = []
-            residue_ids_chain2 = []
-            residue_types_chain2 = []
-
-            for residue1 in chain1:
-                if not is_aa(residue1) or 'CA' not in residue1:
-                    continue
-                res_type1 = residue1.get_resname().upper()
-                for atom1 in residue1:
-                    atom_coords_chain1.append(atom1.coord)
-                    ca_coords_chain1.append(residue1['CA'].coord)
-                    residue_ids_chain1.append(residue1.id[1])
-                    residue_types_chain1.append(res_type1)
-
-            for residue2 in chain2:
-                if not is_aa(residue2) or 'CA' not in residue2:
-                    continue
-                res_type2 = residue2.get_resname().upper()
-                for atom2 in residue2:
-                    atom_coords_chain2.append(atom2.coord)
-                    ca_coords_chain2.append(residue2['CA'].coord)
-                    residue_ids_chain2.append(residue2.id[1])
-                    residue_types_chain2.append(res_type2)
-
-            if len(ca_coords_chain1) == 0 or len(ca_coords_chain2) == 0:
-                return
-
-            # Build KDTree for chain2
-            tree = KDTree(atom_coords_chain2)
-            indices = tree.query_ball_point(atom_coords_chain1, r=distance_cutoff * 10)
-
-            interface1 = []
-            interface1_coords = []
-            interface1_types = []
-            interface2 = []
-            interface2_coords = []
-            interface2_types = []
-
-            residue_pairs = {}
-
-            # Collect interface residues based on KDTree results
-            for idx1, neighbors in enumerate(indices):
-                if neighbors:
-                    if residue_ids_chain1[idx1] not in interface1:
-                        interface1.append(residue_ids_chain1[idx1])
-                        interface1_coords.append(ca_coords_chain1[idx1])
-                        interface1_types.append(residue_types_chain1[idx1])
-
-                    for idx2 in neighbors:
-                        if residue_ids_chain2[idx2] not in interface2:
-                            interface2.append(residue_ids_chain2[idx2])
-                            interface2_coords.append(ca_coords_chain2[idx2])
-                            interface2_types.append(residue_types_chain2[idx2])
-                    
-                        pair_key = (residue_ids_chain1[idx1], residue_ids_chain2[idx2])
-                        energy_key = (residue_types_chain1[idx1], residue_types_chain2[idx2])
-
-                        if pair_key not in residue_pairs:
-                            residue_pairs[pair_key] = energy_table.get(energy_key, 0.0)
-
-            total_energy = sum(residue_pairs.values())
-
+            self.all_COM_chains_coords.append(Coords(*chain_centers[i]))
+            self.all_chains_radius.append(float(chain_radii[i]))
+
+        # One neighbor search over all atoms; residues and energies grouped by chain pair
+        residue_numbers = self.atom_table.residue_number
+        residue_ca = self.atom_table.residue_ca
+        for i, j, interface1, interface2, total_energy in self.atom_table.chain_pair_interfaces(
+                distance_cutoff * 10, energy_table, workers=workers):
             # Store results if any interfaces were found
             if len(interface1) >= residue_cutoff and len(interface2) >= residue_cutoff:
-                avg_coords1 = np.mean(interface1_coords, axis=0)
+                avg_coords1 = np.mean(residue_ca[interface1], axis=0)
                 self.all_interfaces[i].append(self.all_chains[j].id)
                 self.all_interfaces_coords[i].append(Coords(*avg_coords1))
-                self.all_interfaces_residues[i].append(sorted(interface1))
+                self.all_interfaces_residues[i].append(sorted(residue_numbers[interface1].tolist()))
                 self.all_interface_energies[i].append(total_energy)
-                avg_coords2 = np.mean(interface2_coords, axis=0)
+                avg_coords2 = np.mean(residue_ca[interface2], axis=0)
                 self.all_interfaces[j].append(self.all_chains[i].id)
                 self.all_interfaces_coords[j].append(Coords(*avg_coords2))
-                self.all_interfaces_residues[j].append(sorted(interface2))
+                self.all_interfaces_residues[j].append(sorted(residue_numbers[interface2].tolist()))
                 self.all_interface_energies[j].append(total_energy)
 
-        # Parallelize chain pair processing
-        with ThreadPoolExecutor() as executor:
-            futures = [executor.submit(process_chain_pair, i, j) for i in range(num_chains - 1) for j in range(i + 1, num_chains)]
-            for future in futures:
-                future.result()  # Wait for all tasks to complete
-
         for i in range(num_chains):
             sorted_indices = sorted(range(len(self.all_interfaces[i])), key=lambda k: self.all_interfaces[i][k])
             self.all_interfaces[i] = [self.all_interfaces[i][k] for k in sorted_indices]
@@ -341,8 +252,8 @@ class PDBModel(Model):
         for chain in self.all_chains:
             chain_id = chain.id
             chain_ids.append(chain_id)
-            com_coord = self.all_COM_chains_coords[self.all_chains.index([chain for chain in self.all_chains if chain.id == chain_id][0])]
-            interface_coords = self.all_interfaces_coords[self.all_chains.index([chain for chain in self.all_chains if chain.id == chain_id][0])]
+            com_coord = self.all_COM_chains_coords[self.chain_index[chain_id]]
+            interface_coords = self.all_interfaces_coords[self.chain_index[chain_id]]
             points = []
             points.append([com_coord.x, com_coord.y, com_coord.z])
             for interface_coord in interface_coords:
@@ -544,6 +455,11 @@ class PDBModel(Model):
         self.interface_list = []
         self.interface_template_list = []
         self.interface_signatures = []
+        self.signature_index = SignatureIndex(dist_threshold_intra, dist_threshold_inter, angle_threshold)
+        self._superposition_cache = {}
+        self._index_model()
+        group_of_chain = {chain: group for group in self.chains_group for chain in group}
+        binding_chains_pairs = set(self.binding_chains_pairs)
 
         for group in self.chains_group:
             # print(f"Start parsing chain group / molecule template {group}")
@@ -555,7 +471,7 @@ class PDBModel(Model):
             else:
                 molecule_template = MoleculeTemplate(mol_temp_name)
                 # print(f"New mol template {mol_temp_name} is created.")
-                self.molecules_template_list.append(molecule_template)
+                self._add_molecule_template(molecule_template)
 
             for j, chain_id in enumerate(group):
                 # print(f"Start parsing chain / molecule {chain_id}")
@@ -564,22 +480,22 @@ class PDBModel(Model):
                 if is_existing_mol:
                     # print(f"This is an existing molecule {mol_name}")
                     molecule = self.molecule_list[mol_index]
-                    molecule.radius = self.all_chains_radius[self.all_chains.index([chain for chain in self.all_chains if chain.id == mol_name][0])]
+                    molecule.radius = self.all_chains_radius[self.chain_index[mol_name]]
                     molecule.diffusion_translation, molecule.diffusion_rotation = self._compute_diffusion_constants_nm_us(molecule.radius / 10.0)
                     molecule.my_template.diffusion_translation, molecule.my_template.diffusion_rotation = molecule.diffusion_translation, molecule.diffusion_rotation
                 else:
                     molecule = CoarseGrainedMolecule(mol_name)
                     # print(f"New molecule {mol_name} is created.")
                     molecule.my_template = molecule_template
-                    molecule.coord = self.all_COM_chains_coords[self.all_chains.index([chain for chain in self.all_chains if chain.id == mol_name][0])]
-                    molecule.radius = self.all_chains_radius[self.all_chains.index([chain for chain in self.all_chains if chain.id == mol_name][0])]
+                    molecule.coord = self.all_COM_chains_coords[self.chain_index[mol_name]]
+                    molecule.radius = self.all_chains_radius[self.chain_index[mol_name]]
                     molecule.diffusion_translation, molecule.diffusion_rotation = self._compute_diffusion_constants_nm_us(molecule.radius / 10.0)
-                    self.molecule_list.append(molecule)
+                    self._add_molecule(molecule)
                     molecule_template.radius = molecule.radius
                     molecule_template.diffusion_translation, molecule_template.diffusion_rotation = molecule.diffusion_translation, molecule.diffusion_rotation
                 
                 # loop the interface of this chain (molecule)
-                for i, interface_id in enumerate(self.all_interfaces[self.all_chains.index([chain for chain in self.all_chains if chain.id == mol_name][0])]):
+                for i, interface_id in enumerate(self.all_interfaces[self.chain_index[mol_name]]):
                     A = mol_name
                     B = interface_id # this is the chain name of the partner
                     partner_mol_template_name = self.chains_map[B]
@@ -591,7 +507,7 @@ class PDBModel(Model):
                     else:
                         partner_molecule_template = MoleculeTemplate(partner_mol_template_name)
                         # print(f"new mol template {partner_mol_template_name} created for molecule {B}.")
-                        self.molecules_template_list.append(partner_molecule_template)
+                        self._add_molecule_template(partner_molecule_template)
 
                     is_existing_mol, partner_mol_index = self._is_existing_mol(B)
                     if is_existing_mol:
@@ -601,17 +517,17 @@ class PDBModel(Model):
                         partner_molecule = CoarseGrainedMolecule(B)
                         # print(f"New molecule {B} is created.")
                         partner_molecule.my_template = partner_molecule_template
-                        partner_molecule.coord = self.all_COM_chains_coords[self.all_chains.index([chain for chain in self.all_chains if chain.id == B][0])]
-                        self.molecule_list.append(partner_molecule)
+                        partner_molecule.coord = self.all_COM_chains_coords[self.chain_index[B]]
+                        self._add_molecule(partner_molecule)
 
-                    COM_A = self.all_COM_chains_coords[self.all_chains.index([chain for chain in self.all_chains if chain.id == A][0])]
-                    I_A = self.all_interfaces_coords[self.all_chains.index([chain for chain in self.all_chains if chain.id == A][0])][i]
-                    COM_B = self.all_COM_chains_coords[self.all_chains.index([chain for chain in self.all_chains if chain.id == B][0])]
-                    for k, partner_interface_id in enumerate(self.all_interfaces[self.all_chains.index([chain for chain in self.all_chains if chain.id == B][0])]):
+                    COM_A = self.all_COM_chains_coords[self.chain_index[A]]
+                    I_A = self.all_interfaces_coords[self.chain_index[A]][i]
+                    COM_B = self.all_COM_chains_coords[self.chain_index[B]]
+                    for k, partner_interface_id in enumerate(self.all_interfaces[self.chain_index[B]]):
                         if partner_interface_id == A:
-                            I_B = self.all_interfaces_coords[self.all_chains.index([chain for chain in self.all_chains if chain.id == B][0])][k]
-                            R_B = self.all_interfaces_residues[self.all_chains.index([chain for chain in self.all_chains if chain.id == B][0])][k]
-                            E_B = self.all_interface_energies[self.all_chains.index([chain for chain in self.all_chains if chain.id == B][0])][k]
+                            I_B = self.all_interfaces_coords[self.chain_index[B]][k]
+                            R_B = self.all_interfaces_residues[self.chain_index[B]][k]
+                            E_B = self.all_interface_energies[self.chain_index[B]][k]
                             break
 
                     signature = {
@@ -625,16 +541,12 @@ class PDBModel(Model):
                     # print the signature
                     # print(f"Parsing signature: {signature}")
 
-                    is_existing_sig = False
-
-                    for existing_sig in self.interface_signatures:
-                        if self._sig_are_similar(signature, existing_sig, dist_threshold_intra, dist_threshold_inter, angle_threshold):
-                            is_existing_sig = True
-                            break
+                    is_existing_sig = self.signature_index.has_similar(signature)
 
                     if not is_existing_sig:
                         # print("this is a new signature. added to list.")
                         self.interface_signatures.append(signature)
+                        self.signature_index.add(signature)
                         signature_conjugated = {
                             "dA": signature["dB"],
                             "dB": signature["dA"],
@@ -643,6 +555,7 @@ class PDBModel(Model):
                             "thetaB": signature["thetaA"]
                         }
                         self.interface_signatures.append(signature_conjugated)
+                        self.signature_index.add(signature_conjugated)
                         # print(f"the conjugated signature: {signature_conjugated} is also added to the list.")
 
                         # build the interface template pairs for both molecule templates, need to check if this is homo dimerization or hetero
@@ -671,16 +584,16 @@ class PDBModel(Model):
                             interface_template = BindingInterfaceTemplate(interface_template_id)
                             interface_template.signature = signature
                             if j == 0:
-                                interface_template.coord = self.all_interfaces_coords[self.all_chains.index([chain for chain in self.all_chains if chain.id == chain_id][0])][i] - molecule.coord
+                                interface_template.coord = self.all_interfaces_coords[self.chain_index[chain_id]][i] - molecule.coord
                             else:
                                 # align the current chain to the first chain in the group, then get the relative position of interface to COM
-                                chain1 = self.all_chains[self.all_chains.index([chain for chain in self.all_chains if chain.id == group[0]][0])]
-                                chain2 = self.all_chains[self.all_chains.index([chain for chain in self.all_chains if chain.id == chain_id][0])]
-                                R, t = rigid_transform_chains(chain2, chain1)
+                                chain1 = self.all_chains[self.chain_index[group[0]]]
+                                chain2 = self.all_chains[self.chain_index[chain_id]]
+                                R, t = rigid_transform_chains(chain2, chain1, self._superposition_cache)
                                 Q = []
-                                Q_COM_coord = self.all_COM_chains_coords[self.all_chains.index([chain for chain in self.all_chains if chain.id == chain_id][0])]
+                                Q_COM_coord = self.all_COM_chains_coords[self.chain_index[chain_id]]
                                 Q.append([Q_COM_coord.x, Q_COM_coord.y, Q_COM_coord.z])
-                                temp_coord = self.all_interfaces_coords[self.all_chains.index([chain for chain in self.all_chains if chain.id == chain_id][0])][i]
+                                temp_coord = self.all_interfaces_coords[self.chain_index[chain_id]][i]
                                 Q.append([temp_coord.x, temp_coord.y, temp_coord.z])
                                 Q2 = []
                                 for point in Q:
@@ -707,16 +620,16 @@ class PDBModel(Model):
                             interface_template = BindingInterfaceTemplate(interface_template_id)
                             interface_template.signature = signature
                             if j == 0:
-                                interface_template.coord = self.all_interfaces_coords[self.all_chains.index([chain for chain in self.all_chains if chain.id == chain_id][0])][i] - molecule.coord
+                                interface_template.coord = self.all_interfaces_coords[self.chain_index[chain_id]][i] - molecule.coord
                             else:
                                 # align the current chain to the first chain in the group, then get the relative position of interface to COM
-                                chain1 = self.all_chains[self.all_chains.index([chain for chain in self.all_chains if chain.id == group[0]][0])]
-                                chain2 = self.all_chains[self.all_chains.index([chain for chain in self.all_chains if chain.id == chain_id][0])]
-                                R, t = rigid_transform_chains(chain2, chain1)
+                                chain1 = self.all_chains[self.chain_index[group[0]]]
+                                chain2 = self.all_chains[self.chain_index[chain_id]]
+                                R, t = rigid_transform_chains(chain2, chain1, self._superposition_cache)
                                 Q = []
-                                Q_COM_coord = self.all_COM_chains_coords[self.all_chains.index([chain for chain in self.all_chains if chain.id == chain_id][0])]
+                                Q_COM_coord = self.all_COM_chains_coords[self.chain_index[chain_id]]
                                 Q.append([Q_COM_coord.x, Q_COM_coord.y, Q_COM_coord.z])
-                                temp_coord = self.all_interfaces_coords[self.all_chains.index([chain for chain in self.all_chains if chain.id == chain_id][0])][i]
+                                temp_coord = self.all_interfaces_coords[self.chain_index[chain_id]][i]
                                 Q.append([temp_coord.x, temp_coord.y, temp_coord.z])
                                 Q2 = []
                                 for point in Q:
@@ -740,20 +653,17 @@ class PDBModel(Model):
                             interface_template_id = interface_template_id_prefix + interface_template_id_suffix
                             partner_interface_template = BindingInterfaceTemplate(interface_template_id)
                             partner_interface_template.signature = signature_conjugated
-                            B_group = None
-                            for g in self.chains_group:
-                                if B in g:
-                                    B_group = g
+                            B_group = group_of_chain.get(B)
 
                             if B == B_group[0]:
                                 partner_interface_template.coord = I_B - partner_molecule.coord
                             else:
                                 # align the current chain to the first chain in the group, then get the relative position of interface to COM
-                                chain1 = self.all_chains[self.all_chains.index([chain for chain in self.all_chains if chain.id == B_group[0]][0])]
-                                chain2 = self.all_chains[self.all_chains.index([chain for chain in self.all_chains if chain.id == B][0])]
-                                R, t = rigid_transform_chains(chain2, chain1)
+                                chain1 = self.all_chains[self.chain_index[B_group[0]]]
+                                chain2 = self.all_chains[self.chain_index[B]]
+                                R, t = rigid_transform_chains(chain2, chain1, self._superposition_cache)
                                 Q = []
-                                Q_COM_coord = self.all_COM_chains_coords[self.all_chains.index([chain for chain in self.all_chains if chain.id == B][0])]
+                                Q_COM_coord = self.all_COM_chains_coords[self.chain_index[B]]
                                 Q.append([Q_COM_coord.x, Q_COM_coord.y, Q_COM_coord.z])
                                 temp_coord = I_B
                                 Q.append([temp_coord.x, temp_coord.y, temp_coord.z])
@@ -859,12 +769,12 @@ class PDBModel(Model):
                         # create the interface
                         interface = BindingInterface(B)
                         interface.my_template = interface_template
-                        interface.coord = self.all_interfaces_coords[self.all_chains.index([chain for chain in self.all_chains if chain.id == A][0])][i]
-                        interface.my_residues = self.all_interfaces_residues[self.all_chains.index([chain for chain in self.all_chains if chain.id == A][0])][i]
-                        interface.energy = self.all_interface_energies[self.all_chains.index([chain for chain in self.all_chains if chain.id == A][0])][i]
+                        interface.coord = self.all_interfaces_coords[self.chain_index[A]][i]
+                        interface.my_residues = self.all_interfaces_residues[self.chain_index[A]][i]
+                        interface.energy = self.all_interface_energies[self.chain_index[A]][i]
                         interface.my_template.energy = interface.energy
                         self.interface_list.append(interface)
-                        molecule.interface_list.append(interface)
+                        self._add_interface(molecule, interface)
 
                         # print(f"Creating new interface {A} for partner molecule {B}")
                         # create the interface for the partner molecule
@@ -875,14 +785,15 @@ class PDBModel(Model):
                         partner_interface.energy = E_B
                         partner_interface.my_template.energy = E_B
                         self.interface_list.append(partner_interface)
-                        partner_molecule.interface_list.append(partner_interface)
+                        self._add_interface(partner_molecule, partner_interface)
 
                         # add the chains pair to self.binding_chains_pairs
                         if chain_id < interface_id:
                             binding_chains_pair = (chain_id, interface_id)
                         else:
                             binding_chains_pair = (interface_id, chain_id)
-                        if binding_chains_pair not in self.binding_chains_pairs:
+                        if binding_chains_pair not in binding_chains_pairs:
+                            binding_chains_pairs.add(binding_chains_pair)
                             self.binding_chains_pairs.append(binding_chains_pair)
                     else:
                         # print(f"Interface {interface_id} already exists for molecule {mol_name}")
@@ -893,8 +804,8 @@ class PDBModel(Model):
         for group in self.chains_group:
             for i, chain_id in enumerate(group):
                 # determin the COM and interfaces of the corresponding molecule template
-                molecule_template = [mol_template for mol_template in self.molecules_template_list if mol_template.name == self.chains_map[chain_id]][0]
-                molecule_0 = [mol for mol in self.molecule_list if mol.name == group[0]][0]
+                molecule_template = self.molecules_template_list[self.molecule_template_index[self.chains_map[chain_id]]]
+                molecule_0 = self.molecule_list[self.molecule_index[group[0]]]
                 com_coord = molecule_0.coord
                 interface_coords = [interface_template.coord + com_coord for interface_template in molecule_template.interface_template_list]
                 interface_template_ids = [interface_template.name for interface_template in molecule_template.interface_template_list]
@@ -902,14 +813,14 @@ class PDBModel(Model):
                 # calculate the R and t for the rigid transformation
                 if i == 0:
                     # calculate the normal_point for this molecule
-                    molecule = [mol for mol in self.molecule_list if mol.name == chain_id][0]
+                    molecule = self.molecule_list[self.molecule_index[chain_id]]
                     molecule.normal_point = [com_coord.x, com_coord.y, com_coord.z + 1] # normal_point - COM is [0,0,1]
                     # no need to transform the first chain
                     continue
                 else:
-                    chain1 = self.all_chains[self.all_chains.index([chain for chain in self.all_chains if chain.id == group[0]][0])]
-                    chain2 = self.all_chains[self.all_chains.index([chain for chain in self.all_chains if chain.id == chain_id][0])]
-                    R, t = rigid_transform_chains(chain1, chain2)
+                    chain1 = self.all_chains[self.chain_index[group[0]]]
+                    chain2 = self.all_chains[self.chain_index[chain_id]]
+                    R, t = rigid_transform_chains(chain1, chain2, self._superposition_cache)
                     com_coord_transformed = apply_rigid_transform(R, t, np.array([com_coord.x, com_coord.y, com_coord.z]))
                     interface_coords_transformed = []
                     for interface_coord in interface_coords:
@@ -917,7 +828,7 @@ class PDBModel(Model):
                         interface_coords_transformed.append(interface_coord_transformed)
                     normal_point_transformed = apply_rigid_transform(R, t, np.array([com_coord.x, com_coord.y, com_coord.z + 1]))
                     # update the COM and interfaces of the molecule
-                    molecule = [mol for mol in self.molecule_list if mol.name == chain_id][0]
+                    molecule = self.molecule_list[self.molecule_index[chain_id]]
                     molecule.coord = Coords(com_coord_transformed[0], com_coord_transformed[1], com_coord_transformed[2])
                     for j, interface in enumerate(molecule.interface_list):
                         # find the corresponding interface template
@@ -935,6 +846,7 @@ class PDBModel(Model):
         self.molecules_template_list.sort(key=lambda mt: mt.name)
         self.interface_list.sort(key=lambda i: i.name)
         self.interface_template_list.sort(key=lambda it: it.name)
+        self._index_model()
 
         # print("binding chains pairs:")
         # for pair in self.binding_chains_pairs:
@@ -993,6 +905,67 @@ class PDBModel(Model):
             reaction.ka = 10.0 # nm^3/us
             reaction.kb = reaction.kd * reaction.ka * 0.6022 # /s
 
+    def assign_affinity_rates(self, scorer=None, temperature=298.15, workers=-1, cache_file=None, standard_output=False, **scorer_kwargs):
+        """Sets the rates of every reaction template from the binding free energy predicted by ProAffinity.
+
+        Each unique interface template (after `regularize_homologous_chains`) is scored once, on the
+        chain pair of its first reaction. The predicted dG replaces the energy of the template, and kd
+        and kb follow from it with the template's ka. Predictions are memoized by interface signature,
+        in memory and in `cache_file`, so rebuilding the model from the same structure reuses them.
+
+        Args:
+            scorer (ProAffinityScorer, optional): Loaded scorer; created with `scorer_kwargs` if None.
+            temperature (float, optional): Temperature in Kelvin. Defaults to 298.15.
+            workers (int, optional): Threads building the contact graphs; -1 uses all CPUs. Defaults to -1.
+            cache_file (str, optional): JSON file of the predictions. Defaults to `<save_dir>/<pdb_id>_affinities.json`.
+            standard_output (bool, optional): Whether to print the predicted energies. Defaults to False.
+            **scorer_kwargs: Passed to `ProAffinityScorer`, e.g. `model_dir` and `cache_dir`.
+
+        Raises:
+            ValueError: If the model has no reaction templates yet.
+        """
+        from .affinity import R, chain_residue_list, load_proaffinity_scorer, predict_interface_affinities
+
+        if not self.reaction_template_list:
+            raise ValueError("No reaction templates found. Run regularize_homologous_chains first.")
+        if scorer is None:
+            scorer = load_proaffinity_scorer(**scorer_kwargs)
+        if cache_file is None:
+            cache_file = os.path.join(self.save_dir, f"{self.pdb_id}_affinities.json")
+
+        # One chain pair per template
+        representatives = {}
+        for reaction in self.reaction_list:
+            representatives.setdefault(id(reaction.my_template), reaction)
+        templates = [template for template in self.reaction_template_list if id(template) in representatives]
+        residue_lists = {}
+        interfaces = []
+        for template in templates:
+            reaction = representatives[id(template)]
+            partners = []
+            for molecule, _ in reaction.reactants:
+                if molecule.name not in residue_lists:
+                    residue_lists[molecule.name] = chain_residue_list(self.all_chains[self.chain_index[molecule.name]])
+                partners.append([residue_lists[molecule.name]])
+            interfaces.append(tuple(partners))
+
+        dGs = predict_interface_affinities(scorer, interfaces, temperature=temperature, workers=workers, cache_file=cache_file)
+
+        for template, dG in zip(templates, dGs):
+            template.dG = float(dG) # kJ/mol
+            template.energy = template.dG / (R * temperature) # unit RT
+            template.kd = np.exp(template.energy) * 1e6 # unit uM
+            template.ka = getattr(template, 'ka', None) or 10.0 # nm^3/us
+            template.kb = template.kd * template.ka * 0.6022 # /s
+            if standard_output:
+                print(f"{template.expression}: dG = {template.dG:.2f} kJ/mol, kd = {template.kd:.3g} uM, kb = {template.kb:.3g} /s")
+        for reaction in self.reaction_list:
+            template = reaction.my_template
+            if hasattr(template, 'dG'):
+                reaction.energy, reaction.kd, reaction.ka, reaction.kb = template.energy, template.kd, template.ka, template.kb
+
+        self._generate_model_data()
+
     def _generate_model_data(self) -> None:
         """Generates molecule types and reactions and saves the model."""
         
@@ -1075,15 +1048,15 @@ class PDBModel(Model):
         for group in self.chains_group:
             for i, chain_id in enumerate(group):
                 # determin the COM and interfaces of the corresponding molecule template
-                molecule_template = [mol_template for mol_template in self.molecules_template_list if mol_template.name == self.chains_map[chain_id]][0]
-                molecule_0 = [mol for mol in self.molecule_list if mol.name == group[0]][0]
+                molecule_template = self.molecules_template_list[self.molecule_template_index[self.chains_map[chain_id]]]
+                molecule_0 = self.molecule_list[self.molecule_index[group[0]]]
                 com_coord = molecule_0.coord
                 interface_coords = [interface_template.coord + com_coord for interface_template in molecule_template.interface_template_list]
                 interface_template_ids = [interface_template.name for interface_template in molecule_template.interface_template_list]
 
-                chain1 = self.all_chains[self.all_chains.index([chain for chain in self.all_chains if chain.id == group[0]][0])]
-                chain2 = self.all_chains[self.all_chains.index([chain for chain in self.all_chains if chain.id == chain_id][0])]
-                R, t = rigid_transform_chains(chain1, chain2)
+                chain1 = self.all_chains[self.chain_index[group[0]]]
+                chain2 = self.all_chains[self.chain_index[chain_id]]
+                R, t = rigid_transform_chains(chain1, chain2, self._superposition_cache)
                 com_coord_transformed = apply_rigid_transform(R, t, np.array([com_coord.x, com_coord.y, com_coord.z]))
                 interface_coords_transformed = []
                 for interface_coord in interface_coords:
@@ -1091,7 +1064,7 @@ class PDBModel(Model):
                     interface_coords_transformed.append(interface_coord_transformed)
 
                 # add the interfaces in template but not in the molecule to the molecule
-                molecule = [mol for mol in self.molecule_list if mol.name == chain_id][0]
+                molecule = self.molecule_list[self.molecule_index[chain_id]]
                 molecule.coord = Coords(com_coord_transformed[0], com_coord_transformed[1], com_coord_transformed[2])
 
                 # Track existing interface template names in the molecule
@@ -1219,42 +1192,38 @@ class PDBModel(Model):
         the constraint.
         """
         for group in self.chains_group:
+            # interface templates of the chains before the current one in the group
+            seen_template_ids = set()
             for i, chain_id in enumerate(group):
+                if i > 0:
+                    previous_molecule = self.molecule_list[self.molecule_index[group[i - 1]]]
+                    seen_template_ids.update(interface.my_template.name for interface in previous_molecule.interface_list)
                 if i == 0:
                     continue
                 # find the molecule in the list
-                molecule = [mol for mol in self.molecule_list if mol.name == chain_id][0]
+                molecule = self.molecule_list[self.molecule_index[chain_id]]
                 # loop the interfaces list of the molecule
                 for interface in molecule.interface_list:
                     # determine if this interface appears first time
                     interface_id = interface.name
                     interface_template_id = interface.my_template.name
-                    first_appearance = True
-                    for j in range(i):
-                        chain_id_2 = group[j]
-                        molecule_2 = [mol for mol in self.molecule_list if mol.name == chain_id_2][0]
-                        for interface_2 in molecule_2.interface_list:
-                            interface_id_2 = interface_2.name
-                            interface_template_id_2 = interface_2.my_template.name
-                            if interface_template_id == interface_template_id_2:
-                                first_appearance = False
-                                break
+                    first_appearance = interface_template_id not in seen_template_ids
                     if first_appearance:
                         # check the steric clashes between the partner to this interface and partner to the partners to other interfaces of previous chains; two interfaces belong to different interface tempalte
                         my_partner_chain_id = interface_id
-                        my_partner_chain = self.all_chains[self.all_chains.index([chain for chain in self.all_chains if chain.id == my_partner_chain_id][0])]
-                        my_chain = self.all_chains[self.all_chains.index([chain for chain in self.all_chains if chain.id == chain_id][0])]
+                        my_partner_chain = self.all_chains[self.chain_index[my_partner_chain_id]]
+                        my_chain = self.all_chains[self.chain_index[chain_id]]
                         for j in range(i):
                             chain_id_2 = group[j]
-                            molecule_2 = [mol for mol in self.molecule_list if mol.name == chain_id_2][0]
+                            molecule_2 = self.molecule_list[self.molecule_index[chain_id_2]]
                             for interface_2 in molecule_2.interface_list:
                                 interface_id_2 = interface_2.name
                                 interface_template_id_2 = interface_2.my_template.name
                                 if interface_template_id != interface_template_id_2:
                                     another_partner_chain_id = interface_id_2
-                                    another_partner_chain = self.all_chains[self.all_chains.index([chain for chain in self.all_chains if chain.id == another_partner_chain_id][0])]
-                                    another_chain = self.all_chains[self.all_chains.index([chain for chain in self.all_chains if chain.id == chain_id_2][0])]
-                                    R, t = rigid_transform_chains(my_chain, another_chain)
+                                    another_partner_chain = self.all_chains[self.chain_index[another_partner_chain_id]]
+                                    another_chain = self.all_chains[self.chain_index[chain_id_2]]
+                                    R, t = rigid_transform_chains(my_chain, another_chain, self._superposition_cache)
                                     # rotate the CA atoms of my_partner_chain and check the steric clashes with CA atoms of another_partner_chain
                                     my_partner_chain_CA_coords = []
                                     for residue in my_partner_chain:
@@ -1270,7 +1239,7 @@ class PDBModel(Model):
                                             another_partner_chain_CA_coords.append(residue['CA'].coord)
                                     if check_steric_clashes(np.array(my_partner_chain_CA_coords_transformed), np.array(another_partner_chain_CA_coords)):
                                         molecule_template_id = self.chains_map[chain_id]
-                                        molecule_template = [mol_template for mol_template in self.molecules_template_list if mol_template.name == molecule_template_id][0]
+                                        molecule_template = self.molecules_template_list[self.molecule_template_index[molecule_template_id]]
                                         interface_template_1 = [interface_template for interface_template in molecule_template.interface_template_list if interface_template.name == interface_template_id][0]
                                         interface_template_2 = [interface_template for interface_template in molecule_template.interface_template_list if interface_template.name == interface_template_id_2][0]
                                         if interface_template_id not in interface_template_2.required_free_list:
@@ -1291,11 +1260,15 @@ class PDBModel(Model):
         4. Constructs `Reaction` objects and updates the `reaction_list`.
         5. Ensures `ReactionTemplate` objects exist, creating them if necessary.
         """
+        reaction_templates = {}
+        for reaction_template in self.reaction_template_list:
+            reaction_templates.setdefault(tuple(reaction_template.reactants), reaction_template)
+
         for binding_pair in self.binding_chains_pairs:
-            molecule_1 = [mol for mol in self.molecule_list if mol.name == binding_pair[0]][0]
-            molecule_2 = [mol for mol in self.molecule_list if mol.name == binding_pair[1]][0]
-            interface_1 = [interface for interface in molecule_1.interface_list if interface.name == binding_pair[1]][0]
-            interface_2 = [interface for interface in molecule_2.interface_list if interface.name == binding_pair[0]][0]
+            molecule_1 = self.molecule_list[self.molecule_index[binding_pair[0]]]
+            molecule_2 = self.molecule_list[self.molecule_index[binding_pair[1]]]
+            interface_1 = molecule_1.interface_list[self.interface_index[(molecule_1.name, binding_pair[1])]]
+            interface_2 = molecule_2.interface_list[self.interface_index[(molecule_2.name, binding_pair[0])]]
 
             # build the reaction
             reaction = Reaction()
@@ -1366,26 +1339,24 @@ class PDBModel(Model):
             else:
                 reactants.append(f"{molecule_2_template_id}({interface_2_template_id})")
                 reactants.append(f"{molecule_1_template_id}({interface_1_template_id})")
-            existed = False
-            for reaction_template in self.reaction_template_list:
-                if reaction_template.reactants == reactants:
-                    existed = True
-                    self.reaction_list[-1].my_template = reaction_template
-                    # print("My Reaction Template:")
-                    # print(reaction_template.expression)
-                    # print("Template Angles:")
-                    # print(reaction_template.binding_angles)
-                    # print("Template Sigma:")
-                    # print(reaction_template.binding_radius)
-                    break
-            if not existed:
+            existed = tuple(reactants) in reaction_templates
+            if existed:
+                reaction_template = reaction_templates[tuple(reactants)]
+                self.reaction_list[-1].my_template = reaction_template
+                # print("My Reaction Template:")
+                # print(reaction_template.expression)
+                # print("Template Angles:")
+                # print(reaction_template.binding_angles)
+                # print("Template Sigma:")
+                # print(reaction_template.binding_radius)
+            else:
                 reaction_template = ReactionTemplate()
                 reaction_template.reactants = reactants
                 reaction_template.products = []
                 reaction_template.products.append(f"{molecule_1_template_id}({interface_1_template_id}!1).{molecule_2_template_id}({interface_2_template_id}!1)")
                 # reactants and products do not include the interfaces that need to be free, but the expression does
                 free_list_1 = ""
-                molecule_template_1 = [mol_template for mol_template in self.molecules_template_list if mol_template.name == molecule_1_template_id][0]
+                molecule_template_1 = self.molecules_template_list[self.molecule_template_index[molecule_1_template_id]]
                 interface_template_1 = [interface_template for interface_template in molecule_template_1.interface_template_list if interface_template.name == interface_1_template_id][0]
                 free_interface_template_list_1 = interface_template_1.required_free_list
                 for free_interface in free_interface_template_list_1:
@@ -1393,7 +1364,7 @@ class PDBModel(Model):
                 tmp_reactant_1 = f"{molecule_1_template_id}({interface_1_template_id}{free_list_1})"
 
                 free_list_2 = ""
-                molecule_template_2 = [mol_template for mol_template in self.molecules_template_list if mol_template.name == molecule_2_template_id][0]
+                molecule_template_2 = self.molecules_template_list[self.molecule_template_index[molecule_2_template_id]]
                 interface_template_2 = [interface_template for interface_template in molecule_template_2.interface_template_list if interface_template.name == interface_2_template_id][0]
                 free_interface_template_list_2 = interface_template_2.required_free_list
                 for free_interface in free_interface_template_list_2:
@@ -1415,6 +1386,7 @@ class PDBModel(Model):
                 reaction_template.energy = reaction.energy
 
                 self.reaction_template_list.append(reaction_template)
+                reaction_templates[tuple(reactants)] = reaction_template
                 self.reaction_list[-1].my_template = reaction_template
                 # print("My Reaction Template:")
                 # print(reaction_template.expression)
@@ -1475,6 +1447,39 @@ class PDBModel(Model):
             total_diff += abs(sig1[key] - sig2[key]) / denom
         return total_diff
     
+    def _index_model(self):
+        """
+        Rebuilds the lookups from chain ID, molecule name, molecule template name and
+        (molecule name, interface name) to positions in `all_chains`, `molecule_list`,
+        `molecules_template_list` and each molecule's `interface_list`. The first of
+        several entries with the same name wins, as with a list scan.
+        """
+        def first_positions(items, key):
+            return {key(item): i for i, item in reversed(list(enumerate(items)))}
+
+        self.chain_index = first_positions(self.all_chains, lambda chain: chain.id)
+        self.molecule_index = first_positions(self.molecule_list, lambda mol: mol.name)
+        self.molecule_template_index = first_positions(self.molecules_template_list, lambda mol_temp: mol_temp.name)
+        self.interface_index = {}
+        for molecule in self.molecule_list:
+            for i, interface in enumerate(molecule.interface_list):
+                self.interface_index.setdefault((molecule.name, interface.name), i)
+
+    def _add_molecule_template(self, molecule_template):
+        """Appends a molecule template to `molecules_template_list` and indexes it."""
+        self.molecule_template_index.setdefault(molecule_template.name, len(self.molecules_template_list))
+        self.molecules_template_list.append(molecule_template)
+
+    def _add_molecule(self, molecule):
+        """Appends a molecule to `molecule_list` and indexes it."""
+        self.molecule_index.setdefault(molecule.name, len(self.molecule_list))
+        self.molecule_list.append(molecule)
+
+    def _add_interface(self, molecule, interface):
+        """Appends an interface to the interface list of `molecule` and indexes it."""
+        self.interface_index.setdefault((molecule.name, interface.name), len(molecule.interface_list))
+        molecule.interface_list.append(interface)
+
     def _is_existing_mol_temp(self, mol_temp_name):
         """
         Checks if a molecule template with the given name exists in the molecule template list.
@@ -1487,10 +1492,8 @@ class PDBModel(Model):
                 - True and index if the template exists.
                 - False and None otherwise.
         """
-        for i, mol_temp in enumerate(self.molecules_template_list):
-            if mol_temp.name == mol_temp_name:
-                return True, i
-        return False, None
+        i = self.molecule_template_index.get(mol_temp_name)
+        return (True, i) if i is not None else (False, None)
     
     def _is_existing_mol(self, mol_name):
         """
@@ -1504,10 +1507,8 @@ class PDBModel(Model):
                 - True and index if the molecule exists.
                 - False and None otherwise.
         """
-        for i, mol in enumerate(self.molecule_list):
-            if mol.name == mol_name:
-                return True, i
-        return False, None
+        i = self.molecule_index.get(mol_name)
+        return (True, i) if i is not None else (False, None)
     
     def _is_existing_interface(self, interface_name, molecule):
         """
@@ -1522,10 +1523,8 @@ class PDBModel(Model):
                 - True and index if the interface exists.
                 - False and None otherwise.
         """
-        for i, interface in enumerate(molecule.interface_list):
-            if interface.name == interface_name:
-                return True, i
-        return False, None
+        i = self.interface_index.get((molecule.name, interface_name))
+        return (True, i) if i is not None else (False, None)
     
     def _is_existing_sig(self, sig, dist_threshold_intra=2.5, dist_threshold_inter=2.5, angle_threshold=25.0):
         """
@@ -1540,6 +1539,11 @@ class PDBModel(Model):
         Returns:
             bool: True if the signature exists, False otherwise.
         """
+        index = getattr(self, "signature_index", None)
+        if index is not None and len(index) == len(self.interface_signatures) and \
+                (index.dist_threshold_intra, index.dist_threshold_inter, index.angle_threshold) == \
+                (dist_threshold_intra, dist_threshold_inter, angle_threshold):
+            return index.has_similar(sig)
         for existing_sig in self.interface_signatures:
             if self._sig_are_similar(sig, existing_sig, dist_threshold_intra=dist_threshold_intra, dist_threshold_inter=dist_threshold_inter, angle_threshold=angle_threshold):
                 return True
@@ -1773,68 +1777,51 @@ class PDBModel(Model):
                 percentage to classify chains as homologous. Defaults to 90.0.
         """
         try:
-            similar_chains = []
             chains = [chain for chain in self.all_atoms_structure.get_chains() 
                 if any(is_aa(residue) for residue in chain.get_residues())]
-            chain_sequences = {}
 
+            # Bucket chains by exact sequence; only distinct sequences are aligned
+            sequences = []
+            bucket_of_sequence = {}
+            chain_buckets = []
             for chain in chains:
-                sequence = "".join(seq1(residue.resname) for residue in chain.get_residues() if is_aa(residue))
-                chain_sequences[chain.id] = sequence
-
-            # Set up the aligner with the same settings as pairwise2.align.globalxx
-            aligner = PairwiseAligner()
-            aligner.mode = 'global'
-            aligner.match_score = 1.0
-            aligner.mismatch_score = 0.0
-            aligner.open_gap_score = -1.0
-            aligner.extend_gap_score = -0.5
-
-            for i, chain1 in enumerate(chains):
-                for j, chain2 in enumerate(chains):
-                    if i >= j:
+                sequence = chain_sequence(chain)
+                if sequence not in bucket_of_sequence:
+                    bucket_of_sequence[sequence] = len(sequences)
+                    sequences.append(sequence)
+                chain_buckets.append(bucket_of_sequence[sequence])
+            chain_buckets = np.array(chain_buckets, dtype=np.int64)
+            bucket_sizes = np.bincount(chain_buckets, minlength=len(sequences))
+
+            # Buckets linked by similar sequences; identical non-empty sequences are 100% identical
+            parent = list(range(len(sequences)))
+
+            def find(bucket):
+                while parent[bucket] != bucket:
+                    parent[bucket] = parent[parent[bucket]]
+                    bucket = parent[bucket]
+                return bucket
+
+            has_partner = np.array([bucket_sizes[b] > 1 and len(sequences[b]) > 0 and 100.0 >= seq_identity_threshold
+                                    for b in range(len(sequences))], dtype=bool)
+            for b1 in range(len(sequences)):
+                for b2 in range(b1 + 1, len(sequences)):
+                    if sequence_identity(sequences[b1], sequences[b2]) < seq_identity_threshold:
                         continue
+                    has_partner[b1] = has_partner[b2] = True
+                    parent[find(b2)] = find(b1)
 
-                    seq1_chain = chain_sequences[chain1.id]
-                    seq2_chain = chain_sequences[chain2.id]
-
-                    # Calculate sequence length for identity calculation
-                    max_length = max(len(seq1_chain), len(seq2_chain))
-                    if max_length == 0:
-                        continue
-
-                    # Get alignment
-                    alignment = aligner.align(seq1_chain, seq2_chain)[0]
-                    
-                    # Calculate identity percentage
-                    matches = sum(a == b for a, b in zip(alignment[0], alignment[1]) 
-                                if a != '-' and b != '-')
-                    identity = (matches / max_length) * 100
-
-                    if identity < seq_identity_threshold:
-                        continue
-                    similar_chains.append((chain1.id, chain2.id))
-
-            graph = defaultdict(set)
-            for chain1, chain2 in similar_chains:
-                graph[chain1].add(chain2)
-                graph[chain2].add(chain1)
-
-            visited = set()
+            # Chains with a similar partner, grouped by component in order of their first chain
             groups = []
-
-            def dfs(chain, group):
-                visited.add(chain)
-                group.add(chain)
-                for neighbor in graph[chain]:
-                    if neighbor not in visited:
-                        dfs(neighbor, group)
-
-            for chain in graph:
-                if chain not in visited:
-                    group = set()
-                    dfs(chain, group)
-                    groups.append(list(group))
+            group_of_root = {}
+            for chain, bucket in zip(chains, chain_buckets.tolist()):
+                if not has_partner[bucket]:
+                    continue
+                root = find(bucket)
+                if root not in group_of_root:
+                    group_of_root[root] = len(groups)
+                    groups.append([])
+                groups[group_of_root[root]].append(chain.id)
             self.chains_group = groups
             available_NERDSS_mol_ids = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z']
             for i, chains in enumerate(groups):
@@ -2167,7 +2154,100 @@ def apply_rigid_transform(r: np.ndarray, t: np.ndarray, point: np.ndarray):
     return (r @ point.T).T + t
 
 
-def rigid_transform_chains(chain1, chain2):
+@lru_cache(maxsize=None)
+def _one_letter_code(resname: str) -> str:
+    """Memoized `seq1` of a single residue name."""
+    return seq1(resname)
+
+
+def chain_sequence(chain) -> str:
+    """
+    One-letter amino acid sequence of a chain.
+
+    Args:
+        chain (Bio.PDB.Chain.Chain): Molecular chain.
+
+    Returns:
+        str: Sequence of the residues accepted by `is_aa`.
+    """
+    return "".join(_one_letter_code(residue.resname) for residue in chain.get_residues() if is_aa(residue))
+
+
+def _global_aligner() -> PairwiseAligner:
+    """Global aligner with the scoring of pairwise2.align.globalxx plus gap penalties."""
+    aligner = PairwiseAligner()
+    aligner.mode = 'global'
+    aligner.match_score = 1.0
+    aligner.mismatch_score = 0.0
+    aligner.open_gap_score = -1.0
+    aligner.extend_gap_score = -0.5
+    return aligner
+
+
+@lru_cache(maxsize=4096)
+def align_sequences(sequence1: str, sequence2: str):
+    """
+    Best global alignment of two sequences, cached by sequence pair.
+
+    Args:
+        sequence1 (str): First sequence.
+        sequence2 (str): Second sequence.
+
+    Returns:
+        tuple: The two aligned sequences, with '-' for gaps.
+    """
+    alignment = _global_aligner().align(sequence1, sequence2)[0]
+    return alignment[0], alignment[1]
+
+
+@lru_cache(maxsize=4096)
+def sequence_identity(sequence1: str, sequence2: str) -> float:
+    """
+    Percentage of aligned identical residues relative to the longer sequence.
+
+    Args:
+        sequence1 (str): First sequence.
+        sequence2 (str): Second sequence.
+
+    Returns:
+        float: Identity in percent; 0 if both sequences are empty.
+    """
+    max_length = max(len(sequence1), len(sequence2))
+    if max_length == 0:
+        return 0.0
+    aligned1, aligned2 = align_sequences(sequence1, sequence2)
+    matches = sum(a == b for a, b in zip(aligned1, aligned2) if a != '-' and b != '-')
+    return (matches / max_length) * 100
+
+
+@lru_cache(maxsize=4096)
+def residue_correspondence(sequence1: str, sequence2: str):
+    """
+    Residues paired by the global alignment of two sequences.
+
+    Args:
+        sequence1 (str): First sequence.
+        sequence2 (str): Second sequence.
+
+    Returns:
+        tuple:
+            - np.ndarray: Indices into `sequence1` of the aligned residue pairs.
+            - np.ndarray: Indices into `sequence2` of the aligned residue pairs.
+    """
+    aligned1, aligned2 = align_sequences(sequence1, sequence2)
+    gapped1 = np.frombuffer(aligned1.encode(), dtype=np.uint8) == ord('-')
+    gapped2 = np.frombuffer(aligned2.encode(), dtype=np.uint8) == ord('-')
+    paired = ~gapped1 & ~gapped2
+    # Position of each column in its ungapped sequence
+    indices1 = np.cumsum(~gapped1) - 1
+    indices2 = np.cumsum(~gapped2) - 1
+    indices1, indices2 = indices1[paired], indices2[paired]
+    indices1.flags.writeable = False
+    indices2.flags.writeable = False
+    return indices1, indices2
+
+
+def rigid_transform_chains(chain1, chain2, cache: dict = None):
     """
     Aligns chain1 to chain2 by:
     1. Extracting amino acid sequences.
@@ -2176,9 +2256,15 @@ def rigid_transform_chains(chain1, chain2):
     4. Computing a coarse-grained set of representative points.
     5. Computing a rigid transformation.
 
+    Alignments and residue correspondences are cached by sequence pair. With
+    `cache`, the grouping of the matching residues into representative points
+    is computed once per sequence pair and reused for every other pair of
+    chains with the same sequences.
+
     Args:
         chain1 (Bio.PDB.Chain.Chain): First molecular chain.
         chain2 (Bio.PDB.Chain.Chain): Second molecular chain.
+        cache (dict, optional): Residue groupings by sequence pair, filled on first use.
 
     Returns:
         tuple:
@@ -2187,61 +2273,27 @@ def rigid_transform_chains(chain1, chain2):
     """
 
     # Step 1: Extract sequences from both chains
-    def extract_sequence(chain):
-        """Extracts the amino acid sequence from a chain."""
-        return "".join(seq1(residue.resname) for residue in chain.get_residues() if is_aa(residue))
-
-    sequence1 = extract_sequence(chain1)
-    sequence2 = extract_sequence(chain2)
+    sequence1 = chain_sequence(chain1)
+    sequence2 = chain_sequence(chain2)
 
-    # Step 2: Find the best overlap between the two sequences using PairwiseAligner
-    aligner = PairwiseAligner()
-    aligner.mode = 'global'
-    aligner.match_score = 1.0
-    aligner.mismatch_score = 0.0
-    aligner.open_gap_score = -1.0
-    aligner.extend_gap_score = -0.5
-    
-    alignments = aligner.align(sequence1, sequence2)
-    alignment = alignments[0]  # Get the best alignment
-
-    aligned_seq1 = alignment[0]
-    aligned_seq2 = alignment[1]
-
-    # Step 3: Identify matching residue pairs in the aligned sequences
-    residue_pairs = []
-    idx1, idx2 = 0, 0
+    # Step 2 and 3: Find the best overlap between the two sequences and the matching residue pairs
+    indices1, indices2 = residue_correspondence(sequence1, sequence2)
     residues1 = [res for res in chain1 if is_aa(res)]
     residues2 = [res for res in chain2 if is_aa(res)]
-
-    for a1, a2 in zip(aligned_seq1, aligned_seq2):
-        if a1 == '-' or a2 == '-':
-            if a1 != '-':
-                idx1 += 1
-            if a2 != '-':
-                idx2 += 1
-            continue
-        residue_pairs.append((residues1[idx1]['CA'].coord, residues2[idx2]['CA'].coord))
-        idx1 += 1
-        idx2 += 1
+    coords1 = np.array([residues1[i]['CA'].coord for i in indices1]).reshape(-1, 3)
+    coords2 = np.array([residues2[i]['CA'].coord for i in indices2]).reshape(-1, 3)
 
     # Step 4: Group residues into four spatially groups
-    def group_residues(residues, n_groups=4):
-        """Groups residues into n_groups based on their spatial proximity."""
-        coords = np.array([res for res, _ in residues])
-        kmeans = KMeans(n_clusters=n_groups).fit(coords)
-        groups = [[] for _ in range(n_groups)]
-        for i, label in enumerate(kmeans.labels_):
-            groups[label].append(residues[i])
-        return groups
-
-    groups = group_residues(residue_pairs)
+    n_groups = 4
+    labels = cache.get((sequence1, sequence2)) if cache is not None else None
+    if labels is None:
+        labels = KMeans(n_clusters=n_groups).fit(coords1).labels_
+        if cache is not None:
+            cache[(sequence1, sequence2)] = labels
 
     # Step 5: Compute the average position of each group and COM
-    P = [np.mean([res[0] for res in group], axis=0) for group in groups]
-    Q = [np.mean([res[1] for res in group], axis=0) for group in groups]
-    P.insert(0, np.mean([res[0] for res in residue_pairs], axis=0))
-    Q.insert(0, np.mean([res[1] for res in residue_pairs], axis=0))
+    P = [coords1.mean(axis=0)] + [coords1[labels == group].mean(axis=0) for group in range(n_groups)]
+    Q = [coords2.mean(axis=0)] + [coords2[labels == group].mean(axis=0) for group in range(n_groups)]
 
     P = np.array(P)
     Q = np.array(Q)
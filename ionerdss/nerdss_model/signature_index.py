@@ -0,0 +1,99 @@
+"""Hashed index of interface geometry signatures.
+
+``regularize_homologous_chains`` decides whether an interface is new by
+comparing its signature (``dA``, ``dB``, ``dAB``, ``thetaA``, ``thetaB``)
+against every signature seen so far. ``SignatureIndex`` hashes the three
+distances onto a grid whose cells are twice the matching thresholds, so
+every similar signature lies in the same or an adjacent cell and a lookup
+only compares against the signatures in those 27 cells.
+"""
+
+import math
+from itertools import product
+
+# Hashed keys and the threshold that applies to each
+_GRID_KEYS = (("dA", "intra"), ("dB", "intra"), ("dAB", "inter"))
+
+
+class SignatureIndex:
+    """Signatures bucketed by their distances for fast similarity lookups.
+
+    Similarity is the rule of ``PDBModel._sig_are_similar``: every distance
+    and angle differs by at most its threshold.
+
+    Attributes:
+        dist_threshold_intra (float): Threshold on ``dA`` and ``dB``.
+        dist_threshold_inter (float): Threshold on ``dAB``.
+        angle_threshold (float): Threshold on ``thetaA`` and ``thetaB``.
+        signatures (list): Signatures added so far, in order.
+    """
+
+    def __init__(self, dist_threshold_intra: float, dist_threshold_inter: float, angle_threshold: float):
+        self.dist_threshold_intra = dist_threshold_intra
+        self.dist_threshold_inter = dist_threshold_inter
+        self.angle_threshold = angle_threshold
+        self.signatures = []
+        self._cells = {}
+        thresholds = {"intra": dist_threshold_intra, "inter": dist_threshold_inter}
+        # Twice the threshold, so rounding in the division can never push a match two cells away
+        self._cell_sizes = [2.0 * thresholds[kind] for _, kind in _GRID_KEYS]
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def _cell(self, sig):
+        # A zero threshold only matches equal values: key on the value itself
+        return tuple(math.floor(sig[key] / size) if size > 0 else sig[key]
+                     for (key, _), size in zip(_GRID_KEYS, self._cell_sizes))
+
+    def matches(self, sig1, sig2) -> bool:
+        """Whether two signatures are similar within the thresholds of the index."""
+        for key in ("dA", "dB"):
+            if abs(sig1[key] - sig2[key]) > self.dist_threshold_intra:
+                return False
+        if abs(sig1["dAB"] - sig2["dAB"]) > self.dist_threshold_inter:
+            return False
+        for key in ("thetaA", "thetaB"):
+            if abs(sig1[key] - sig2[key]) > self.angle_threshold:
+                return False
+        return True
+
+    def add(self, sig):
+        """Adds a signature to the index.
+
+        Args:
+            sig (dict): Interface signature.
+        """
+        self._cells.setdefault(self._cell(sig), []).append(len(self.signatures))
+        self.signatures.append(sig)
+
+    def _similar_positions(self, sig):
+        center = self._cell(sig)
+        offsets = [(-1, 0, 1) if size > 0 else (0,) for size in self._cell_sizes]
+        for shift in product(*offsets):
+            cell = tuple(c + s for c, s in zip(center, shift))
+            for position in self._cells.get(cell, ()):
+                if self.matches(sig, self.signatures[position]):
+                    yield position
+
+    def find_similar(self, sig) -> list:
+        """Signatures similar to ``sig``, in the order they were added.
+
+        Args:
+            sig (dict): Interface signature.
+
+        Returns:
+            list: The similar signatures.
+        """
+        return [self.signatures[position] for position in sorted(self._similar_positions(sig))]
+
+    def has_similar(self, sig) -> bool:
+        """Whether a signature similar to ``sig`` was added.
+
+        Args:
+            sig (dict): Interface signature.
+
+        Returns:
+            bool: True if a similar signature exists.
+        """
+        return next(self._similar_positions(sig), None) is not None
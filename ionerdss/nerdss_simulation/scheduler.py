@@ -0,0 +1,316 @@
+"""Bounded-concurrency scheduler for NERDSS runs.
+
+Every run is one NERDSS process in its own directory. ``SimulationScheduler``
+keeps at most ``max_concurrent`` of them running: each slot is a worker
+thread that stages a run, starts the process and blocks in ``wait()`` until
+it exits, so queued runs start as soon as a slot frees up and nothing sleeps
+in a polling loop. Exit codes, start and end times of every run are written
+to a JSON manifest after each change, which lets an interrupted sweep be
+resumed without re-running the indices that already finished.
+
+``stage_run_dir`` prepares a run directory. Files shared by every run (the
+NERDSS executable, the .mol files) can be hardlinked or symlinked instead of
+copied, so a sweep of thousands of runs does not store thousands of copies.
+"""
+
+import os
+import json
+import time
+import threading
+import subprocess
+import shutil
+import concurrent.futures
+from typing import Callable, Dict, List, Optional
+
+MANIFEST_VERSION = 1
+STAGING_MODES = ("copy", "hardlink", "symlink")
+
+
+def stage_run_dir(run_dir: str, shared_files: List[str], run_files: List[str], mode: str = "copy") -> Dict:
+    """Places the input files of a run in its directory.
+
+    Existing files of the same name are replaced, never written through, so a
+    link from a previous staging does not redirect a copy into the source file.
+    When a hardlink cannot be made (e.g. `run_dir` is on another filesystem),
+    the file is copied instead.
+
+    Args:
+        run_dir (str): Directory of the run, created if needed.
+        shared_files (List[str]): Read-only files identical for every run; linked unless `mode` is "copy".
+        run_files (List[str]): Files that may differ between runs; always copied.
+        mode (str, optional): "copy", "hardlink" or "symlink". Defaults to "copy".
+
+    Returns:
+        Dict: The staging `mode` and the names of the `linked` and `copied` files.
+
+    Raises:
+        ValueError: If `mode` is unknown.
+    """
+    if mode not in STAGING_MODES:
+        raise ValueError(f"Unknown staging mode '{mode}'. Use one of {', '.join(STAGING_MODES)}.")
+    os.makedirs(run_dir, exist_ok=True)
+    linked, copied = [], []
+    files = [(source, True) for source in shared_files] + [(source, False) for source in run_files]
+    for source, shared in files:
+        name = os.path.basename(source)
+        target = os.path.join(run_dir, name)
+        if os.path.lexists(target):
+            os.remove(target)
+        if shared and mode != "copy":
+            try:
+                if mode == "hardlink":
+                    os.link(source, target)
+                else:
+                    os.symlink(os.path.abspath(source), target)
+                linked.append(name)
+                continue
+            except OSError:
+                pass
+        shutil.copy(source, target)
+        copied.append(name)
+    return {"mode": mode, "linked": linked, "copied": copied}
+
+
+class RunRecord:
+    """State of one scheduled run.
+
+    Attributes:
+        index (int): Simulation index.
+        run_dir (str): Directory the process runs in.
+        cmd (List[str]): Command line of the process.
+        log_file (str): File in `run_dir` receiving stdout and stderr.
+        status (str): "queued", "running", "completed", "failed", "skipped" or "cancelled".
+        returncode (Optional[int]): Exit code of the process, None if it did not run or could not start.
+        start_time (Optional[float]): Time the process started (seconds since the epoch).
+        end_time (Optional[float]): Time the process exited.
+        error (Optional[str]): Why the run could not be staged or started.
+        staging (dict): What ``prepare`` reports about the staged files.
+    """
+
+    def __init__(self, index: int, run_dir: str, cmd: List[str], prepare: Optional[Callable] = None, log_file: str = "output.log"):
+        self.index = index
+        self.run_dir = run_dir
+        self.cmd = list(cmd)
+        self.prepare = prepare
+        self.log_file = log_file
+        self.status = "queued"
+        self.returncode = None
+        self.start_time = None
+        self.end_time = None
+        self.error = None
+        self.staging = {}
+
+    @property
+    def wall_time(self) -> Optional[float]:
+        """Seconds the process ran, or None if it has not finished."""
+        if self.start_time is None or self.end_time is None:
+            return None
+        return self.end_time - self.start_time
+
+    def to_dict(self) -> Dict:
+        return {
+            "run_dir": self.run_dir,
+            "cmd": self.cmd,
+            "status": self.status,
+            "returncode": self.returncode,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "wall_time": self.wall_time,
+            "error": self.error,
+            "staging": self.staging,
+        }
+
+    def __repr__(self) -> str:
+        return f"RunRecord(index={self.index}, status={self.status!r}, returncode={self.returncode}, wall_time={self.wall_time})"
+
+
+class SimulationScheduler:
+    """Runs queued NERDSS processes with a fixed number of slots.
+
+    Attributes:
+        max_concurrent (int): Number of runs executing at the same time.
+        manifest_path (Optional[str]): JSON file recording every run, or None.
+        label (str): Name of a run in printed messages.
+        verbose (bool): Whether to print when runs start and finish.
+
+    Example:
+        >>> scheduler = SimulationScheduler(max_concurrent=32, manifest_path="nerdss_output/sweep_manifest.json")
+        >>> for index in range(1, 201):
+        ...     scheduler.submit(index, f"nerdss_output/{index}", ["./nerdss", "-f", "parms.inp"], prepare=stage)
+        >>> records = scheduler.run(resume=True)
+        >>> failed = [r.index for r in records.values() if r.status == "failed"]
+    """
+
+    def __init__(self, max_concurrent: int = None, manifest_path: str = None, label: str = "Simulation", verbose: bool = True):
+        """Initializes the scheduler.
+
+        Args:
+            max_concurrent (int, optional): Number of slots. Defaults to the number of CPUs.
+            manifest_path (str, optional): JSON file recording the runs. Defaults to None.
+            label (str, optional): Name of a run in printed messages. Defaults to "Simulation".
+            verbose (bool, optional): Whether to print when runs start and finish. Defaults to True.
+
+        Raises:
+            ValueError: If `max_concurrent` is less than 1.
+        """
+        if max_concurrent is None:
+            max_concurrent = os.cpu_count() or 1
+        if max_concurrent < 1:
+            raise ValueError(f"max_concurrent must be at least 1, got {max_concurrent}.")
+        self.max_concurrent = max_concurrent
+        self.manifest_path = manifest_path
+        self.label = label
+        self.verbose = verbose
+        self.records: Dict[int, RunRecord] = {}
+        self._recorded_runs = {}
+        self._processes: Dict[int, subprocess.Popen] = {}
+        self._lock = threading.Lock()
+        self._stopping = False
+
+    def submit(self, index: int, run_dir: str, cmd: List[str], prepare: Callable = None, log_file: str = "output.log") -> RunRecord:
+        """Queues a run.
+
+        Args:
+            index (int): Simulation index, unique within the scheduler.
+            run_dir (str): Directory the process runs in.
+            cmd (List[str]): Command line of the process.
+            prepare (Callable, optional): Called just before the process starts, e.g. to stage
+                the input files. A returned dict is recorded as the run's staging information.
+            log_file (str, optional): File in `run_dir` receiving stdout and stderr. Defaults to "output.log".
+
+        Returns:
+            RunRecord: The queued run.
+        """
+        record = RunRecord(index, run_dir, cmd, prepare, log_file)
+        self.records[index] = record
+        return record
+
+    def load_manifest(self) -> Dict:
+        """Runs recorded in the manifest, keyed by index as a string; empty if there is none."""
+        if self.manifest_path is None or not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, "r") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: ignoring unreadable manifest {self.manifest_path}: {e}")
+            return {}
+        if manifest.get("version") != MANIFEST_VERSION:
+            return {}
+        return manifest.get("runs", {})
+
+    def _save_manifest(self):
+        """Writes the manifest; a failed write is reported and never interrupts the runs."""
+        if self.manifest_path is None:
+            return
+        with self._lock:
+            runs = self._recorded_runs
+            for index, record in self.records.items():
+                if record.status != "skipped":
+                    runs[str(index)] = record.to_dict()
+            tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_path, "w") as f:
+                    json.dump({"version": MANIFEST_VERSION, "runs": runs}, f, indent=1)
+                os.replace(tmp_path, self.manifest_path)
+            except (OSError, TypeError, ValueError) as e:
+                print(f"Warning: could not write manifest {self.manifest_path}: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def _execute(self, record: RunRecord) -> RunRecord:
+        if self._stopping:
+            record.status = "cancelled"
+            return record
+        process = None
+        try:
+            if record.prepare is not None:
+                staging = record.prepare() or {}
+                json.dumps(staging)  # the manifest must be able to record it
+                record.staging = staging
+            with open(os.path.join(record.run_dir, record.log_file), "w") as log_file:
+                process = subprocess.Popen(record.cmd, cwd=record.run_dir, stdout=log_file, stderr=log_file)
+        except Exception as e:
+            # Staging or starting failed: fail this run only
+            record.error = f"{type(e).__name__}: {e}"
+        if process is not None:
+            record.start_time = time.time()
+            record.status = "running"
+            with self._lock:
+                self._processes[record.index] = process
+            try:
+                if self.verbose:
+                    print(f"Running {self.label.lower()} {record.index}...")
+                self._save_manifest()
+            finally:
+                # A started process is always waited on
+                record.returncode = process.wait()
+                with self._lock:
+                    self._processes.pop(record.index, None)
+        record.end_time = time.time()
+        record.status = "completed" if record.returncode == 0 else "failed"
+        if self.verbose:
+            if record.status == "completed":
+                print(f"{self.label} {record.index} completed in {record.wall_time:.1f} s.")
+            else:
+                print(f"{self.label} {record.index} failed (exit code {record.returncode}{', ' + record.error if record.error else ''}).")
+        self._save_manifest()
+        return record
+
+    def running(self) -> List[RunRecord]:
+        """Runs whose process is currently executing."""
+        return [record for record in self.records.values() if record.status == "running"]
+
+    def run(self, resume: bool = False, on_poll: Callable = None, poll_interval: float = 2.0) -> Dict[int, RunRecord]:
+        """Executes the queued runs and waits for all of them.
+
+        Args:
+            resume (bool, optional): Skip runs that completed successfully according to the manifest. Defaults to False.
+            on_poll (Callable, optional): Called with the scheduler every `poll_interval` seconds while runs
+                execute, e.g. to display progress. Without it the scheduler only wakes when a run finishes.
+            poll_interval (float, optional): Seconds between `on_poll` calls. Defaults to 2.0.
+
+        Returns:
+            Dict[int, RunRecord]: The record of every submitted run.
+        """
+        self._recorded_runs = self.load_manifest()
+        queued = []
+        for index, record in self.records.items():
+            previous = self._recorded_runs.get(str(index))
+            if resume and previous and previous.get("status") == "completed" and previous.get("returncode") == 0:
+                record.status = "skipped"
+                record.returncode = 0
+                record.start_time, record.end_time = previous.get("start_time"), previous.get("end_time")
+                record.staging = previous.get("staging", {})
+                if self.verbose:
+                    print(f"{self.label} {index} already completed; skipping.")
+            else:
+                queued.append(record)
+
+        self._stopping = False
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_concurrent)
+        try:
+            pending = {pool.submit(self._execute, record) for record in queued}
+            while pending:
+                done, pending = concurrent.futures.wait(
+                    pending, timeout=poll_interval if on_poll is not None else None,
+                    return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+                if on_poll is not None:
+                    on_poll(self)
+        except BaseException:
+            # Interrupted: stop starting runs and terminate the running ones
+            self._stopping = True
+            with self._lock:
+                processes = list(self._processes.values())
+            for process in processes:
+                process.terminate()
+            raise
+        finally:
+            pool.shutdown(wait=True)
+
+        failed = [record.index for record in queued if record.status == "failed"]
+        if failed and self.verbose:
+            print(f"{len(failed)} of {len(queued)} runs failed: {failed}")
+        return self.records
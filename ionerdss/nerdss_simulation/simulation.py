@@ -4,10 +4,10 @@ import subprocess
 import shutil
 import json
 from typing import Dict, Any, List
-import time
 import glob
 from ..nerdss_model.model import Model
-from ..util import strip_comment
+from ..util import strip_comment, read_last_line
+from .scheduler import RunRecord, SimulationScheduler, STAGING_MODES, stage_run_dir
 
 class Simulation:
     """Class for handling NERDSS simulation configurations and running simulations.
@@ -180,13 +180,16 @@ class Simulation:
         with open(mol_file, "r") as f:
             lines = f.readlines()
         
-        with open(mol_file, "w") as f:
+        # Write a new file instead of rewriting in place: run directories may hardlink this one
+        tmp_file = f"{mol_file}.tmp"
+        with open(tmp_file, "w") as f:
             for line in lines:
                 key = line.split("=")[0].strip()
                 if key in modifications:
                     f.write(f"{key} = {modifications[key]}\n")
                 else:
                     f.write(line)
+        os.replace(tmp_file, mol_file)
 
     def modify_inp_file(self, modifications: Dict[str, Any], filename: str = "parms.inp") -> None:
         """
@@ -314,9 +317,13 @@ class Simulation:
             available_mols = [f.split(".mol")[0] for f in os.listdir(input_dir) if f.endswith(".mol")]
             raise FileNotFoundError(f"Molecule '{mol_name}' not found. Available molecules: {', '.join(available_mols)}")
         
-        with open(mol_file, "a") as f:
+        # Append to a new file: run directories may hardlink this one
+        tmp_file = f"{mol_file}.tmp"
+        shutil.copy(mol_file, tmp_file)
+        with open(tmp_file, "a") as f:
             state_line = f"state = {interface_name}~" + "~".join(states) + "\n"
             f.write(state_line)
+        os.replace(tmp_file, mol_file)
 
     def print_mol_parameters(self, mol_name: str) -> None:
         """Prints all parameters of a given .mol file.
@@ -450,15 +457,36 @@ class Simulation:
 
     def run_new_simulations(
             self, sim_indices: List[int] = None, sim_dir: str = None, nerdss_dir: str = None, parallel: bool = False,
-            coordinate: bool = False, progress: bool = True, verbose=True,
-        ) -> None:
+            coordinate: bool = False, progress: bool = True, verbose=True, max_concurrent: int = None,
+            resume: bool = False, staging: str = "copy",
+        ) -> Dict[int, RunRecord]:
         """Runs NERDSS simulations based on the given parameters.
+
+        Runs are executed by a `SimulationScheduler`: at most `max_concurrent` simulations run at a
+        time and queued ones start as slots free up. Exit codes and wall times are recorded in
+        `sim_dir/sweep_manifest.json`, from which `resume=True` skips the indices that already
+        completed successfully.
+
+        With `staging="hardlink"` or `"symlink"` the NERDSS executable and the .mol files are linked
+        into each run directory instead of copied; the parameter and coordinate files are always
+        copied. The manifest records which files of each run were linked and which were copied.
         
         Args:
             sim_indices (List[int], optional): List of simulation indices to run. If None, runs one simulation with index = 1.
             sim_dir (str, optional): Directory where simulation results should be stored. Defaults to `self.work_dir/nerdss_output`.
             nerdss_dir (str, optional): Directory where NERDSS is installed. Defaults to `self.work_dir/NERDSS`.
             parallel (bool, optional): Whether to run simulations in parallel. Defaults to False.
+            coordinate (bool, optional): Whether to pass the fixed coordinates file to NERDSS. Defaults to False.
+            progress (bool, optional): Whether to show progress bars of the running simulations. Defaults to True.
+            verbose (bool, optional): Whether to print progress messages. Defaults to True.
+            max_concurrent (int, optional): Number of simulations running at a time when `parallel` is True.
+                Defaults to the number of CPUs.
+            resume (bool, optional): Skip indices that completed successfully in a previous call. Defaults to False.
+            staging (str, optional): How shared input files are staged: "copy", "hardlink" or "symlink".
+                Defaults to "copy".
+
+        Returns:
+            Dict[int, RunRecord]: Status, exit code and wall time of each simulation.
 
         Notes:
             FIXME: Doesn't work on Fedora OS using Jupyter notebook. Doesn't test on other OS. Doesn't test using Python script.
@@ -486,55 +514,59 @@ class Simulation:
         if not os.path.exists(parms_file):
             raise FileNotFoundError(f"NERDSS input file not found: {parms_file}")
         
+        if staging not in STAGING_MODES:
+            raise ValueError(f"Unknown staging mode '{staging}'. Use one of {', '.join(STAGING_MODES)}.")
+
         if sim_indices is None:
             sim_indices = [1]
-        
-        processes = []
-        progress_bars = {}
-        
+
+        cmd = ["./nerdss", "-f", self.parmfile]
+        if coordinate:
+            cmd.append("-c")
+            cmd.append(self.coordinatefile)
+
+        # The executable and the .mol files are read-only for NERDSS; everything else may differ per run
+        input_files = sorted(os.path.join(input_dir, file) for file in os.listdir(input_dir))
+        shared_files = [nerdss_exec] + [file for file in input_files if file.endswith(".mol")]
+        run_files = [file for file in input_files if not file.endswith(".mol")]
+
+        def stage(sim_subdir):
+            return stage_run_dir(sim_subdir, shared_files, run_files, mode=staging)
+
+        scheduler = SimulationScheduler(
+            max_concurrent=max_concurrent if parallel else 1,
+            manifest_path=os.path.join(sim_dir, "sweep_manifest.json"),
+            verbose=verbose,
+        )
         for index in sim_indices:
             sim_subdir = os.path.join(sim_dir, f"{index}")
-            os.makedirs(sim_subdir, exist_ok=True)
-            
-            for file in os.listdir(input_dir):
-                shutil.copy(os.path.join(input_dir, file), sim_subdir)
-            shutil.copy(nerdss_exec, sim_subdir)
-            
-            output_log = os.path.join(sim_subdir, "output.log")
-            with open(output_log, "w") as log_file:
-                cmd = ["./nerdss", "-f", self.parmfile]
-                if coordinate:
-                    cmd.append("-c")
-                    cmd.append(self.coordinatefile)
-                
-                if parallel:
-                    process = subprocess.Popen(cmd, cwd=sim_subdir, stdout=log_file, stderr=log_file)
-                    processes.append((index, process))
-                else:
-                    if verbose: print(f"Running simulation {index}...")
-                    process = subprocess.Popen(cmd, cwd=sim_subdir, stdout=log_file, stderr=log_file)
-
-                    if verbose:
-                        if progress:
-                            from tqdm import tqdm
-                            progress_bars[index] = tqdm(total=100, desc=f"Simulation {index}")
-                            while process.poll() is None:
-                                progress = self.calculate_progress_percentage(sim_subdir)
-                                progress_bars[index].n = progress
-                                progress_bars[index].refresh()
-                                time.sleep(2)
-                            
-                            progress_bars[index].close()
-        
-        if parallel and verbose:
-            for index, process in processes:
-                print(f"Waiting for simulation {index} to complete...")
-                process.wait()
-                print(f"Simulation {index} completed.")
+            scheduler.submit(index, sim_subdir, cmd, prepare=lambda sim_subdir=sim_subdir: stage(sim_subdir))
+
+        records = scheduler.run(resume=resume, on_poll=self._progress_monitor() if verbose and progress else None)
         
         if verbose:
             if progress: 
                 print("All simulations completed.")
+        return records
+
+    def _progress_monitor(self):
+        """Returns an `on_poll` callback of `SimulationScheduler.run` showing a progress bar per running simulation."""
+        from tqdm import tqdm
+
+        progress_bars = {}
+
+        def update(scheduler):
+            for record in scheduler.records.values():
+                if record.status == "running" and record.index not in progress_bars:
+                    progress_bars[record.index] = tqdm(total=100, desc=f"{scheduler.label} {record.index}")
+                bar = progress_bars.get(record.index)
+                if bar is None or bar.disable:
+                    continue
+                bar.n = 100 if record.status == "completed" else self.calculate_progress_percentage(record.run_dir)
+                bar.refresh()
+                if record.status in ("completed", "failed"):
+                    bar.close()
+        return update
 
     def calculate_progress_percentage(self, sim_subdir: str) -> int:
         """
@@ -544,15 +576,12 @@ class Simulation:
             sim_subdir (str): The directory of the simulation.
         """
         current_time = 0.0
-        copy_numbers_file = os.path.join(sim_subdir, "copy_numbers_time.dat")
+        copy_numbers_file = os.path.join(sim_subdir, "DATA", "copy_numbers_time.dat")
+        if not os.path.exists(copy_numbers_file):
+            copy_numbers_file = os.path.join(sim_subdir, "copy_numbers_time.dat")
         
         try:
-            cmd = f"tail -n 2 {copy_numbers_file}"
-            process = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            output, error = process.communicate()
-            output = output.decode("utf-8").strip()
-            lines = output.split("\n")
-            last_line = lines[-1] if len(lines) > 1 else lines[0]
+            last_line = read_last_line(copy_numbers_file)
             current_time = float(last_line.split(",")[0])
         except Exception:
             pass
@@ -578,8 +607,11 @@ class Simulation:
         else:
             return int(current_time / total_time * 100)
 
-    def run_restart_simulations(self, sim_indices: List[int] = None, sim_dir: str = None, nerdss_dir: str = None, restart_from: str = "", restart_sim_name: str = "restart_sim", parallel: bool = False) -> None:
+    def run_restart_simulations(self, sim_indices: List[int] = None, sim_dir: str = None, nerdss_dir: str = None, restart_from: str = "", restart_sim_name: str = "restart_sim", parallel: bool = False, max_concurrent: int = None, resume: bool = False, verbose: bool = True) -> Dict[int, RunRecord]:
         """Runs NERDSS simulations from a restart file.
+
+        Restarts are executed by a `SimulationScheduler` and waited for in both modes; they are
+        recorded in `sim_dir/<restart_sim_name>_manifest.json`.
         
         Args:
             sim_indices (List[int], optional): List of simulation indices to restart. If None, restarts one simulation with index = 1.
@@ -588,6 +620,13 @@ class Simulation:
             restart_from (str): Path to the directory containing the restart file.
             restart_sim_name (str): Name of the folder where restarted simulations will be stored.
             parallel (bool, optional): Whether to run simulations in parallel. Defaults to False.
+            max_concurrent (int, optional): Number of restarts running at a time when `parallel` is True.
+                Defaults to the number of CPUs.
+            resume (bool, optional): Skip indices whose restart completed successfully before. Defaults to False.
+            verbose (bool, optional): Whether to print progress messages. Defaults to True.
+
+        Returns:
+            Dict[int, RunRecord]: Status, exit code and wall time of each restart.
         """
         if sim_dir is None:
             sim_dir = os.path.join(self.work_dir, "nerdss_output")
@@ -602,10 +641,15 @@ class Simulation:
         
         if sim_indices is None:
             sim_indices = [1]
-        
+
+        scheduler = SimulationScheduler(
+            max_concurrent=max_concurrent if parallel else 1,
+            manifest_path=os.path.join(sim_dir, f"{restart_sim_name}_manifest.json"),
+            label="Restarted simulation",
+            verbose=verbose,
+        )
         for index in sim_indices:
             restart_subdir = os.path.join(sim_dir, f"{index}", f"{restart_sim_name}")
-            os.makedirs(restart_subdir, exist_ok=True)
             
             if restart_from == "":
                 restart_file = os.path.join(sim_dir, f"{index}", "DATA", "restart.dat")
@@ -613,23 +657,19 @@ class Simulation:
                 restart_file = os.path.join(sim_dir, f"{index}", restart_from, "DATA", "restart.dat")
             if not os.path.exists(restart_file):
                 raise FileNotFoundError(f"Restart file not found at {restart_file}.")
-            
-            shutil.copy(restart_file, restart_subdir)
-            shutil.copy(nerdss_exec, restart_subdir)
-            
-            output_log = os.path.join(restart_subdir, "output.log")
-            with open(output_log, "w") as log_file:
-                cmd = ["./nerdss", "-r", "restart.dat"]
-                
-                if parallel:
-                    subprocess.Popen(cmd, cwd=restart_subdir, stdout=log_file, stderr=log_file)
-                else:
-                    print(f"Restarting simulation {index}...")
-                    process = subprocess.Popen(cmd, cwd=restart_subdir, stdout=log_file, stderr=log_file)
-                    process.wait()
-                    print(f"Simulation {index} restarted successfully.")
+
+            def stage(restart_subdir=restart_subdir, restart_file=restart_file):
+                os.makedirs(restart_subdir, exist_ok=True)
+                shutil.copy(restart_file, restart_subdir)
+                shutil.copy(nerdss_exec, restart_subdir)
+
+            scheduler.submit(index, restart_subdir, ["./nerdss", "-r", "restart.dat"], prepare=stage)
+
+        records = scheduler.run(resume=resume)
         
-        print("All restart simulations completed.")
+        if verbose:
+            print("All restart simulations completed.")
+        return records
 
 
     def _print_dict(self,dict):
@@ -0,0 +1,254 @@
+"""
+Batched ODE solves of one reaction network over many rate-constant sets.
+
+Fitting rate constants means integrating the same network again and again
+with different ``k``. ``solve_reaction_ode_sweep`` compiles the network
+once per worker as a ``ReactionNetwork``, swaps in each parameter set, and
+warm-starts every solve with the initial step size accepted by the
+previous one. Parameter sets are split into batches that run in a process
+pool, solutions are sampled only at the requested output times, and
+everything comes back stacked in arrays, so fitting loops stay in NumPy.
+
+Forward sensitivities ``s_j = dy/dk_j`` are integrated alongside the
+concentrations from
+
+    ds_j/dt = J(y) s_j + S[:, j] * prod_s y_s ** n_js
+
+where ``J`` is the Jacobian of the mass-action right-hand side and ``S``
+the net stoichiometry. Implicit methods get the block-diagonal part of the
+Jacobian of this augmented system, which is exact for ``y`` and omits only
+the coupling of the sensitivities to ``y`` in the Newton iterations.
+"""
+
+import os
+import math
+import pickle
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.integrate import BDF, DOP853, LSODA, RK23, RK45, Radau
+
+from .reaction_network import ReactionNetwork
+
+# Configure logging,
+import logging
+# inherit from the global level (should be setup in main)
+logger = logging.getLogger(__name__)
+
+METHODS = {"RK23": RK23, "RK45": RK45, "DOP853": DOP853, "Radau": Radau, "BDF": BDF, "LSODA": LSODA}
+IMPLICIT_METHODS = ("BDF", "Radau", "LSODA")
+
+
+class ODESweepResult:
+    """
+    Output of solve_reaction_ode_sweep.
+
+    Attributes:
+        times (numpy.ndarray): Output times, shape (T,).
+        rate_constants (numpy.ndarray): Parameter sets, shape (P, R).
+        y (numpy.ndarray): Concentrations, shape (P, T, S); NaN where a solve failed.
+        sensitivities (numpy.ndarray or None): dy/dk for the selected rate constants,
+            shape (P, T, S, Q); None if not computed.
+        sensitivity_parameters (numpy.ndarray or None): Indices of the Q rate constants.
+        success (numpy.ndarray): Whether each solve succeeded, shape (P,).
+        messages (list): Solver message of each solve.
+    """
+
+    def __init__(self, times, rate_constants, y, sensitivities, sensitivity_parameters, success, messages):
+        self.times = times
+        self.rate_constants = rate_constants
+        self.y = y
+        self.sensitivities = sensitivities
+        self.sensitivity_parameters = sensitivity_parameters
+        self.success = success
+        self.messages = messages
+
+
+def _sensitivity_system(network, parameters, method):
+    """Right-hand side and Jacobian of concentrations and sensitivities stacked in one vector."""
+    num_species = network.num_species
+    num_blocks = len(parameters) + 1
+    stoichiometry = network.stoichiometry.tocsc()[:, parameters].toarray()
+
+    def rhs(t, state):
+        y = state[:num_species]
+        blocks = state.reshape(num_blocks, num_species)
+        jacobian = network.jacobian(t, y)
+        sensitivities = (jacobian @ blocks[1:].T).T + (stoichiometry * network.rate_monomials(y)[parameters]).T
+        return np.concatenate((network.dydt(t, y), sensitivities.ravel()))
+
+    def jac(t, state):
+        blocks = sp.block_diag([network.jacobian(t, state[:num_species])] * num_blocks, format="csc")
+        return blocks.toarray() if method == "LSODA" else blocks
+
+    return rhs, jac
+
+
+def _integrate(rhs, jac, t0, state0, times, method, atol, rtol, first_step, solver_options):
+    """
+    Step a scipy solver and interpolate its steps at the output times only.
+
+    Returns:
+        tuple: (states of shape (T, N) or None on failure, solver message, first step size taken)
+    """
+    options = dict(solver_options)
+    if method in IMPLICIT_METHODS:
+        options["jac"] = jac
+    if first_step is not None:
+        options.setdefault("first_step", first_step)
+    solver = METHODS[method](rhs, t0, state0, times[-1], atol=atol, rtol=rtol, **options)
+
+    states = np.empty((len(times), len(state0)))
+    filled = int(np.searchsorted(times, t0, side="right"))
+    states[:filled] = state0
+    taken = None
+    while filled < len(times):
+        message = solver.step()
+        if solver.status == "failed":
+            return None, message, taken
+        if taken is None:
+            taken = solver.t - solver.t_old
+        stop = len(times) if solver.status == "finished" else int(np.searchsorted(times, solver.t, side="right"))
+        if stop > filled:
+            states[filled:stop] = solver.dense_output()(times[filled:stop]).T
+            filled = stop
+    return states, "The solver successfully reached the end of the integration interval.", taken
+
+
+def _solve_batch(indices, rate_constant_sets, times, t0, y_initial, reactant_matrix, product_matrix,
+                 method, atol, rtol, parameters, warm_start, solver_options):
+    """Solve a batch of parameter sets; module-level so it can be sent to worker processes."""
+    network = ReactionNetwork(reactant_matrix, product_matrix, rate_constant_sets[0])
+    num_species = network.num_species
+    with_sensitivities = parameters is not None
+    y_batch = np.full((len(indices), len(times), num_species), np.nan)
+    sensitivity_batch = np.full((len(indices), len(times), num_species, len(parameters)), np.nan) \
+        if with_sensitivities else None
+    success = np.zeros(len(indices), dtype=bool)
+    messages = []
+
+    if with_sensitivities:
+        rhs, jac = _sensitivity_system(network, parameters, method)
+        state0 = np.concatenate((y_initial, np.zeros(num_species * len(parameters))))
+    else:
+        rhs, jac = network.dydt, (network.dense_jacobian if method == "LSODA" else network.jacobian)
+        state0 = y_initial
+
+    first_step = None
+    for i, rate_constants in enumerate(rate_constant_sets):
+        network.set_rate_constants(rate_constants)
+        states, message, taken = _integrate(rhs, jac, t0, state0, times, method, atol, rtol, first_step,
+                                            solver_options)
+        messages.append(message)
+        if warm_start and taken:
+            # The next parameter set is likely to start on a similar time scale
+            first_step = taken
+        if states is None:
+            continue
+        success[i] = True
+        y_batch[i] = states[:, :num_species]
+        if with_sensitivities:
+            sensitivity_batch[i] = states[:, num_species:].reshape(len(times), len(parameters), num_species) \
+                .transpose(0, 2, 1)
+    return indices, y_batch, sensitivity_batch, success, messages
+
+
+def solve_reaction_ode_sweep(rate_constant_sets, times, y_initial, reactant_matrix, product_matrix,
+                             t0=0.0, method="BDF", atol=1e-4, rtol=1e-3, sensitivities=False,
+                             sensitivity_parameters=None, warm_start=True, max_workers=None,
+                             batch_size=None, backend="process", solver_options=None):
+    """
+    Solve one mass-action network for many sets of rate constants.
+
+    Args:
+        rate_constant_sets (numpy.ndarray): Parameter sets, shape (P, R), one row per solve.
+        times (numpy.ndarray): Increasing output times, all at or after t0.
+        y_initial (numpy.ndarray): Initial concentrations, shared by all solves.
+        reactant_matrix (numpy.ndarray): Matrix representing reactants in each reaction.
+        product_matrix (numpy.ndarray): Matrix representing products in each reaction.
+        t0 (float): Time of the initial concentrations.
+        method (str): Integrator, one of the scipy.integrate.solve_ivp methods.
+        atol (float): Absolute tolerance.
+        rtol (float): Relative tolerance.
+        sensitivities (bool): Also integrate the forward sensitivities dy/dk.
+        sensitivity_parameters (array-like, optional): Indices of the rate constants to
+            differentiate by; all of them by default.
+        warm_start (bool): Start each solve with the initial step size of the previous one in its batch.
+        max_workers (int, optional): Number of worker processes; defaults to the number of CPUs.
+        batch_size (int, optional): Parameter sets per task; defaults to about four tasks per worker.
+        backend (str): "process" or "serial".
+        solver_options (dict, optional): Further options of the scipy.integrate solver class.
+
+    Raises:
+        ValueError: If the arguments are inconsistent.
+
+    Returns:
+        ODESweepResult: Output times, stacked concentrations and, if requested, sensitivities.
+
+    Example:
+        >>> k_sets = np.exp(np.random.default_rng(0).normal(size=(200, 2)))
+        >>> result = solve_reaction_ode_sweep(k_sets, np.linspace(0, 10, 11), [1.0, 1.0, 0.0],
+        ...                                   reactant_matrix, product_matrix, sensitivities=True)
+        >>> result.y.shape, result.sensitivities.shape
+        ((200, 11, 3), (200, 11, 3, 2))
+    """
+    if backend not in ("process", "serial"):
+        raise ValueError(f"Unknown backend '{backend}'; expected 'process' or 'serial'.")
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}'; expected one of {list(METHODS)}.")
+    rate_constant_sets = np.atleast_2d(np.asarray(rate_constant_sets, dtype=np.float64))
+    num_sets, num_reactions = rate_constant_sets.shape
+    reactant_matrix = np.asarray(reactant_matrix)
+    product_matrix = np.asarray(product_matrix)
+    if reactant_matrix.shape[0] != num_reactions:
+        raise ValueError(f"Each parameter set must have {reactant_matrix.shape[0]} rate constants, got {num_reactions}.")
+    times = np.asarray(times, dtype=np.float64)
+    if times.ndim != 1 or len(times) == 0 or np.any(np.diff(times) <= 0) or times[0] < t0:
+        raise ValueError("times must be a non-empty, increasing 1-d array of times >= t0.")
+    y_initial = np.asarray(y_initial, dtype=np.float64)
+
+    parameters = None
+    if sensitivities:
+        parameters = np.arange(num_reactions) if sensitivity_parameters is None \
+            else np.asarray(sensitivity_parameters, dtype=np.int64)
+
+    y = np.empty((num_sets, len(times), len(y_initial)))
+    sensitivity = np.empty((num_sets, len(times), len(y_initial), len(parameters))) if sensitivities else None
+    success = np.zeros(num_sets, dtype=bool)
+    messages = [None] * num_sets
+
+    num_workers = 1 if backend == "serial" else max(1, min(num_sets, max_workers or os.cpu_count() or 1))
+    if batch_size is None:
+        batch_size = max(1, math.ceil(num_sets / (4 * num_workers)))
+    batches = [np.arange(start, min(start + batch_size, num_sets)) for start in range(0, num_sets, batch_size)]
+    common = (times, t0, y_initial, reactant_matrix, product_matrix, method, atol, rtol, parameters,
+              warm_start, solver_options or {})
+
+    def collect(indices, y_batch, sensitivity_batch, success_batch, message_batch):
+        y[indices] = y_batch
+        if sensitivity is not None:
+            sensitivity[indices] = sensitivity_batch
+        success[indices] = success_batch
+        for index, message in zip(indices, message_batch):
+            messages[index] = message
+
+    if num_workers == 1:
+        for indices in batches:
+            collect(*_solve_batch(indices, rate_constant_sets[indices], *common))
+    else:
+        try:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=num_workers) as pool:
+                futures = [pool.submit(_solve_batch, indices, rate_constant_sets[indices], *common)
+                           for indices in batches]
+                for future in concurrent.futures.as_completed(futures):
+                    collect(*future.result())
+        except (BrokenProcessPool, pickle.PicklingError, OSError) as e:
+            logger.warning(f"Process pool unavailable ({e}); solving parameter sets serially instead.")
+            for indices in batches:
+                collect(*_solve_batch(indices, rate_constant_sets[indices], *common))
+
+    if not success.all():
+        logger.warning(f"{np.count_nonzero(~success)} of {num_sets} ODE solves failed; their results are NaN.")
+    return ODESweepResult(times, rate_constant_sets, y, sensitivity, parameters, success, messages)
@@ -11,6 +11,8 @@ from matplotlib import rcParams
 
 from scipy.integrate import solve_ivp
 
+from .reaction_network import ReactionNetwork
+
 def calculate_macroscopic_reaction_rates(y, reactant_matrix, k):
     """
     Calculate macroscopic reaction rates for reactions based on the equation sum(k * product(conc^stoichiometry)).
@@ -23,21 +25,10 @@ def calculate_macroscopic_reaction_rates(y, reactant_matrix, k):
     Returns:
         array-like: An array containing the macroscopic reaction rates for each reaction.
     """
-    num_reactions = len(reactant_matrix)
-    num_species = len(reactant_matrix[0])
-
-    # Initialize rates
-    reaction_rates = np.zeros(num_reactions)
-
-    # Calculate rates for each reaction
-    for reaction_index, reactant_array in enumerate(reactant_matrix):
+    reactant_matrix = np.asarray(reactant_matrix)
 
-        # Calculate rate as k[i] * Product of y[j]^reactant_stoichiometry
-        reaction_rates[reaction_index] = k[reaction_index]  # Initialize rates with k
-        for species in np.arange(num_species):
-            reaction_rates[reaction_index] *= y[species] ** reactant_array[species]
-
-    return reaction_rates
+    # Rate is k[i] * Product of y[j]^reactant_stoichiometry, for all reactions at once
+    return np.asarray(k, dtype=np.float64) * np.prod(np.asarray(y, dtype=np.float64) ** reactant_matrix, axis=1)
 
 def dydt(t, y, reactant_matrix, product_matrix, k):
     """
@@ -53,25 +44,14 @@ def dydt(t, y, reactant_matrix, product_matrix, k):
     Returns:
         array-like: The rate of change of concentrations for each species at the given time.
     """
-    net_change_matrix = product_matrix - reactant_matrix
-
-    # Get the number of species (note that it is the secondary axis)
-    num_species = len(reactant_matrix[0])
+    net_change_matrix = np.asarray(product_matrix) - np.asarray(reactant_matrix)
 
-    # Initialize the rate of change vector
-    dydt = np.zeros(num_species)
+    # Sum net_change * rate over reactions for every species
+    return net_change_matrix.T @ calculate_macroscopic_reaction_rates(y, reactant_matrix, k)
 
-    # Calculate reaction rates
-    reaction_rates = calculate_macroscopic_reaction_rates(y, reactant_matrix, k)
-
-    # Iterate over species
-    for species in np.arange(num_species):
-
-        # Iterate over reactions and sum up net_change * rate
-        for reaction_index, net_change_array in enumerate(net_change_matrix):
-            dydt[species] += (net_change_array[species] * reaction_rates[reaction_index])
-
-    return dydt
+def _is_mass_action_dydt(function):
+    # ionerdss.reaction_dydt is a lazy proxy of dydt that forwards attribute access
+    return function is dydt or getattr(function, "__code__", None) is dydt.__code__
 
 def solve_reaction_ode(dydt, t_span, y_initial, reactant_matrix, product_matrix, k,
                     plotting=True, dense_output=True, method="BDF", atol = 1e-4, plotting_sample_points=1000, species_names = None):
@@ -89,11 +69,22 @@ def solve_reaction_ode(dydt, t_span, y_initial, reactant_matrix, product_matrix,
         plotting_sample_points (int, optional): Number of points for plotting. Defaults to 1000.
         species_names (list, optional): Names of species for legend. If None, species are labeled as y0, y1, etc.
 
+    Note:
+        When dydt is this module's mass-action dydt, the network is compiled once into a
+        ReactionNetwork: its vectorized right-hand side is integrated instead, and the
+        implicit methods (BDF, Radau, LSODA) get its analytic sparse Jacobian.
+
     Returns:
         time
         concentration
     """
-    sol = solve_ivp(dydt, t_span, y_initial, args=(reactant_matrix, product_matrix, k), dense_output=dense_output, atol=atol, method=method)
+    if _is_mass_action_dydt(dydt):
+        network = ReactionNetwork(reactant_matrix, product_matrix, k)
+        jacobians = {"BDF": network.jacobian, "Radau": network.jacobian, "LSODA": network.dense_jacobian}
+        options = {"jac": jacobians[method]} if method in jacobians else {}
+        sol = solve_ivp(network.dydt, t_span, y_initial, dense_output=dense_output, atol=atol, method=method, **options)
+    else:
+        sol = solve_ivp(dydt, t_span, y_initial, args=(reactant_matrix, product_matrix, k), dense_output=dense_output, atol=atol, method=method)
     t = np.linspace(min(t_span), max(t_span), plotting_sample_points)
     y = sol.sol(t)
     
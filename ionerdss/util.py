@@ -1,3 +1,7 @@
+import os
+from typing import Tuple
+
+
 def strip_comment(line: str) -> str:
     """
     Removes comments from a line of code, preserving '#' characters that occur inside string literals.
@@ -27,3 +31,86 @@ def strip_comment(line: str) -> str:
 
     return line.strip()
 
+
+
+def read_last_line(path: str, block_size: int = 4096) -> str:
+    """
+    Returns the last non-empty line of a text file without reading the whole file.
+
+    Parameters:
+        path (str): Path to the file.
+        block_size (int): Number of bytes read per step while seeking backwards.
+
+    Returns:
+        str: The last non-empty line, or an empty string if the file is empty.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        data = b""
+        while end > 0:
+            start = max(0, end - block_size)
+            f.seek(start)
+            data = f.read(end - start) + data
+            end = start
+            stripped = data.rstrip()
+            if b"\n" in stripped or end == 0:
+                return stripped.rsplit(b"\n", 1)[-1].decode("utf-8", errors="replace").strip()
+    return ""
+
+
+class FileTail:
+    """
+    Incrementally reads complete lines appended to a growing text file.
+
+    The byte offset of the first unread line is remembered between calls, so
+    each call to ``read`` only touches data written since the previous call.
+    A trailing line without a newline is treated as still being written and is
+    returned by a later call. If the file shrinks (e.g. a simulation was
+    restarted and the file rewritten), reading starts over from the beginning.
+
+    Attributes:
+        path (str): Path to the file being followed.
+        offset (int): Byte offset of the first unread line.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0
+
+    def reset(self) -> None:
+        """Forget the current position so the next read starts from the beginning."""
+        self.offset = 0
+
+    def seek(self, offset: int) -> None:
+        """Move the read position back (or forward) to a line boundary at ``offset``."""
+        self.offset = offset
+
+    def read(self) -> Tuple[int, bytes, bool]:
+        """
+        Reads all complete lines appended since the last call.
+
+        Returns:
+            Tuple[int, bytes, bool]: The byte offset the chunk starts at, the chunk
+            of complete lines, and whether the file was truncated (and so read from
+            the beginning again).
+        """
+        truncated = False
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return self.offset, b"", False
+        if size < self.offset:
+            self.offset = 0
+            truncated = True
+        if size == self.offset:
+            return self.offset, b"", truncated
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read(size - self.offset)
+
+        end = chunk.rfind(b"\n") + 1
+        start = self.offset
+        self.offset += end
+        return start, chunk[:end], truncated
@@ -8,11 +8,12 @@
 # pip install torch_geometric==2.3.0 transformers==4.38
 #!/usr/bin/env python
 import copy
-import math
 import torch
 import pickle
 import os
 import re
+import hashlib
+from collections import OrderedDict
 from itertools import chain
 
 from torch_geometric.nn.models import AttentiveFP
@@ -171,137 +172,141 @@ def get_residue_list_from_file(filename, chain_list):
         print(e)
         return residue_chain_list
 
-# Given 2 parts of protein-protein complex, return the residue list of the complex
-# Should be completed 2 residue lists
-
-def get_interaction_residue_pair_new(dis_thred, reslistA, reslistB):
-    res_pair = []
-    proteinA = copy.deepcopy(reslistA)
-    proteinB = copy.deepcopy(reslistB)
-    
-    for i, resA in enumerate(proteinA):     
-        find_match_res_pair = 0
-        ca1 = list(filter(lambda x: x['type'] == 'CA', resA['atoms']))[0]
-        ca1_x = float(ca1['x'])
-        ca1_y = float(ca1['y'])
-        ca1_z = float(ca1['z'])
-        
-        for j, resB in enumerate(proteinB):
-            find_match_res_pair = 0
-            ca2 = list(filter(lambda x: x['type'] == 'CA', resB['atoms']))[0]
-            ca2_x = float(ca2['x'])
-            ca2_y = float(ca2['y'])
-            ca2_z = float(ca2['z'])  
-        
-            for atomA in resA['atoms']:
-                Ax = float(atomA['x'])
-                Ay = float(atomA['y'])
-                Az = float(atomA['z'])        
-
-                for atomB in resB['atoms']:
-                    Bx = float(atomB['x'])
-                    By = float(atomB['y'])
-                    Bz = float(atomB['z'])
-
-                    distance = math.sqrt((Ax-Bx)**2 + (Ay-By)**2 + (Az-Bz)**2)
-          
-                    if distance <= dis_thred:
-                        c_alpha_dist = math.sqrt((ca1_x-ca2_x)**2 + (ca1_y-ca2_y)**2 + (ca1_z-ca2_z)**2)
-                        res_pair.append((resA, resB, c_alpha_dist))
-                        find_match_res_pair = 1
-                        break
-
-                if find_match_res_pair == 1:
-                    break
-
-    return res_pair
-
-def get_interaction_residue_pair_new_indi(dis_thred, reslistA, reslistB):
-    res_pair = []
-    proteinA = copy.deepcopy(reslistA)
-    proteinB = copy.deepcopy(reslistB)
-    
-    for i, resA in enumerate(proteinA):     
-        find_match_res_pair = 0
-        ca1 = list(filter(lambda x: x['type'] == 'CA', resA['atoms']))[0]
-        ca1_x = float(ca1['x'])
-        ca1_y = float(ca1['y'])
-        ca1_z = float(ca1['z'])
-        res1_num = resA['number']
-        
-        for j, resB in enumerate(proteinB):
-            find_match_res_pair = 0
-            ca2 = list(filter(lambda x: x['type'] == 'CA', resB['atoms']))[0]
-            ca2_x = float(ca2['x'])
-            ca2_y = float(ca2['y'])
-            ca2_z = float(ca2['z'])  
-            res2_num = resB['number']
-            if res1_num == res2_num:
-                continue
-        
-            for atomA in resA['atoms']:
-                Ax = float(atomA['x'])
-                Ay = float(atomA['y'])
-                Az = float(atomA['z'])        
-
-                for atomB in resB['atoms']:
-                    Bx = float(atomB['x'])
-                    By = float(atomB['y'])
-                    Bz = float(atomB['z'])
-
-                    distance = math.sqrt((Ax-Bx)**2 + (Ay-By)**2 + (Az-Bz)**2)
-          
-                    if distance <= dis_thred:
-     
-                        c_alpha_dist = math.sqrt((ca1_x-ca2_x)**2 + (ca1_y-ca2_y)**2 + (ca1_z-ca2_z)**2)
-                        res_pair.append((resA, resB, c_alpha_dist))
-                        find_match_res_pair = 1
-                        break
-
-                if find_match_res_pair == 1:
-                    break
-
-    return res_pair
-
-# get the edge index of the graph from the interaction pairs
-# only 2 parts in the inter_pairs
-# len_pro1 is the length of the first part of the protein-protein complex
-
-def get_edge_index(inter_pairs, len_protein1_fasta):
-    source_list = []
-    des_list = []
-
-    for pair in inter_pairs:
-        source_res = int(pair[0]['number'])
-        des_res = int(pair[1]['number']) + len_protein1_fasta
-        source_list.append(source_res)
-        des_list.append(des_res)
-
-    source = torch.unsqueeze(torch.tensor(source_list), 0)
-    des = torch.unsqueeze(torch.tensor(des_list), 0)
-
-    bi_direct_source = torch.cat((source, des), 1)
-    bi_direct_edge = torch.cat((des, source), 1)
-    edge_index = torch.squeeze(torch.stack((bi_direct_source, bi_direct_edge)))
-    
-    return edge_index
+# Atom pair types of the edge features; the types are those given by infer_atom_type
+atom_pair = ['A_A', 'A_C', 'A_OA', 'A_N', 'A_NA', 'A_SA', 'A_HD', 
+            'C_C', 'C_OA', 'C_N', 'C_NA', 'C_SA', 'C_HD',
+            'OA_OA', 'OA_N', 'OA_NA', 'OA_SA', 'OA_HD',
+            'N_N', 'N_NA', 'N_SA', 'N_HD', 
+            'NA_NA', 'NA_SA', 'NA_HD',
+            'SA_SA', 'SA_HD',
+            'HD_HD']
+pdbqt_types = ['A', 'C', 'OA', 'N', 'NA', 'SA', 'HD']
+pdbqt_type_index = {t: i for i, t in enumerate(pdbqt_types)}
+# atom_pair index of every (type1, type2), in either order
+pair_type_table = np.array([[atom_pair.index(t1 + '_' + t2) if t1 + '_' + t2 in atom_pair else atom_pair.index(t2 + '_' + t1)
+                             for t2 in pdbqt_types] for t1 in pdbqt_types])
+
+def get_residue_arrays(reslist):
+    """
+    Parse the atoms of a residue list into arrays once.
 
-def get_edge_index_indi(inter_pairs):
-    source_list = []
-    des_list = []
+    Returns a dict with the coordinates ('coords', atoms x 3), owning residue
+    ('residue') and pdbqt type index ('type') of every atom, and the CA
+    coordinates ('ca'), first atom ('start') and atom count ('count') of
+    every residue. Atoms of a residue are contiguous.
+    """
+    coords = []
+    types = []
+    counts = []
+    ca = []
+    for res in reslist:
+        for atom in res['atoms']:
+            coords.append((float(atom['x']), float(atom['y']), float(atom['z'])))
+            if atom['pdbqt_type'] not in pdbqt_type_index:
+                raise ValueError('no match type!' + 'type:' + atom['pdbqt_type'])
+            types.append(pdbqt_type_index[atom['pdbqt_type']])
+        counts.append(len(res['atoms']))
+        ca_atom = next(atom for atom in res['atoms'] if atom['type'] == 'CA')
+        ca.append((float(ca_atom['x']), float(ca_atom['y']), float(ca_atom['z'])))
+
+    counts = np.array(counts, dtype=np.int64)
+    return {
+        'coords': np.array(coords, dtype=np.float64).reshape(-1, 3),
+        'residue': np.repeat(np.arange(len(reslist)), counts),
+        'type': np.array(types, dtype=np.int64),
+        'ca': np.array(ca, dtype=np.float64).reshape(-1, 3),
+        'start': np.cumsum(counts) - counts,
+        'count': counts,
+    }
+
+def find_residue_contacts(dis_thred, reslistA, reslistB, arraysA=None, arraysB=None, skip_same_number=False):
+    """
+    Residue pairs with any two atoms within dis_thred, found with KD-trees over all atoms.
 
-    for pair in inter_pairs:
-        source_res = int(pair[0]['number'])
-        des_res = int(pair[1]['number'])
-        if source_res != des_res:
-            source_list.append(source_res)
-            des_list.append(des_res)
+    Returns the indices of the residues in reslistA and reslistB, ordered by
+    reslistA and then reslistB, and the CA distance of each pair. With
+    skip_same_number, pairs of residues with the same number are left out.
+    """
+    from scipy.spatial import cKDTree
+
+    if arraysA is None:
+        arraysA = get_residue_arrays(reslistA)
+    if arraysB is None:
+        arraysB = arraysA if reslistB is reslistA else get_residue_arrays(reslistB)
+    if len(arraysA['coords']) == 0 or len(arraysB['coords']) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+
+    treeA = cKDTree(arraysA['coords'])
+    treeB = treeA if arraysB is arraysA else cKDTree(arraysB['coords'])
+    atom_pairs = treeA.sparse_distance_matrix(treeB, dis_thred, output_type='ndarray')
+    numB = len(reslistB)
+    keys = np.unique(arraysA['residue'][atom_pairs['i']] * numB + arraysB['residue'][atom_pairs['j']])
+    res_a, res_b = np.divmod(keys, numB)
+
+    if skip_same_number:
+        number_ids = {}
+        idsA = np.array([number_ids.setdefault(res['number'], len(number_ids)) for res in reslistA])
+        idsB = np.array([number_ids.setdefault(res['number'], len(number_ids)) for res in reslistB])
+        keep = idsA[res_a] != idsB[res_b]
+        res_a, res_b = res_a[keep], res_b[keep]
+
+    ca_dist = np.linalg.norm(arraysA['ca'][res_a] - arraysB['ca'][res_b], axis=1)
+    return res_a, res_b, ca_dist
+
+def get_contact_edge_features(arraysA, arraysB, res_a, res_b, feature_distance, bin_number=10):
+    """
+    Edge features of residue pairs: for every pair, the counts of its atom pairs
+    by distance bin (of width feature_distance / bin_number, the last bin open
+    ended) and atom pair type, flattened bin-major as in the trained model.
+    """
+    type_number = len(atom_pair)
+    width = type_number * bin_number
+    countB = arraysB['count'][res_b]
+    sizes = arraysA['count'][res_a] * countB
+    # Every atom pair of every residue pair
+    pair = np.repeat(np.arange(len(res_a)), sizes)
+    local = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    atomA = arraysA['start'][res_a][pair] + local // countB[pair]
+    atomB = arraysB['start'][res_b][pair] + local % countB[pair]
+
+    dis = np.linalg.norm(arraysA['coords'][atomA] - arraysB['coords'][atomB], axis=1)
+    bin_n = np.minimum(np.ceil(dis / (feature_distance / bin_number)), bin_number).astype(np.int64)
+    pair_type_index = pair_type_table[arraysA['type'][atomA], arraysB['type'][atomB]]
+    # The modulo keeps the wrap-around of coincident atoms (bin 0) to the last entry
+    encoding_index = ((bin_n - 1) * type_number + pair_type_index) % width
+    features = np.bincount(pair * width + encoding_index, minlength=len(res_a) * width)
+    return features.reshape(len(res_a), width).astype(np.float64)
+
+def build_contact_graph(reslistA, reslistB, dis_thred, feature_distance, offset=0, intra=False):
+    """
+    Edge index and edge features of a residue contact graph in one pass.
 
-    source = torch.unsqueeze(torch.tensor(source_list), 0)
-    des = torch.unsqueeze(torch.tensor(des_list), 0)
+    For the inter graph (reslistA against reslistB) the edges go both ways,
+    with the numbers of reslistB shifted by offset and the features repeated
+    for the reverse edges. For an intra graph (intra=True, a list against
+    itself) each contact is already listed in both directions and residues
+    are not paired with themselves.
 
-    edge_index = torch.squeeze(torch.stack((source, des)))
-    return edge_index
+    Returns:
+        (edge_index, edge_attr, contacts): int64 array (2, E), float64 array (E, 280),
+        and the (res_a, res_b, ca_dist) arrays of find_residue_contacts.
+    """
+    arraysA = get_residue_arrays(reslistA)
+    arraysB = arraysA if reslistB is reslistA else get_residue_arrays(reslistB)
+    res_a, res_b, ca_dist = find_residue_contacts(dis_thred, reslistA, reslistB, arraysA, arraysB,
+                                                  skip_same_number=intra)
+    edge_attr = get_contact_edge_features(arraysA, arraysB, res_a, res_b, feature_distance)
+
+    numbersA = np.array([int(res['number']) for res in reslistA], dtype=np.int64)
+    numbersB = np.array([int(res['number']) for res in reslistB], dtype=np.int64)
+    source = numbersA[res_a].reshape(-1)
+    des = numbersB[res_b].reshape(-1) + offset
+    if intra:
+        edge_index = np.stack((source, des))
+    else:
+        edge_index = np.stack((np.concatenate((source, des)), np.concatenate((des, source))))
+        edge_attr = np.concatenate((edge_attr, edge_attr), 0)
+    return edge_index, edge_attr, (res_a, res_b, ca_dist)
 
 def adjust_residuelist_num(residuelist):
     index = 0
@@ -310,16 +315,6 @@ def adjust_residuelist_num(residuelist):
             res['number'] = index
             index += 1
             
-# Helpers
-def get_fasta_seq(pdb_tuple):
-    fastaA = pdb_tuple[0]
-    fastaB = pdb_tuple[1]
-    return fastaA, fastaB
-
-def get_distance(x1, y1, z1, x2, y2, z2):
-    distance = math.sqrt((x1-x2)**2 + (y1-y2)**2 + (z1-z2)**2)
-    return distance
-
 # Models
 class AttentiveFPModel(torch.nn.Module):
     def __init__(self, in_channels, hidden_channels, out_channels, edge_dim, num_layers, num_timesteps, dropout):
@@ -351,445 +346,269 @@ class GraphNetwork(torch.nn.Module):
         x = self.fc2(x)
         return x
         
-def run_proaffinity_inference(
-        pdbfile, chainindex, weights_path='./model.pkl', temperature=298.15, verbose=False
-    ):
-    """
-    Run ProAffinity inference on a given PDB file and chain index.
-    
-    Args:
-        pdbfile (str): Path to the PDB or PDBQT file.
-        chainindex (str): List of chains (e.g. "AB,C").
-        weights_path (str): Path to the model weights.
-        temperature (float): Temperature in Kelvin (default is 298.15) to convert K from.
-        
-    Returns:
-        float: Predicted dG (kJ/mol) value.
-    """
-
-    pdbfile = pdbfile
-    chainindex = chainindex.split(',')
+# Inference
+ESM_MODEL_NAME = "facebook/esm2_t33_650M_UR50D"
+# Sub-directory of a local model directory holding the ESM weights (see save_esm_model)
+ESM_SUBDIR = "esm2_t33_650M_UR50D"
+GNN_WEIGHTS_NAME = "model.pkl"
+# Contact cutoffs (Angstrom) of the inter- and intra-chain graphs; also the range of the distance bins
+INTER_DISTANCE = 6
+INTRA_DISTANCE = 3.5
+
+def save_esm_model(model_dir, esm_model=ESM_MODEL_NAME):
+    """Download the ESM tokenizer and weights once into model_dir, for offline use by ProAffinityScorer."""
+    from transformers import AutoTokenizer, EsmModel
 
-    # get 2 residue lists from file of one pdb
-    # each residue list may contain several res lists, each res list represents a chain
+    target = os.path.join(model_dir, ESM_SUBDIR)
+    AutoTokenizer.from_pretrained(esm_model).save_pretrained(target)
+    EsmModel.from_pretrained(esm_model).save_pretrained(target)
+    return target
 
-    prot_pair = chainindex
+def get_interface_residues(pdbfile, chainindex):
+    """
+    Parse the residues of both partners of an interface from one read of the file.
 
+    chainindex is e.g. "AB,C". Returns (residuelistA, residuelistB), one residue list per chain.
+    """
+    prot_pair = chainindex.split(',')
     if len(prot_pair) != 2:
         print('no 2 pro-pro pair!!')
+    residuelists = get_residue_list_from_file(pdbfile, prot_pair[0] + prot_pair[1])
+    return residuelists[:len(prot_pair[0])], residuelists[len(prot_pair[0]):]
 
-    # Get residues from the PDB file
-    if verbose: print(prot_pair)
-    residuelistA = get_residue_list_from_file(pdbfile, prot_pair[0])
-    residuelistB = get_residue_list_from_file(pdbfile, prot_pair[1])
-
-    adjust_residuelist_num(residuelistA)
-    adjust_residuelist_num(residuelistB)
-
-    # Create a sequence for each chain
-    if len(residuelistA) == 0 or len(residuelistB) == 0:
-        print('no residue list')
-
-    seqA = []
-
-    for reslist in residuelistA: # for each chain in the residuelistA:
-        chain_res = []
-        for res in reslist:
-            chain_res.append(res['type'])
-        chain_res = ''.join(chain_res)
-        seqA.append(chain_res)
-
-    seqB = []
-
-    for reslist in residuelistB: # for each chain in the residuelistA:
-        chain_res = []
-        for res in reslist:
-            chain_res.append(res['type'])
-        chain_res = ''.join(chain_res)
-        seqB.append(chain_res)
-        
-    seqA_len = sum([len(seq) for seq in seqA])
-
-    adjust_residuelist_num(residuelistA)
-    adjust_residuelist_num(residuelistB)
-
-    concat_reslistA = list(chain.from_iterable(residuelistA))
-    concat_reslistB = list(chain.from_iterable(residuelistB))
-
-    # Generate graphs
-    thred = 6
-    inter_pairs = get_interaction_residue_pair_new(thred, concat_reslistA, concat_reslistB)
-    edge_index = get_edge_index(inter_pairs, seqA_len)
-    info_save = (inter_pairs, edge_index, (seqA, seqB))
-
-    # get 2 residue lists from file of one pdb
-    # each residue list may contain several res lists, each res list represents a chain
-
-    residuelistA = get_residue_list_from_file(pdbfile, prot_pair[0])
-    residuelistB = get_residue_list_from_file(pdbfile, prot_pair[1])
-
-    adjust_residuelist_num(residuelistA)
-    adjust_residuelist_num(residuelistB)
+def build_interface_graphs(residuelistA, residuelistB):
+    """
+    Sequences and contact graphs (without node features) of an interface.
 
+    Returns a dict with the chain sequences 'seqA' and 'seqB' and the
+    (edge_index, edge_attr) arrays of the 'inter', 'intra1' and 'intra2' graphs.
+    """
     if len(residuelistA) == 0 or len(residuelistB) == 0:
         print('no residue list')
-
-    seqA = []
-
-    for reslist in residuelistA: # for each chain in the residuelistA:
-        chain_res = []
-        for res in reslist:
-            chain_res.append(res['type'])
-        chain_res = ''.join(chain_res)
-        seqA.append(chain_res)
-
-    seqB = []
-
-    for reslist in residuelistB: # for each chain in the residuelistA:
-        chain_res = []
-        for res in reslist:
-            chain_res.append(res['type'])
-        chain_res = ''.join(chain_res)
-        seqB.append(chain_res)
-
     adjust_residuelist_num(residuelistA)
     adjust_residuelist_num(residuelistB)
-
+    seqA = [''.join(res['type'] for res in reslist) for reslist in residuelistA]
+    seqB = [''.join(res['type'] for res in reslist) for reslist in residuelistB]
     concat_reslistA = list(chain.from_iterable(residuelistA))
     concat_reslistB = list(chain.from_iterable(residuelistB))
 
+    inter = build_contact_graph(concat_reslistA, concat_reslistB, INTER_DISTANCE, INTER_DISTANCE,
+                                offset=len(concat_reslistA))
+    intra1 = build_contact_graph(concat_reslistA, concat_reslistA, INTRA_DISTANCE, INTRA_DISTANCE, intra=True)
+    intra2 = build_contact_graph(concat_reslistB, concat_reslistB, INTRA_DISTANCE, INTRA_DISTANCE, intra=True)
+    return {'seqA': seqA, 'seqB': seqB, 'inter': inter[:2], 'intra1': intra1[:2], 'intra2': intra2[:2]}
 
-    thred = 3.5
-    intra_pairsA = get_interaction_residue_pair_new_indi(thred, concat_reslistA, concat_reslistA)
-    intra_pairsB = get_interaction_residue_pair_new_indi(thred, concat_reslistB, concat_reslistB)
-
-    edge_index1 = get_edge_index_indi(intra_pairsA)
-    edge_index2 = get_edge_index_indi(intra_pairsB)
-
-    info_save1 = (intra_pairsA, edge_index1, seqA)
-    info_save2 = (intra_pairsB, edge_index2, seqB)
-                    
-    # Get ESM embedding from the sequences
-    from transformers import AutoTokenizer, EsmModel
-    import torch
-
-    tokenizer = AutoTokenizer.from_pretrained("facebook/esm2_t33_650M_UR50D")
-    model = EsmModel.from_pretrained("facebook/esm2_t33_650M_UR50D")
-    model.eval()
-    torch.set_grad_enabled(False)  
-
-    from torch_geometric.data import Data
-    
-
-    atom_type = ['A', 'C', 'OA', 'N', 'NA' 'SA', 'HD']
-
-    atom_pair = ['A_A', 'A_C', 'A_OA', 'A_N', 'A_NA', 'A_SA', 'A_HD', 
-                'C_C', 'C_OA', 'C_N', 'C_NA', 'C_SA', 'C_HD',
-                'OA_OA', 'OA_N', 'OA_NA', 'OA_SA', 'OA_HD',
-                'N_N', 'N_NA', 'N_SA', 'N_HD', 
-                'NA_NA', 'NA_SA', 'NA_HD',
-                'SA_SA', 'SA_HD',
-                'HD_HD']
-
-    bin_number = 10
-    type_number = len(atom_pair)
-    inter_distance = 6
-    intra_distance = 3.5
-
-    seqA, seqB = get_fasta_seq(info_save[2])
-    output1_list = []
-    output2_list = []
-
-    for fasta in seqA:
-        input1 = tokenizer(fasta, return_tensors="pt")
-        output1 = model(**input1)
-        last_hidden_state1 = output1.last_hidden_state
-        last_hidden_state1 = torch.squeeze(last_hidden_state1)
-        # get the token from the 2nd to the 2nd last one
-        last_hidden_state1 = last_hidden_state1[1:-1]
-        output1_list.append(last_hidden_state1)
-
-
-    for fasta in seqB:
-        input2 = tokenizer(fasta, return_tensors="pt")
-        output2 = model(**input2)
-        last_hidden_state2 = output2.last_hidden_state
-        last_hidden_state2 = torch.squeeze(last_hidden_state2)
-        # get the token from the 2nd to the 2nd last one
-        last_hidden_state2 = last_hidden_state2[1:-1]
-        output2_list.append(last_hidden_state2)
-
-
-    x1 = torch.cat(output1_list, 0)
-    x2 = torch.cat(output2_list, 0)
-    x = torch.cat((x1, x2), 0)
-
-    pairs = info_save[0]
-    edge_index = info_save[1]
-
-    try:
-        edge_feature = []
-        for pair in pairs:
-
-            edge_encoding = np.zeros(type_number * bin_number)
-            residueA = pair[0]
-            residueB = pair[1]
-
-            for atom1 in residueA['atoms']:
-                x1 = float(atom1['x'])
-                y1 = float(atom1['y'])
-                z1 = float(atom1['z'])
-                type1 = atom1['pdbqt_type']
-
-                for atom2 in residueB['atoms']:
-                    x2 = float(atom2['x'])
-                    y2 = float(atom2['y'])
-                    z2 = float(atom2['z'])
-                    type2 = atom2['pdbqt_type']
-
-                    dis = get_distance(x1, y1, z1, x2, y2, z2)
-
-                    bin_n = math.ceil(dis / (inter_distance / bin_number))
-                    #print(bin_n)
-                    if bin_n > 10:
-                        bin_n = 10
-
-                    if type1 + '_' + type2 in atom_pair:
-                        pair_type = type1 + '_' + type2       
-                    elif type2 + '_' + type1 in atom_pair:
-                        pair_type = type2 + '_' + type1
-                    else:
-                        print('no match type!' + 'type1:' + type1 + 'type2:' + type2)
-                        pair_type = 'others'
-                        
-                    pair_type_index = atom_pair.index(pair_type)
-                    encoding_index = (bin_n - 1) * type_number + pair_type_index
-                    edge_encoding[encoding_index] = edge_encoding[encoding_index] + 1
-
-            edge_feature.append(torch.from_numpy(edge_encoding))                
-
-        edge_feature = torch.stack(edge_feature, 0) 
-        edge_feature = torch.cat((edge_feature, edge_feature), 0)
-
-    except Exception as e:
-        print(e)
-
-    data = Data(x=x, edge_index=edge_index, edge_attr=edge_feature)
-
-    # for individual graph
-
-    seq1 = info_save1[2]
-
-    output1_list = []
-
-    for fasta in seq1:
-        input1 = tokenizer(fasta, return_tensors="pt")
-        output1 = model(**input1)
-        last_hidden_state1 = output1.last_hidden_state
-        last_hidden_state1 = torch.squeeze(last_hidden_state1)
-        # get the token from the 2nd to the 2nd last one
-        last_hidden_state1 = last_hidden_state1[1:-1]
-        output1_list.append(last_hidden_state1)
-
-    x_indi_1= torch.cat(output1_list, 0)
-
-    pairs = info_save1[0]
-    edge_index = info_save1[1]
-
-    try:
-        edge_feature = []
-        for pair in pairs:
-
-            edge_encoding = np.zeros(type_number * bin_number)
-            residueA = pair[0]
-            residueB = pair[1]
-
-            for atom1 in residueA['atoms']:
-                x1 = float(atom1['x'])
-                y1 = float(atom1['y'])
-                z1 = float(atom1['z'])
-                type1 = atom1['pdbqt_type']
-
-                for atom2 in residueB['atoms']:
-                    x2 = float(atom2['x'])
-                    y2 = float(atom2['y'])
-                    z2 = float(atom2['z'])
-                    type2 = atom2['pdbqt_type']
-
-                    dis = get_distance(x1, y1, z1, x2, y2, z2)
-
-                    bin_n = math.ceil(dis / (intra_distance / bin_number))
-                    #print(bin_n)
-                    if bin_n > 10:
-                        bin_n = 10
-
-                    if type1 + '_' + type2 in atom_pair:
-                        pair_type = type1 + '_' + type2       
-                    elif type2 + '_' + type1 in atom_pair:
-                        pair_type = type2 + '_' + type1
-                    else:
-                        print('no match type!' + 'type1:' + type1 + 'type2:' + type2)
-                        pair_type = 'others'
-                        
-                    pair_type_index = atom_pair.index(pair_type)
-                    encoding_index = (bin_n - 1) * type_number + pair_type_index
-                    edge_encoding[encoding_index] = edge_encoding[encoding_index] + 1
-
-            edge_feature.append(torch.from_numpy(edge_encoding))                
-
-        edge_feature = torch.stack(edge_feature, 0) 
-
-    except Exception as e:
-        print(e)
-
-    data1 = Data(x=x_indi_1, edge_index=edge_index, edge_attr=edge_feature)
-
-    seq2 = info_save2[2]
-
-    output2_list = []
-
-    for fasta in seq2:
-        input2 = tokenizer(fasta, return_tensors="pt")
-        output1 = model(**input2)
-        last_hidden_state2 = output2.last_hidden_state
-        last_hidden_state2 = torch.squeeze(last_hidden_state2)
-        # get the token from the 2nd to the 2nd last one
-        last_hidden_state2 = last_hidden_state2[1:-1]
-        output2_list.append(last_hidden_state2)
-
-    x_indi_2= torch.cat(output2_list, 0)
-
-    pairs = info_save2[0]
-    edge_index = info_save2[1]
-
-    try:
-        edge_feature = []
-        for pair in pairs:
-
-            edge_encoding = np.zeros(type_number * bin_number)
-            residueA = pair[0]
-            residueB = pair[1]
-
-            for atom1 in residueA['atoms']:
-                x1 = float(atom1['x'])
-                y1 = float(atom1['y'])
-                z1 = float(atom1['z'])
-                type1 = atom1['pdbqt_type']
-
-                for atom2 in residueB['atoms']:
-                    x2 = float(atom2['x'])
-                    y2 = float(atom2['y'])
-                    z2 = float(atom2['z'])
-                    type2 = atom2['pdbqt_type']
-
-                    dis = get_distance(x1, y1, z1, x2, y2, z2)
-
-                    bin_n = math.ceil(dis / (intra_distance / bin_number))
-                    #print(bin_n)
-                    if bin_n > 10:
-                        bin_n = 10
-
-                    if type1 + '_' + type2 in atom_pair:
-                        pair_type = type1 + '_' + type2       
-                    elif type2 + '_' + type1 in atom_pair:
-                        pair_type = type2 + '_' + type1
-                    else:
-                        print('no match type!' + 'type1:' + type1 + 'type2:' + type2)
-                        pair_type = 'others'
-                        
-                    pair_type_index = atom_pair.index(pair_type)
-                    encoding_index = (bin_n - 1) * type_number + pair_type_index
-                    edge_encoding[encoding_index] = edge_encoding[encoding_index] + 1
-
-            edge_feature.append(torch.from_numpy(edge_encoding))                
-
-        edge_feature = torch.stack(edge_feature, 0) 
-
-    except Exception as e:
-        print(e)
-
-
-    data2 = Data(x=x_indi_2, edge_index=edge_index, edge_attr=edge_feature)
-
-    graph = data
-    graph1 = data1
-    graph2 = data2
-    graph.edge_attr = graph.edge_attr.float()
-
-    graph1.edge_attr = [attr.float() for attr in graph1.edge_attr]
-    graph2.edge_attr = graph2.edge_attr.float()
-
-    datalist_inter = []
-    datalist_intra1 = []
-    datalist_intra2 = []
-    datalist_inter.append(graph)
-    datalist_intra1.append(graph1)
-    datalist_intra2.append(graph2)
-
-    test_loader_inter = DataLoader(datalist_inter, batch_size=1)
-    test_loader_intra1 = DataLoader(datalist_intra1, batch_size=1)
-    test_loader_intra2 = DataLoader(datalist_intra2, batch_size=1)
-
-    in_channels = data.num_node_features
-    hidden_channels = 256
-    out_channels = 64
-    linear_out1 = 32   
-    linear_out2 = 1
-    edge_dim = data.num_edge_features
-    num_layers = 3 
-    num_timesteps = 2
-    dropout = 0.5
-
-    devicename = "cuda" if torch.cuda.is_available() else "cpu"
-    device = torch.device(devicename)
-    model = GraphNetwork(in_channels, hidden_channels, out_channels, edge_dim, num_layers, num_timesteps, dropout, linear_out1, linear_out2).to(device)
-
-    state_dict = torch.load(weights_path, map_location=devicename)
+class ProAffinityScorer:
+    """
+    ProAffinity predictor that keeps its models loaded and scores many interfaces at once.
+
+    The ESM and GNN weights are loaded once. Chain sequences are embedded in
+    padded batches, and each distinct sequence only once: embeddings are kept
+    in an LRU of cache_size sequences and, with cache_dir, as .npy files keyed
+    by a hash of the model and sequence, so homologous chains and repeated
+    runs reuse them. The graphs of many interfaces go through the GNN in
+    DataLoader batches of batch_size.
+
+    Example:
+        >>> scorer = ProAffinityScorer(model_dir="./proaffinity_models", cache_dir="./esm_cache")
+        >>> dG = scorer.score([("8y7s.pdb", "A,B"), ("8y7s.pdb", "A,E")])
+    """
 
-    new_state_dict = {}
-    for key, value in state_dict.items():
-        new_key = key.replace("lin_src", "lin").replace("lin_dst", "lin")
-        new_state_dict[new_key] = value
+    def __init__(self, weights_path=None, model_dir=None, esm_model=ESM_MODEL_NAME, cache_dir=None,
+                 cache_size=1024, batch_size=32, embedding_batch_size=8, device=None):
+        """
+        Args:
+            weights_path (str): Path to the GNN weights; defaults to model_dir/model.pkl or ./model.pkl.
+            model_dir (str): Local model directory; if given, ESM is loaded from model_dir/esm2_t33_650M_UR50D
+                without network access (see save_esm_model).
+            esm_model (str): ESM model name or path, used when model_dir is None.
+            cache_dir (str): Directory of the on-disk embedding cache, or None.
+            cache_size (int): Number of sequence embeddings kept in memory.
+            batch_size (int): Interfaces per GNN batch.
+            embedding_batch_size (int): Sequences per ESM batch.
+            device (str): Torch device; cuda if available by default.
+        """
+        from transformers import AutoTokenizer, EsmModel
+
+        if weights_path is None:
+            weights_path = os.path.join(model_dir or '.', GNN_WEIGHTS_NAME)
+        if model_dir is not None:
+            esm_model = os.path.join(model_dir, ESM_SUBDIR)
+        self.esm_model = esm_model
+        self.weights_path = weights_path
+        self.cache_dir = cache_dir
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self.embedding_batch_size = embedding_batch_size
+        self.device = torch.device(device or ("cuda" if torch.cuda.is_available() else "cpu"))
+        self.num_embedded = 0
+        self._embeddings = OrderedDict()
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        local_files_only = model_dir is not None
+        self.tokenizer = AutoTokenizer.from_pretrained(esm_model, local_files_only=local_files_only)
+        self.esm = EsmModel.from_pretrained(esm_model, local_files_only=local_files_only).to(self.device)
+        self.esm.eval()
+
+        in_channels = self.esm.config.hidden_size
+        hidden_channels = 256
+        out_channels = 64
+        linear_out1 = 32   
+        linear_out2 = 1
+        edge_dim = len(atom_pair) * 10
+        num_layers = 3 
+        num_timesteps = 2
+        dropout = 0.5
+        self.model = GraphNetwork(in_channels, hidden_channels, out_channels, edge_dim, num_layers, num_timesteps,
+                                  dropout, linear_out1, linear_out2).to(self.device)
+
+        state_dict = torch.load(weights_path, map_location=self.device)
+        new_state_dict = {}
+        for key, value in state_dict.items():
+            new_key = key.replace("lin_src", "lin").replace("lin_dst", "lin")
+            new_state_dict[new_key] = value
+        self.model.load_state_dict(new_state_dict, strict=False)
+        self.model.eval()
+
+    def _cache_key(self, sequence):
+        return hashlib.sha1(f"{self.esm_model}:{sequence}".encode()).hexdigest()
+
+    def _remember(self, key, embedding):
+        self._embeddings[key] = embedding
+        self._embeddings.move_to_end(key)
+        while len(self._embeddings) > self.cache_size:
+            self._embeddings.popitem(last=False)
+
+    def embed(self, sequences):
+        """
+        ESM embeddings of chain sequences, one (length, hidden size) tensor per sequence.
+
+        Sequences found in neither cache are embedded in padded batches, shortest first.
+        """
+        keys = [self._cache_key(seq) for seq in sequences]
+        found = {}
+        missing = {}
+        for key, seq in zip(keys, sequences):
+            if key in found:
+                continue
+            if key in self._embeddings:
+                self._embeddings.move_to_end(key)
+                found[key] = self._embeddings[key]
+                continue
+            path = os.path.join(self.cache_dir, key + '.npy') if self.cache_dir is not None else None
+            if path is not None and os.path.exists(path):
+                found[key] = torch.from_numpy(np.load(path))
+                self._remember(key, found[key])
+            else:
+                missing[key] = seq
+
+        todo = sorted(missing.items(), key=lambda item: len(item[1]))
+        for start in range(0, len(todo), self.embedding_batch_size):
+            batch = todo[start:start + self.embedding_batch_size]
+            inputs = self.tokenizer([seq for _, seq in batch], return_tensors="pt", padding=True).to(self.device)
+            with torch.no_grad():
+                last_hidden_state = self.esm(**inputs).last_hidden_state.float().cpu()
+            for i, (key, seq) in enumerate(batch):
+                # get the token from the 2nd to the one before the end token
+                embedding = last_hidden_state[i, 1:len(seq) + 1].clone()
+                self.num_embedded += 1
+                found[key] = embedding
+                self._remember(key, embedding)
+                if self.cache_dir is not None:
+                    path = os.path.join(self.cache_dir, key + '.npy')
+                    tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+                    np.save(tmp_path, embedding.numpy())
+                    os.replace(tmp_path, path)
+
+        return [found[key] for key in keys]
+
+    @staticmethod
+    def build_graphs(residuelistA, residuelistB):
+        """Graphs of one interface from per-chain residue lists; see build_interface_graphs."""
+        return build_interface_graphs(residuelistA, residuelistB)
+
+    def _to_data(self, graph, embeddings):
+        edge_index, edge_attr = graph
+        x = torch.cat(embeddings, 0) if embeddings else torch.empty((0, self.esm.config.hidden_size))
+        return Data(x=x, edge_index=torch.from_numpy(edge_index).long(),
+                    edge_attr=torch.from_numpy(edge_attr).float())
+
+    def predict(self, interface_graphs):
+        """
+        Predicted log10 affinity constants of interfaces from build_interface_graphs.
+
+        Returns:
+            numpy.ndarray: One prediction per interface.
+        """
+        sequences = [seq for graphs in interface_graphs for seq in graphs['seqA'] + graphs['seqB']]
+        embedding_of = dict(zip(sequences, self.embed(list(dict.fromkeys(sequences)))))
+
+        datalist_inter = []
+        datalist_intra1 = []
+        datalist_intra2 = []
+        for graphs in interface_graphs:
+            xA = [embedding_of[seq] for seq in graphs['seqA']]
+            xB = [embedding_of[seq] for seq in graphs['seqB']]
+            datalist_inter.append(self._to_data(graphs['inter'], xA + xB))
+            datalist_intra1.append(self._to_data(graphs['intra1'], xA))
+            datalist_intra2.append(self._to_data(graphs['intra2'], xB))
+
+        loaders = (DataLoader(datalist_inter, batch_size=self.batch_size),
+                   DataLoader(datalist_intra1, batch_size=self.batch_size),
+                   DataLoader(datalist_intra2, batch_size=self.batch_size))
+        all_predictions = []
+        with torch.no_grad():
+            for batch_inter, batch_intra1, batch_intra2 in zip(*loaders):
+                y_pred = self.model(batch_inter.to(self.device), batch_intra1.to(self.device),
+                                    batch_intra2.to(self.device))
+                all_predictions.append(y_pred.reshape(-1).cpu().numpy())
+        return np.concatenate(all_predictions) if all_predictions else np.empty(0)
+
+    def score(self, interfaces, temperature=298.15):
+        """
+        Predicted binding free energies of interfaces.
+
+        Args:
+            interfaces (list): (pdbfile, chainindex) pairs, e.g. ("8y7s.pdb", "A,B").
+            temperature (float): Temperature in Kelvin to convert K from.
+
+        Returns:
+            numpy.ndarray: Predicted dG (kJ/mol) of each interface.
+        """
+        interface_graphs = [self.build_graphs(*get_interface_residues(pdbfile, chainindex))
+                            for pdbfile, chainindex in interfaces]
+        return log10_affinity_to_dG(self.predict(interface_graphs), temperature)
+
+def log10_affinity_to_dG(log10_K, temperature=298.15):
+    """dG = -RT ln K in kJ/mol."""
+    R = 8.314 / 1000 # kJ/(mol*K)
+    return -R * temperature * np.log(10.0) * np.asarray(log10_K)
 
-    model.load_state_dict(new_state_dict, strict=False)
+# Scorers of run_proaffinity_inference, keyed by weights path, so the models are loaded only once
+_scorers = {}
 
+def run_proaffinity_inference(
+        pdbfile, chainindex, weights_path='./model.pkl', temperature=298.15, verbose=False
+    ):
+    """
+    Run ProAffinity inference on a given PDB file and chain index.
 
-    # Assuming model is your GNN model and dataloader is your test dataloader
-    model.eval()  # Set the model to evaluation mode
+    To score many interfaces, use ProAffinityScorer.score, which batches them.
     
-
-    all_predictions = []
-
-    with torch.no_grad():
-        # Disable gradient computation during testing
-        for batch_inter, batch_intra1, batch_intra2 in zip(test_loader_inter, test_loader_intra1, test_loader_intra2):
-            # Assuming batch contains input data 'x' and true values 'y_true'
-            batch_inter = batch_inter.to(device)
-            batch_intra1 = batch_intra1.to(device)
-            batch_intra2 = batch_intra2.to(device)
-            if isinstance(batch_intra1.edge_attr, list):
-                batch_intra1.edge_attr = torch.stack(batch_intra1.edge_attr, dim=0).to(device) 
-            if isinstance(batch_intra2.edge_attr, list):
-                batch_intra2.edge_attr = torch.stack(batch_intra2.edge_attr, dim=0).to(device)        # y_true = batch_inter.y
-            
-            # Get model predictions for the current batch
-            y_pred = model(batch_inter, batch_intra1, batch_intra2)
-            y_pred = torch.squeeze(y_pred)
-            
-            # Store predictions and true values
-            all_predictions.append(y_pred.cpu().numpy())
-
-    for i in range(len(all_predictions)):
-        # Check if the current item is a scalar by examining its dimensionality
-        if all_predictions[i].ndim == 0:
-            # Convert scalar to a 1D array and update the item in the list
-            all_predictions[i] = np.array([all_predictions[i]])
-
-    # Concatenate all predictions and true values
-    all_predictions = np.concatenate(all_predictions, axis=0)
-    K = 10**(all_predictions[0])
-    R = 8.314 / 1000 # kJ/(mol*K)
-    dG = -R * temperature * np.log(K)
+    Args:
+        pdbfile (str): Path to the PDB or PDBQT file.
+        chainindex (str): List of chains (e.g. "AB,C").
+        weights_path (str): Path to the model weights.
+        temperature (float): Temperature in Kelvin (default is 298.15) to convert K from.
+        
+    Returns:
+        float: Predicted dG (kJ/mol) value.
+    """
+    if verbose: print(chainindex.split(','))
+    if weights_path not in _scorers:
+        _scorers[weights_path] = ProAffinityScorer(weights_path=weights_path)
+    dG = _scorers[weights_path].score([(pdbfile, chainindex)], temperature)[0]
     if verbose: print('dG:', int(dG), 'kJ/mol')
     return dG
 
@@ -0,0 +1,90 @@
+import io
+import contextlib
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from ionerdss.nerdss_model import affinity
+from ionerdss.nerdss_model.affinity import R, predict_interface_affinities
+from ionerdss.nerdss_model.pdb_model import PDBModel
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+class FakeScorer:
+    """Stands in for ProAffinityScorer: log10 K grows with the number of residues of the pair."""
+    esm_model = "fake-esm"
+    weights_path = "fake.pkl"
+
+    def __init__(self):
+        self.num_predicted = 0
+
+    @staticmethod
+    def build_graphs(residuelistA, residuelistB):
+        return sum(len(r) for r in residuelistA), sum(len(r) for r in residuelistB)
+
+    def predict(self, graphs):
+        self.num_predicted += len(graphs)
+        return np.array([6.0 + 1e-3 * (a + 2 * b) for a, b in graphs])
+
+
+class TestAffinityRates(unittest.TestCase):
+    def setUp(self):
+        affinity._predictions.clear()
+        self.save_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.save_dir.cleanup()
+
+    def build_model(self):
+        model = PDBModel(pdb_file=str(DATA_DIR / "8erq-assembly1.cif"), save_dir=self.save_dir.name)
+        with contextlib.redirect_stdout(io.StringIO()):
+            model.coarse_grain()
+            np.random.seed(0)
+            model.regularize_homologous_chains()
+        return model
+
+    def test_predictions_deduplicated_and_memoized(self):
+        chain = [[{"type": "A", "number": 0, "atoms": [{"type": "CA", "x": 1.0, "y": 2.0, "z": 3.0}]}]]
+        other = [[{"type": "G", "number": 0, "atoms": [{"type": "CA", "x": 0.0, "y": 2.0, "z": 3.0}]}]]
+        scorer = FakeScorer()
+        cache_file = os.path.join(self.save_dir.name, "affinities.json")
+        dG = predict_interface_affinities(scorer, [(chain, other), (chain, other), (other, chain)], cache_file=cache_file)
+        self.assertEqual(scorer.num_predicted, 2)
+        self.assertEqual(dG[0], dG[1])
+        self.assertAlmostEqual(dG[0], -R * 298.15 * np.log(10.0) * 6.003)
+
+        # A new session reads the predictions back from the cache file
+        affinity._predictions.clear()
+        again = predict_interface_affinities(scorer, [(other, chain)], temperature=310.0, cache_file=cache_file)
+        self.assertEqual(scorer.num_predicted, 2)
+        self.assertAlmostEqual(again[0], dG[2] * 310.0 / 298.15)
+
+    def test_assign_affinity_rates(self):
+        model = self.build_model()
+        scorer = FakeScorer()
+        with contextlib.redirect_stdout(io.StringIO()):
+            model.assign_affinity_rates(scorer=scorer, workers=2)
+        templates = model.reaction_template_list
+        self.assertEqual(scorer.num_predicted, len(templates))
+        for template in templates:
+            kd = np.exp(template.dG / (R * 298.15)) * 1e6
+            self.assertAlmostEqual(template.kd / kd, 1.0)
+            self.assertAlmostEqual(template.kb / (kd * template.ka * 0.6022), 1.0)
+        self.assertEqual(sorted(r.kb for r in model.reactions), sorted(t.kb for t in templates))
+        for reaction in model.reaction_list:
+            self.assertEqual(reaction.kb, reaction.my_template.kb)
+
+        # Rebuilding the model from the same structure predicts nothing again
+        rebuilt = self.build_model()
+        with contextlib.redirect_stdout(io.StringIO()):
+            rebuilt.assign_affinity_rates(scorer=scorer)
+        self.assertEqual(scorer.num_predicted, len(templates))
+        self.assertEqual([t.kb for t in rebuilt.reaction_template_list], [t.kb for t in templates])
+
+
+if __name__ == "__main__":
+    unittest.main()
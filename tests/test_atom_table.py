@@ -0,0 +1,75 @@
+import unittest
+from pathlib import Path
+
+import numpy as np
+from Bio.PDB import MMCIFParser
+from scipy.spatial import KDTree
+
+from ionerdss.nerdss_model.atom_table import AtomTable
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+class TestAtomTable(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        structure = MMCIFParser(QUIET=True).get_structure("8y7s", str(DATA_DIR / "8y7s-assembly1.cif"))
+        cls.chains = list(structure[0])
+        cls.table = AtomTable.from_chains(cls.chains)
+
+    def chain_coords(self, chain_index):
+        return self.table.coords[self.table.atom_chain == chain_index]
+
+    def test_chain_reductions(self):
+        centers = self.table.chain_centers_of_mass()
+        radii = self.table.chain_radii_of_gyration(centers)
+        mins, maxs = self.table.chain_bounding_boxes()
+        for i in range(self.table.num_chains):
+            coords = self.chain_coords(i)
+            np.testing.assert_allclose(centers[i], coords.mean(axis=0), atol=1e-6)
+            np.testing.assert_allclose(radii[i], np.sqrt(np.mean(np.sum((coords - coords.mean(axis=0)) ** 2, axis=1))),
+                                       atol=1e-6)
+            np.testing.assert_allclose(mins[i], coords.min(axis=0))
+            np.testing.assert_allclose(maxs[i], coords.max(axis=0))
+
+    def test_interchain_contacts_match_pairwise_search(self):
+        cutoff = 3.5
+        atoms1, atoms2 = self.table.interchain_contacts(cutoff, chunk_size=1000)
+        found = set(zip(atoms1.tolist(), atoms2.tolist()))
+        self.assertEqual(len(found), len(atoms1))
+
+        eligible = self.table.residue_has_ca[self.table.atom_residue]
+        expected = set()
+        for i in range(self.table.num_chains):
+            atoms_i = np.flatnonzero((self.table.atom_chain == i) & eligible)
+            for j in range(i + 1, self.table.num_chains):
+                atoms_j = np.flatnonzero((self.table.atom_chain == j) & eligible)
+                pairs = KDTree(self.table.coords[atoms_i]).query_ball_tree(KDTree(self.table.coords[atoms_j]), cutoff)
+                expected.update((atoms_i[a], atoms_j[b]) for a, neighbors in enumerate(pairs) for b in neighbors)
+
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(found, expected)
+
+    def test_chain_pair_interfaces_match_contact_loop(self):
+        table = self.table
+        energy_table = {("ALA", "LEU"): 1.5, ("LEU", "ALA"): 1.5, ("GLU", "LYS"): -2.0, ("LYS", "GLU"): -2.0}
+        atoms1, atoms2 = table.interchain_contacts(3.5)
+        expected = {}
+        for a1, a2 in zip(atoms1.tolist(), atoms2.tolist()):
+            r1 = table.residue_canonical[table.atom_residue[a1]]
+            r2 = table.residue_canonical[table.atom_residue[a2]]
+            pairs = expected.setdefault((table.residue_chain[r1], table.residue_chain[r2]), set())
+            pairs.add((r1, r2))
+
+        interfaces = table.chain_pair_interfaces(3.5, energy_table, workers=2)
+        self.assertEqual([(i, j) for i, j, *_ in interfaces], sorted(expected))
+        for i, j, residues1, residues2, energy in interfaces:
+            pairs = expected[(i, j)]
+            self.assertEqual(residues1.tolist(), sorted({r1 for r1, _ in pairs}))
+            self.assertEqual(residues2.tolist(), sorted({r2 for _, r2 in pairs}))
+            self.assertAlmostEqual(energy, sum(
+                energy_table.get((table.residue_name[r1], table.residue_name[r2]), 0.0) for r1, r2 in pairs))
+
+
+if __name__ == "__main__":
+    unittest.main()
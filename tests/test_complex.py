@@ -0,0 +1,126 @@
+import itertools
+import unittest
+from types import SimpleNamespace
+
+from ionerdss.nerdss_model.complex import Complex, _micro2macro, build_ode_model_from_complexes
+
+
+class Molecule:
+    def __init__(self, name, template):
+        self.name = name
+        self.my_template = SimpleNamespace(name=template)
+        self.diffusion_translation = 1.0
+
+
+def molecule(name, template):
+    return Molecule(name, template)
+
+
+def reaction(expression):
+    return SimpleNamespace(my_template=SimpleNamespace(expression=expression, ka=10.0, kb=1.0, binding_radius=10.0))
+
+
+def make_complex(molecules, bonds):
+    complex_obj = Complex()
+    if not bonds:
+        complex_obj.add_interaction(molecules[0], None, None)
+    for m1, m2, rxn in bonds:
+        complex_obj.add_interaction(m1, m2, rxn)
+        complex_obj.add_interaction(m2, m1, rxn)
+    return complex_obj
+
+
+def reference_eq(c1, c2):
+    """Edge-list comparison that Complex.__eq__ used to perform."""
+    if c1.size() != c2.size():
+        return False
+    if sorted(k.my_template.name for k in c1.get_keys()) != sorted(k.my_template.name for k in c2.get_keys()):
+        return False
+    if c1.size() == 1:
+        return True
+
+    def edges(c):
+        return sorted(sorted((k.my_template.name, p.my_template.name, r.my_template.expression))
+                      for k in c.get_keys() for p, r in c.get_interactions(k))
+    return edges(c1) == edges(c2)
+
+
+class TestComplexCanonicalKey(unittest.TestCase):
+    def setUp(self):
+        self.molecules = [molecule(name, template) for name, template in
+                          (("A", "X"), ("B", "X"), ("C", "Y"), ("D", "X"))]
+        self.reactions = [reaction("X(a) + X(a)"), reaction("X(b) + Y(b)")]
+
+    def all_complexes(self):
+        complexes = [make_complex([m], []) for m in self.molecules]
+        pairs = list(itertools.combinations(self.molecules, 2))
+        for num_bonds in (1, 2, 3):
+            for bonds in itertools.combinations(pairs, num_bonds):
+                for reactions in itertools.product(self.reactions, repeat=num_bonds):
+                    complexes.append(make_complex(self.molecules,
+                                                  [(m1, m2, r) for (m1, m2), r in zip(bonds, reactions)]))
+        return complexes
+
+    def test_key_consistent_with_eq_and_hash(self):
+        complexes = self.all_complexes()
+        for c1, c2 in itertools.product(complexes, repeat=2):
+            expected = reference_eq(c1, c2)
+            self.assertEqual(c1 == c2, expected)
+            self.assertEqual(c1.canonical_key() == c2.canonical_key(), expected)
+            if expected:
+                self.assertEqual(hash(c1), hash(c2))
+
+    def test_fragments_found_by_key(self):
+        a, b, c = self.molecules[:3]
+        monomers = [make_complex([m], []) for m in (a, b, c)]
+        dimer_ab = make_complex([a, b], [(a, b, self.reactions[0])])
+        dimer_bc = make_complex([b, c], [(b, c, self.reactions[1])])
+        trimer = make_complex([a, b, c], [(a, b, self.reactions[0]), (b, c, self.reactions[1])])
+        complex_list = monomers + [dimer_ab, dimer_bc, trimer]
+        for i, complex_obj in enumerate(complex_list):
+            complex_obj.name = f"C{i + 1}"
+            complex_obj.diffusion_constant = 1.0 / complex_obj.size()
+
+        system = build_ode_model_from_complexes(complex_list)
+        dissociations = sorted(r.expression for r in system.reactions if r.is_dissociation())
+        # A and B share a template, so both monomers of template X resolve to the same listed complex
+        self.assertEqual(dissociations, ["C4 -> C2 + C2", "C5 -> C2 + C3", "C6 -> C2 + C5", "C6 -> C3 + C4"])
+
+
+class TestDegenerateReactions(unittest.TestCase):
+    def setUp(self):
+        # Head-to-tail ring of three molecules of one template
+        self.a, self.b, self.c = (molecule(name, "X") for name in "ABC")
+        self.bond = reaction("X(h) + X(t)")
+        a, b, c, bond = self.a, self.b, self.c, self.bond
+        self.complex_list = [
+            make_complex([a], []),
+            make_complex([a, b], [(a, b, bond)]),
+            make_complex([a, b, c], [(a, b, bond), (b, c, bond)]),
+            make_complex([a, b, c], [(a, b, bond), (b, c, bond), (c, a, bond)]),
+        ]
+        for i, complex_obj in enumerate(self.complex_list):
+            complex_obj.name = f"C{i + 1}"
+            complex_obj.diffusion_constant = 1.0 / complex_obj.size()
+
+    def test_symmetric_copies_collapsed_with_degeneracy(self):
+        system = build_ode_model_from_complexes(self.complex_list)
+        degeneracies = {r.expression: r.degeneracy for r in system.reactions}
+        self.assertEqual(degeneracies, {
+            "C2 -> C1 + C1": 1, "C1 + C1 -> C2": 1,
+            # Either end bond of the trimer breaks; a monomer binds either free end of a dimer
+            "C3 -> C1 + C2": 2, "C1 + C2 -> C3": 2,
+            # Any of the three ring bonds opens; a linear trimer closes one way
+            "C4 -> C3": 3, "C3 -> C4": 1,
+        })
+        rates = {r.expression: r.rate for r in system.reactions}
+        self.assertAlmostEqual(rates["C4 -> C3"], 3 * self.bond.my_template.kb)
+        self.assertAlmostEqual(rates["C3 -> C4"], self.bond.my_template.ka * 0.6022 * 1e6)
+        template = self.bond.my_template
+        kon, koff = _micro2macro(template.ka, template.kb, template.binding_radius / 10.0, 1.0 + 0.5)
+        self.assertAlmostEqual(rates["C1 + C2 -> C3"], 2 * kon)
+        self.assertAlmostEqual(rates["C3 -> C1 + C2"], 2 * koff)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import itertools
+import random
+import unittest
+from types import SimpleNamespace
+
+from ionerdss.nerdss_model.complex import Complex, parse_complexes_from_pdb_model
+from ionerdss.nerdss_model.complex_enumeration import ComplexEnumerator, canonical_form
+
+
+class Molecule:
+    def __init__(self, name, template):
+        self.name = name
+        self.my_template = SimpleNamespace(name=template)
+
+
+def binding(m1, m2, expression):
+    return SimpleNamespace(reactants=[(m1, None), (m2, None)],
+                           my_template=SimpleNamespace(expression=expression))
+
+
+def ring_model():
+    """A ring of six X molecules, each with a Y bound to it, and one chord."""
+    xs = [Molecule(f"X{i}", "X") for i in range(6)]
+    ys = [Molecule(f"Y{i}", "Y") for i in range(6)]
+    reactions = [binding(xs[i], xs[(i + 1) % 6], "X(a) + X(b)") for i in range(6)]
+    reactions += [binding(x, y, "X(c) + Y(c)") for x, y in zip(xs, ys)]
+    reactions.append(binding(xs[0], xs[3], "X(d) + X(d)"))
+    # Interleave the molecules so the ordering is not trivially along the ring
+    return SimpleNamespace(molecule_list=[m for pair in zip(xs, ys) for m in pair], reaction_list=reactions)
+
+
+def reference_complexes(model, max_size):
+    """The complexes found by testing every molecule and edge combination, in that order."""
+    molecules = model.molecule_list
+    edges = {}
+    for reaction in model.reaction_list:
+        m1, m2 = reaction.reactants[0][0], reaction.reactants[1][0]
+        edges.setdefault(frozenset((m1.name, m2.name)), (m1, m2, reaction))
+
+    def connected(names, edge_subset):
+        adjacency = {name: set() for name in names}
+        for m1, m2, _ in edge_subset:
+            adjacency[m1.name].add(m2.name)
+            adjacency[m2.name].add(m1.name)
+        stack, seen = [next(iter(names))], set()
+        while stack:
+            name = stack.pop()
+            if name not in seen:
+                seen.add(name)
+                stack.extend(adjacency[name])
+        return seen == set(names)
+
+    keys = []
+    for size in range(1, max_size + 1):
+        for subset in itertools.combinations(molecules, size):
+            names = {m.name for m in subset}
+            if size == 1:
+                complex_obj = Complex()
+                complex_obj.add_interaction(subset[0], None, None)
+                keys.append(complex_obj.canonical_key())
+                continue
+            valid = [edge for pair, edge in edges.items() if pair <= names]
+            for count in range(size - 1, len(valid) + 1):
+                for edge_subset in itertools.combinations(valid, count):
+                    if connected(names, edge_subset):
+                        complex_obj = Complex()
+                        for m1, m2, reaction in edge_subset:
+                            complex_obj.add_interaction(m1, m2, reaction)
+                            complex_obj.add_interaction(m2, m1, reaction)
+                        keys.append(complex_obj.canonical_key())
+    return keys
+
+
+class TestCanonicalForm(unittest.TestCase):
+    def test_invariant_under_relabeling(self):
+        rng = random.Random(0)
+        labels = ["A", "A", "B", "A", "B", "A"]
+        edges = {(0, 1): "x", (1, 2): "y", (2, 3): "y", (3, 4): "y", (4, 5): "y", (0, 5): "x", (1, 4): "z"}
+        form, order = canonical_form(labels, edges)
+        self.assertEqual(sorted(order), list(range(6)))
+        for _ in range(20):
+            permutation = list(range(6))
+            rng.shuffle(permutation)
+            permuted_labels = [None] * 6
+            for v, label in enumerate(labels):
+                permuted_labels[permutation[v]] = label
+            permuted_edges = {tuple(sorted((permutation[i], permutation[j]))): label
+                              for (i, j), label in edges.items()}
+            self.assertEqual(canonical_form(permuted_labels, permuted_edges)[0], form)
+
+    def test_distinguishes_non_isomorphic_graphs(self):
+        path = canonical_form(["A"] * 4, {(0, 1): "x", (1, 2): "x", (2, 3): "x"})[0]
+        star = canonical_form(["A"] * 4, {(0, 1): "x", (0, 2): "x", (0, 3): "x"})[0]
+        relabeled = canonical_form(["A"] * 4, {(0, 1): "x", (1, 2): "y", (2, 3): "x"})[0]
+        self.assertEqual(len({path, star, relabeled}), 3)
+
+
+class TestComplexEnumerator(unittest.TestCase):
+    def setUp(self):
+        self.model = ring_model()
+
+    def test_connected_sets_visited_once(self):
+        enumerator = ComplexEnumerator(self.model.molecule_list, self.model.reaction_list, max_complex_size=5)
+        sets = list(enumerator.connected_molecule_sets())
+        self.assertEqual(len(sets), len(set(sets)))
+
+        position = {m.name: i for i, m in enumerate(self.model.molecule_list)}
+        adjacency = {i: set() for i in position.values()}
+        for reaction in self.model.reaction_list:
+            i, j = (position[reactant[0].name] for reactant in reaction.reactants)
+            adjacency[i].add(j)
+            adjacency[j].add(i)
+
+        def connected(subset):
+            stack, seen = [subset[0]], set()
+            while stack:
+                v = stack.pop()
+                if v not in seen:
+                    seen.add(v)
+                    stack.extend(adjacency[v] & set(subset))
+            return len(seen) == len(subset)
+
+        expected = {subset for size in range(1, 6) for subset in itertools.combinations(range(12), size)
+                    if connected(subset)}
+        self.assertEqual(set(sets), expected)
+
+    def test_matches_exhaustive_enumeration(self):
+        max_size = 5
+        reference = reference_complexes(self.model, max_size)
+        first_seen = list(dict.fromkeys(reference))
+        complexes = parse_complexes_from_pdb_model(self.model, max_complex_size=max_size)
+        keys = [complex_obj.canonical_key() for complex_obj in complexes]
+        self.assertEqual(len(keys), len(set(keys)))
+        self.assertEqual(set(keys), set(first_seen))
+        # Ordered by size, then by the first molecule combination forming each complex
+        self.assertEqual([len(key[0]) for key in keys], [len(key[0]) for key in first_seen])
+
+    def test_streams_unique_complexes_and_reports_progress(self):
+        reports = []
+        enumerator = ComplexEnumerator(self.model.molecule_list, self.model.reaction_list, max_complex_size=4,
+                                       progress_callback=lambda e: reports.append(e.num_molecule_sets),
+                                       progress_interval=50)
+        stream = enumerator.iter_unique()
+        first = next(stream)
+        self.assertEqual(first.size(), 1)
+        streamed = [first] + list(stream)
+        keys = {complex_obj.canonical_key() for complex_obj in streamed}
+        self.assertEqual(len(keys), len(streamed))
+        self.assertEqual(keys, set(reference_complexes(self.model, 4)))
+        self.assertEqual(enumerator.num_complexes, len(streamed))
+        self.assertLess(enumerator.num_isomorphism_classes, enumerator.num_molecule_sets)
+        self.assertEqual(reports[-1], enumerator.num_molecule_sets)
+        self.assertTrue(all(count % 50 == 0 for count in reports[:-1]))
+        self.assertGreater(len(reports), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
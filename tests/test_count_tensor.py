@@ -0,0 +1,78 @@
+import os
+import unittest
+
+import numpy as np
+
+from ionerdss.nerdss_analysis.data.processors import HistogramProcessor, CountTensor
+from ionerdss.nerdss_analysis.data.processors.utils import parse_histogram_complex
+from ionerdss.nerdss_analysis.parallel import ParallelExecutor
+
+OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "8erq_dir", "nerdss_output")
+SIM_DIRS = [os.path.join(OUTPUT_DIR, str(i)) for i in (1, 2, 3)]
+LEGENDS = ["A: 1.", "B: 1.", "A: 1. C: 1.", "C: 3.", "B: 1000."]
+
+
+class TestCountTensor(unittest.TestCase):
+
+    def setUp(self):
+        self.processor = HistogramProcessor(use_disk_cache=False)
+        self.processor.configure(SIM_DIRS, executor=ParallelExecutor(backend="serial"))
+        self.all_data = self.processor.read_multiple(SIM_DIRS)
+
+    def test_time_series_matches_reference_loop(self):
+        result = self.processor.get_time_series(LEGENDS)
+        min_length = min(len(d["Time (s)"]) for d in self.all_data)
+        self.assertEqual(result["Time (s)"], self.all_data[0]["Time (s)"][:min_length])
+
+        for legend in LEGENDS:
+            legend_dict = parse_histogram_complex(legend)
+            expected = np.zeros((len(self.all_data), min_length), dtype=np.int64)
+            for s, data in enumerate(self.all_data):
+                for t in range(min_length):
+                    for count, species_dict in data["complexes"][t]:
+                        if species_dict == legend_dict:
+                            expected[s, t] = count
+            np.testing.assert_array_equal(result[legend], expected)
+
+    def test_statistics(self):
+        stats = self.processor.calculate_time_series_statistics(LEGENDS[:2], ["A1", "B1"])
+        series = self.processor.get_time_series(LEGENDS[:2], ["A1", "B1"])
+        np.testing.assert_allclose(stats["A1"]["mean"], series["A1"].mean(axis=0))
+        np.testing.assert_allclose(stats["B1"]["std"], series["B1"].std(axis=0))
+
+    def test_complex_sizes_match_expanded_lists(self):
+        legend = ["A", "C"]
+        sizes = self.processor.calculate_complex_sizes(legend)
+        self.assertEqual(len(sizes), len(self.all_data))
+        for sim_sizes, data in zip(sizes, self.all_data):
+            expected = []
+            for complexes in data["complexes"]:
+                for count, species_dict in complexes:
+                    expected.extend([sum(species_dict.get(s, 0) for s in legend)] * count)
+            self.assertEqual(sorted(sim_sizes.tolist()), sorted(expected))
+
+    def test_weighted_entries_match_expanded_histogram(self):
+        tensor = self.processor.get_count_tensor()
+        self.assertIsInstance(tensor, CountTensor)
+        _, times, composition_ids, counts = tensor.entries()
+        sizes = tensor.sizes(["B"])[composition_ids]
+
+        expanded = [
+            (time, species_dict.get("B", 0))
+            for data in self.all_data
+            for time, complexes in zip(data["Time (s)"], data["complexes"])
+            for count, species_dict in complexes
+            for _ in range(count)
+        ]
+        exp_times, exp_sizes = np.array(expanded).T
+        expected, time_edges, size_edges = np.histogram2d(exp_times, exp_sizes, bins=[7, 5])
+        result, _, _ = np.histogram2d(times, sizes, bins=[time_edges, size_edges], weights=counts)
+        np.testing.assert_array_equal(result, expected)
+
+        totals = tensor.totals((0.0, 0.01))
+        self.assertEqual(totals.shape, (len(SIM_DIRS), len(tensor.compositions)))
+        self.assertTrue(np.all(totals <= tensor.totals().astype(np.int64)))
+
+
+if __name__ == '__main__':
+    unittest.main()
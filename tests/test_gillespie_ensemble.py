@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from ionerdss import SimpleGillespieSimulator
+from ionerdss.gillespie_simulation.ensemble import RunningMoments, run_gillespie_ensemble
+
+
+class TestGillespieEnsemble(unittest.TestCase):
+
+    def setUp(self):
+        # A + B <-> C
+        self.reactant_matrix = np.array([[1, 1, 0], [0, 0, 1]])
+        self.product_matrix = np.array([[0, 0, 1], [1, 1, 0]])
+        self.rate_constants = np.array([0.01, 0.5])
+        self.y_init = np.array([30, 20, 0])
+        self.time_grid = np.linspace(0.0, 5.0, 26)
+        self.sgs = SimpleGillespieSimulator()
+
+    def run_ensemble(self, **kwargs):
+        return self.sgs.gillespie_ensemble(
+            12, self.time_grid, self.y_init, self.reactant_matrix, self.product_matrix,
+            self.rate_constants, seed=7, **kwargs
+        )
+
+    def test_grid_matches_event_records(self):
+        y_record, t_record = self.sgs.gillespie_simulation(
+            5.0, self.y_init, self.reactant_matrix, self.product_matrix, self.rate_constants,
+            rng=np.random.default_rng(np.random.SeedSequence(7).spawn(1)[0])
+        )
+        result = run_gillespie_ensemble(
+            1, self.time_grid, self.y_init, self.reactant_matrix, self.product_matrix,
+            self.rate_constants, seed=7, backend="serial"
+        )
+        positions = np.searchsorted(t_record, self.time_grid, side="right") - 1
+        np.testing.assert_array_equal(result.trajectories[0], np.array(y_record)[positions])
+
+    def test_replicates_do_not_depend_on_batching(self):
+        serial = self.run_ensemble(backend="serial", batch_size=1)
+        pooled = self.run_ensemble(backend="process", max_workers=2, batch_size=5)
+        np.testing.assert_array_equal(serial.trajectories, pooled.trajectories)
+        self.assertEqual(serial.trajectories.shape, (12, 26, 3))
+        # Distinct streams per replicate
+        self.assertFalse(np.array_equal(serial.trajectories[0], serial.trajectories[1]))
+
+    def test_moments_and_memmap(self):
+        stored = self.run_ensemble(backend="serial", batch_size=5)
+        np.testing.assert_allclose(stored.mean, stored.trajectories.mean(axis=0))
+        np.testing.assert_allclose(stored.variance, stored.trajectories.var(axis=0), atol=1e-12)
+        np.testing.assert_array_equal(stored.trajectories[:, :, 0] + stored.trajectories[:, :, 2], 30)
+
+        streamed = self.run_ensemble(backend="serial", batch_size=5, store_trajectories=False)
+        self.assertIsNone(streamed.trajectories)
+        np.testing.assert_allclose(streamed.mean, stored.mean)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            memmap_file = os.path.join(temp_dir, "trajectories.npy")
+            mapped = self.run_ensemble(backend="serial", memmap_file=memmap_file)
+            np.testing.assert_array_equal(np.load(memmap_file), stored.trajectories)
+            del mapped
+
+    def test_approximate_methods(self):
+        leaped = self.run_ensemble(backend="serial", method="tau_leaping", method_options={"epsilon": 0.05})
+        self.assertEqual(leaped.trajectories.dtype, np.int64)
+        hybrid = self.run_ensemble(backend="serial", method="hybrid", method_options={"copy_threshold": 15})
+        self.assertEqual(hybrid.trajectories.dtype, np.float64)
+        for result in (leaped, hybrid):
+            np.testing.assert_allclose(result.trajectories[:, :, 0] + result.trajectories[:, :, 2], 30)
+
+    def test_running_moments(self):
+        samples = np.random.default_rng(0).normal(size=(23, 4))
+        moments = RunningMoments(4)
+        for batch in np.array_split(samples, [3, 4, 15]):
+            moments.add_batch(batch)
+        np.testing.assert_allclose(moments.mean, samples.mean(axis=0))
+        np.testing.assert_allclose(moments.variance, samples.var(axis=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import re
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from ionerdss.nerdss_analysis.data.processors import HistogramProcessor, HistogramStore, load_histogram_store
+from ionerdss.nerdss_analysis.data.processors.histogram_store import get_store_dir
+from ionerdss.nerdss_analysis.data.processors.utils import parse_histogram_line
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), "..", "data", "test_single_histogram.dat")
+
+
+def read_histogram_reference(data_file):
+    """Line-by-line reference parse of histogram_complexes_time.dat."""
+    time_series, all_complexes = [], []
+    current_time, current_complexes = None, []
+    with open(data_file) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            time_match = re.match(r"Time \(s\):\s+([\d.]+(?:[eE][+-]?\d+)?)", line)
+            if time_match:
+                if current_time is not None:
+                    time_series.append(current_time)
+                    all_complexes.append(current_complexes)
+                    current_complexes = []
+                current_time = float(time_match.group(1))
+            else:
+                count, species_dict = parse_histogram_line(line)
+                if species_dict:
+                    current_complexes.append((count, species_dict))
+    if current_time is not None and current_complexes:
+        time_series.append(current_time)
+        all_complexes.append(current_complexes)
+    return {"Time (s)": time_series, "complexes": all_complexes}
+
+
+class TestHistogramStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.sim_dir = self.temp_dir.name
+        os.makedirs(os.path.join(self.sim_dir, "DATA"))
+        self.data_file = os.path.join(self.sim_dir, "DATA", "histogram_complexes_time.dat")
+        shutil.copy(DATA_FILE, self.data_file)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_matches_reference_parser(self):
+        expected = read_histogram_reference(self.data_file)
+        result = HistogramProcessor().read_single(self.sim_dir)
+        self.assertEqual(result["Time (s)"], expected["Time (s)"])
+        self.assertEqual(result["complexes"], expected["complexes"])
+
+    def test_sidecar_is_memory_mapped(self):
+        load_histogram_store(self.sim_dir)
+        self.assertTrue(os.path.exists(os.path.join(get_store_dir(self.sim_dir), "meta.json")))
+
+        store = load_histogram_store(self.sim_dir)
+        self.assertIsInstance(store.count, np.memmap)
+        self.assertEqual(store.to_dict(), read_histogram_reference(self.data_file))
+
+    def test_sidecar_invalidated_on_append(self):
+        store = load_histogram_store(self.sim_dir)
+        with open(self.data_file, "a") as f:
+            f.write("Time (s): 99\n3\tdode: 1. \n1\tdode: 7. \n")
+
+        updated = load_histogram_store(self.sim_dir)
+        self.assertEqual(updated.num_times, store.num_times + 1)
+        self.assertEqual(updated.complexes_at(updated.num_times - 1), [(3, {"dode": 1}), (1, {"dode": 7})])
+
+    def test_select_time_frame(self):
+        store = load_histogram_store(self.sim_dir, use_cache=False)
+        selected = store.select_time_frame((0.002, 0.004))
+        np.testing.assert_allclose(selected.times, [0.002, 0.003, 0.004])
+        self.assertEqual(selected.complexes_at(0), store.complexes_at(2))
+        self.assertEqual(selected.complexes_at(2), store.complexes_at(4))
+
+    def test_compositions_are_interned(self):
+        store = load_histogram_store(self.sim_dir, use_cache=False)
+        keys = [tuple(sorted(c.items())) for c in store.compositions]
+        self.assertEqual(len(keys), len(set(keys)))
+        self.assertIsInstance(store, HistogramStore)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import io
+import contextlib
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from ionerdss.nerdss_model.pdb_model import (
+    PDBModel, align_sequences, chain_sequence, residue_correspondence, rigid_transform_chains, sequence_identity
+)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+class TestHomology(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.save_dir = tempfile.TemporaryDirectory()
+        cls.model = PDBModel(pdb_file=str(DATA_DIR / "8y7s-assembly1.cif"), save_dir=cls.save_dir.name)
+        cls.chains = {chain.id: chain for chain in cls.model.all_atoms_structure[0]}
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.save_dir.cleanup()
+
+    def test_alignment_grouping(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.model._find_homologous_chains_by_alignment()
+        self.assertEqual([sorted(group) for group in self.model.chains_group], [["A", "B", "E", "F"]])
+        self.assertEqual(set(self.model.chains_map.values()), {"A"})
+
+    def test_residue_correspondence(self):
+        sequence1, sequence2 = "MKTAYIAKQRQISFVK", "MKTAYAKQRQISWFVK"
+        aligned1, aligned2 = align_sequences(sequence1, sequence2)
+        expected1, expected2, idx1, idx2 = [], [], 0, 0
+        for a1, a2 in zip(aligned1, aligned2):
+            if a1 != '-' and a2 != '-':
+                expected1.append(idx1)
+                expected2.append(idx2)
+            idx1 += a1 != '-'
+            idx2 += a2 != '-'
+        indices1, indices2 = residue_correspondence(sequence1, sequence2)
+        self.assertEqual(indices1.tolist(), expected1)
+        self.assertEqual(indices2.tolist(), expected2)
+        self.assertEqual(sequence_identity(sequence1, sequence1), 100.0)
+        self.assertEqual(sequence_identity("", ""), 0.0)
+
+    def test_rigid_transform_reuses_grouping(self):
+        # A and B have identical sequences
+        chain_a, chain_b = self.chains["A"], self.chains["B"]
+        cache = {}
+        R, t = rigid_transform_chains(chain_a, chain_b, cache)
+        self.assertEqual(list(cache), [(chain_sequence(chain_a), chain_sequence(chain_b))])
+        R_inverse, t_inverse = rigid_transform_chains(chain_b, chain_a, cache)
+        self.assertEqual(len(cache), 1)
+
+        # With the same residue groups the two transforms are inverses of each other
+        np.testing.assert_allclose(R_inverse @ R, np.eye(3), atol=1e-5)
+        np.testing.assert_allclose(R_inverse @ t + t_inverse, np.zeros(3), atol=1e-3)
+
+        # Superposed CA atoms of the two copies nearly coincide
+        moved = np.array([res['CA'].coord for res in chain_a if 'CA' in res]) @ R.T + t
+        reference = np.array([res['CA'].coord for res in chain_b if 'CA' in res])
+        self.assertEqual(len(moved), len(reference))
+        self.assertLess(np.sqrt(np.mean(np.sum((moved - reference) ** 2, axis=1))), 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
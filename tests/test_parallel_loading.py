@@ -0,0 +1,67 @@
+import glob
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from ionerdss.nerdss_analysis.data import Data
+from ionerdss.nerdss_analysis.parallel import ParallelExecutor
+from ionerdss.nerdss_analysis.data_readers import read_multiple_simulations, read_transition_matrix
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+SIM_DIRS = sorted(glob.glob(os.path.join(DATA_DIR, "8y7s_dir", "nerdss_output", "*")))
+
+
+def square_or_fail(x):
+    if x == 3:
+        raise ValueError("bad item")
+    return x * x
+
+
+class TestParallelLoading(unittest.TestCase):
+
+    def test_results_keep_input_order_and_errors(self):
+        for backend in ("process", "thread", "serial"):
+            with self.subTest(backend=backend):
+                executor = ParallelExecutor(backend=backend, max_workers=2, chunksize=2)
+                results = executor.map(square_or_fail, range(6))
+                self.assertEqual([r.item for r in results], list(range(6)))
+                self.assertEqual([r.value for r in results], [0, 1, 4, None, 16, 25])
+                self.assertIn("bad item", results[3].error)
+                self.assertTrue(all(r.error is None for i, r in enumerate(results) if i != 3))
+
+    def test_unpicklable_function_falls_back_to_serial(self):
+        results = ParallelExecutor(max_workers=2).map(lambda x: x + 1, [1, 2, 3])
+        self.assertEqual([r.value for r in results], [2, 3, 4])
+
+    def test_invalid_backend(self):
+        with self.assertRaises(ValueError):
+            ParallelExecutor(backend="mpi")
+
+    def test_read_multiple_simulations_reports_missing_dirs(self):
+        with tempfile.TemporaryDirectory() as missing:
+            results = read_multiple_simulations(SIM_DIRS + [missing], read_transition_matrix,
+                                                executor=ParallelExecutor(max_workers=2))
+        self.assertEqual(len(results), len(SIM_DIRS) + 1)
+        self.assertEqual(results[-1], (None, None))
+
+    def test_process_pool_matches_serial(self):
+        loaded = {}
+        for backend in ("serial", "process"):
+            data = Data()
+            data.configure(simulation_dirs=SIM_DIRS, executor=backend, max_workers=2)
+            loaded[backend] = (
+                data.get_histogram_data(SIM_DIRS)['raw_data'],
+                data.get_copy_numbers_data(SIM_DIRS)['dataframes'],
+                data.get_transition_data()['aggregated_matrix'],
+            )
+            self.assertEqual(data.get_load_errors()['histogram'], {})
+        self.assertEqual(loaded["serial"][0], loaded["process"][0])
+        for serial_df, process_df in zip(loaded["serial"][1], loaded["process"][1]):
+            self.assertTrue(serial_df.equals(process_df))
+        np.testing.assert_array_equal(loaded["serial"][2], loaded["process"][2])
+
+
+if __name__ == '__main__':
+    unittest.main()
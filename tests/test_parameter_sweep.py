@@ -0,0 +1,78 @@
+import unittest
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from ionerdss.ode_solver.parameter_sweep import solve_reaction_ode_sweep
+from ionerdss.ode_solver.reaction_network import ReactionNetwork
+
+
+class TestParameterSweep(unittest.TestCase):
+
+    def setUp(self):
+        # A + B <-> C, C -> D
+        self.reactant_matrix = np.array([[1, 1, 0, 0], [0, 0, 1, 0], [0, 0, 1, 0]])
+        self.product_matrix = np.array([[0, 0, 1, 0], [1, 1, 0, 0], [0, 0, 0, 1]])
+        self.y_initial = np.array([1.0, 0.8, 0.0, 0.0])
+        self.times = np.linspace(0.5, 5.0, 10)
+        self.k_sets = np.exp(np.random.default_rng(3).normal(size=(6, 3)))
+
+    def sweep(self, **kwargs):
+        options = dict(atol=1e-10, rtol=1e-8, backend="serial")
+        options.update(kwargs)
+        return solve_reaction_ode_sweep(self.k_sets, self.times, self.y_initial, self.reactant_matrix,
+                                        self.product_matrix, **options)
+
+    def test_matches_independent_solves(self):
+        result = self.sweep(batch_size=4)
+        self.assertEqual(result.y.shape, (6, 10, 4))
+        self.assertTrue(result.success.all())
+        self.assertIsNone(result.sensitivities)
+        for k, y in zip(self.k_sets, result.y):
+            network = ReactionNetwork(self.reactant_matrix, self.product_matrix, k)
+            expected = solve_ivp(network.dydt, (0.0, self.times[-1]), self.y_initial, t_eval=self.times,
+                                 method="LSODA", atol=1e-10, rtol=1e-8).y.T
+            np.testing.assert_allclose(y, expected, atol=1e-6)
+        # Mass conservation of A + C + D
+        np.testing.assert_allclose(result.y[:, :, [0, 2, 3]].sum(axis=2), 1.0, atol=1e-7)
+
+    def test_sensitivities_match_finite_differences(self):
+        result = self.sweep(sensitivities=True, sensitivity_parameters=[0, 2])
+        self.assertEqual(result.sensitivities.shape, (6, 10, 4, 2))
+        step = 1e-5
+        for column, parameter in enumerate([0, 2]):
+            upper, lower = self.k_sets.copy(), self.k_sets.copy()
+            upper[:, parameter] *= 1 + step
+            lower[:, parameter] *= 1 - step
+            y_upper = solve_reaction_ode_sweep(upper, self.times, self.y_initial, self.reactant_matrix,
+                                               self.product_matrix, atol=1e-12, rtol=1e-10, backend="serial").y
+            y_lower = solve_reaction_ode_sweep(lower, self.times, self.y_initial, self.reactant_matrix,
+                                               self.product_matrix, atol=1e-12, rtol=1e-10, backend="serial").y
+            expected = (y_upper - y_lower) / (2 * step * self.k_sets[:, parameter])[:, None, None]
+            np.testing.assert_allclose(result.sensitivities[..., column], expected, atol=1e-4)
+
+    def test_process_pool_and_warm_start_agree(self):
+        serial = self.sweep(warm_start=False)
+        pooled = self.sweep(backend="process", max_workers=2, batch_size=2)
+        np.testing.assert_allclose(pooled.y, serial.y, atol=1e-7)
+        np.testing.assert_array_equal(pooled.rate_constants, self.k_sets)
+
+    def test_output_at_initial_time(self):
+        times = np.array([0.0, 1.0])
+        result = solve_reaction_ode_sweep(self.k_sets[:2], times, self.y_initial, self.reactant_matrix,
+                                          self.product_matrix, backend="serial")
+        np.testing.assert_array_equal(result.y[:, 0], np.tile(self.y_initial, (2, 1)))
+
+    def test_rejects_inconsistent_arguments(self):
+        with self.assertRaises(ValueError):
+            self.sweep(backend="threads")
+        with self.assertRaises(ValueError):
+            solve_reaction_ode_sweep(self.k_sets[:, :2], self.times, self.y_initial, self.reactant_matrix,
+                                     self.product_matrix)
+        with self.assertRaises(ValueError):
+            solve_reaction_ode_sweep(self.k_sets, self.times[::-1], self.y_initial, self.reactant_matrix,
+                                     self.product_matrix)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import numpy as np
+
+from ionerdss import ReactionStringParser, reaction_dydt, solve_reaction_ode
+from ionerdss.ode_solver.reaction_network import ReactionNetwork
+from ionerdss.ode_solver.reaction_ode_solver import calculate_macroscopic_reaction_rates
+
+
+def assembly_network(rng, num_species=12, num_reactions=30):
+    """Random network of first and second order reactions, including 2A -> B."""
+    reactant_matrix = np.zeros((num_reactions, num_species), dtype=int)
+    product_matrix = np.zeros((num_reactions, num_species), dtype=int)
+    for r in range(num_reactions):
+        order = rng.integers(0, 3)
+        for s in rng.choice(num_species, size=order, replace=False):
+            reactant_matrix[r, s] += 1
+        if r % 7 == 0:
+            reactant_matrix[r, rng.integers(num_species)] = 2
+        for s in rng.choice(num_species, size=rng.integers(1, 3), replace=False):
+            product_matrix[r, s] += 1
+    return reactant_matrix, product_matrix, rng.uniform(0.1, 2.0, num_reactions)
+
+
+class TestReactionNetwork(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.reactant_matrix, self.product_matrix, self.k = assembly_network(self.rng)
+        self.network = ReactionNetwork(self.reactant_matrix, self.product_matrix, self.k)
+
+    def test_matches_reference_rates_and_dydt(self):
+        for y in (self.rng.uniform(0.0, 3.0, 12), np.zeros(12), np.r_[0.0, self.rng.uniform(0.5, 1.0, 11)]):
+            np.testing.assert_allclose(self.network.rates(y),
+                                       calculate_macroscopic_reaction_rates(y, self.reactant_matrix, self.k))
+            np.testing.assert_allclose(self.network.dydt(0.0, y),
+                                       reaction_dydt(0.0, y, self.reactant_matrix, self.product_matrix, self.k),
+                                       atol=1e-12)
+
+    def test_jacobian_matches_finite_differences(self):
+        # Includes zero concentrations, where dividing the rate by y would fail
+        y = self.rng.uniform(0.5, 2.0, 12)
+        y[[1, 4]] = 0.0
+        jacobian = self.network.jacobian(0.0, y)
+        self.assertEqual(jacobian.shape, (12, 12))
+        step = 1e-6
+        expected = np.empty((12, 12))
+        for s in range(12):
+            upper, lower = y.copy(), y.copy()
+            upper[s] += step
+            lower[s] -= step
+            expected[:, s] = (self.network.dydt(0.0, upper) - self.network.dydt(0.0, lower)) / (2 * step)
+        np.testing.assert_allclose(jacobian.toarray(), expected, atol=1e-6)
+        np.testing.assert_allclose(self.network.dense_jacobian(0.0, y), jacobian.toarray())
+
+    def test_from_reaction_strings(self):
+        network = ReactionNetwork.from_reaction_strings(["A + B -> C, kon", "C -> A + B, koff", "2A -> D, kd"],
+                                                        {"kon": 2.0, "koff": 0.5, "kd": 1.0})
+        y = dict(zip(network.species_names, (1.0, 3.0, 4.0, 0.0)))
+        rates = dict(zip(network.rate_constant_names, network.rates([y[name] for name in network.species_names])))
+        self.assertEqual(rates, {"kon": 6.0, "koff": 2.0, "kd": 1.0})
+
+    def test_solve_with_analytic_jacobian(self):
+        parser = ReactionStringParser()
+        species_names, _, reactant_matrix, product_matrix = parser.parse_reaction_strings(
+            ["A + B -> C, kon", "C -> A + B, koff"])
+        k = [1.0, 0.5]
+        species = list(species_names)
+        y_initial = [1.0 if name in ("A", "B") else 0.0 for name in species]
+        _, y_bdf, _ = solve_reaction_ode(reaction_dydt, (0, 20), y_initial, reactant_matrix, product_matrix, k,
+                                         plotting=False)
+        _, y_rk, _ = solve_reaction_ode(reaction_dydt, (0, 20), y_initial, reactant_matrix, product_matrix, k,
+                                        plotting=False, method="RK45", atol=1e-8)
+        np.testing.assert_allclose(y_bdf[-1], y_rk[-1], atol=1e-3)
+        # Equilibrium of A + B <-> C from [A] = [B] = 1: c / (1 - c)^2 = kon / koff
+        c = y_rk[-1][species.index("C")]
+        self.assertAlmostEqual(c / (1 - c) ** 2, 2.0, places=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from ionerdss.nerdss_analysis.cache import ResultCache, make_cache_key
+from ionerdss.nerdss_analysis.data.core import Data
+
+SIM_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "8erq_dir", "nerdss_output", "1")
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_lru_eviction_respects_budget(self):
+        cache = ResultCache(max_bytes=3 * 8000)
+        for i in range(3):
+            cache.put(f"k{i}", np.zeros(1000))
+        cache.get("k0")     # k1 is now the least recently used
+        cache.put("k3", np.zeros(1000))
+
+        self.assertIn("k0", cache)
+        self.assertNotIn("k1", cache)
+        stats = cache.stats()
+        self.assertLessEqual(stats["memory_bytes"], 3 * 8000)
+        self.assertEqual(stats["evictions"], 1)
+
+    def test_key_changes_with_file_and_params(self):
+        path = os.path.join(self.temp_dir.name, "data.dat")
+        with open(path, "w") as f:
+            f.write("1\n")
+        key = make_cache_key("test", [path], time_frame=(0, 1))
+        self.assertEqual(key, make_cache_key("test", [path], time_frame=[0, 1]))
+        self.assertNotEqual(key, make_cache_key("test", [path], time_frame=(0, 2)))
+
+        with open(path, "a") as f:
+            f.write("2\n")
+        self.assertNotEqual(key, make_cache_key("test", [path], time_frame=(0, 1)))
+
+    def test_disk_tier_and_hit_rate(self):
+        disk_dir = os.path.join(self.temp_dir.name, "results")
+        ResultCache(disk_dir=disk_dir).put("value", {"a": np.arange(5)})
+
+        cache = ResultCache(disk_dir=disk_dir)
+        np.testing.assert_array_equal(cache.get("value")["a"], np.arange(5))
+        cache.get("value")
+        self.assertIsNone(cache.get("missing"))
+
+        stats = cache.stats()
+        self.assertEqual((stats["disk_hits"], stats["hits"], stats["misses"]), (1, 1, 1))
+        self.assertAlmostEqual(stats["hit_rate"], 2 / 3)
+        self.assertEqual(stats["disk_entries"], 1)
+
+        cache.clear(disk=True)
+        self.assertEqual(cache.stats()["disk_entries"], 0)
+
+    def test_data_results_follow_file_changes(self):
+        sim_dir = os.path.join(self.temp_dir.name, "1")
+        shutil.copytree(SIM_DIR, sim_dir)
+        data = Data()
+        data.configure([sim_dir], executor="serial", cache_dir=os.path.join(self.temp_dir.name, "cache"))
+
+        series = data.get_time_series_statistics(["A: 1."])
+        self.assertIs(data.get_time_series_statistics(["A: 1."]), series)
+        self.assertGreater(data.get_cache_info()["hit_rate"], 0)
+
+        with open(os.path.join(sim_dir, "DATA", "histogram_complexes_time.dat"), "a") as f:
+            f.write("Time (s): 99\n1\tA: 1. \n")
+        updated = data.get_time_series_statistics(["A: 1."])
+        self.assertEqual(len(updated["Time (s)"]), len(series["Time (s)"]) + 1)
+
+    def test_single_dir_and_one_element_list_cached_separately(self):
+        data = Data()
+        data.configure([SIM_DIR], executor="serial")
+        for query in (data.get_histogram_data, data.get_copy_numbers_data):
+            with self.subTest(query=query.__name__):
+                aggregated = query([SIM_DIR])
+                single = query(SIM_DIR)
+                self.assertIn('metadata', aggregated)
+                self.assertNotIn('metadata', single)
+                self.assertIs(query([SIM_DIR]), aggregated)
+                self.assertIs(query(SIM_DIR), single)
+
+
+if __name__ == '__main__':
+    unittest.main()
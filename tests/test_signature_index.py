@@ -0,0 +1,45 @@
+import unittest
+
+import numpy as np
+
+from ionerdss.nerdss_model.signature_index import SignatureIndex
+
+
+def similar(sig1, sig2, intra, inter, angle):
+    return (abs(sig1["dA"] - sig2["dA"]) <= intra and abs(sig1["dB"] - sig2["dB"]) <= intra
+            and abs(sig1["dAB"] - sig2["dAB"]) <= inter
+            and abs(sig1["thetaA"] - sig2["thetaA"]) <= angle and abs(sig1["thetaB"] - sig2["thetaB"]) <= angle)
+
+
+def random_signature(rng):
+    return {"dA": rng.uniform(10, 30), "dB": rng.uniform(10, 30), "dAB": rng.uniform(0, 10),
+            "thetaA": rng.uniform(0, 180), "thetaB": rng.uniform(0, 180)}
+
+
+class TestSignatureIndex(unittest.TestCase):
+    def test_matches_linear_scan(self):
+        rng = np.random.default_rng(0)
+        index = SignatureIndex(3.5, 3.5, 25.0)
+        for _ in range(300):
+            index.add(random_signature(rng))
+        for _ in range(300):
+            query = random_signature(rng)
+            expected = [sig for sig in index.signatures if similar(query, sig, 3.5, 3.5, 25.0)]
+            self.assertEqual(index.find_similar(query), expected)
+            self.assertEqual(index.has_similar(query), bool(expected))
+
+    def test_boundary_and_zero_thresholds(self):
+        sig = {"dA": 7.0, "dB": 10.5, "dAB": 3.5, "thetaA": 30.0, "thetaB": 60.0}
+        index = SignatureIndex(3.5, 3.5, 25.0)
+        index.add(sig)
+        self.assertTrue(index.has_similar(dict(sig, dA=10.5, dAB=0.0, thetaB=85.0)))
+        self.assertFalse(index.has_similar(dict(sig, dB=14.0 + 1e-9)))
+
+        exact = SignatureIndex(0.0, 0.0, 0.0)
+        exact.add(sig)
+        self.assertTrue(exact.has_similar(dict(sig)))
+        self.assertFalse(exact.has_similar(dict(sig, dAB=3.5 + 1e-12)))
+
+
+if __name__ == "__main__":
+    unittest.main()
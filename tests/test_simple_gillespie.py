@@ -1,6 +1,18 @@
+import math
 import unittest
 import numpy as np
 from ionerdss import SimpleGillespieSimulator
+from ionerdss.gillespie_simulation.propensity import PropensityKernel
+from ionerdss.gillespie_simulation.ssa_methods import (
+    SumTreeSelector, CompositionRejectionSelector, IndexedPriorityQueue
+)
+
+
+def reference_propensity(y, reactant_matrix, microscopic_rate_constants):
+    return np.array([
+        k * np.prod([math.comb(int(n), int(order)) for n, order in zip(y, reaction)])
+        for reaction, k in zip(reactant_matrix, microscopic_rate_constants)
+    ])
 
 class TestReactionGillespie(unittest.TestCase):
 
@@ -39,6 +51,152 @@ class TestReactionGillespie(unittest.TestCase):
         )
 
         # You can add more assertions based on the expected behavior of your simulation
+        np.testing.assert_array_equal(y_init, [10, 5, 3])
+        self.assertEqual(len(y_record), len(t_record))
+
+    def test_propensity_kernel_matches_comb(self):
+        rng = np.random.default_rng(0)
+        reactant_matrix = rng.integers(0, 4, size=(40, 6)) * (rng.random((40, 6)) < 0.3)
+        reactant_matrix[0] = 0  # zeroth-order reaction
+        rate_constants = rng.random(40)
+        kernel = PropensityKernel(reactant_matrix, rate_constants)
+
+        for _ in range(5):
+            y = rng.integers(0, 6, size=6)
+            expected = reference_propensity(y, reactant_matrix, rate_constants)
+            np.testing.assert_allclose(kernel.evaluate(y), expected)
+
+            propensities = np.zeros(40)
+            subset = np.array([0, 3, 7, 39])
+            kernel.update(y, subset, propensities)
+            np.testing.assert_allclose(propensities[subset], expected[subset])
+            self.assertFalse(np.any(np.delete(propensities, subset)))
+
+    def test_dependency_graph_matches_update_flags(self):
+        delta_y = self.product_matrix - self.reactant_matrix
+        kernel = PropensityKernel(self.reactant_matrix, np.ones(2))
+        dependents = kernel.dependency_graph(delta_y)
+        for reaction_index in range(len(delta_y)):
+            flags = np.dot(self.reactant_matrix, np.abs(delta_y[reaction_index]))
+            np.testing.assert_array_equal(dependents[reaction_index], np.flatnonzero(flags))
+
+    def test_incremental_and_full_updates_agree(self):
+        y_init = np.array([10, 5, 3])
+        records = []
+        for full_update_scheme in (True, False):
+            np.random.seed(1)
+            records.append(self.sgs.gillespie_simulation(
+                0.5, y_init, self.reactant_matrix, self.product_matrix,
+                np.array([0.1, 0.01]), 1, full_update_scheme
+            ))
+        np.testing.assert_array_equal(records[0][0], records[1][0])
+        np.testing.assert_allclose(records[0][1], records[1][1])
+
+    def test_sum_tree_matches_cumulative_search(self):
+        rng = np.random.default_rng(2)
+        propensities = rng.random(37) * (rng.random(37) < 0.7)
+        tree = SumTreeSelector(propensities)
+        propensities[[3, 20]] = [0.0, 5.0]
+        tree.update(np.array([3, 20]), propensities)
+        self.assertAlmostEqual(tree.total, propensities.sum())
+
+        cumulative = np.cumsum(propensities)
+        for u in rng.random(200):
+            expected = int(np.searchsorted(cumulative, u * cumulative[-1], side="right"))
+            self.assertEqual(tree.select(lambda: u), expected)
+
+    def test_composition_rejection_distribution(self):
+        np.random.seed(3)
+        propensities = np.array([0.0, 1.0, 3.0, 0.01, 100.0, 40.0])
+        selector = CompositionRejectionSelector(propensities)
+        propensities[[4, 0]] = [6.0, 2.0]
+        selector.update(np.array([4, 0]), propensities)
+        self.assertAlmostEqual(selector.total, propensities.sum())
+
+        draws = np.bincount([selector.select(np.random.rand) for _ in range(20000)], minlength=6)
+        np.testing.assert_allclose(draws / draws.sum(), propensities / propensities.sum(), atol=0.015)
+
+    def test_indexed_priority_queue(self):
+        rng = np.random.default_rng(4)
+        keys = rng.random(50)
+        queue = IndexedPriorityQueue(keys)
+        for item, key in zip(rng.integers(0, 50, 200), rng.random(200) * 2):
+            keys[item] = key
+            queue.update(int(item), float(key))
+            self.assertEqual(queue.top(), (int(np.argmin(keys)), keys.min()))
+
+    def test_ssa_methods_reach_equilibrium(self):
+        # A <-> B with equal rates: time-averaged A is half of the total
+        reactant_matrix = np.array([[1, 0], [0, 1]])
+        product_matrix = np.array([[0, 1], [1, 0]])
+        for method in ("direct", "sum_tree", "composition_rejection", "next_reaction"):
+            np.random.seed(5)
+            y_record, t_record = self.sgs.gillespie_simulation(
+                200.0, np.array([100, 0]), reactant_matrix, product_matrix,
+                np.array([1.0, 1.0]), method=method
+            )
+            a = np.array(y_record)[:-1, 0]
+            dwell = np.diff(t_record)
+            mean_a = np.sum(a[dwell.size // 10:] * dwell[dwell.size // 10:]) / np.sum(dwell[dwell.size // 10:])
+            self.assertAlmostEqual(mean_a, 50, delta=3, msg=method)
+            self.assertTrue(np.all(np.array(y_record).sum(axis=1) == 100), msg=method)
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            self.sgs.gillespie_simulation(1.0, self.y, self.reactant_matrix, self.product_matrix,
+                                          np.ones(2), method="first_reaction")
+
+
+    def binding_network(self):
+        # A + B <-> C
+        return np.array([[1, 1, 0], [0, 0, 1]]), np.array([[0, 0, 1], [1, 1, 0]]), np.array([1e-3, 0.5])
+
+    def test_tau_leaping_matches_ssa_statistics(self):
+        reactant_matrix, product_matrix, k = self.binding_network()
+        y_init = np.array([800, 600, 0])
+        finals = {}
+        for method in ("direct", "tau_leaping"):
+            finals[method] = np.array([
+                self.sgs.gillespie_simulation(2.0, y_init, reactant_matrix, product_matrix, k,
+                                              method=method, rng=np.random.default_rng(seed))[0][-1]
+                for seed in range(8)
+            ])
+        self.assertAlmostEqual(finals["tau_leaping"][:, 2].mean(), finals["direct"][:, 2].mean(), delta=15)
+
+        _, t_exact = self.sgs.gillespie_simulation(
+            2.0, y_init, reactant_matrix, product_matrix, k, rng=np.random.default_rng(0))
+        _, t_record = self.sgs.tau_leaping_simulation(
+            2.0, y_init, reactant_matrix, product_matrix, k, rng=np.random.default_rng(0))
+        self.assertEqual(t_record[-1], 2.0)
+        self.assertLess(len(t_record), len(t_exact) / 2)
+
+    def test_tau_leaping_takes_exact_steps_at_low_copy_numbers(self):
+        reactant_matrix, product_matrix, k = self.binding_network()
+        delta_y = product_matrix - reactant_matrix
+        y_record, _ = self.sgs.tau_leaping_simulation(
+            20.0, np.array([10, 8, 0]), reactant_matrix, product_matrix, np.array([0.05, 0.5]),
+            rng=np.random.default_rng(1))
+        # The last step is cut short at max_time and may fire nothing
+        steps = np.diff(np.array(y_record), axis=0)[:-1]
+        self.assertTrue(all(any(np.array_equal(step, d) for d in delta_y) for step in steps))
+
+    def test_hybrid_simulation(self):
+        reactant_matrix, product_matrix, k = self.binding_network()
+        y_record, t_record = self.sgs.hybrid_simulation(
+            2.0, np.array([800, 600, 5]), reactant_matrix, product_matrix, k,
+            copy_threshold=3, rng=np.random.default_rng(0))
+        y_record = np.array(y_record)
+        self.assertEqual(y_record.dtype, np.float64)
+        self.assertEqual(t_record[-1], 2.0)
+        np.testing.assert_allclose(y_record[:, 0] + y_record[:, 2], 805)
+        np.testing.assert_allclose(y_record[:, 0] - y_record[:, 1], 200)
+
+        # With a threshold above every copy number the hybrid reduces to exact SSA
+        y_record, _ = self.sgs.hybrid_simulation(
+            0.5, np.array([10, 8, 0]), reactant_matrix, product_matrix, k,
+            rng=np.random.default_rng(0))
+        self.assertTrue(np.all(np.abs(np.diff(np.array(y_record)[:, 2])) == 1))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from ionerdss.nerdss_analysis import discovery
+from ionerdss.nerdss_analysis.analysis import Analysis
+from ionerdss.nerdss_analysis.discovery import discover_simulation_dirs, get_manifest_path
+
+
+def make_simulation(path):
+    os.makedirs(os.path.join(path, "DATA"), exist_ok=True)
+
+
+class TestSimulationDiscovery(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        for name in ("sweep/k1", "sweep/k2", "other/rep0"):
+            make_simulation(os.path.join(self.root, name))
+        os.makedirs(os.path.join(self.root, "sweep", "k1", "restart"))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def expected(self, *names):
+        return sorted(os.path.join(self.root, name) for name in names)
+
+    def test_manifest_reused_until_tree_changes(self):
+        found = discover_simulation_dirs(self.root)
+        self.assertEqual(sorted(found), self.expected("sweep/k1", "sweep/k2", "other/rep0"))
+        self.assertTrue(os.path.exists(get_manifest_path(self.root)))
+
+        with mock.patch.object(discovery.os, "walk", side_effect=AssertionError("walked")):
+            self.assertEqual(discover_simulation_dirs(self.root), found)
+
+        make_simulation(os.path.join(self.root, "sweep", "k3"))
+        self.assertEqual(sorted(discover_simulation_dirs(self.root)),
+                         self.expected("sweep/k1", "sweep/k2", "sweep/k3", "other/rep0"))
+
+    def test_single_simulation_and_no_manifest(self):
+        sim_dir = os.path.join(self.root, "sweep", "k1")
+        self.assertEqual(discover_simulation_dirs(sim_dir), [sim_dir])
+        discover_simulation_dirs(self.root, use_manifest=False)
+        self.assertFalse(os.path.exists(get_manifest_path(self.root)))
+
+    def test_analysis_defers_discovery_and_data(self):
+        with mock.patch.object(discovery, "walk_simulation_dirs",
+                               wraps=discovery.walk_simulation_dirs) as walk:
+            analysis = Analysis(save_dir=self.root)
+            walk.assert_not_called()
+            self.assertIsNone(analysis._data)
+
+            data = analysis.data
+            self.assertEqual(walk.call_count, 1)
+            self.assertEqual(data._config['simulations'], [0, 1, 2])
+            self.assertEqual(analysis.get_simulation_info()['num_simulations'], 3)
+
+            # A second session reuses the manifest
+            self.assertEqual(Analysis(save_dir=self.root).simulation_dirs, analysis.simulation_dirs)
+            self.assertEqual(walk.call_count, 1)
+
+    def test_missing_simulations_raise_on_access(self):
+        with tempfile.TemporaryDirectory() as empty:
+            analysis = Analysis(save_dir=empty)
+            with self.assertRaises(ValueError):
+                analysis.simulation_dirs
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+import io
+import os
+import json
+import stat
+import contextlib
+import tempfile
+import unittest
+
+from ionerdss.nerdss_simulation.scheduler import SimulationScheduler
+from ionerdss.nerdss_simulation.simulation import Simulation
+
+# Fake NERDSS: tracks how many copies run at once and fails when the run directory is named "3"
+FAKE_NERDSS = """#!/bin/sh
+mkdir -p ../running
+touch ../running/$$
+ls ../running | wc -l >> ../peaks
+sleep 0.2
+rm ../running/$$
+[ "$(basename "$PWD")" = "3" ] && exit 3
+exit 0
+"""
+
+
+class TestSimulationScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.work_dir = self.temp_dir.name
+        bin_dir = os.path.join(self.work_dir, "NERDSS", "bin")
+        os.makedirs(bin_dir)
+        nerdss = os.path.join(bin_dir, "nerdss")
+        with open(nerdss, "w") as f:
+            f.write(FAKE_NERDSS)
+        os.chmod(nerdss, os.stat(nerdss).st_mode | stat.S_IEXEC)
+        os.makedirs(os.path.join(self.work_dir, "nerdss_input"))
+        with open(os.path.join(self.work_dir, "nerdss_input", "parms.inp"), "w") as f:
+            f.write("start parameters\n    nItr = 10\n    timeStep = 0.1\nend parameters\n")
+        with open(os.path.join(self.work_dir, "nerdss_input", "A.mol"), "w") as f:
+            f.write("Name = A\nD = [12.0, 12.0, 12.0]\n")
+        self.sim_dir = os.path.join(self.work_dir, "nerdss_output")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_simulations(self, sim_indices, **kwargs):
+        simulation = Simulation(self.work_dir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return simulation.run_new_simulations(sim_indices=sim_indices, progress=False, **kwargs)
+
+    def test_slots_and_exit_codes(self):
+        records = self.run_simulations([1, 2, 3, 4, 5, 6], parallel=True, max_concurrent=2)
+        with open(os.path.join(self.sim_dir, "peaks")) as f:
+            peaks = [int(line) for line in f]
+        self.assertEqual(len(peaks), 6)
+        self.assertLessEqual(max(peaks), 2)
+
+        self.assertEqual(records[3].status, "failed")
+        self.assertEqual(records[3].returncode, 3)
+        for index in (1, 2, 4, 5, 6):
+            self.assertEqual(records[index].status, "completed")
+            self.assertGreater(records[index].wall_time, 0.0)
+        self.assertTrue(os.path.exists(os.path.join(self.sim_dir, "1", "parms.inp")))
+
+        with open(os.path.join(self.sim_dir, "sweep_manifest.json")) as f:
+            runs = json.load(f)["runs"]
+        self.assertEqual(runs["3"]["returncode"], 3)
+        self.assertEqual(runs["1"]["status"], "completed")
+
+    def test_resume_skips_completed_runs(self):
+        self.run_simulations([1, 2, 3])
+        os.remove(os.path.join(self.sim_dir, "peaks"))
+        records = self.run_simulations([1, 2, 3, 4], resume=True)
+        self.assertEqual([records[i].status for i in (1, 2)], ["skipped", "skipped"])
+        self.assertEqual(records[3].status, "failed")
+        self.assertEqual(records[4].status, "completed")
+        with open(os.path.join(self.sim_dir, "peaks")) as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+    def test_restart_simulations_wait(self):
+        self.run_simulations([1, 2])
+        for index in (1, 2):
+            os.makedirs(os.path.join(self.sim_dir, str(index), "DATA"))
+            open(os.path.join(self.sim_dir, str(index), "DATA", "restart.dat"), "w").close()
+        simulation = Simulation(self.work_dir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            records = simulation.run_restart_simulations(sim_indices=[1, 2], parallel=True, max_concurrent=2)
+        self.assertEqual([records[i].status for i in (1, 2)], ["completed", "completed"])
+        self.assertTrue(os.path.exists(os.path.join(self.sim_dir, "restart_sim_manifest.json")))
+
+    def test_linked_staging(self):
+        records = self.run_simulations([1, 2], staging="hardlink")
+        run_dir = os.path.join(self.sim_dir, "1")
+        mol_file = os.path.join(self.work_dir, "nerdss_input", "A.mol")
+        self.assertTrue(os.path.samefile(os.path.join(run_dir, "A.mol"), mol_file))
+        self.assertTrue(os.path.samefile(os.path.join(run_dir, "nerdss"), os.path.join(self.sim_dir, "2", "nerdss")))
+        self.assertFalse(os.path.samefile(os.path.join(run_dir, "parms.inp"), os.path.join(self.sim_dir, "2", "parms.inp")))
+        self.assertEqual(sorted(records[1].staging["linked"]), ["A.mol", "nerdss"])
+        self.assertEqual(records[1].staging["copied"], ["parms.inp"])
+        with open(os.path.join(self.sim_dir, "sweep_manifest.json")) as f:
+            self.assertEqual(json.load(f)["runs"]["1"]["staging"]["mode"], "hardlink")
+
+        # Editing the input replaces the file, leaving the staged runs untouched
+        Simulation(self.work_dir).modify_mol_file("A", {"D": "[1.0, 1.0, 1.0]"})
+        with open(os.path.join(run_dir, "A.mol")) as f:
+            self.assertIn("12.0", f.read())
+
+        # Restaging as copies replaces the links instead of writing through them
+        records = self.run_simulations([1], staging="copy")
+        self.assertFalse(os.path.islink(os.path.join(run_dir, "A.mol")))
+        self.assertFalse(os.path.samefile(os.path.join(run_dir, "A.mol"), mol_file))
+        self.assertEqual(records[1].staging["linked"], [])
+
+    def test_symlink_staging(self):
+        records = self.run_simulations([1], staging="symlink")
+        self.assertEqual(records[1].status, "completed")
+        self.assertTrue(os.path.islink(os.path.join(self.sim_dir, "1", "nerdss")))
+        with self.assertRaises(ValueError):
+            self.run_simulations([1], staging="reflink")
+
+    def schedule(self, manifest_path, prepares):
+        scheduler = SimulationScheduler(max_concurrent=2, manifest_path=manifest_path)
+        for index, prepare in enumerate(prepares, 1):
+            run_dir = os.path.join(self.work_dir, f"run{index}")
+            os.makedirs(run_dir)
+            scheduler.submit(index, run_dir, ["sh", "-c", "exit 0"], prepare=prepare)
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            records = scheduler.run()
+        return records, output.getvalue()
+
+    def test_failed_prepare_fails_only_its_run(self):
+        def broken():
+            raise RuntimeError("staging broke")
+        manifest_path = os.path.join(self.work_dir, "manifest.json")
+        records, _ = self.schedule(manifest_path, [None, broken, lambda: {"files": {"a", "b"}}])
+        self.assertEqual(records[1].status, "completed")
+        self.assertEqual(records[2].status, "failed")
+        self.assertIsNone(records[2].returncode)
+        self.assertIn("staging broke", records[2].error)
+        self.assertEqual(records[3].status, "failed")
+        self.assertIn("TypeError", records[3].error)
+        with open(manifest_path) as f:
+            self.assertEqual(json.load(f)["runs"]["2"]["status"], "failed")
+
+    def test_unwritable_manifest_does_not_fail_runs(self):
+        manifest_path = os.path.join(self.work_dir, "missing", "manifest.json")
+        records, output = self.schedule(manifest_path, [None, None, None])
+        self.assertEqual([record.returncode for record in records.values()], [0, 0, 0])
+        self.assertEqual([record.status for record in records.values()], ["completed"] * 3)
+        self.assertIn("could not write manifest", output)
+
+    def test_invalid_slot_count(self):
+        with self.assertRaises(ValueError):
+            SimulationScheduler(max_concurrent=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
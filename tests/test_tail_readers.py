@@ -0,0 +1,110 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from ionerdss.util import read_last_line
+from ionerdss.nerdss_analysis.data_readers import parse_transition_lifetime_data
+from ionerdss.nerdss_analysis.data.processors.histogram_store import parse_histogram_file
+from ionerdss.nerdss_analysis.data.processors.tail_readers import (
+    HistogramTailReader, CopyNumberTailReader, TransitionTailReader
+)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+SIM_DATA_DIR = os.path.join(DATA_DIR, "8y7s_dir", "nerdss_output", "1", "DATA")
+
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def complete_lines_copy(path, directory):
+    """Copy of ``path`` without a trailing, partially written line."""
+    content = read_bytes(path)
+    copy_path = os.path.join(directory, "complete_" + os.path.basename(path))
+    with open(copy_path, "wb") as f:
+        f.write(content[:content.rfind(b"\n") + 1])
+    return copy_path
+
+
+class TestTailReaders(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def grow(self, source, cut_points):
+        """Copy ``source`` into the temp dir in pieces, yielding after each piece."""
+        content = read_bytes(source)
+        target = os.path.join(self.temp_dir.name, os.path.basename(source))
+        open(target, "wb").close()
+        previous = 0
+        for cut in list(cut_points) + [len(content)]:
+            with open(target, "ab") as f:
+                f.write(content[previous:cut])
+            previous = cut
+            yield target
+
+    def test_histogram_tail_matches_full_parse(self):
+        source = os.path.join(DATA_DIR, "test_single_histogram.dat")
+        size = os.path.getsize(source)
+        reader = None
+        # Cut in the middle of lines and blocks
+        for target in self.grow(source, [size // 7, size // 3 + 5, size // 2, size // 2 + 1]):
+            reader = reader or HistogramTailReader(target)
+            store = reader.read()
+            expected = parse_histogram_file(complete_lines_copy(target, self.temp_dir.name))
+            self.assertEqual(store.to_dict(), expected.to_dict())
+
+    def test_copy_number_tail_matches_full_read(self):
+        source = os.path.join(SIM_DATA_DIR, "copy_numbers_time.dat")
+        size = os.path.getsize(source)
+        reader = None
+        for target in self.grow(source, [size // 5, size // 2 + 3]):
+            reader = reader or CopyNumberTailReader(target)
+            df = reader.read()
+        expected = pd.read_csv(source)
+        expected.rename(columns=lambda x: x.strip(), inplace=True)
+        np.testing.assert_allclose(df.values, expected.values)
+        self.assertEqual(list(df.columns), list(expected.columns))
+
+    def test_transition_tail_matches_full_parse(self):
+        source = os.path.join(SIM_DATA_DIR, "transition_matrix_time.dat")
+        size = os.path.getsize(source)
+        reader = None
+        for target in self.grow(source, [size // 4, size // 2 + 11]):
+            reader = reader or TransitionTailReader(target)
+            for time_frame in (None, (0.005, 0.03)):
+                matrix, lifetime = reader.read(time_frame)
+                expected_matrix, expected_lifetime = parse_transition_lifetime_data(
+                    complete_lines_copy(target, self.temp_dir.name), time_frame
+                )
+                np.testing.assert_array_equal(matrix, expected_matrix)
+                self.assertEqual(lifetime, expected_lifetime)
+
+    def test_truncated_file_is_read_again(self):
+        source = os.path.join(DATA_DIR, "test_single_histogram.dat")
+        target = os.path.join(self.temp_dir.name, "histogram_complexes_time.dat")
+        with open(target, "wb") as f:
+            f.write(read_bytes(source))
+        reader = HistogramTailReader(target)
+        reader.read()
+        with open(target, "w") as f:
+            f.write("Time (s): 0\n10\tdode: 1. \n")
+        store = reader.read()
+        self.assertEqual(store.to_dict(), {"Time (s)": [0.0], "complexes": [[(10, {"dode": 1})]]})
+
+    def test_read_last_line(self):
+        target = os.path.join(self.temp_dir.name, "copy_numbers_time.dat")
+        with open(target, "w") as f:
+            f.write("Time (s),A\n" + "".join(f"{i * 0.5},{i}\n" for i in range(5000)))
+        self.assertEqual(read_last_line(target, block_size=16), "2499.5,4999")
+
+
+if __name__ == '__main__':
+    unittest.main()
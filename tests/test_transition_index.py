@@ -0,0 +1,93 @@
+import os
+import re
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from ionerdss.nerdss_analysis.data_readers import read_transition_matrix
+from ionerdss.nerdss_analysis.transition_index import (
+    TransitionIndex, load_transition_index, get_index_file
+)
+
+SIM_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "8y7s_dir", "nerdss_output", "1")
+TIME_FRAMES = [None, (0.0, 0.01), (0.005, 0.03), (0.01, 0.01), (5.0, 6.0)]
+
+
+def read_transition_reference(file_path, time_frame):
+    """Whole-file reference parse: every block is parsed and the boundary blocks are differenced."""
+    with open(file_path) as f:
+        blocks = re.split(r"time:\s*", f.read())[1:]
+    time_data = []
+    for block in blocks:
+        lines = block.strip().splitlines()
+        matrix_start = next(i for i, l in enumerate(lines) if "transion matrix" in l) + 2
+        lifetime_start = next(i for i, l in enumerate(lines) if "lifetime for each mol type:" in l)
+        matrix = np.array([[int(x) for x in l.split()] for l in lines[matrix_start:lifetime_start]])
+        lifetime, size = {}, None
+        for line in lines[lifetime_start + 2:]:
+            if line.startswith("size of the cluster:"):
+                size = int(line.split(":")[1])
+            elif line.strip():
+                lifetime.setdefault(size, []).extend(float(x) for x in line.split())
+        time_data.append((float(lines[0]), matrix, lifetime))
+    time_data.sort(key=lambda x: x[0])
+
+    if time_frame is None:
+        return time_data[-1][1], time_data[-1][2]
+    valid = [d for d in time_data if time_frame[0] <= d[0] <= time_frame[1]]
+    if len(valid) < 2:
+        return np.array([]), {}
+    (_, m0, l0), (_, m1, l1) = valid[0], valid[-1]
+    return m1 - m0, {k: v[len(l0.get(k, [])):] for k, v in l1.items()}
+
+
+class TestTransitionIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.sim_dir = os.path.join(self.temp_dir.name, "1")
+        os.makedirs(os.path.join(self.sim_dir, "DATA"))
+        self.data_file = os.path.join(self.sim_dir, "DATA", "transition_matrix_time.dat")
+        shutil.copy(os.path.join(SIM_DIR, "DATA", "transition_matrix_time.dat"), self.data_file)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_matches_reference_parser(self):
+        for time_frame in TIME_FRAMES:
+            matrix, lifetime = read_transition_matrix(self.sim_dir, time_frame)
+            expected_matrix, expected_lifetime = read_transition_reference(self.data_file, time_frame)
+            np.testing.assert_array_equal(matrix, expected_matrix)
+            self.assertEqual(lifetime, expected_lifetime)
+
+    def test_time_frame_parses_boundary_blocks_only(self):
+        index = TransitionIndex.build(self.data_file)
+        self.assertGreater(index.num_blocks, 3)
+        with mock.patch.object(TransitionIndex, "read_block", autospec=True,
+                               side_effect=TransitionIndex.read_block) as read_block:
+            index.query((0.0, 1e9))
+        self.assertEqual(read_block.call_count, 2)
+
+    def test_flat_lifetimes(self):
+        index = TransitionIndex.build(self.data_file)
+        snapshot = index.read_block(index.num_blocks - 1)
+        lifetime = snapshot.lifetime_dict()
+        for size in snapshot.sizes:
+            np.testing.assert_array_equal(snapshot.lifetimes(size), lifetime[size])
+        self.assertEqual(int(snapshot.lifetime_counts.sum()), len(snapshot.lifetime_values))
+
+    def test_sidecar_is_invalidated_on_append(self):
+        load_transition_index(self.sim_dir)
+        self.assertTrue(os.path.exists(get_index_file(self.sim_dir)))
+        num_blocks = load_transition_index(self.sim_dir).num_blocks
+
+        with open(self.data_file, "a") as f:
+            f.write("time: 99\ntransion matrix for each mol type: \nA\n 1 0\n 0 1\n")
+        self.assertEqual(load_transition_index(self.sim_dir).num_blocks, num_blocks + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()